@@ -0,0 +1,131 @@
+from fastapi import APIRouter, Header, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
+import os
+import logging
+from typing import AsyncIterator, List, Optional
+
+from ..core.push_hub import Subscription, alert_topic, price_topic, push_hub
+from ..services.auth import user_from_token
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# Comment frames keep idle SSE connections open through proxies
+HEARTBEAT_SECONDS = float(os.getenv('PUSH_HEARTBEAT_SECONDS', '15'))
+
+
+def _user_id(token: Optional[str], authorization: Optional[str] = None) -> Optional[str]:
+    """User from a ?token= query parameter or a Bearer header; None if anonymous"""
+    if not token and authorization and authorization.lower().startswith('bearer '):
+        token = authorization[7:]
+    if not token:
+        return None
+    return user_from_token(token).user_id  # raises 401 for a bad token
+
+
+def _topics(cards: List[str], user_id: Optional[str]) -> List[str]:
+    topics = [alert_topic(user_id)] if user_id else []
+    return topics + [price_topic(card) for card in cards if card.strip()]
+
+
+def _split_cards(cards: Optional[str]) -> List[str]:
+    return [card for card in (cards or '').split(',') if card.strip()]
+
+
+async def event_stream(subscription: Subscription, heartbeat: float = HEARTBEAT_SECONDS) -> AsyncIterator[str]:
+    """SSE frames for a subscription; unsubscribes when the client goes away"""
+    try:
+        yield f"retry: 3000\nevent: subscribed\ndata: {json.dumps({'topics': sorted(subscription.topics)})}\n\n"
+        while True:
+            event = await subscription.get(timeout=heartbeat)
+            yield event.sse if event else ": ping\n\n"
+    finally:
+        push_hub.unsubscribe(subscription)
+
+
+@router.get("/stream/events")
+async def stream_events(
+    cards: Optional[str] = Query(None, description="Comma-separated card names to receive price ticks for"),
+    token: Optional[str] = Query(None, description="JWT (EventSource can't send headers); adds your alert feed"),
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Server-sent events: price ticks for the given cards and, when
+    authenticated, your alert triggers
+
+    Events: `price` {card_name, avg_price, high, low, recorded_at} and
+    `alert_triggered` {id, card_name, target_price, current_price, alert_type, triggered_at}.
+    """
+    user_id = _user_id(token, authorization)
+    subscription = push_hub.subscribe(_topics(_split_cards(cards), user_id))
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Too many live connections, retry later")
+    return StreamingResponse(
+        event_stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/stream/stats")
+async def stream_stats():
+    """Live connections and fan-out counters for this worker"""
+    return {"connections": push_hub.connections, "max_connections": push_hub.max_connections, **push_hub.stats}
+
+
+@router.websocket("/ws/events")
+async def websocket_events(websocket: WebSocket, cards: Optional[str] = None, token: Optional[str] = None):
+    """
+    WebSocket feed with the same events as /stream/events
+
+    Clients may change their card set with
+    {"action": "subscribe" | "unsubscribe", "cards": [...]}.
+    """
+    try:
+        user_id = _user_id(token, websocket.headers.get('authorization'))
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    subscription = push_hub.subscribe(_topics(_split_cards(cards), user_id))
+    if subscription is None:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+
+    await websocket.accept()
+
+    async def send_events():
+        while True:
+            event = await subscription.get()
+            await websocket.send_text(event.message)
+
+    sender = asyncio.create_task(send_events())
+    try:
+        await websocket.send_json({'type': 'subscribed', 'data': {'topics': sorted(subscription.topics)}})
+        while True:
+            try:
+                request = await websocket.receive_json()
+            except json.JSONDecodeError:
+                await websocket.send_json({'type': 'error', 'data': {'detail': "message must be JSON"}})
+                continue
+            cards = request.get('cards', []) if isinstance(request, dict) else None
+            if not isinstance(cards, list) or not all(isinstance(card, str) for card in cards):
+                await websocket.send_json({'type': 'error', 'data': {
+                    'detail': 'send {"action": "subscribe" | "unsubscribe", "cards": [card names]}'
+                }})
+                continue
+            topics = [price_topic(card) for card in cards if card.strip()]
+            if request.get('action') == 'subscribe':
+                push_hub.add_topics(subscription, topics)
+            elif request.get('action') == 'unsubscribe':
+                push_hub.remove_topics(subscription, topics)
+            else:
+                await websocket.send_json({'type': 'error', 'data': {'detail': "action must be subscribe or unsubscribe"}})
+                continue
+            await websocket.send_json({'type': 'subscribed', 'data': {'topics': sorted(subscription.topics)}})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        push_hub.unsubscribe(subscription)
@@ -5,7 +5,7 @@ import json
 from typing import Optional
 from supabase import create_client, Client
 from ebaysdk.finding import Connection as Finding
-from app.services.auth import get_current_user
+from app.services.auth import User, get_current_user
 from app.core.database import PortfolioOperations
 from app.core.models import Portfolio
 
@@ -78,7 +78,7 @@ def get_ebay_price_estimate(player: str, year: int, card_set: str) -> Optional[f
 async def upload_card(
     file: UploadFile = File(...),
     metadata: str = Form(...),
-    current_user: dict = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Upload a card image, extract metadata, and add to portfolio
@@ -94,7 +94,7 @@ async def upload_card(
             raise HTTPException(status_code=400, detail="Player name is required")
 
         # Get user ID from JWT
-        user_id = current_user.get('sub')
+        user_id = current_user.user_id
         if not user_id:
             raise HTTPException(status_code=401, detail="Invalid user authentication")
 
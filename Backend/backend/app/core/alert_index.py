@@ -0,0 +1,315 @@
+# DimeDrop Alert Index
+# In-memory, per-card sorted thresholds for matching price alerts by binary search
+
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def card_key(card_name: str) -> str:
+    """Index key for a card name (same trimming as portfolio holdings)"""
+    return card_name.strip()
+
+
+class _CardThresholds:
+    """
+    Sorted (price, alert_id) pairs for one card, split by alert type
+
+    above/below hold armed alerts by target price; rearm_above/rearm_below
+    hold fired auto re-arm alerts by the price that re-arms them.
+    """
+
+    __slots__ = ('above', 'below', 'rearm_above', 'rearm_below')
+
+    def __init__(self):
+        self.above: List[Tuple[float, int]] = []
+        self.below: List[Tuple[float, int]] = []
+        self.rearm_above: List[Tuple[float, int]] = []
+        self.rearm_below: List[Tuple[float, int]] = []
+
+    def side(self, alert_type: str, armed: bool = True) -> List[Tuple[float, int]]:
+        if armed:
+            return self.above if alert_type == 'above' else self.below
+        return self.rearm_above if alert_type == 'above' else self.rearm_below
+
+    def __bool__(self) -> bool:
+        return bool(self.above or self.below or self.rearm_above or self.rearm_below)
+
+
+class _AlertState:
+    """Where an alert is indexed, plus its cooldown / re-arm settings"""
+
+    __slots__ = ('key', 'alert_type', 'target', 'armed', 'auto_rearm', 'cooldown', 'hysteresis', 'last_triggered')
+
+    def __init__(self, key: str, alert_type: str, target: float, armed: bool, auto_rearm: bool,
+                 cooldown: float, hysteresis: float, last_triggered: Optional[datetime]):
+        self.key = key
+        self.alert_type = alert_type
+        self.target = target
+        self.armed = armed
+        self.auto_rearm = auto_rearm
+        self.cooldown = cooldown
+        self.hysteresis = hysteresis
+        self.last_triggered = last_triggered
+
+    @property
+    def rearm_price(self) -> float:
+        """Price the alert must move back past before it can fire again"""
+        band = self.target * self.hysteresis / 100
+        return self.target - band if self.alert_type == 'above' else self.target + band
+
+    @property
+    def position(self) -> float:
+        """Price it is sorted by in its list: the target when armed, else the rearm price"""
+        return self.target if self.armed else self.rearm_price
+
+
+class AlertIndex:
+    """
+    Active alerts indexed by card, with thresholds kept sorted
+
+    For a new price p, 'above' alerts with target <= p form a prefix of the
+    card's sorted above list and 'below' alerts with target >= p form a suffix
+    of its below list, so matching is two binary searches plus the k matches.
+
+    Alerts with auto_rearm stay active after firing but are disarmed until
+    the price moves back out of a hysteresis band (hysteresis_pct of the
+    target below an 'above' target, above a 'below' one); re-arming is the
+    same binary search on the rearm lists. Any alert that fired less than
+    cooldown_seconds ago is held back instead of firing again.
+
+    With a version_loader, ensure_current() notices writes made by other
+    worker processes: every refresh_seconds at most it reads the stored
+    version and rebuilds the index if it moved since the last load.
+    """
+
+    def __init__(self, loader: Optional[Callable[[], Iterable[Dict]]] = None,
+                 cooldown_seconds: float = 0, hysteresis_pct: float = 0,
+                 version_loader: Optional[Callable[[], Optional[int]]] = None,
+                 refresh_seconds: float = 5):
+        """
+        Args:
+            loader: Returns every active alert (id, card_name, target_price,
+                alert_type, and optionally armed, auto_rearm, cooldown_seconds,
+                hysteresis_pct, last_triggered); called on first use and by reload()
+            cooldown_seconds: Cooldown for alerts that don't set their own
+            hysteresis_pct: Re-arm band for alerts that don't set their own
+            version_loader: Returns the alerts table's change counter (None if
+                it can't be read); bumped by every alert write, in any worker
+            refresh_seconds: Minimum time between version checks
+        """
+        self.loader = loader
+        self.cooldown_seconds = cooldown_seconds
+        self.hysteresis_pct = hysteresis_pct
+        self.version_loader = version_loader
+        self.refresh_seconds = refresh_seconds
+        self.clock = time.monotonic
+        self._cards: Dict[str, _CardThresholds] = {}
+        self._alerts: Dict[int, _AlertState] = {}
+        self._lock = threading.RLock()
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self.loaded = False
+
+        # Counters for monitoring; suppressed = crossings held back by a cooldown
+        self.stats = {'triggered': 0, 'suppressed': 0, 'rearmed': 0}
+
+    def _state(self, alert: Dict) -> _AlertState:
+        cooldown = alert.get('cooldown_seconds')
+        hysteresis = alert.get('hysteresis_pct')
+        last_triggered = alert.get('last_triggered')
+        if isinstance(last_triggered, str):
+            last_triggered = datetime.fromisoformat(last_triggered)
+        return _AlertState(
+            key=card_key(alert['card_name']),
+            alert_type=alert['alert_type'],
+            target=float(alert['target_price']),
+            armed=bool(alert.get('armed', True)),
+            auto_rearm=bool(alert.get('auto_rearm', False)),
+            cooldown=float(self.cooldown_seconds if cooldown is None else cooldown),
+            hysteresis=float(self.hysteresis_pct if hysteresis is None else hysteresis),
+            last_triggered=last_triggered
+        )
+
+    def reload(self) -> int:
+        """Rebuild the index from the loader; returns the number of alerts indexed"""
+        with self._lock:
+            # Read the version first: a write landing mid-load is caught by the next check
+            self._version = self.version_loader() if self.version_loader else None
+            self._checked_at = self.clock()
+            cards: Dict[str, _CardThresholds] = {}
+            alerts = {}
+            for alert in (self.loader() if self.loader else []):
+                state = self._state(alert)
+                cards.setdefault(state.key, _CardThresholds()).side(state.alert_type, state.armed).append(
+                    (state.position, alert['id'])
+                )
+                alerts[alert['id']] = state
+
+            # One sort per list instead of an insort per alert
+            for thresholds in cards.values():
+                for side in (thresholds.above, thresholds.below, thresholds.rearm_above, thresholds.rearm_below):
+                    side.sort()
+
+            self._cards = cards
+            self._alerts = alerts
+            self.loaded = True
+            logger.info(f"Alert index loaded {len(alerts)} alerts across {len(cards)} cards")
+            return len(alerts)
+
+    def ensure_loaded(self) -> None:
+        """Load the index on first use"""
+        if not self.loaded:
+            self.reload()
+
+    def ensure_current(self, max_age: Optional[float] = None) -> None:
+        """
+        Load the index on first use, and rebuild it if alerts changed elsewhere
+
+        Args:
+            max_age: Skip the version check if the last one is younger than
+                this many seconds (default refresh_seconds; 0 always checks)
+        """
+        if not self.loaded or self.version_loader is None:
+            self.ensure_loaded()
+            return
+        max_age = self.refresh_seconds if max_age is None else max_age
+        if self.clock() - self._checked_at < max_age:
+            return
+        version = self.version_loader()
+        self._checked_at = self.clock()
+        if version is not None and version != self._version:
+            self.reload()
+
+    def _insert(self, alert_id: int, state: _AlertState) -> None:
+        insort(self._cards.setdefault(state.key, _CardThresholds()).side(state.alert_type, state.armed),
+               (state.position, alert_id))
+        self._alerts[alert_id] = state
+
+    def _remove(self, alert_id: int) -> Optional[_AlertState]:
+        state = self._alerts.pop(alert_id, None)
+        if state is None:
+            return None
+        thresholds = self._cards[state.key]
+        side = thresholds.side(state.alert_type, state.armed)
+        del side[bisect_left(side, (state.position, alert_id))]
+        if not thresholds:
+            del self._cards[state.key]
+        return state
+
+    def add(self, alert_id: int, card_name: str, target_price: float, alert_type: str, **settings) -> None:
+        """
+        Index (or re-index) an active alert
+
+        settings: armed, auto_rearm, cooldown_seconds, hysteresis_pct and
+        last_triggered, as in the loader's rows
+        """
+        with self._lock:
+            self._remove(alert_id)
+            self._insert(alert_id, self._state({'card_name': card_name, 'target_price': target_price,
+                                                'alert_type': alert_type, **settings}))
+
+    def discard(self, alert_id: int) -> bool:
+        """Remove an alert if indexed; returns True if it was"""
+        with self._lock:
+            return self._remove(alert_id) is not None
+
+    def sync(self, alert: Dict) -> None:
+        """Mirror a row written to the alerts table (no-op until the index is loaded)"""
+        if not self.loaded:
+            return
+        if alert.get('is_active'):
+            settings = {name: alert[name] for name in
+                        ('armed', 'auto_rearm', 'cooldown_seconds', 'hysteresis_pct', 'last_triggered')
+                        if name in alert}
+            self.add(alert['id'], alert['card_name'], alert['target_price'], alert['alert_type'], **settings)
+        else:
+            self.discard(alert['id'])
+
+    def match(self, card_name: str, price: float) -> List[int]:
+        """
+        IDs of armed alerts for a card that fire at `price`
+
+        'above' alerts fire when price >= target, 'below' alerts when price <= target.
+        """
+        with self._lock:
+            thresholds = self._cards.get(card_key(card_name))
+            if thresholds is None:
+                return []
+            above = thresholds.above[:bisect_right(thresholds.above, (price, float('inf')))]
+            below = thresholds.below[bisect_left(thresholds.below, (price, float('-inf'))):]
+            return [alert_id for _, alert_id in above] + [alert_id for _, alert_id in below]
+
+    def rearm(self, card_name: str, price: float) -> List[int]:
+        """
+        Arm again the fired auto re-arm alerts that `price` has moved back past
+
+        'above' alerts re-arm at or below their rearm price, 'below' alerts at
+        or above it.
+
+        Returns:
+            IDs re-armed (the caller persists them)
+        """
+        with self._lock:
+            thresholds = self._cards.get(card_key(card_name))
+            if thresholds is None:
+                return []
+            split_above = bisect_left(thresholds.rearm_above, (price, float('-inf')))
+            split_below = bisect_right(thresholds.rearm_below, (price, float('inf')))
+            ids = ([alert_id for _, alert_id in thresholds.rearm_above[split_above:]] +
+                   [alert_id for _, alert_id in thresholds.rearm_below[:split_below]])
+            for alert_id in ids:
+                state = self._remove(alert_id)
+                state.armed = True
+                self._insert(alert_id, state)
+            self.stats['rearmed'] += len(ids)
+            return ids
+
+    def split_cooldown(self, alert_ids: List[int], now: datetime) -> Tuple[List[int], List[int]]:
+        """
+        Separate matched alerts that may fire from those still cooling down
+
+        Held-back alerts stay armed, so they fire on the first price after
+        their cooldown if it still crosses; each hold-back is counted.
+
+        Returns:
+            (due, suppressed) alert IDs
+        """
+        due, suppressed = [], []
+        with self._lock:
+            for alert_id in alert_ids:
+                state = self._alerts.get(alert_id)
+                cooling = (state is not None and state.last_triggered is not None and state.cooldown > 0
+                           and now < state.last_triggered + timedelta(seconds=state.cooldown))
+                (suppressed if cooling else due).append(alert_id)
+        self.stats['suppressed'] += len(suppressed)
+        return due, suppressed
+
+    def record_trigger(self, alert_ids: List[int], triggered_at: datetime) -> None:
+        """Alerts fired (here or by another worker): disarm auto re-arm alerts, drop the rest (now inactive)"""
+        with self._lock:
+            for alert_id in alert_ids:
+                state = self._remove(alert_id)
+                if state is not None and state.auto_rearm:
+                    state.armed = False
+                    state.last_triggered = triggered_at
+                    self._insert(alert_id, state)
+            self.stats['triggered'] += len(alert_ids)
+
+    def cards(self) -> List[str]:
+        """Card keys that have at least one active alert"""
+        with self._lock:
+            return list(self._cards)
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def __contains__(self, alert_id: int) -> bool:
+        return alert_id in self._alerts
@@ -8,8 +8,12 @@ from fastapi import HTTPException
 import logging
 
 # Import our database module
-from .database import AlertOperations, NotificationOperations
+from .database import AlertOperations, CacheOperations, ChangeCounterOperations
+from .notification_outbox import outbox_drainer
 from .notification_service import notification_service
+from .alert_index import AlertIndex
+from .price_events import PriceUpdate
+from .push_hub import push_hub
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,7 +31,8 @@ class AlertsTracker:
         Create a new price alert
 
         Args:
-            alert_data: Dict containing card_name, target_price, alert_type
+            alert_data: Dict containing card_name, target_price, alert_type, and
+                optionally notes, auto_rearm, cooldown_seconds, hysteresis_pct
             user_id: Optional user ID for multi-user support
 
         Returns:
@@ -44,6 +49,9 @@ class AlertsTracker:
             target_price = float(alert_data['target_price'])
             alert_type = alert_data['alert_type']
             notes = alert_data.get('notes')
+            auto_rearm = bool(alert_data.get('auto_rearm', False))
+            cooldown_seconds = alert_data.get('cooldown_seconds')
+            hysteresis_pct = alert_data.get('hysteresis_pct')
 
             if target_price <= 0:
                 raise HTTPException(status_code=400, detail="Target price must be positive")
@@ -51,18 +59,28 @@ class AlertsTracker:
             if alert_type not in ['above', 'below']:
                 raise HTTPException(status_code=400, detail="Alert type must be 'above' or 'below'")
 
+            if cooldown_seconds is not None and cooldown_seconds < 0:
+                raise HTTPException(status_code=400, detail="Cooldown must not be negative")
+
+            if hysteresis_pct is not None and not 0 <= hysteresis_pct < 100:
+                raise HTTPException(status_code=400, detail="Hysteresis must be between 0 and 100 percent")
+
             # Save to database
             alert_entry = AlertOperations.create_alert(
                 card_name=card_name,
                 target_price=target_price,
                 alert_type=alert_type,
                 notes=notes,
-                user_id=user_id
+                user_id=user_id,
+                auto_rearm=auto_rearm,
+                cooldown_seconds=cooldown_seconds,
+                hysteresis_pct=hysteresis_pct
             )
 
             if not alert_entry:
                 raise HTTPException(status_code=500, detail="Failed to create alert")
 
+            alert_index.sync(alert_entry)
             logger.info(f"Created alert for {card_name}: {alert_type} ${target_price}")
 
             return {
@@ -72,7 +90,10 @@ class AlertsTracker:
                 'alert_type': alert_type,
                 'is_active': True,
                 'notes': notes,
-                'created_at': alert_entry['created_at']
+                'created_at': alert_entry['created_at'],
+                'auto_rearm': auto_rearm,
+                'cooldown_seconds': cooldown_seconds,
+                'hysteresis_pct': hysteresis_pct
             }
 
         except Exception as e:
@@ -124,6 +145,7 @@ class AlertsTracker:
             if not updated_alert:
                 raise HTTPException(status_code=404, detail="Alert not found")
 
+            alert_index.sync(updated_alert)
             logger.info(f"Updated alert {alert_id}")
 
             return updated_alert
@@ -146,6 +168,7 @@ class AlertsTracker:
             success = AlertOperations.delete_alert(alert_id)
 
             if success:
+                alert_index.discard(alert_id)
                 logger.info(f"Deleted alert {alert_id}")
             else:
                 raise HTTPException(status_code=404, detail="Alert not found")
@@ -158,89 +181,117 @@ class AlertsTracker:
 
     async def check_alerts(self) -> List[Dict]:
         """
-        Check all active alerts against current prices and return triggered alerts
+        Check all active alerts against cached prices and return triggered alerts
+
+        Prices come from one batched price cache lookup for the cards that
+        have alerts; cards without a cached market price are skipped rather
+        than guessed at. Each card's crossed alerts come straight from the
+        alert index.
 
         Returns:
             List of triggered alerts
         """
         try:
-            alerts = await self.get_alerts(active_only=True)
-            triggered_alerts = []
-
-            for alert in alerts:
-                current_price = alert['current_price']
-                target_price = alert['target_price']
-                alert_type = alert['alert_type']
-
-                triggered = False
-                if alert_type == 'above' and current_price >= target_price:
-                    triggered = True
-                elif alert_type == 'below' and current_price <= target_price:
-                    triggered = True
-
-                if triggered:
-                    # Mark as triggered
-                    await self.update_alert(alert['id'], {
-                        'last_triggered': datetime.now(),
-                        'is_active': False  # Deactivate after triggering
-                    })
-
-                    triggered_alert = {
-                        'id': alert['id'],
-                        'card_name': alert['card_name'],
-                        'target_price': target_price,
-                        'current_price': current_price,
-                        'alert_type': alert_type,
-                        'triggered_at': datetime.now()
-                    }
-
-                    triggered_alerts.append(triggered_alert)
-
-                    # Send notification if user has preferences set up
-                    await self._send_alert_notification(triggered_alert)
+            alert_index.ensure_current()
+            cards = alert_index.cards()
+            cached = CacheOperations.get_cached_prices(cards) if cards else {}
 
+            triggered_alerts = []
+            unpriced = 0
+            for card_name in cards:
+                price = cached[card_name]['price_data'].get('avg_price') if card_name in cached else None
+                if price is None:
+                    unpriced += 1
+                    continue
+                triggered_alerts.extend(await self.evaluate_price(card_name, float(price)))
+
+            if unpriced:
+                logger.info(f"Alert check skipped {unpriced} cards with no cached price")
             return triggered_alerts
 
         except Exception as e:
             logger.error(f"Error checking alerts: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Error checking alerts: {str(e)}")
 
-    async def _send_alert_notification(self, alert_data: Dict) -> None:
+    async def evaluate_price(self, card_name: str, current_price: float) -> List[Dict]:
         """
-        Send notification for triggered alert
+        Trigger the alerts a new price for one card crosses
 
         Args:
-            alert_data: Triggered alert data
+            card_name: Card whose price changed
+            current_price: The new price
+
+        Returns:
+            List of triggered alerts
         """
-        try:
-            # Get user's notification preferences
-            # For now, we'll use a default email - in production this would be user-specific
-            default_email = os.getenv('DEFAULT_USER_EMAIL', 'chaisincardboard@gmail.com')
-
-            prefs = NotificationOperations.get_notification_preferences(default_email)
-
-            if prefs and prefs.get('email_notifications_enabled', True) and prefs.get('alert_trigger_notifications', True):
-                # Send email notification
-                success = await notification_service.send_price_alert_notification(
-                    user_email=default_email,
-                    alert_data={
-                        'card_name': alert_data['card_name'],
-                        'target_price': alert_data['target_price'],
-                        'condition': alert_data['alert_type']
-                    },
-                    current_price=alert_data['current_price']
-                )
-
-                if success:
-                    logger.info(f"Sent notification for triggered alert: {alert_data['card_name']}")
-                else:
-                    logger.warning(f"Failed to send notification for alert: {alert_data['card_name']}")
-            else:
-                logger.info(f"Notifications disabled or not configured for alert: {alert_data['card_name']}")
+        alert_index.ensure_current()
+        triggered_at = datetime.now()
+
+        # Auto re-arm alerts whose price moved back out of the hysteresis band
+        rearmed = alert_index.rearm(card_name, current_price)
+        if rearmed:
+            AlertOperations.rearm_alerts(rearmed)
+
+        matched = alert_index.match(card_name, current_price)
+        if not matched:
+            return []
+
+        # Alerts still cooling down stay armed and are only counted
+        due, suppressed = alert_index.split_cooldown(matched, triggered_at)
+        if suppressed:
+            logger.debug(f"Cooldown suppressed {len(suppressed)} alerts on '{card_name}'")
+        if not due:
+            return []
+
+        # Fire and write the notifications to the outbox in one transaction;
+        # only alerts this call flipped are reported
+        fired_alerts = AlertOperations.trigger_alerts(
+            due, triggered_at, current_price, recipient_for=self._outbox_recipient
+        )
+        alert_index.record_trigger(due, triggered_at)
+
+        triggered_alerts = [{
+            'id': alert['id'],
+            'card_name': alert['card_name'],
+            'target_price': alert['target_price'],
+            'current_price': current_price,
+            'alert_type': alert['alert_type'],
+            'triggered_at': triggered_at
+        } for alert in fired_alerts]
+
+        # The drainer sends them (and checks notification preferences)
+        if triggered_alerts:
+            outbox_drainer.notify()
+
+        # Live clients of each alert's owner hear about it right away
+        for alert, triggered_alert in zip(fired_alerts, triggered_alerts):
+            push_hub.publish_alert(alert['user_id'], triggered_alert)
+
+        return triggered_alerts
+
+    async def on_price_update(self, event: PriceUpdate) -> None:
+        """
+        Price event subscriber: evaluate only the alerts on the card that moved
 
-        except Exception as e:
-            logger.error(f"Error sending alert notification: {str(e)}")
-            # Don't raise exception - notification failure shouldn't break alert checking
+        Registered with price_events in main.py, so alerts fire as soon as a
+        fresh price is written instead of on the next /alerts/check.
+        """
+        if event.avg_price is None:
+            return
+        triggered = await self.evaluate_price(event.card_query, event.avg_price)
+        if triggered:
+            logger.info(f"Price update for '{event.card_query}' triggered {len(triggered)} alerts")
+
+    def _recipient_email(self, alert: Dict) -> str:
+        """Email address notified when an alert fires"""
+        # For now, we'll use a default email - in production this would be user-specific
+        return os.getenv('DEFAULT_USER_EMAIL', 'chaisincardboard@gmail.com')
+
+    def _outbox_recipient(self, alert: Dict) -> Optional[str]:
+        """Recipient for a fired alert's outbox row, or None when email is disabled"""
+        if not notification_service.transport:
+            return None
+        return self._recipient_email(alert)
 
     def _get_current_price(self, card_name: str) -> float:
         """
@@ -258,4 +309,16 @@ class AlertsTracker:
         }
 
         # Return base price or a default
-        return base_prices.get(card_name, 100.00)
\ No newline at end of file
+        return base_prices.get(card_name, 100.00)
+
+
+# Global alert index, loaded from the alerts table on first use, kept in sync
+# by AlertsTracker's create/update/delete, and rebuilt when the 'alerts'
+# change counter shows another worker wrote to the table
+alert_index = AlertIndex(
+    loader=AlertOperations.get_active_alerts,
+    cooldown_seconds=float(os.getenv('ALERT_COOLDOWN_SECONDS', '3600')),
+    hysteresis_pct=float(os.getenv('ALERT_HYSTERESIS_PERCENT', '2')),
+    version_loader=lambda: ChangeCounterOperations.get_version('alerts'),
+    refresh_seconds=float(os.getenv('ALERT_INDEX_REFRESH_SECONDS', '5'))
+)
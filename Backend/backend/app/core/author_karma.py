@@ -0,0 +1,130 @@
+# DimeDrop Author Karma Cache
+# Reddit author karma for sentiment weighting, cached in-process and in SQLite
+
+import asyncio
+import os
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from .database import AuthorKarmaOperations
+from .ttl_cache import TTLCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Fetches karma for authors given as username -> fullname (t2_...);
+# authors it can't find come back as None
+KarmaFetcher = Callable[[Dict[str, str]], Awaitable[Dict[str, Optional[int]]]]
+
+FETCH_MODES = ('background', 'inline', 'off')
+
+
+class AuthorKarmaCache:
+    """
+    Author karma looked up by username: memory, then SQLite, then Reddit
+
+    Authors missing from both caches are fetched in one batched call (up to
+    100 per request to Reddit) depending on fetch_mode:
+
+    - 'background': after the lookup returns, so the sentiment request only
+      makes its search calls and later requests see the karma
+    - 'inline': before the lookup returns (one extra call, exact weights)
+    - 'off': never; unknown authors get no karma weight
+    """
+
+    def __init__(self, ttl_seconds: float = 7 * 86400, max_entries: int = 50000, fetch_mode: str = 'background'):
+        """
+        Args:
+            ttl_seconds: How long karma stays cached (memory and SQLite)
+            max_entries: Authors kept in memory
+            fetch_mode: 'background', 'inline' or 'off'
+        """
+        if fetch_mode not in FETCH_MODES:
+            raise ValueError(f"fetch_mode must be one of {FETCH_MODES}")
+        self.ttl_seconds = ttl_seconds
+        self.fetch_mode = fetch_mode
+        self._memory = TTLCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+        self._in_flight: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Counters for monitoring
+        self.stats = {'memory_hits': 0, 'db_hits': 0, 'misses': 0, 'fetched': 0, 'fetch_calls': 0}
+
+    async def lookup(self, authors: Dict[str, Optional[str]],
+                     fetcher: Optional[KarmaFetcher] = None) -> Dict[str, Optional[int]]:
+        """
+        Karma for many authors
+
+        Args:
+            authors: username -> fullname (None if unknown; such authors can't be fetched)
+            fetcher: Batch fetch for cache misses (skipped when None or fetch_mode is 'off')
+
+        Returns:
+            Dict of username -> karma, None for gone accounts and for authors
+            not cached yet (unless fetched inline)
+        """
+        karma = self._memory.get_many(authors)
+        self.stats['memory_hits'] += len(karma)
+
+        missing = [username for username in authors if username not in karma]
+        if missing:
+            now = datetime.utcnow()
+            stored = await asyncio.to_thread(AuthorKarmaOperations.get_karma, missing)
+            for username, (value, expires_at) in stored.items():
+                self._memory.set(username, value, ttl_seconds=(expires_at - now).total_seconds())
+                karma[username] = value
+            self.stats['db_hits'] += len(stored)
+
+        unknown = {username: authors[username] for username in authors
+                   if username not in karma and authors[username] and username not in self._in_flight}
+        self.stats['misses'] += len(authors) - len(karma)
+
+        if unknown and fetcher is not None and self.fetch_mode != 'off':
+            if self.fetch_mode == 'inline':
+                karma.update(await self.fetch(unknown, fetcher))
+            else:
+                task = asyncio.create_task(self.fetch(unknown, fetcher))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+        return {username: karma.get(username) for username in authors}
+
+    async def fetch(self, authors: Dict[str, str], fetcher: KarmaFetcher) -> Dict[str, Optional[int]]:
+        """Fetch karma for authors and cache it; returns what was fetched ({} on error)"""
+        self._in_flight.update(authors)
+        try:
+            fetched = await fetcher(authors)
+            self.stats['fetch_calls'] += 1
+            self.stats['fetched'] += len(fetched)
+            self.store(fetched)
+            await asyncio.to_thread(AuthorKarmaOperations.store_karma, fetched, self.ttl_seconds)
+            return fetched
+        except Exception as e:
+            logger.warning(f"Error fetching karma for {len(authors)} Reddit authors: {str(e)}")
+            return {}
+        finally:
+            self._in_flight.difference_update(authors)
+
+    def store(self, karma: Dict[str, Optional[int]]) -> None:
+        """Put karma in the in-process cache"""
+        for username, value in karma.items():
+            self._memory.set(username, value)
+
+    async def wait(self) -> None:
+        """Wait for background fetches (tests and shutdown)"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def clear(self) -> None:
+        """Drop the in-process cache (SQLite entries stay until they expire)"""
+        self._memory.clear()
+
+
+# Global author karma cache - shared by every SentimentAnalyzer in the process
+author_karma_cache = AuthorKarmaCache(
+    ttl_seconds=float(os.getenv('REDDIT_KARMA_CACHE_TTL_SECONDS', str(7 * 86400))),
+    max_entries=int(os.getenv('REDDIT_KARMA_CACHE_SIZE', '50000')),
+    fetch_mode=os.getenv('REDDIT_KARMA_FETCH', 'background')
+)
@@ -5,11 +5,18 @@ Uses local SQLite database with SQLAlchemy
 """
 
 import os
-from datetime import datetime, timedelta
-from typing import Optional, Dict, List
-from sqlalchemy import text
+from datetime import date, datetime, timedelta
+from typing import Callable, Optional, Dict, List, Tuple
+from sqlalchemy import case, create_engine, event, func, inspect, select, text, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from .models import SessionLocal, PriceCache, ApiRateLimits, Portfolio, Alert, NotificationPreferences, create_tables
+from .models import (
+    SessionLocal, PriceCache, ApiRateLimits, Portfolio, PortfolioTombstone, PortfolioSummary, PortfolioHolding,
+    PortfolioSnapshot, Alert, NotificationPreferences, NotificationOutbox, JobLease, JobRun, RedditAuthorKarma,
+    TextPolarity, ChangeCounter, PushEventLog
+)
+from .partitions import price_cache_partitions, price_history_partitions
+from .ttl_cache import MISSING, TTLCache
 import logging
 import json
 
@@ -77,17 +84,82 @@ def get_supabase_manager():
     """Legacy function for backward compatibility during migration"""
     return get_db_manager()
 
+# Backend/backend/alembic.ini - migrations live next to it in backend/migrations
+ALEMBIC_INI_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'alembic.ini'
+)
+
+# Revision that matches a database built by the old Base.metadata.create_all
+BASELINE_REVISION = '0001'
+
+
+def run_migrations(db_url: Optional[str] = None, revision: str = 'head') -> None:
+    """
+    Upgrade the database schema to the given Alembic revision
+
+    Databases created before migrations existed have tables but no
+    alembic_version row; those are stamped at the baseline first so the
+    later revisions apply on top of them.
+
+    Args:
+        db_url: Database URL (defaults to DATABASE_URL / local SQLite)
+        revision: Target revision (default 'head')
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    db_url = db_url or os.getenv('DATABASE_URL', 'sqlite:///./dimedrop.db')
+
+    config = Config(ALEMBIC_INI_PATH)
+    config.set_main_option('sqlalchemy.url', db_url)
+    config.attributes['url_override'] = True
+    config.attributes['configure_logger'] = False
+
+    engine = create_engine(db_url)
+    try:
+        tables = set(inspect(engine).get_table_names())
+    finally:
+        engine.dispose()
+
+    if 'price_cache' in tables and 'alembic_version' not in tables:
+        logger.info(f"Stamping legacy database at baseline revision {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+
+    command.upgrade(config, revision)
+    logger.info(f"Database schema upgraded to {revision}")
+
+
 def init_database():
-    """Initialize local database and create tables"""
+    """Initialize local database and bring the schema up to date"""
     logger.info("Initializing local SQLite database")
-    create_tables()
+    run_migrations()
+    # Pre-create upcoming price partitions so writes never issue DDL
+    CacheOperations.cleanup_expired()
+    PriceHistoryOperations.cleanup_expired()
+    PortfolioOperations.cleanup_tombstones()
     return True
 # ============================================================================
 # Database Operations (CRUD) - Supabase Implementation
 # ============================================================================
 
 class CacheOperations:
-    """Operations for price_cache table using Supabase"""
+    """
+    Operations for the price cache
+
+    Entries live in monthly partitions (price_cache_YYYYMM, by expires_at
+    month); rows written before partitioning stay in the legacy price_cache
+    table until they expire. Callers see a single cache either way.
+    """
+
+    @staticmethod
+    def _entry_dict(entry) -> Dict:
+        return {
+            'id': entry.id,
+            'card_query': entry.card_query,
+            'price_data': entry.price_data,
+            'cached_at': entry.cached_at.isoformat(),
+            'expires_at': entry.expires_at.isoformat()
+        }
 
     @staticmethod
     def get_cached_price(card_query: str) -> Optional[Dict]:
@@ -103,23 +175,36 @@ class CacheOperations:
         try:
             db = SessionLocal()
             now = datetime.utcnow()
-
-            cache_entry = db.query(PriceCache).filter(
+            conn = db.connection()
+
+            # Only partitions from the current month on can hold live entries;
+            # each is one index lookup, then the newest entry wins
+            candidates = []
+            for table in price_cache_partitions.tables_between(conn, start=now):
+                row = conn.execute(
+                    select(table)
+                    .where(table.c.card_query == card_query, table.c.expires_at > now)
+                    .order_by(table.c.cached_at.desc())
+                    .limit(1)
+                ).first()
+                if row:
+                    candidates.append(row)
+
+            legacy_entry = db.query(PriceCache).filter(
                 PriceCache.card_query == card_query,
                 PriceCache.expires_at > now
             ).order_by(PriceCache.cached_at.desc()).first()
+            if legacy_entry:
+                candidates.append(legacy_entry)
+
+            cache_entry = max(candidates, key=lambda entry: entry.cached_at) if candidates else None
+            result = CacheOperations._entry_dict(cache_entry) if cache_entry else None
 
             db.close()
 
-            if cache_entry:
+            if result:
                 logger.info(f"Cache hit for '{card_query}'")
-                return {
-                    'id': cache_entry.id,
-                    'card_query': cache_entry.card_query,
-                    'price_data': cache_entry.price_data,
-                    'cached_at': cache_entry.cached_at.isoformat(),
-                    'expires_at': cache_entry.expires_at.isoformat()
-                }
+                return result
             else:
                 logger.info(f"Cache miss for '{card_query}'")
                 return None
@@ -129,7 +214,58 @@ class CacheOperations:
             return None
 
     @staticmethod
-    def set_cached_price(card_query: str, price_data: Dict, cache_days: int = 90) -> Optional[Dict]:
+    def get_cached_prices(card_queries: List[str], chunk_size: int = 500) -> Dict[str, Dict]:
+        """
+        Batched get_cached_price for many cards at once
+
+        Runs one IN (...) query per live partition (per chunk of queries)
+        instead of one lookup per card.
+
+        Args:
+            card_queries: Card search queries (duplicates are ignored)
+            chunk_size: Max queries per IN list (SQLite bound-parameter limit)
+
+        Returns:
+            Dict of card_query -> cache data dict for every unexpired hit
+        """
+        try:
+            db = SessionLocal()
+            now = datetime.utcnow()
+            conn = db.connection()
+            queries = list(dict.fromkeys(card_queries))
+
+            newest = {}
+            tables = price_cache_partitions.tables_between(conn, start=now)
+            for i in range(0, len(queries), chunk_size):
+                chunk = queries[i:i + chunk_size]
+                rows = []
+                for table in tables:
+                    rows.extend(conn.execute(
+                        select(table).where(table.c.card_query.in_(chunk), table.c.expires_at > now)
+                    ).all())
+                rows.extend(db.query(PriceCache).filter(
+                    PriceCache.card_query.in_(chunk),
+                    PriceCache.expires_at > now
+                ).all())
+
+                for row in rows:
+                    current = newest.get(row.card_query)
+                    if current is None or row.cached_at > current.cached_at:
+                        newest[row.card_query] = row
+
+            results = {query: CacheOperations._entry_dict(row) for query, row in newest.items()}
+            db.close()
+
+            logger.info(f"Batched cache lookup: {len(results)}/{len(queries)} hits")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error fetching batch from cache: {str(e)}")
+            return {}
+
+    @staticmethod
+    def set_cached_price(card_query: str, price_data: Dict, cache_days: int = 90,
+                         db: Optional[Session] = None) -> Optional[Dict]:
         """
         Store price data in cache
 
@@ -137,66 +273,213 @@ class CacheOperations:
             card_query: Card search query
             price_data: Price data dictionary
             cache_days: Number of days to cache (default 90 for eBay ToS compliance)
+            db: Caller-managed session (e.g. the write queue); the caller commits
+                and errors are raised instead of returning None
 
         Returns:
             Created cache entry dict or None if failed
         """
+        owns_session = db is None
         try:
-            db = SessionLocal()
+            if owns_session:
+                db = SessionLocal()
             now = datetime.utcnow()
             expires_at = now + timedelta(days=cache_days)
 
-            cache_entry = PriceCache(
+            conn = db.connection()
+            table = price_cache_partitions.table_for_write(conn, expires_at)
+            result = conn.execute(table.insert().values(
                 card_query=card_query,
                 price_data=price_data,
                 cached_at=now,
                 expires_at=expires_at
-            )
+            ))
+            entry_id = result.inserted_primary_key[0]
 
-            db.add(cache_entry)
-            db.commit()
-            db.refresh(cache_entry)
-            db.close()
+            if owns_session:
+                db.commit()
+                db.close()
 
-            logger.info(f"Created cache entry for '{card_query}'")
+            logger.info(f"Created cache entry for '{card_query}' in {table.name}")
             return {
-                'id': cache_entry.id,
-                'card_query': cache_entry.card_query,
-                'price_data': cache_entry.price_data,
-                'cached_at': cache_entry.cached_at.isoformat(),
-                'expires_at': cache_entry.expires_at.isoformat()
+                'id': entry_id,
+                'card_query': card_query,
+                'price_data': price_data,
+                'cached_at': now.isoformat(),
+                'expires_at': expires_at.isoformat()
             }
 
         except Exception as e:
             logger.error(f"Error storing in cache: {str(e)}")
+            if not owns_session:
+                raise
             return None
 
     @staticmethod
-    def cleanup_expired() -> int:
+    def cleanup_expired(cache_days: int = 90) -> int:
         """
-        Remove expired cache entries
+        Drop fully expired cache partitions and pre-create upcoming ones
+
+        Retention is a DROP TABLE per month rather than a DELETE over live
+        data. Leftover rows in the legacy price_cache table are deleted.
+
+        Args:
+            cache_days: Cache lifetime used when writing, to size the upcoming partitions
 
         Returns:
-            Number of entries deleted
+            Number of expired partitions dropped
         """
         try:
             db = SessionLocal()
             now = datetime.utcnow()
+            conn = db.connection()
+
+            dropped = price_cache_partitions.drop_before(conn, now)
+            price_cache_partitions.ensure(conn, now, now + timedelta(days=cache_days + 31))
+            legacy_deleted = db.query(PriceCache).filter(PriceCache.expires_at < now).delete()
 
-            deleted_count = db.query(PriceCache).filter(PriceCache.expires_at < now).delete()
             db.commit()
             db.close()
 
-            if deleted_count > 0:
-                logger.info(f"Cleaned up {deleted_count} expired cache entries")
+            if dropped or legacy_deleted:
+                logger.info(f"Dropped expired cache partitions {dropped}, {legacy_deleted} legacy entries")
 
-            return deleted_count
+            return len(dropped)
 
         except Exception as e:
             logger.error(f"Error cleaning up expired cache: {str(e)}")
             return 0
 
 
+class PriceHistoryOperations:
+    """Operations for price history (monthly price_history_YYYYMM partitions)"""
+
+    @staticmethod
+    def record_price(card_query: str, price_data: Dict, recorded_at: Optional[datetime] = None,
+                     db: Optional[Session] = None) -> Optional[Dict]:
+        """
+        Append a price observation for a card
+
+        Args:
+            card_query: Card search query
+            price_data: Price data dict with avg_price, high, low, count
+            recorded_at: Observation time (defaults to now)
+            db: Caller-managed session (e.g. the write queue); the caller commits
+                and errors are raised instead of returning None
+
+        Returns:
+            Recorded observation dict or None if failed
+        """
+        owns_session = db is None
+        try:
+            if owns_session:
+                db = SessionLocal()
+            recorded_at = recorded_at or datetime.utcnow()
+
+            conn = db.connection()
+            table = price_history_partitions.table_for_write(conn, recorded_at)
+            conn.execute(table.insert().values(
+                card_query=card_query,
+                avg_price=price_data.get('avg_price'),
+                high=price_data.get('high'),
+                low=price_data.get('low'),
+                count=price_data.get('count'),
+                recorded_at=recorded_at
+            ))
+
+            if owns_session:
+                db.commit()
+                db.close()
+
+            return {
+                'card_query': card_query,
+                'avg_price': price_data.get('avg_price'),
+                'high': price_data.get('high'),
+                'low': price_data.get('low'),
+                'count': price_data.get('count'),
+                'recorded_at': recorded_at.isoformat()
+            }
+
+        except Exception as e:
+            logger.error(f"Error recording price history: {str(e)}")
+            if not owns_session:
+                raise
+            return None
+
+    @staticmethod
+    def get_price_history(card_query: str, since: Optional[datetime] = None,
+                          until: Optional[datetime] = None) -> List[Dict]:
+        """
+        Get price observations for a card across all partitions in range
+
+        Args:
+            card_query: Card search query
+            since: Earliest observation time (inclusive)
+            until: Latest observation time (inclusive)
+
+        Returns:
+            List of observation dicts, oldest first
+        """
+        try:
+            db = SessionLocal()
+            conn = db.connection()
+
+            rows = []
+            for table in reversed(price_history_partitions.tables_between(conn, since, until)):
+                query = select(table).where(table.c.card_query == card_query)
+                if since:
+                    query = query.where(table.c.recorded_at >= since)
+                if until:
+                    query = query.where(table.c.recorded_at <= until)
+                rows.extend(conn.execute(query.order_by(table.c.recorded_at)).all())
+
+            db.close()
+
+            return [{
+                'card_query': row.card_query,
+                'avg_price': float(row.avg_price) if row.avg_price is not None else None,
+                'high': float(row.high) if row.high is not None else None,
+                'low': float(row.low) if row.low is not None else None,
+                'count': row.count,
+                'recorded_at': row.recorded_at.isoformat()
+            } for row in rows]
+
+        except Exception as e:
+            logger.error(f"Error getting price history: {str(e)}")
+            return []
+
+    @staticmethod
+    def cleanup_expired(retention_days: int = 90) -> int:
+        """
+        Drop history partitions older than the retention window
+
+        Args:
+            retention_days: Days of history to keep (default 90 for eBay ToS compliance)
+
+        Returns:
+            Number of partitions dropped
+        """
+        try:
+            db = SessionLocal()
+            now = datetime.utcnow()
+            conn = db.connection()
+
+            dropped = price_history_partitions.drop_before(conn, now - timedelta(days=retention_days))
+            price_history_partitions.ensure(conn, now, now + timedelta(days=31))
+
+            db.commit()
+            db.close()
+
+            if dropped:
+                logger.info(f"Dropped expired price history partitions {dropped}")
+
+            return len(dropped)
+
+        except Exception as e:
+            logger.error(f"Error cleaning up price history: {str(e)}")
+            return 0
+
+
 class RateLimitOperations:
     """Operations for APIRateLimit table using Supabase"""
 
@@ -295,6 +578,198 @@ class RateLimitOperations:
         return count < limit
 
 
+class AuthorKarmaOperations:
+    """
+    Operations for the Reddit author karma cache
+
+    Karma changes slowly, so it is kept for days and shared by every
+    sentiment request and worker instead of fetching each author's profile.
+    """
+
+    CHUNK_SIZE = 500  # stays under SQLite's bound-parameter limit
+
+    @staticmethod
+    def get_karma(usernames: List[str]) -> Dict[str, Tuple[Optional[int], datetime]]:
+        """
+        Unexpired cached karma for many authors
+
+        Args:
+            usernames: Reddit usernames
+
+        Returns:
+            Dict of username -> (karma or None for a gone account, expires_at)
+            for every cached author; unknown or expired ones are left out
+        """
+        try:
+            db = SessionLocal()
+            now = datetime.utcnow()
+            found = {}
+            names = list(dict.fromkeys(usernames))
+            for i in range(0, len(names), AuthorKarmaOperations.CHUNK_SIZE):
+                chunk = names[i:i + AuthorKarmaOperations.CHUNK_SIZE]
+                for row in db.execute(
+                    select(RedditAuthorKarma.username, RedditAuthorKarma.karma, RedditAuthorKarma.expires_at)
+                    .where(RedditAuthorKarma.username.in_(chunk), RedditAuthorKarma.expires_at > now)
+                ):
+                    found[row.username] = (row.karma, row.expires_at)
+            db.close()
+            return found
+
+        except Exception as e:
+            logger.error(f"Error getting author karma: {str(e)}")
+            return {}
+
+    @staticmethod
+    def store_karma(karma: Dict[str, Optional[int]], ttl_seconds: float) -> int:
+        """
+        Cache karma for many authors (one upsert per chunk)
+
+        Args:
+            karma: username -> karma (None for deleted or suspended accounts)
+            ttl_seconds: How long the values stay valid
+
+        Returns:
+            Number of authors stored
+        """
+        if not karma:
+            return 0
+        try:
+            db = SessionLocal()
+            now = datetime.utcnow()
+            expires_at = now + timedelta(seconds=ttl_seconds)
+            values = [{'username': username, 'karma': value, 'fetched_at': now, 'expires_at': expires_at}
+                      for username, value in karma.items()]
+            for i in range(0, len(values), AuthorKarmaOperations.CHUNK_SIZE):
+                statement = sqlite_insert(RedditAuthorKarma).values(values[i:i + AuthorKarmaOperations.CHUNK_SIZE])
+                db.execute(statement.on_conflict_do_update(
+                    index_elements=['username'],
+                    set_={column: statement.excluded[column] for column in ('karma', 'fetched_at', 'expires_at')}
+                ))
+            db.commit()
+            db.close()
+            return len(values)
+
+        except Exception as e:
+            logger.error(f"Error storing author karma: {str(e)}")
+            return 0
+
+    @staticmethod
+    def cleanup_expired() -> int:
+        """
+        Delete expired karma entries
+
+        Returns:
+            Number of rows deleted
+        """
+        try:
+            db = SessionLocal()
+            deleted = db.query(RedditAuthorKarma).filter(
+                RedditAuthorKarma.expires_at <= datetime.utcnow()
+            ).delete(synchronize_session=False)
+            db.commit()
+            db.close()
+            if deleted:
+                logger.info(f"Deleted {deleted} expired author karma entries")
+            return deleted
+
+        except Exception as e:
+            logger.error(f"Error cleaning up author karma: {str(e)}")
+            return 0
+
+
+class PolarityOperations:
+    """
+    Operations for the text polarity cache
+
+    A document's polarity never changes, so scores are shared by every
+    query, request and worker that sees the same post or article.
+    """
+
+    CHUNK_SIZE = 500  # stays under SQLite's bound-parameter limit
+
+    @staticmethod
+    def get_polarity(content_hashes: List[str]) -> Dict[str, float]:
+        """
+        Cached polarity for many documents
+
+        Args:
+            content_hashes: Hashes from polarity_cache.content_hash
+
+        Returns:
+            Dict of content_hash -> polarity for the documents already scored
+        """
+        try:
+            db = SessionLocal()
+            found = {}
+            hashes = list(dict.fromkeys(content_hashes))
+            for i in range(0, len(hashes), PolarityOperations.CHUNK_SIZE):
+                chunk = hashes[i:i + PolarityOperations.CHUNK_SIZE]
+                for row in db.execute(
+                    select(TextPolarity.content_hash, TextPolarity.polarity)
+                    .where(TextPolarity.content_hash.in_(chunk))
+                ):
+                    found[row.content_hash] = row.polarity
+            db.close()
+            return found
+
+        except Exception as e:
+            logger.error(f"Error getting text polarity: {str(e)}")
+            return {}
+
+    @staticmethod
+    def store_polarity(polarity: Dict[str, float]) -> int:
+        """
+        Cache polarity for many documents (existing rows are kept)
+
+        Args:
+            polarity: content_hash -> polarity
+
+        Returns:
+            Number of documents submitted
+        """
+        if not polarity:
+            return 0
+        try:
+            db = SessionLocal()
+            now = datetime.utcnow()
+            values = [{'content_hash': content_hash, 'polarity': value, 'created_at': now}
+                      for content_hash, value in polarity.items()]
+            for i in range(0, len(values), PolarityOperations.CHUNK_SIZE):
+                db.execute(sqlite_insert(TextPolarity).values(
+                    values[i:i + PolarityOperations.CHUNK_SIZE]
+                ).on_conflict_do_nothing(index_elements=['content_hash']))
+            db.commit()
+            db.close()
+            return len(values)
+
+        except Exception as e:
+            logger.error(f"Error storing text polarity: {str(e)}")
+            return 0
+
+    @staticmethod
+    def cleanup_expired(max_age_days: int = 30) -> int:
+        """
+        Delete scores older than max_age_days (search results rarely go back that far)
+
+        Returns:
+            Number of rows deleted
+        """
+        try:
+            db = SessionLocal()
+            deleted = db.query(TextPolarity).filter(
+                TextPolarity.created_at < datetime.utcnow() - timedelta(days=max_age_days)
+            ).delete(synchronize_session=False)
+            db.commit()
+            db.close()
+            if deleted:
+                logger.info(f"Deleted {deleted} old text polarity entries")
+            return deleted
+
+        except Exception as e:
+            logger.error(f"Error cleaning up text polarity: {str(e)}")
+            return 0
+
+
 class PortfolioOperations:
     """Operations for Portfolio table using Supabase"""
 
@@ -302,10 +777,19 @@ class PortfolioOperations:
     def add_card(card_name: str, purchase_price: Optional[float] = None,
                  purchase_date = None, quantity: int = 1,
                  condition: Optional[str] = None, notes: Optional[str] = None,
-                 user_id: Optional[str] = None) -> Optional[Dict]:
-        """Add a card to portfolio"""
+                 user_id: Optional[str] = None, db: Optional[Session] = None,
+                 current_price: Optional[float] = None) -> Optional[Dict]:
+        """
+        Add a card to portfolio (pass db to join a caller-managed transaction)
+
+        The user's portfolio summary is updated in the same transaction;
+        current_price (a confirmed market price, if known) values the holding.
+        The result's current_price is the price the holding is valued at.
+        """
+        owns_session = db is None
         try:
-            db = SessionLocal()
+            if owns_session:
+                db = SessionLocal()
 
             if purchase_date is None:
                 purchase_date = datetime.utcnow().date()
@@ -326,9 +810,14 @@ class PortfolioOperations:
             )
 
             db.add(card)
-            db.commit()
-            db.refresh(card)
-            db.close()
+            valued_at = PortfolioSummaryOperations.apply_row(db, user_id, card_name, quantity, purchase_price, +1,
+                                                             price=current_price)
+            if owns_session:
+                db.commit()
+                db.refresh(card)
+                db.close()
+            else:
+                db.flush()
 
             logger.info(f"Added card to portfolio: {card_name}")
             return {
@@ -339,12 +828,15 @@ class PortfolioOperations:
                 'quantity': card.quantity,
                 'condition': card.condition,
                 'notes': card.notes,
+                'current_price': valued_at,
                 'created_at': card.created_at.isoformat(),
                 'updated_at': card.updated_at.isoformat()
             }
 
         except Exception as e:
             logger.error(f"Error adding card to portfolio: {str(e)}")
+            if not owns_session:
+                raise
             return None
 
     @staticmethod
@@ -376,6 +868,118 @@ class PortfolioOperations:
             logger.error(f"Error getting all cards: {str(e)}")
             return []
 
+    @staticmethod
+    def get_cards_page(user_id: Optional[str] = None, after: Optional[Tuple[str, int]] = None,
+                       limit: int = 1000) -> List[Dict]:
+        """
+        One page of portfolio rows, keyset-paginated in get_all_cards order
+
+        Each page is its own short read (no cursor held between pages), so a
+        long export never pins a transaction or blocks writers.
+
+        Args:
+            user_id: Optional user ID filter
+            after: (created_at, id) of the previous page's last row; None for the first page
+            limit: Rows per page
+
+        Returns:
+            Up to limit card dicts (created_at newest first, ties by id);
+            errors are raised so an export can't silently end early
+        """
+        columns = (Portfolio.id, Portfolio.card_name, Portfolio.buy_price, Portfolio.purchase_date,
+                   Portfolio.quantity, Portfolio.condition, Portfolio.notes,
+                   Portfolio.created_at, Portfolio.updated_at)
+        query = select(*columns).order_by(Portfolio.created_at.desc(), Portfolio.id.desc()).limit(limit)
+        if user_id:
+            query = query.where(Portfolio.user_id == user_id)
+        if after:
+            query = query.where(tuple_(Portfolio.created_at, Portfolio.id)
+                                < tuple_(datetime.fromisoformat(after[0]), after[1]))
+
+        db = SessionLocal()
+        try:
+            rows = db.execute(query).all()
+        finally:
+            db.close()
+
+        return [{
+            'id': row.id,
+            'card_name': row.card_name,
+            'buy_price': float(row.buy_price) if row.buy_price else None,
+            'purchase_date': row.purchase_date.isoformat() if row.purchase_date else None,
+            'quantity': row.quantity,
+            'condition': row.condition,
+            'notes': row.notes,
+            'created_at': row.created_at.isoformat(),
+            'updated_at': row.updated_at.isoformat()
+        } for row in rows]
+
+    # Group key expression per /portfolio/breakdown dimension
+    BREAKDOWN_KEYS = {
+        'condition': lambda: func.coalesce(Portfolio.condition, 'Raw'),
+        'card_name': lambda: func.trim(Portfolio.card_name),
+        'purchase_month': lambda: func.coalesce(func.strftime('%Y-%m', Portfolio.purchase_date), 'Unknown'),
+    }
+
+    @staticmethod
+    def get_breakdown(user_id: str, by: str = 'condition') -> List[Dict]:
+        """
+        Aggregate a user's portfolio per group in SQL
+
+        Rows are valued at their holding's current price (portfolio_holdings,
+        kept current by price updates), falling back to the buy price.
+
+        Args:
+            user_id: Auth0 user ID
+            by: 'condition', 'card_name' or 'purchase_month'
+
+        Returns:
+            One dict per group, largest current value first (same shape as
+            portfolio_analytics.group_breakdown)
+        """
+        try:
+            db = SessionLocal()
+            group = PortfolioOperations.BREAKDOWN_KEYS[by]().label('grp')
+            buy_price = func.coalesce(Portfolio.buy_price, 0)
+            price = func.coalesce(PortfolioHolding.price, buy_price)
+
+            rows = db.execute(
+                select(
+                    group,
+                    func.count().label('row_count'),
+                    func.sum(Portfolio.quantity).label('card_count'),
+                    func.sum(buy_price * Portfolio.quantity).label('total_investment'),
+                    func.sum(price * Portfolio.quantity).label('total_value'),
+                )
+                .select_from(Portfolio)
+                .outerjoin(PortfolioHolding, (PortfolioHolding.user_id == Portfolio.user_id)
+                           & (PortfolioHolding.card_name == func.trim(Portfolio.card_name)))
+                .where(Portfolio.user_id == user_id)
+                .group_by(group)
+            ).all()
+            db.close()
+
+            total_value = sum(float(row.total_value or 0) for row in rows)
+            breakdown = []
+            for row in rows:
+                investment = float(row.total_investment or 0)
+                value = float(row.total_value or 0)
+                breakdown.append({
+                    'group': row.grp,
+                    'row_count': row.row_count,
+                    'card_count': int(row.card_count or 0),
+                    'total_investment': round(investment, 2),
+                    'total_value': round(value, 2),
+                    'roi_percentage': round((value - investment) / investment * 100, 2) if investment > 0 else 0,
+                    'weight_percentage': round(value / total_value * 100, 2) if total_value > 0 else 0
+                })
+
+            return sorted(breakdown, key=lambda group: group['total_value'], reverse=True)
+
+        except Exception as e:
+            logger.error(f"Error getting portfolio breakdown: {str(e)}")
+            return []
+
     @staticmethod
     def get_card_by_id(card_id: int) -> Optional[Dict]:
         """Get a specific card by ID"""
@@ -404,27 +1008,41 @@ class PortfolioOperations:
             return None
 
     @staticmethod
-    def update_card(card_id: int, **kwargs) -> Optional[Dict]:
-        """Update a card in portfolio"""
+    def update_card(card_id: int, db: Optional[Session] = None, **kwargs) -> Optional[Dict]:
+        """Update a card in portfolio (pass db to join a caller-managed transaction)"""
+        owns_session = db is None
         try:
-            db = SessionLocal()
+            if owns_session:
+                db = SessionLocal()
             card = db.query(Portfolio).filter(Portfolio.id == card_id).first()
 
             if not card:
-                db.close()
+                if owns_session:
+                    db.close()
                 return None
 
+            old_row = (card.user_id, card.card_name, card.quantity, card.buy_price)
+
             # Update fields
             for key, value in kwargs.items():
                 if hasattr(card, key):
                     setattr(card, key, value)
 
-            card.updated_at = datetime.utcnow()
-            db.commit()
-            db.refresh(card)
-            db.close()
+            # Move the row's contribution in the summary from old to new values
+            price = PortfolioSummaryOperations.apply_row(db, *old_row, -1)
+            same_card = (card.user_id, card.card_name.strip()) == (old_row[0], old_row[1].strip())
+            PortfolioSummaryOperations.apply_row(db, card.user_id, card.card_name, card.quantity, card.buy_price, +1,
+                                                 price=price if same_card else None)
 
-            logger.info(f"Updated card: {card.card_name}")
+            card.updated_at = datetime.utcnow()
+            if owns_session:
+                db.commit()
+                db.refresh(card)
+                db.close()
+            else:
+                db.flush()
+
+            logger.info(f"Updated card: {card.card_name}")
             return {
                 'id': card.id,
                 'card_name': card.card_name,
@@ -439,16 +1057,32 @@ class PortfolioOperations:
 
         except Exception as e:
             logger.error(f"Error updating card: {str(e)}")
+            if not owns_session:
+                raise
             return None
 
     @staticmethod
-    def delete_card(card_id: int) -> bool:
-        """Delete a card from portfolio"""
+    def delete_card(card_id: int, db: Optional[Session] = None) -> bool:
+        """Delete a card from portfolio (pass db to join a caller-managed transaction)"""
+        owns_session = db is None
         try:
-            db = SessionLocal()
-            deleted_count = db.query(Portfolio).filter(Portfolio.id == card_id).delete()
-            db.commit()
-            db.close()
+            if owns_session:
+                db = SessionLocal()
+            card = db.query(Portfolio).filter(Portfolio.id == card_id).first()
+            deleted_count = 0
+            if card:
+                PortfolioSummaryOperations.apply_row(db, card.user_id, card.card_name, card.quantity,
+                                                     card.buy_price, -1)
+                # Tombstone so delta sync clients learn about the delete
+                db.add(PortfolioTombstone(portfolio_id=card.id, user_id=card.user_id,
+                                          deleted_at=datetime.utcnow()))
+                db.delete(card)
+                deleted_count = 1
+            if owns_session:
+                db.commit()
+                db.close()
+            else:
+                db.flush()
 
             if deleted_count > 0:
                 logger.info(f"Deleted card with ID: {card_id}")
@@ -458,292 +1092,1738 @@ class PortfolioOperations:
 
         except Exception as e:
             logger.error(f"Error deleting card: {str(e)}")
+            if not owns_session:
+                raise
             return False
 
 
-class AlertOperations:
-    """Operations for managing price alerts"""
+    # Tombstones older than this are purged; older sync tokens get a full resync
+    TOMBSTONE_RETENTION_DAYS = 30
+
+    # Re-send rows stamped this close before the token, in case a write stamped
+    # just before the previous sync committed just after it (clients upsert by id)
+    SYNC_OVERLAP = timedelta(seconds=5)
 
     @staticmethod
-    def create_alert(card_name: str, target_price: float, alert_type: str, notes: Optional[str] = None, user_id: Optional[str] = None) -> Optional[Dict]:
+    def parse_sync_token(token: str) -> datetime:
         """
-        Create a new price alert
+        Decode a next_token returned by get_changes
+
+        Raises:
+            ValueError: If the token is malformed
+        """
+        return datetime.fromisoformat(token)
+
+    @staticmethod
+    def get_changes(user_id: str, since: Optional[datetime] = None) -> Optional[Dict]:
+        """
+        Get portfolio rows changed and deleted since a client's last sync
 
         Args:
-            card_name: Name of the basketball card
-            target_price: Target price for the alert
-            alert_type: 'above' or 'below'
-            notes: Optional notes
-            user_id: Optional user ID for multi-user support
+            user_id: Auth0 user ID
+            since: Decoded sync token; None (or a token older than the
+                tombstone retention) returns every row as a full resync
 
         Returns:
-            Dict with alert details including ID and created_at
+            Dict with 'changes' (card dicts to upsert by id), 'deleted'
+            (portfolio ids to drop; never one that is also in changes),
+            'prices' (trimmed card_name -> price each holding is valued at,
+            for every card the user holds), 'full_resync' (replace the local
+            copy instead of merging) and 'next_token', or None on error
         """
         try:
-            # For now, return mock data since we're using Supabase
-            # In production, this would create a record in Supabase
-            alert_data = {
-                'id': 1,  # Mock ID
-                'card_name': card_name,
-                'target_price': target_price,
-                'alert_type': alert_type,
-                'is_active': True,
-                'notes': notes,
-                'created_at': datetime.utcnow().isoformat()
+            db = SessionLocal()
+            # Taken before reading so nothing written during the sync is skipped next time
+            now = datetime.utcnow()
+            full_resync = since is None or since < now - timedelta(days=PortfolioOperations.TOMBSTONE_RETENTION_DAYS)
+
+            query = db.query(Portfolio).filter(Portfolio.user_id == user_id)
+            deleted = []
+            if not full_resync:
+                window_start = since - PortfolioOperations.SYNC_OVERLAP
+                query = query.filter(Portfolio.updated_at >= window_start)
+                deleted = [tombstone.portfolio_id for tombstone in db.query(PortfolioTombstone).filter(
+                    PortfolioTombstone.user_id == user_id,
+                    PortfolioTombstone.deleted_at >= window_start
+                ).order_by(PortfolioTombstone.deleted_at).all()]
+
+            cards = query.order_by(Portfolio.updated_at).all()
+            prices = dict(db.query(PortfolioHolding.card_name, PortfolioHolding.price).filter(
+                PortfolioHolding.user_id == user_id
+            ).all())
+            db.close()
+
+            # A row that exists now wins over a tombstone for the same id
+            changed_ids = {card.id for card in cards}
+            deleted = [card_id for card_id in dict.fromkeys(deleted) if card_id not in changed_ids]
+
+            return {
+                'changes': [{
+                    'id': card.id,
+                    'card_name': card.card_name,
+                    'buy_price': float(card.buy_price) if card.buy_price else None,
+                    'purchase_date': card.purchase_date.isoformat() if card.purchase_date else None,
+                    'quantity': card.quantity,
+                    'condition': card.condition,
+                    'notes': card.notes,
+                    'created_at': card.created_at.isoformat(),
+                    'updated_at': card.updated_at.isoformat()
+                } for card in cards],
+                'deleted': deleted,
+                'prices': prices,
+                'full_resync': full_resync,
+                'next_token': now.isoformat()
             }
 
-            logger.info(f"Created alert for {card_name}: {alert_type} ${target_price}")
-            return alert_data
+        except Exception as e:
+            logger.error(f"Error getting portfolio changes: {str(e)}")
+            return None
+
+    @staticmethod
+    def cleanup_tombstones(retention_days: Optional[int] = None) -> int:
+        """
+        Purge tombstones past the retention window
+
+        Returns:
+            Number of tombstones deleted
+        """
+        retention_days = retention_days or PortfolioOperations.TOMBSTONE_RETENTION_DAYS
+        try:
+            db = SessionLocal()
+            deleted_count = db.query(PortfolioTombstone).filter(
+                PortfolioTombstone.deleted_at < datetime.utcnow() - timedelta(days=retention_days)
+            ).delete()
+            db.commit()
+            db.close()
+
+            logger.info(f"Purged {deleted_count} portfolio tombstones")
+            return deleted_count
 
         except Exception as e:
-            logger.error(f"Error creating alert: {str(e)}")
+            logger.error(f"Error purging portfolio tombstones: {str(e)}")
+            return 0
+
+class PortfolioSummaryOperations:
+    """
+    Operations for incrementally maintained portfolio summaries
+
+    portfolio_summaries holds each user's running totals; portfolio_holdings
+    holds the per-card aggregates and the price each was valued at, so a price
+    change for one card is applied as a delta to just the users holding it.
+
+    Pricing rule (shared by /portfolio, /portfolio/summary, /breakdown and
+    the snapshots behind /history): a card is valued at its latest confirmed
+    market price (price cache / eBay refresh); until one is known, at the buy
+    price its holding started with.
+    """
+
+    @staticmethod
+    def _summary_dict(summary: Optional[PortfolioSummary], user_id: str) -> Dict:
+        total_investment = summary.total_investment if summary else 0.0
+        total_value = summary.total_value if summary else 0.0
+        total_roi = ((total_value - total_investment) / total_investment) * 100 if total_investment > 0 else 0
+        return {
+            'user_id': user_id,
+            'total_investment': round(total_investment, 2),
+            'total_value': round(total_value, 2),
+            'total_roi_percentage': round(total_roi, 2),
+            'card_count': summary.row_count if summary else 0,
+            'updated_at': summary.updated_at.isoformat() if summary and summary.updated_at else None
+        }
+
+    @staticmethod
+    def apply_row(db: Session, user_id: Optional[str], card_name: str, quantity: Optional[int],
+                  buy_price, sign: int, price: Optional[float] = None) -> Optional[float]:
+        """
+        Add (sign=+1) or remove (sign=-1) one portfolio row's contribution
+
+        Runs inside the caller's transaction. `price` must be a confirmed market
+        price (or None); a new holding without one is valued at its buy price.
+
+        Returns:
+            The price the holding is valued at
+        """
+        if not user_id:
             return None
 
+        card_name = card_name.strip()
+        quantity = quantity or 0
+        buy_price = float(buy_price) if buy_price is not None else 0.0
+        now = datetime.utcnow()
+
+        holding = db.get(PortfolioHolding, (user_id, card_name))
+        if holding is None:
+            holding = PortfolioHolding(user_id=user_id, card_name=card_name, quantity=0, investment=0.0,
+                                       row_count=0, price=float(price if price is not None else buy_price))
+            db.add(holding)
+
+        summary = db.get(PortfolioSummary, user_id)
+        if summary is None:
+            summary = PortfolioSummary(user_id=user_id, total_investment=0.0, total_value=0.0, row_count=0)
+            db.add(summary)
+
+        if price is not None and float(price) != holding.price:
+            # Caller knows a fresher price: revalue the whole holding first
+            summary.total_value += (float(price) - holding.price) * holding.quantity
+            holding.price = float(price)
+
+        holding.quantity += sign * quantity
+        holding.investment += sign * quantity * buy_price
+        holding.row_count += sign
+        summary.total_investment += sign * quantity * buy_price
+        summary.total_value += sign * quantity * holding.price
+        summary.row_count += sign
+        summary.updated_at = now
+
+        if holding.row_count <= 0:
+            db.delete(holding)
+
+        # autoflush is off; flush so the next apply_row in this session sees these rows
+        db.flush()
+        return holding.price
+
     @staticmethod
-    def get_alerts(active_only: bool = True, user_id: Optional[str] = None) -> List[Dict]:
+    def apply_price_change(card_name: str, price: float, db: Optional[Session] = None) -> int:
         """
-        Get all alerts
+        Revalue every holding of a card at a new price
 
         Args:
-            active_only: If True, return only active alerts
-            user_id: Optional user ID filter for multi-user support
+            card_name: Card name / price cache query
+            price: New current price
+            db: Caller-managed session (e.g. the write queue); the caller commits
+                and errors are raised instead of returning 0
 
         Returns:
-            List of alert dictionaries
+            Number of user summaries updated
         """
+        owns_session = db is None
         try:
-            # Mock data for now
-            alerts = [
-                {
-                    'id': 1,
-                    'card_name': 'Wembanyama Prizm',
-                    'target_price': 150.00,
-                    'alert_type': 'above',
-                    'is_active': True,
-                    'notes': 'Good investment opportunity',
-                    'created_at': '2025-10-13T10:00:00Z',
-                    'current_price': 152.50
-                },
-                {
-                    'id': 2,
-                    'card_name': 'Luka Doncic Auto',
-                    'target_price': 180.00,
-                    'alert_type': 'below',
-                    'is_active': True,
-                    'notes': 'Watch for dip',
-                    'created_at': '2025-10-13T11:00:00Z',
-                    'current_price': 200.00
-                }
-            ]
+            if owns_session:
+                db = SessionLocal()
+            card_name = card_name.strip()
+
+            updated = db.execute(text("""
+                UPDATE portfolio_summaries
+                SET total_value = total_value + (
+                        SELECT SUM(h.quantity * (:price - h.price)) FROM portfolio_holdings AS h
+                        WHERE h.user_id = portfolio_summaries.user_id AND h.card_name = :card_name
+                    ),
+                    updated_at = :now
+                WHERE user_id IN (
+                    SELECT user_id FROM portfolio_holdings WHERE card_name = :card_name AND price != :price
+                )
+            """), {'price': float(price), 'card_name': card_name, 'now': datetime.utcnow()}).rowcount
+            db.execute(text("UPDATE portfolio_holdings SET price = :price WHERE card_name = :card_name"),
+                       {'price': float(price), 'card_name': card_name})
 
-            if active_only:
-                alerts = [alert for alert in alerts if alert['is_active']]
+            if owns_session:
+                db.commit()
+                db.close()
 
-            return alerts
+            if updated:
+                logger.info(f"Revalued {updated} portfolio summaries for '{card_name}' at ${price}")
+            return updated
 
         except Exception as e:
-            logger.error(f"Error getting alerts: {str(e)}")
+            logger.error(f"Error applying price change to summaries: {str(e)}")
+            if not owns_session:
+                raise
+            return 0
+
+    @staticmethod
+    def get_held_card_names() -> List[str]:
+        """Distinct (trimmed) card names held in any portfolio"""
+        try:
+            db = SessionLocal()
+            names = db.execute(select(PortfolioHolding.card_name).distinct()).scalars().all()
+            db.close()
+            return list(names)
+
+        except Exception as e:
+            logger.error(f"Error getting held card names: {str(e)}")
             return []
 
     @staticmethod
-    def update_alert(alert_id: int, update_data: Dict) -> Optional[Dict]:
+    def get_holding_prices(user_id: str) -> Dict[str, float]:
         """
-        Update an existing alert
-
-        Args:
-            alert_id: ID of the alert to update
-            update_data: Dict with fields to update
+        Price each of a user's holdings is valued at
 
         Returns:
-            Updated alert dict or None if not found
+            Dict of trimmed card_name -> price
         """
         try:
-            # Mock implementation - in production would update Supabase
-            alerts = AlertOperations.get_alerts(active_only=False)
-            alert = next((a for a in alerts if a['id'] == alert_id), None)
+            db = SessionLocal()
+            prices = dict(db.query(PortfolioHolding.card_name, PortfolioHolding.price).filter(
+                PortfolioHolding.user_id == user_id
+            ).all())
+            db.close()
+            return prices
 
-            if not alert:
-                return None
+        except Exception as e:
+            logger.error(f"Error getting holding prices: {str(e)}")
+            return {}
 
-            # Apply updates
-            for key, value in update_data.items():
-                if key in alert:
-                    alert[key] = value
+    @staticmethod
+    def get_user_ids() -> List[str]:
+        """Users with portfolio rows or a stored summary"""
+        try:
+            db = SessionLocal()
+            user_ids = db.execute(
+                select(Portfolio.user_id).where(Portfolio.user_id.isnot(None))
+                .union(select(PortfolioSummary.user_id))
+            ).scalars().all()
+            db.close()
+            return list(user_ids)
 
-            logger.info(f"Updated alert {alert_id}")
-            return alert
+        except Exception as e:
+            logger.error(f"Error getting portfolio user ids: {str(e)}")
+            return []
+
+    @staticmethod
+    def get_summary(user_id: str) -> Dict:
+        """
+        Get a user's portfolio totals (single primary-key read)
+
+        Returns:
+            Summary dict; all zeros if the user has no portfolio rows
+        """
+        try:
+            db = SessionLocal()
+            summary = db.get(PortfolioSummary, user_id)
+            result = PortfolioSummaryOperations._summary_dict(summary, user_id)
+            db.close()
+            return result
 
         except Exception as e:
-            logger.error(f"Error updating alert {alert_id}: {str(e)}")
-            return None
+            logger.error(f"Error getting portfolio summary: {str(e)}")
+            return PortfolioSummaryOperations._summary_dict(None, user_id)
 
     @staticmethod
-    def delete_alert(alert_id: int) -> bool:
+    def check_summary(user_id: str, repair: bool = True) -> Dict:
         """
-        Delete an alert
+        Recompute a user's summary from their portfolio rows and compare
+
+        Cards are priced from the cache (bringing values current), else at the
+        price their holding was last valued at, else their average buy price.
 
         Args:
-            alert_id: ID of the alert to delete
+            user_id: User to check
+            repair: Replace the stored summary/holdings when they've drifted
 
         Returns:
-            True if deleted successfully
+            Dict with consistent flag, stored and expected summaries, repaired flag
         """
+        db = SessionLocal()
         try:
-            # Mock implementation - in production would delete from Supabase
-            alerts = AlertOperations.get_alerts(active_only=False)
-            alert = next((a for a in alerts if a['id'] == alert_id), None)
+            rows = db.query(
+                func.trim(Portfolio.card_name),
+                func.sum(Portfolio.quantity),
+                func.sum(func.coalesce(Portfolio.buy_price, 0) * Portfolio.quantity),
+                func.count(Portfolio.id)
+            ).filter(Portfolio.user_id == user_id).group_by(func.trim(Portfolio.card_name)).all()
+
+            known_prices = dict(db.query(PortfolioHolding.card_name, PortfolioHolding.price).filter(
+                PortfolioHolding.user_id == user_id
+            ).all())
+            cached = CacheOperations.get_cached_prices([row[0] for row in rows]) if rows else {}
+
+            holdings = []
+            for card_name, quantity, investment, row_count in rows:
+                price = cached[card_name]['price_data'].get('avg_price') if card_name in cached else None
+                if price is None:
+                    price = known_prices.get(card_name)
+                if price is None:
+                    price = float(investment) / quantity if quantity else 0.0
+                holdings.append(PortfolioHolding(
+                    user_id=user_id, card_name=card_name, quantity=int(quantity),
+                    investment=float(investment), row_count=int(row_count), price=float(price)
+                ))
+
+            expected = PortfolioSummary(
+                user_id=user_id,
+                total_investment=sum(h.investment for h in holdings),
+                total_value=sum(h.quantity * h.price for h in holdings),
+                row_count=sum(h.row_count for h in holdings),
+                updated_at=datetime.utcnow()
+            )
+            stored = db.get(PortfolioSummary, user_id)
+
+            stored_dict = PortfolioSummaryOperations._summary_dict(stored, user_id)
+            expected_dict = PortfolioSummaryOperations._summary_dict(expected, user_id)
+            consistent = all(stored_dict[key] == expected_dict[key]
+                             for key in ('total_investment', 'total_value', 'card_count'))
+
+            repaired = False
+            if repair and not consistent:
+                db.query(PortfolioHolding).filter(PortfolioHolding.user_id == user_id).delete()
+                if stored:
+                    db.delete(stored)
+                db.flush()
+                db.add_all(holdings)
+                if holdings:
+                    db.add(expected)
+                db.commit()
+                repaired = True
+                logger.warning(f"Rebuilt drifted portfolio summary for {user_id}")
 
-            if not alert:
-                return False
+            return {
+                'consistent': consistent,
+                'stored': stored_dict,
+                'expected': expected_dict,
+                'repaired': repaired
+            }
 
-            # In real implementation, would remove from database
-            logger.info(f"Deleted alert {alert_id}")
-            return True
+        finally:
+            db.close()
 
-        except Exception as e:
-            logger.error(f"Error deleting alert {alert_id}: {str(e)}")
-            return False
 
+class PortfolioSnapshotOperations:
+    """
+    Operations for daily portfolio value snapshots
+
+    One compact row per user per day, valued from portfolio_holdings and the
+    price cache. get_history downsamples in SQL so long ranges stay small.
+    """
 
-class NotificationOperations:
-    """Operations for managing notification preferences"""
+    # Bucket expression per downsampling interval; each bucket keeps its last snapshot
+    INTERVALS = {
+        'daily': None,
+        'weekly': lambda column: func.date(column, 'weekday 0'),
+        'monthly': lambda column: func.strftime('%Y-%m', column),
+    }
 
     @staticmethod
-    def get_notification_preferences(email: str) -> Optional[Dict]:
+    def take_snapshots(snapshot_date: Optional[date] = None, batch_size: int = 1000) -> int:
         """
-        Get notification preferences for a user
+        Value every user's portfolio in one pass and store the day's snapshots
+
+        Holdings are streamed in batches; each batch is priced with one batched
+        cache lookup, falling back to the price the holding was last valued at.
+        Re-running for the same day overwrites that day's rows.
 
         Args:
-            email: User's email address
+            snapshot_date: Day to record (defaults to today, UTC)
+            batch_size: Holdings read and priced per batch
 
         Returns:
-            Notification preferences dict or None if not found
+            Number of user snapshots written, or -1 on error
         """
+        snapshot_date = snapshot_date or datetime.utcnow().date()
         try:
             db = SessionLocal()
-            prefs = db.query(NotificationPreferences).filter(
-                NotificationPreferences.email == email
-            ).first()
+            totals = {}  # user_id -> [investment, value, row_count]
+
+            holdings = db.execute(
+                select(PortfolioHolding.user_id, PortfolioHolding.card_name, PortfolioHolding.quantity,
+                       PortfolioHolding.investment, PortfolioHolding.row_count, PortfolioHolding.price)
+                .execution_options(yield_per=batch_size)
+            )
+            for rows in holdings.partitions():
+                cached = CacheOperations.get_cached_prices(list({row.card_name for row in rows}))
+                for row in rows:
+                    price = (cached.get(row.card_name) or {}).get('price_data', {}).get('avg_price')
+                    price = float(price) if price is not None else row.price
+                    user_totals = totals.setdefault(row.user_id, [0.0, 0.0, 0])
+                    user_totals[0] += row.investment
+                    user_totals[1] += row.quantity * price
+                    user_totals[2] += row.row_count
+
+            values = [{
+                'user_id': user_id,
+                'snapshot_date': snapshot_date,
+                'total_investment': round(investment, 2),
+                'total_value': round(value, 2),
+                'card_count': row_count
+            } for user_id, (investment, value, row_count) in totals.items()]
+
+            for i in range(0, len(values), batch_size):
+                statement = sqlite_insert(PortfolioSnapshot).values(values[i:i + batch_size])
+                db.execute(statement.on_conflict_do_update(
+                    index_elements=['user_id', 'snapshot_date'],
+                    set_={column: statement.excluded[column]
+                          for column in ('total_investment', 'total_value', 'card_count')}
+                ))
+            db.commit()
             db.close()
 
-            if prefs:
-                return {
-                    'id': prefs.id,
-                    'email': prefs.email,
-                    'email_notifications_enabled': bool(prefs.email_notifications_enabled),
-                    'push_notifications_enabled': bool(prefs.push_notifications_enabled),
-                    'alert_trigger_notifications': bool(prefs.alert_trigger_notifications),
-                    'weekly_summary_enabled': bool(prefs.weekly_summary_enabled),
-                    'created_at': prefs.created_at.isoformat(),
-                    'updated_at': prefs.updated_at.isoformat()
-                }
-            else:
-                return None
+            logger.info(f"Wrote {len(values)} portfolio snapshots for {snapshot_date}")
+            return len(values)
 
         except Exception as e:
-            logger.error(f"Error getting notification preferences: {str(e)}")
-            return None
+            logger.error(f"Error taking portfolio snapshots: {str(e)}")
+            return -1
 
     @staticmethod
-    def create_or_update_notification_preferences(
-        email: str,
-        email_notifications_enabled: bool = True,
-        push_notifications_enabled: bool = False,
-        alert_trigger_notifications: bool = True,
-        weekly_summary_enabled: bool = False
-    ) -> Optional[Dict]:
+    def get_history(user_id: str, start: Optional[date] = None, end: Optional[date] = None,
+                    interval: str = 'daily') -> List[Dict]:
         """
-        Create or update notification preferences for a user
+        Get a user's portfolio value series, downsampled server-side
 
         Args:
-            email: User's email address
-            email_notifications_enabled: Enable email notifications
-            push_notifications_enabled: Enable push notifications
-            alert_trigger_notifications: Enable alert trigger notifications
-            weekly_summary_enabled: Enable weekly summary emails
+            user_id: Auth0 user ID
+            start: First day to include (optional)
+            end: Last day to include (optional)
+            interval: 'daily', 'weekly' or 'monthly'; weekly/monthly points are
+                the last snapshot in each week (ending Sunday) or month
 
         Returns:
-            Updated preferences dict
+            Points oldest first
         """
         try:
             db = SessionLocal()
-            now = datetime.utcnow()
+            filters = [PortfolioSnapshot.user_id == user_id]
+            if start:
+                filters.append(PortfolioSnapshot.snapshot_date >= start)
+            if end:
+                filters.append(PortfolioSnapshot.snapshot_date <= end)
+
+            bucket = PortfolioSnapshotOperations.INTERVALS[interval]
+            query = db.query(PortfolioSnapshot).filter(*filters)
+            if bucket:
+                closes = (select(func.max(PortfolioSnapshot.snapshot_date))
+                          .where(*filters)
+                          .group_by(bucket(PortfolioSnapshot.snapshot_date)))
+                query = query.filter(PortfolioSnapshot.snapshot_date.in_(closes))
+
+            snapshots = query.order_by(PortfolioSnapshot.snapshot_date).all()
+            db.close()
 
-            # Try to get existing preferences
-            prefs = db.query(NotificationPreferences).filter(
-                NotificationPreferences.email == email
-            ).first()
+            return [{
+                'date': snapshot.snapshot_date.isoformat(),
+                'total_investment': snapshot.total_investment,
+                'total_value': snapshot.total_value,
+                'total_roi_percentage': round(
+                    (snapshot.total_value - snapshot.total_investment) / snapshot.total_investment * 100, 2
+                ) if snapshot.total_investment > 0 else 0,
+                'card_count': snapshot.card_count
+            } for snapshot in snapshots]
 
-            if prefs:
-                # Update existing
-                prefs.email_notifications_enabled = int(email_notifications_enabled)
-                prefs.push_notifications_enabled = int(push_notifications_enabled)
-                prefs.alert_trigger_notifications = int(alert_trigger_notifications)
-                prefs.weekly_summary_enabled = int(weekly_summary_enabled)
-                prefs.updated_at = now
-            else:
-                # Create new
-                prefs = NotificationPreferences(
-                    email=email,
-                    email_notifications_enabled=int(email_notifications_enabled),
-                    push_notifications_enabled=int(push_notifications_enabled),
-                    alert_trigger_notifications=int(alert_trigger_notifications),
-                    weekly_summary_enabled=int(weekly_summary_enabled),
-                    created_at=now,
-                    updated_at=now
-                )
-                db.add(prefs)
+        except Exception as e:
+            logger.error(f"Error getting portfolio history: {str(e)}")
+            return []
 
-            db.commit()
-            db.refresh(prefs)
-            db.close()
 
-            logger.info(f"Updated notification preferences for {email}")
-            return {
-                'id': prefs.id,
-                'email': prefs.email,
-                'email_notifications_enabled': bool(prefs.email_notifications_enabled),
-                'push_notifications_enabled': bool(prefs.push_notifications_enabled),
-                'alert_trigger_notifications': bool(prefs.alert_trigger_notifications),
-                'weekly_summary_enabled': bool(prefs.weekly_summary_enabled),
-                'created_at': prefs.created_at.isoformat(),
-                'updated_at': prefs.updated_at.isoformat()
-            }
+class ChangeCounterOperations:
+    """
+    Operations for per-table change counters
+
+    Writers bump a table's counter in the same transaction as the write;
+    each worker compares the counter with the version its in-memory mirror
+    was built at (one primary-key read) to notice other workers' writes.
+    """
+
+    @staticmethod
+    def bump(db: Session, name: str) -> None:
+        """Increment a counter inside the caller's transaction"""
+        statement = sqlite_insert(ChangeCounter).values(name=name, version=1)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=['name'], set_={'version': ChangeCounter.version + 1}
+        ))
+
+    @staticmethod
+    def get_version(name: str) -> Optional[int]:
+        """Current counter value (0 if never bumped), or None on error"""
+        try:
+            db = SessionLocal()
+            version = db.execute(select(ChangeCounter.version).where(ChangeCounter.name == name)).scalar()
+            db.close()
+            return version or 0
 
         except Exception as e:
-            logger.error(f"Error updating notification preferences: {str(e)}")
+            logger.error(f"Error reading change counter {name}: {str(e)}")
             return None
 
+
+class AlertOperations:
+    """
+    Operations for managing price alerts
+
+    Every write bumps the 'alerts' change counter so other workers' alert
+    indexes notice it.
+    """
+
     @staticmethod
-    def delete_notification_preferences(email: str) -> bool:
+    def _alert_dict(alert: Alert) -> Dict:
+        return {
+            'id': alert.id,
+            'user_id': alert.user_id,
+            'card_name': alert.card_name,
+            'target_price': float(alert.target_price),
+            'alert_type': alert.alert_type,
+            'is_active': bool(alert.is_active),
+            'notes': alert.notes,
+            'created_at': alert.created_at.isoformat() if alert.created_at else None,
+            'last_triggered': alert.last_triggered.isoformat() if alert.last_triggered else None,
+            'auto_rearm': bool(alert.auto_rearm),
+            'armed': bool(alert.armed),
+            'cooldown_seconds': alert.cooldown_seconds,
+            'hysteresis_pct': alert.hysteresis_pct
+        }
+
+    @staticmethod
+    def create_alert(card_name: str, target_price: float, alert_type: str, notes: Optional[str] = None,
+                     user_id: Optional[str] = None, auto_rearm: bool = False,
+                     cooldown_seconds: Optional[int] = None, hysteresis_pct: Optional[float] = None) -> Optional[Dict]:
         """
-        Delete notification preferences for a user
+        Create a new price alert
 
         Args:
-            email: User's email address
+            card_name: Name of the basketball card
+            target_price: Target price for the alert
+            alert_type: 'above' or 'below'
+            notes: Optional notes
+            user_id: Optional user ID for multi-user support
+            auto_rearm: Keep the alert after it fires and re-arm it once the
+                price leaves the hysteresis band (default: fire once)
+            cooldown_seconds: Min seconds between triggers (None = server default)
+            hysteresis_pct: Re-arm band as a % of the target (None = server default)
 
         Returns:
-            True if deleted successfully
+            Dict with alert details including ID and created_at
         """
         try:
             db = SessionLocal()
-            deleted_count = db.query(NotificationPreferences).filter(
-                NotificationPreferences.email == email
-            ).delete()
+            alert = Alert(
+                user_id=user_id or '',
+                card_name=card_name,
+                target_price=target_price,
+                alert_type=alert_type,
+                is_active=1,
+                notes=notes,
+                created_at=datetime.utcnow(),
+                auto_rearm=int(auto_rearm),
+                armed=1,
+                cooldown_seconds=cooldown_seconds,
+                hysteresis_pct=hysteresis_pct
+            )
+            db.add(alert)
+            ChangeCounterOperations.bump(db, 'alerts')
             db.commit()
+            db.refresh(alert)
+            alert_data = AlertOperations._alert_dict(alert)
             db.close()
 
-            if deleted_count > 0:
-                logger.info(f"Deleted notification preferences for {email}")
-                return True
-            else:
-                return False
+            logger.info(f"Created alert for {card_name}: {alert_type} ${target_price}")
+            return alert_data
+
+        except Exception as e:
+            logger.error(f"Error creating alert: {str(e)}")
+            return None
+
+    @staticmethod
+    def get_alerts(active_only: bool = True, user_id: Optional[str] = None) -> List[Dict]:
+        """
+        Get all alerts
+
+        Args:
+            active_only: If True, return only active alerts
+            user_id: Optional user ID filter for multi-user support
+
+        Returns:
+            List of alert dictionaries
+        """
+        try:
+            db = SessionLocal()
+            query = db.query(Alert)
+            if user_id:
+                query = query.filter(Alert.user_id == user_id)
+            if active_only:
+                query = query.filter(Alert.is_active == 1)
+
+            alerts = [AlertOperations._alert_dict(alert) for alert in query.order_by(Alert.id).all()]
+            db.close()
+            return alerts
+
+        except Exception as e:
+            logger.error(f"Error getting alerts: {str(e)}")
+            return []
+
+    @staticmethod
+    def get_alerts_by_ids(alert_ids: List[int]) -> List[Dict]:
+        """Get alerts by primary key (one IN query)"""
+        if not alert_ids:
+            return []
+        try:
+            db = SessionLocal()
+            alerts = [AlertOperations._alert_dict(alert)
+                      for alert in db.query(Alert).filter(Alert.id.in_(alert_ids)).all()]
+            db.close()
+            return alerts
+
+        except Exception as e:
+            logger.error(f"Error getting alerts by id: {str(e)}")
+            return []
+
+    @staticmethod
+    def get_active_alerts() -> List[Dict]:
+        """Every active alert's matching and re-arm fields (for building the alert index)"""
+        try:
+            db = SessionLocal()
+            rows = db.execute(
+                select(Alert.id, Alert.card_name, Alert.target_price, Alert.alert_type, Alert.armed,
+                       Alert.auto_rearm, Alert.cooldown_seconds, Alert.hysteresis_pct, Alert.last_triggered)
+                .where(Alert.is_active == 1)
+            ).all()
+            db.close()
+            return [{
+                'id': row.id,
+                'card_name': row.card_name,
+                'target_price': float(row.target_price),
+                'alert_type': row.alert_type,
+                'armed': bool(row.armed),
+                'auto_rearm': bool(row.auto_rearm),
+                'cooldown_seconds': row.cooldown_seconds,
+                'hysteresis_pct': row.hysteresis_pct,
+                'last_triggered': row.last_triggered
+            } for row in rows]
+
+        except Exception as e:
+            logger.error(f"Error loading active alerts: {str(e)}")
+            return []
+
+    @staticmethod
+    def update_alert(alert_id: int, update_data: Dict) -> Optional[Dict]:
+        """
+        Update an existing alert
+
+        Args:
+            alert_id: ID of the alert to update
+            update_data: Dict with fields to update
+
+        Returns:
+            Updated alert dict or None if not found
+        """
+        try:
+            db = SessionLocal()
+            alert = db.get(Alert, alert_id)
+
+            if not alert:
+                db.close()
+                return None
+
+            # Apply updates
+            for key, value in update_data.items():
+                if key in ('is_active', 'auto_rearm'):
+                    value = 1 if value else 0
+                if hasattr(alert, key):
+                    setattr(alert, key, value)
+            # Re-activating an alert arms it again (its cooldown still applies)
+            if update_data.get('is_active'):
+                alert.armed = 1
+
+            ChangeCounterOperations.bump(db, 'alerts')
+            db.commit()
+            db.refresh(alert)
+            alert_data = AlertOperations._alert_dict(alert)
+            db.close()
+
+            logger.info(f"Updated alert {alert_id}")
+            return alert_data
+
+        except Exception as e:
+            logger.error(f"Error updating alert {alert_id}: {str(e)}")
+            return None
+
+    @staticmethod
+    def deactivate_alerts(alert_ids: List[int], triggered_at: Optional[datetime] = None) -> List[int]:
+        """
+        Mark triggered alerts inactive in one UPDATE
+
+        Only alerts that are still active are changed, so concurrent checks
+        can't trigger the same alert twice.
+
+        Returns:
+            IDs of the alerts this call deactivated
+        """
+        if not alert_ids:
+            return []
+        try:
+            db = SessionLocal()
+            deactivated = db.execute(
+                update(Alert)
+                .where(Alert.id.in_(alert_ids), Alert.is_active == 1)
+                .values(is_active=0, last_triggered=triggered_at or datetime.utcnow())
+                .returning(Alert.id)
+            ).scalars().all()
+            if deactivated:
+                ChangeCounterOperations.bump(db, 'alerts')
+            db.commit()
+            db.close()
+            return list(deactivated)
+
+        except Exception as e:
+            logger.error(f"Error deactivating alerts: {str(e)}")
+            return []
+
+    @staticmethod
+    def rearm_alerts(alert_ids: List[int]) -> int:
+        """
+        Arm fired auto re-arm alerts again (the price left their hysteresis band)
+
+        Returns:
+            Number of alerts re-armed
+        """
+        if not alert_ids:
+            return 0
+        try:
+            db = SessionLocal()
+            rearmed = db.execute(
+                update(Alert)
+                .where(Alert.id.in_(alert_ids), Alert.is_active == 1, Alert.armed == 0)
+                .values(armed=1)
+            ).rowcount
+            if rearmed:
+                ChangeCounterOperations.bump(db, 'alerts')
+            db.commit()
+            db.close()
+            return rearmed
+
+        except Exception as e:
+            logger.error(f"Error re-arming alerts: {str(e)}")
+            return 0
+
+    @staticmethod
+    def trigger_alerts(
+        alert_ids: List[int],
+        triggered_at: datetime,
+        current_price: float,
+        recipient_for: Optional[Callable[[Dict], Optional[str]]] = None
+    ) -> List[Dict]:
+        """
+        Fire triggered alerts and queue their notifications atomically
+
+        Fired alerts are disarmed; one-shot alerts are also deactivated, while
+        auto re-arm alerts stay active until the price re-arms them. The
+        UPDATE and the outbox rows commit in one transaction, so a crash
+        can't leave an alert fired without its notification (or vice versa).
+
+        Args:
+            alert_ids: Alerts whose threshold the new price crosses
+            triggered_at: When they fired
+            current_price: Price that triggered them
+            recipient_for: Email to notify for a fired alert (None = no email)
+
+        Returns:
+            The alerts this call fired (armed, active ones only, so
+            concurrent checks can't trigger an alert twice)
+        """
+        if not alert_ids:
+            return []
+        try:
+            db = SessionLocal()
+            rows = db.execute(
+                update(Alert)
+                .where(Alert.id.in_(alert_ids), Alert.is_active == 1, Alert.armed == 1)
+                .values(is_active=case((Alert.auto_rearm == 1, 1), else_=0), armed=0, last_triggered=triggered_at)
+                .returning(Alert.id, Alert.user_id, Alert.card_name, Alert.target_price, Alert.alert_type)
+            ).all()
+            fired = [{
+                'id': row.id,
+                'user_id': row.user_id,
+                'card_name': row.card_name,
+                'target_price': float(row.target_price),
+                'alert_type': row.alert_type,
+            } for row in rows]
+
+            for alert in fired:
+                recipient = recipient_for(alert) if recipient_for else None
+                if recipient:
+                    OutboxOperations.enqueue(db, 'price_alert', recipient, {
+                        'alert_id': alert['id'],
+                        'card_name': alert['card_name'],
+                        'target_price': alert['target_price'],
+                        'condition': alert['alert_type'],
+                        'current_price': current_price,
+                        'triggered_at': triggered_at.isoformat(),
+                    })
+
+            if fired:
+                ChangeCounterOperations.bump(db, 'alerts')
+            db.commit()
+            db.close()
+            return fired
+
+        except Exception as e:
+            logger.error(f"Error triggering alerts: {str(e)}")
+            return []
+
+    @staticmethod
+    def delete_alert(alert_id: int) -> bool:
+        """
+        Delete an alert
+
+        Args:
+            alert_id: ID of the alert to delete
+
+        Returns:
+            True if deleted successfully
+        """
+        try:
+            db = SessionLocal()
+            deleted_count = db.query(Alert).filter(Alert.id == alert_id).delete()
+            if deleted_count:
+                ChangeCounterOperations.bump(db, 'alerts')
+            db.commit()
+            db.close()
+
+            if deleted_count > 0:
+                logger.info(f"Deleted alert {alert_id}")
+                return True
+            return False
+
+        except Exception as e:
+            logger.error(f"Error deleting alert {alert_id}: {str(e)}")
+            return False
+
+
+class NotificationOperations:
+    """
+    Operations for managing notification preferences
+
+    Reads go through an in-process TTL cache keyed by email (users without
+    preferences are cached as None too); writes and deletes invalidate it.
+    Writes also bump the 'notification_preferences' change counter, and a
+    worker that sees the counter move clears its whole cache, so another
+    worker's unsubscribe takes effect within PREFERENCES_VERSION_CHECK_SECONDS
+    (the bulk lookup the outbox drainer uses checks on every call).
+    """
+
+    PREFERENCES_CACHE_TTL_SECONDS = float(os.getenv('NOTIFICATION_PREFS_CACHE_TTL_SECONDS', '300'))
+    PREFERENCES_VERSION_CHECK_SECONDS = float(os.getenv('NOTIFICATION_PREFS_VERSION_CHECK_SECONDS', '5'))
+    BULK_FETCH_CHUNK = 500  # stays under SQLite's bound-parameter limit
+
+    _preferences_cache = TTLCache(ttl_seconds=PREFERENCES_CACHE_TTL_SECONDS)
+    _preferences_version: Optional[int] = None
+    _version_checked_at = float('-inf')
+
+    @staticmethod
+    def _preferences_dict(prefs: NotificationPreferences) -> Dict:
+        return {
+            'id': prefs.id,
+            'email': prefs.email,
+            'user_id': prefs.user_id,
+            'email_notifications_enabled': bool(prefs.email_notifications_enabled),
+            'push_notifications_enabled': bool(prefs.push_notifications_enabled),
+            'alert_trigger_notifications': bool(prefs.alert_trigger_notifications),
+            'weekly_summary_enabled': bool(prefs.weekly_summary_enabled),
+            'created_at': prefs.created_at.isoformat(),
+            'updated_at': prefs.updated_at.isoformat()
+        }
+
+    @staticmethod
+    def _invalidate_preferences(email: str, db: Optional[Session] = None) -> None:
+        """
+        Drop a cached entry now and, for a caller-managed session, again once
+        it commits (a read racing the commit could otherwise re-cache old data)
+        """
+        cache = NotificationOperations._preferences_cache
+        cache.invalidate(email)
+        if db is not None:
+            event.listen(db, 'after_commit', lambda session: cache.invalidate(email), once=True)
+
+    @staticmethod
+    def _ensure_current(max_age: Optional[float] = None) -> None:
+        """
+        Clear the cache if another worker changed preferences since the last check
+
+        Args:
+            max_age: Skip the check if the last one is younger than this many
+                seconds (default PREFERENCES_VERSION_CHECK_SECONDS; 0 always checks)
+        """
+        cache = NotificationOperations._preferences_cache
+        max_age = NotificationOperations.PREFERENCES_VERSION_CHECK_SECONDS if max_age is None else max_age
+        if cache.clock() - NotificationOperations._version_checked_at < max_age:
+            return
+        # Read before any rows are loaded, so rows cached after this are at least this new
+        version = ChangeCounterOperations.get_version('notification_preferences')
+        NotificationOperations._version_checked_at = cache.clock()
+        if version is not None and version != NotificationOperations._preferences_version:
+            cache.clear()
+            NotificationOperations._preferences_version = version
+
+    @staticmethod
+    def get_notification_preferences(email: str) -> Optional[Dict]:
+        """
+        Get notification preferences for a user
+
+        Args:
+            email: User's email address
+
+        Returns:
+            Notification preferences dict or None if not found
+        """
+        NotificationOperations._ensure_current()
+        cached = NotificationOperations._preferences_cache.get(email)
+        if cached is not MISSING:
+            return dict(cached) if cached else None
+
+        try:
+            db = SessionLocal()
+            prefs = db.query(NotificationPreferences).filter(
+                NotificationPreferences.email == email
+            ).first()
+            db.close()
+
+            result = NotificationOperations._preferences_dict(prefs) if prefs else None
+            NotificationOperations._preferences_cache.set(email, result)
+            return dict(result) if result else None
+
+        except Exception as e:
+            logger.error(f"Error getting notification preferences: {str(e)}")
+            return None
+
+    @staticmethod
+    def get_notification_preferences_bulk(emails: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Get notification preferences for many users with one query for all cache misses
+
+        Args:
+            emails: Users' email addresses
+
+        Returns:
+            Dict of email -> preferences dict (None if the user has none); on a
+            database error, the emails that couldn't be loaded are left out
+        """
+        NotificationOperations._ensure_current(0)
+        cache = NotificationOperations._preferences_cache
+        results = {email: (dict(prefs) if prefs else None) for email, prefs in cache.get_many(set(emails)).items()}
+        missing = [email for email in set(emails) if email not in results]
+        if not missing:
+            return results
+
+        try:
+            db = SessionLocal()
+            loaded = {}
+            for i in range(0, len(missing), NotificationOperations.BULK_FETCH_CHUNK):
+                chunk = missing[i:i + NotificationOperations.BULK_FETCH_CHUNK]
+                for prefs in db.query(NotificationPreferences).filter(NotificationPreferences.email.in_(chunk)):
+                    loaded[prefs.email] = NotificationOperations._preferences_dict(prefs)
+            db.close()
+
+            for email in missing:
+                prefs = loaded.get(email)
+                cache.set(email, prefs)
+                results[email] = dict(prefs) if prefs else None
+            return results
+
+        except Exception as e:
+            logger.error(f"Error bulk-loading notification preferences: {str(e)}")
+            return results
+
+    @staticmethod
+    def create_or_update_notification_preferences(
+        email: str,
+        email_notifications_enabled: bool = True,
+        push_notifications_enabled: bool = False,
+        alert_trigger_notifications: bool = True,
+        weekly_summary_enabled: bool = False,
+        user_id: Optional[str] = None,
+        db: Optional[Session] = None
+    ) -> Optional[Dict]:
+        """
+        Create or update notification preferences for a user
+
+        Args:
+            email: User's email address
+            email_notifications_enabled: Enable email notifications
+            push_notifications_enabled: Enable push notifications
+            alert_trigger_notifications: Enable alert trigger notifications
+            weekly_summary_enabled: Enable weekly summary emails
+            user_id: Auth0 user ID whose portfolio the weekly summary reports
+                (left unchanged when None)
+            db: Caller-managed session (e.g. the write queue); the caller commits
+                and errors are raised instead of returning None
+
+        Returns:
+            Updated preferences dict
+        """
+        owns_session = db is None
+        try:
+            if owns_session:
+                db = SessionLocal()
+            now = datetime.utcnow()
+
+            # Try to get existing preferences
+            prefs = db.query(NotificationPreferences).filter(
+                NotificationPreferences.email == email
+            ).first()
+
+            if prefs:
+                # Update existing
+                prefs.email_notifications_enabled = int(email_notifications_enabled)
+                prefs.push_notifications_enabled = int(push_notifications_enabled)
+                prefs.alert_trigger_notifications = int(alert_trigger_notifications)
+                prefs.weekly_summary_enabled = int(weekly_summary_enabled)
+                if user_id:
+                    prefs.user_id = user_id
+                prefs.updated_at = now
+            else:
+                # Create new
+                prefs = NotificationPreferences(
+                    email=email,
+                    user_id=user_id,
+                    email_notifications_enabled=int(email_notifications_enabled),
+                    push_notifications_enabled=int(push_notifications_enabled),
+                    alert_trigger_notifications=int(alert_trigger_notifications),
+                    weekly_summary_enabled=int(weekly_summary_enabled),
+                    created_at=now,
+                    updated_at=now
+                )
+                db.add(prefs)
+            ChangeCounterOperations.bump(db, 'notification_preferences')
+
+            if owns_session:
+                db.commit()
+                db.refresh(prefs)
+                db.close()
+                NotificationOperations._invalidate_preferences(email)
+            else:
+                db.flush()
+                NotificationOperations._invalidate_preferences(email, db)
+
+            logger.info(f"Updated notification preferences for {email}")
+            return NotificationOperations._preferences_dict(prefs)
+
+        except Exception as e:
+            logger.error(f"Error updating notification preferences: {str(e)}")
+            if not owns_session:
+                raise
+            return None
+
+    @staticmethod
+    def delete_notification_preferences(email: str) -> bool:
+        """
+        Delete notification preferences for a user
+
+        Args:
+            email: User's email address
+
+        Returns:
+            True if deleted successfully
+        """
+        try:
+            db = SessionLocal()
+            deleted_count = db.query(NotificationPreferences).filter(
+                NotificationPreferences.email == email
+            ).delete()
+            if deleted_count:
+                ChangeCounterOperations.bump(db, 'notification_preferences')
+            db.commit()
+            db.close()
+            NotificationOperations._invalidate_preferences(email)
+
+            if deleted_count > 0:
+                logger.info(f"Deleted notification preferences for {email}")
+                return True
+            else:
+                return False
 
         except Exception as e:
             logger.error(f"Error deleting notification preferences: {str(e)}")
             return False
 
 
+class OutboxOperations:
+    """
+    Operations for the transactional notification outbox
+
+    Producers add rows inside their own transaction (enqueue). Drainers claim
+    batches with a single UPDATE ... RETURNING, which SQLite's write lock
+    makes atomic, so concurrent drainers never get the same row. A claim
+    expires after lease_seconds unless its drainer extends it; rows whose
+    drainer died are then claimed again, giving at-least-once delivery,
+    up to max_attempts claims per row.
+    """
+
+    RETENTION_DAYS = 7
+
+    @staticmethod
+    def enqueue(db: Session, kind: str, recipient: str, payload: Dict,
+                available_at: Optional[datetime] = None) -> NotificationOutbox:
+        """
+        Add a notification to the caller's transaction (the caller commits)
+
+        Args:
+            db: Session holding the state change the notification reports
+            kind: Notification type, e.g. 'price_alert'
+            recipient: Email address
+            payload: JSON-serialisable template data
+            available_at: Earliest send time (default now)
+        """
+        now = datetime.utcnow()
+        row = NotificationOutbox(
+            kind=kind, recipient=recipient, payload=json.dumps(payload), status='pending',
+            attempts=0, available_at=available_at or now, created_at=now
+        )
+        db.add(row)
+        return row
+
+    @staticmethod
+    def claim_batch(owner: str, limit: int = 100, lease_seconds: float = 60,
+                    max_attempts: Optional[int] = None) -> List[Dict]:
+        """
+        Claim up to `limit` due rows for sending
+
+        Args:
+            owner: Drainer id, recorded so only the claimant can complete a row
+            limit: Batch size
+            lease_seconds: How long the claim is held before others may retry it
+            max_attempts: Due rows already claimed this many times (their
+                drainers died mid-send) are marked failed instead
+
+        Returns:
+            Claimed rows (id, kind, recipient, payload dict, attempts)
+        """
+        try:
+            db = SessionLocal()
+            now = datetime.utcnow()
+            if max_attempts is not None:
+                exhausted = db.execute(
+                    update(NotificationOutbox)
+                    .where(NotificationOutbox.status.in_(['pending', 'sending']),
+                           NotificationOutbox.available_at <= now,
+                           NotificationOutbox.attempts >= max_attempts)
+                    .values(status='failed', last_error=f"Gave up after {max_attempts} attempts (claim expired)")
+                ).rowcount
+                if exhausted:
+                    logger.error(f"Giving up on {exhausted} outbox notifications whose claims kept expiring")
+            due = (
+                select(NotificationOutbox.id)
+                .where(NotificationOutbox.status.in_(['pending', 'sending']),
+                       NotificationOutbox.available_at <= now)
+                .order_by(NotificationOutbox.available_at)
+                .limit(limit)
+                .scalar_subquery()
+            )
+            rows = db.execute(
+                update(NotificationOutbox)
+                .where(NotificationOutbox.id.in_(due))
+                .values(status='sending', claimed_by=owner, attempts=NotificationOutbox.attempts + 1,
+                        available_at=now + timedelta(seconds=lease_seconds))
+                .returning(NotificationOutbox.id, NotificationOutbox.kind, NotificationOutbox.recipient,
+                           NotificationOutbox.payload, NotificationOutbox.attempts)
+            ).all()
+            db.commit()
+            db.close()
+            return [{
+                'id': row.id,
+                'kind': row.kind,
+                'recipient': row.recipient,
+                'payload': json.loads(row.payload),
+                'attempts': row.attempts,
+            } for row in sorted(rows, key=lambda row: row.id)]
+
+        except Exception as e:
+            logger.error(f"Error claiming outbox batch: {str(e)}")
+            return []
+
+    @staticmethod
+    def extend_claims(outbox_ids: List[int], owner: str, lease_seconds: float) -> int:
+        """
+        Push back the claim expiry of rows a drainer is still sending
+
+        Returns:
+            Number of claims extended (rows already completed or reclaimed are left alone)
+        """
+        if not outbox_ids:
+            return 0
+        try:
+            db = SessionLocal()
+            updated = db.execute(
+                update(NotificationOutbox)
+                .where(NotificationOutbox.id.in_(outbox_ids), NotificationOutbox.claimed_by == owner,
+                       NotificationOutbox.status == 'sending')
+                .values(available_at=datetime.utcnow() + timedelta(seconds=lease_seconds))
+            ).rowcount
+            db.commit()
+            db.close()
+            return updated
+
+        except Exception as e:
+            logger.error(f"Error extending outbox claims: {str(e)}")
+            return 0
+
+    @staticmethod
+    def complete(outbox_ids: List[int], owner: str, status: str = 'sent') -> int:
+        """
+        Mark claimed rows done ('sent' or 'skipped')
+
+        Returns:
+            Number of rows updated (rows reclaimed by another drainer are left alone)
+        """
+        if not outbox_ids:
+            return 0
+        try:
+            db = SessionLocal()
+            updated = db.execute(
+                update(NotificationOutbox)
+                .where(NotificationOutbox.id.in_(outbox_ids), NotificationOutbox.claimed_by == owner,
+                       NotificationOutbox.status == 'sending')
+                .values(status=status, sent_at=datetime.utcnow(), last_error=None)
+            ).rowcount
+            db.commit()
+            db.close()
+            return updated
+
+        except Exception as e:
+            logger.error(f"Error completing outbox rows: {str(e)}")
+            return 0
+
+    @staticmethod
+    def fail(outbox_ids: List[int], owner: str, error: str, retry_at: Optional[datetime] = None) -> int:
+        """
+        Record a failed send: back to 'pending' until retry_at, or 'failed' if retry_at is None
+
+        Returns:
+            Number of rows updated
+        """
+        if not outbox_ids:
+            return 0
+        try:
+            db = SessionLocal()
+            values = {'status': 'pending', 'available_at': retry_at} if retry_at else {'status': 'failed'}
+            updated = db.execute(
+                update(NotificationOutbox)
+                .where(NotificationOutbox.id.in_(outbox_ids), NotificationOutbox.claimed_by == owner,
+                       NotificationOutbox.status == 'sending')
+                .values(last_error=error[:2000], **values)
+            ).rowcount
+            db.commit()
+            db.close()
+            return updated
+
+        except Exception as e:
+            logger.error(f"Error recording outbox failure: {str(e)}")
+            return 0
+
+    @staticmethod
+    def get_backlog() -> Dict:
+        """
+        Outbox backlog for monitoring
+
+        Returns:
+            Row counts for pending / sending / failed, and the age in seconds
+            of the oldest pending row (None if nothing is pending)
+        """
+        try:
+            db = SessionLocal()
+            backlog = {}
+            for status in ('pending', 'sending', 'failed'):
+                backlog[status] = db.query(func.count(NotificationOutbox.id)).filter(
+                    NotificationOutbox.status == status
+                ).scalar()
+            oldest = db.query(func.min(NotificationOutbox.available_at)).filter(
+                NotificationOutbox.status == 'pending'
+            ).scalar()
+            db.close()
+            backlog['oldest_pending_seconds'] = (
+                round((datetime.utcnow() - oldest).total_seconds(), 1) if oldest else None
+            )
+            return backlog
+
+        except Exception as e:
+            logger.error(f"Error getting outbox backlog: {str(e)}")
+            return {}
+
+    @staticmethod
+    def cleanup(retention_days: Optional[int] = None) -> int:
+        """
+        Delete sent and skipped rows older than the retention window (failed rows are kept)
+
+        Returns:
+            Number of rows deleted
+        """
+        retention_days = OutboxOperations.RETENTION_DAYS if retention_days is None else retention_days
+        try:
+            db = SessionLocal()
+            cutoff = datetime.utcnow() - timedelta(days=retention_days)
+            deleted = 0
+            for status in ('sent', 'skipped'):
+                deleted += db.query(NotificationOutbox).filter(
+                    NotificationOutbox.status == status, NotificationOutbox.sent_at < cutoff
+                ).delete(synchronize_session=False)
+            db.commit()
+            db.close()
+            if deleted:
+                logger.info(f"Deleted {deleted} delivered outbox rows")
+            return deleted
+
+        except Exception as e:
+            logger.error(f"Error cleaning up outbox: {str(e)}")
+            return 0
+
+
+class PushEventOperations:
+    """
+    Operations for the shared push event log
+
+    Workers append the live events they produce and read rows past the last
+    id they saw; ids only grow, so each poll is one primary-key range scan.
+    """
+
+    @staticmethod
+    def append(events: List[Tuple[str, str, Dict]]) -> bool:
+        """
+        Add events for every worker's live clients
+
+        Args:
+            events: (topic, event_type, data) tuples, data JSON-serialisable
+
+        Returns:
+            True if written
+        """
+        if not events:
+            return True
+        try:
+            db = SessionLocal()
+            now = datetime.utcnow()
+            db.execute(sqlite_insert(PushEventLog).values([
+                {'topic': topic, 'event_type': event_type, 'data': json.dumps(data, default=str), 'created_at': now}
+                for topic, event_type, data in events
+            ]))
+            db.commit()
+            db.close()
+            return True
+
+        except Exception as e:
+            logger.error(f"Error appending push events: {str(e)}")
+            return False
+
+    @staticmethod
+    def get_since(after_id: int, limit: int = 500) -> List[Dict]:
+        """
+        Events with id > after_id, oldest first
+
+        Returns:
+            List of {id, topic, event_type, data}; empty on error
+        """
+        try:
+            db = SessionLocal()
+            rows = db.execute(
+                select(PushEventLog.id, PushEventLog.topic, PushEventLog.event_type, PushEventLog.data)
+                .where(PushEventLog.id > after_id).order_by(PushEventLog.id).limit(limit)
+            ).all()
+            db.close()
+            return [{'id': row.id, 'topic': row.topic, 'event_type': row.event_type, 'data': json.loads(row.data)}
+                    for row in rows]
+
+        except Exception as e:
+            logger.error(f"Error reading push events: {str(e)}")
+            return []
+
+    @staticmethod
+    def get_last_id() -> Optional[int]:
+        """Newest event id (0 if the log is empty), or None on error"""
+        try:
+            db = SessionLocal()
+            last_id = db.execute(select(func.max(PushEventLog.id))).scalar()
+            db.close()
+            return last_id or 0
+
+        except Exception as e:
+            logger.error(f"Error reading last push event id: {str(e)}")
+            return None
+
+    @staticmethod
+    def cleanup(max_age_seconds: float = 300) -> int:
+        """
+        Delete events older than max_age_seconds (every worker has polled them by then)
+
+        Returns:
+            Number of rows deleted
+        """
+        try:
+            db = SessionLocal()
+            deleted = db.query(PushEventLog).filter(
+                PushEventLog.created_at < datetime.utcnow() - timedelta(seconds=max_age_seconds)
+            ).delete(synchronize_session=False)
+            db.commit()
+            db.close()
+            return deleted
+
+        except Exception as e:
+            logger.error(f"Error cleaning up push events: {str(e)}")
+            return 0
+
+
+class WeeklySummaryOperations:
+    """
+    Batch producer for weekly portfolio summary emails
+
+    Opted-in users are read in keyset pages of batch_size. Each page costs a
+    fixed number of queries (holdings and last week's snapshots by IN list,
+    prices for cards not seen earlier in the run, one bulk outbox insert)
+    regardless of how many users or holdings it has.
+    """
+
+    TOP_HOLDINGS = 5
+
+    @staticmethod
+    def _summary(user_id: str, holdings: List, prices: Dict[str, Optional[float]],
+                 last_week_value: Optional[float], week_ending: date) -> Dict:
+        investment = value = 0.0
+        card_count = 0
+        valued = []
+        for row in holdings:
+            price = prices.get(row.card_name)
+            holding_value = row.quantity * (price if price is not None else row.price)
+            investment += row.investment
+            value += holding_value
+            card_count += row.row_count
+            valued.append((holding_value, row))
+        valued.sort(key=lambda item: item[0], reverse=True)
+
+        week_change = round(value - last_week_value, 2) if last_week_value is not None else None
+        return {
+            'user_id': user_id,
+            'week_ending': week_ending.isoformat(),
+            'total_investment': round(investment, 2),
+            'total_value': round(value, 2),
+            'total_roi_percentage': round((value - investment) / investment * 100, 2) if investment > 0 else 0,
+            'card_count': card_count,
+            'week_change': week_change,
+            'week_change_percentage': (round(week_change / last_week_value * 100, 2)
+                                       if week_change is not None and last_week_value > 0 else None),
+            'top_holdings': [{
+                'card_name': row.card_name,
+                'quantity': row.quantity,
+                'value': round(holding_value, 2)
+            } for holding_value, row in valued[:WeeklySummaryOperations.TOP_HOLDINGS]]
+        }
+
+    @staticmethod
+    def enqueue_summaries(week_ending: Optional[date] = None, batch_size: int = 1000, chunk_size: int = 500) -> int:
+        """
+        Value every opted-in user's portfolio and add their summary emails to the outbox
+
+        Users need weekly_summary_enabled, email notifications on and a linked
+        user_id; users without holdings get no email. Prices come from the
+        price cache, looked up once per card for the whole run, falling back
+        to the price each holding was last valued at. Each page is committed
+        on its own, so a failure part-way keeps the pages already enqueued.
+
+        Args:
+            week_ending: Last day the summary covers (defaults to today, UTC);
+                the weekly change compares against the snapshot 7 days earlier
+            batch_size: Users per page
+            chunk_size: Max user IDs per IN list (SQLite bound-parameter limit)
+
+        Returns:
+            Number of summaries enqueued, or -1 on error
+        """
+        week_ending = week_ending or datetime.utcnow().date()
+        last_week = week_ending - timedelta(days=7)
+        try:
+            db = SessionLocal()
+            prices: Dict[str, Optional[float]] = {}  # shared by every page of the run
+            enqueued = 0
+            after = ('', 0)  # keyset position: (user_id, id) of the last row read
+
+            while True:
+                recipients = db.execute(
+                    select(NotificationPreferences.id, NotificationPreferences.user_id, NotificationPreferences.email)
+                    .where(NotificationPreferences.weekly_summary_enabled == 1,
+                           tuple_(NotificationPreferences.user_id, NotificationPreferences.id) > after,
+                           NotificationPreferences.email_notifications_enabled == 1)
+                    .order_by(NotificationPreferences.user_id, NotificationPreferences.id)
+                    .limit(batch_size)
+                ).all()
+                if not recipients:
+                    break
+                after = (recipients[-1].user_id, recipients[-1].id)
+
+                user_ids = list(dict.fromkeys(row.user_id for row in recipients))
+                holdings: Dict[str, List] = {}
+                last_week_values: Dict[str, float] = {}
+                for i in range(0, len(user_ids), chunk_size):
+                    chunk = user_ids[i:i + chunk_size]
+                    for row in db.execute(
+                        select(PortfolioHolding.user_id, PortfolioHolding.card_name, PortfolioHolding.quantity,
+                               PortfolioHolding.investment, PortfolioHolding.row_count, PortfolioHolding.price)
+                        .where(PortfolioHolding.user_id.in_(chunk))
+                    ):
+                        holdings.setdefault(row.user_id, []).append(row)
+                    last_week_values.update(db.execute(
+                        select(PortfolioSnapshot.user_id, PortfolioSnapshot.total_value)
+                        .where(PortfolioSnapshot.user_id.in_(chunk), PortfolioSnapshot.snapshot_date == last_week)
+                    ).all())
+
+                unpriced = list({row.card_name for rows in holdings.values() for row in rows} - prices.keys())
+                if unpriced:
+                    cached = CacheOperations.get_cached_prices(unpriced)
+                    for card_name in unpriced:
+                        price = (cached.get(card_name) or {}).get('price_data', {}).get('avg_price')
+                        prices[card_name] = float(price) if price is not None else None
+
+                now = datetime.utcnow()
+                summaries = {}
+                rows = []
+                for recipient in recipients:
+                    if recipient.user_id not in holdings:
+                        continue
+                    if recipient.user_id not in summaries:
+                        summaries[recipient.user_id] = json.dumps(WeeklySummaryOperations._summary(
+                            recipient.user_id, holdings[recipient.user_id], prices,
+                            last_week_values.get(recipient.user_id), week_ending
+                        ))
+                    rows.append({
+                        'kind': 'weekly_summary', 'recipient': recipient.email,
+                        'payload': summaries[recipient.user_id], 'status': 'pending', 'attempts': 0,
+                        'available_at': now, 'created_at': now
+                    })
+                if rows:
+                    db.execute(NotificationOutbox.__table__.insert(), rows)
+                db.commit()
+                enqueued += len(rows)
+
+            db.close()
+            logger.info(f"Enqueued {enqueued} weekly summaries for the week ending {week_ending}")
+            return enqueued
+
+        except Exception as e:
+            logger.error(f"Error enqueuing weekly summaries: {str(e)}")
+            return -1
+
+
+class JobOperations:
+    """
+    Operations for scheduler leases and job run history
+
+    A lease row per job names the worker process allowed to run it until
+    expires_at. Acquiring is a single conditional UPSERT, so when several
+    workers race for an expired lease SQLite's write lock lets exactly one win.
+    """
+
+    @staticmethod
+    def acquire_lease(job_name: str, owner: str, lease_seconds: float) -> bool:
+        """
+        Take or renew the lease on a job
+
+        Succeeds if nobody holds the lease, it has expired, or `owner`
+        already holds it (renewal keeps the same worker as leader).
+
+        Args:
+            job_name: Scheduled job name
+            owner: Identifier of the calling worker process
+            lease_seconds: How long the lease is held
+
+        Returns:
+            True if `owner` holds the lease afterwards
+        """
+        try:
+            db = SessionLocal()
+            now = datetime.utcnow()
+            statement = sqlite_insert(JobLease).values(
+                job_name=job_name, owner=owner, expires_at=now + timedelta(seconds=lease_seconds)
+            )
+            db.execute(statement.on_conflict_do_update(
+                index_elements=['job_name'],
+                set_={'owner': statement.excluded.owner, 'expires_at': statement.excluded.expires_at},
+                where=(JobLease.expires_at <= now) | (JobLease.owner == owner)
+            ))
+            db.commit()
+            holder = db.get(JobLease, job_name).owner
+            db.close()
+            return holder == owner
+
+        except Exception as e:
+            logger.error(f"Error acquiring lease for job {job_name}: {str(e)}")
+            return False
+
+    @staticmethod
+    def release_lease(job_name: str, owner: str) -> bool:
+        """Give up a lease early (e.g. on shutdown) so another worker can take over"""
+        try:
+            db = SessionLocal()
+            released = db.query(JobLease).filter(
+                JobLease.job_name == job_name, JobLease.owner == owner
+            ).delete()
+            db.commit()
+            db.close()
+            return released > 0
+
+        except Exception as e:
+            logger.error(f"Error releasing lease for job {job_name}: {str(e)}")
+            return False
+
+    @staticmethod
+    def record_run(job_name: str, owner: str, started_at: datetime, duration_ms: float,
+                   status: str, error: Optional[str] = None) -> bool:
+        """Store one job execution's duration and outcome"""
+        try:
+            db = SessionLocal()
+            db.add(JobRun(job_name=job_name, owner=owner, started_at=started_at,
+                          duration_ms=duration_ms, status=status, error=error))
+            db.commit()
+            db.close()
+            return True
+
+        except Exception as e:
+            logger.error(f"Error recording run of job {job_name}: {str(e)}")
+            return False
+
+    @staticmethod
+    def get_job_stats(job_name: str, since: Optional[datetime] = None) -> Dict:
+        """
+        Summarize a job's recorded runs
+
+        Args:
+            job_name: Scheduled job name
+            since: Only count runs started at or after this time (default: last 24h)
+
+        Returns:
+            Dict with runs, failures, avg_duration_ms, max_duration_ms and last_run
+        """
+        since = since or datetime.utcnow() - timedelta(days=1)
+        try:
+            db = SessionLocal()
+            filters = (JobRun.job_name == job_name, JobRun.started_at >= since)
+            runs, failures, avg_ms, max_ms = db.query(
+                func.count(JobRun.id),
+                func.sum(case((JobRun.status == 'failed', 1), else_=0)),
+                func.avg(JobRun.duration_ms),
+                func.max(JobRun.duration_ms)
+            ).filter(*filters).one()
+            last = db.query(JobRun).filter(*filters).order_by(JobRun.started_at.desc()).first()
+            db.close()
+
+            return {
+                'job_name': job_name,
+                'runs': runs,
+                'failures': int(failures or 0),
+                'avg_duration_ms': round(avg_ms, 1) if avg_ms is not None else None,
+                'max_duration_ms': round(max_ms, 1) if max_ms is not None else None,
+                'last_run': {
+                    'started_at': last.started_at.isoformat(),
+                    'duration_ms': last.duration_ms,
+                    'status': last.status,
+                    'owner': last.owner,
+                    'error': last.error
+                } if last else None
+            }
+
+        except Exception as e:
+            logger.error(f"Error getting stats for job {job_name}: {str(e)}")
+            return {'job_name': job_name, 'runs': 0, 'failures': 0,
+                    'avg_duration_ms': None, 'max_duration_ms': None, 'last_run': None}
+
+    @staticmethod
+    def cleanup_runs(retention_days: int = 30) -> int:
+        """Delete job run history older than the retention window"""
+        try:
+            db = SessionLocal()
+            deleted_count = db.query(JobRun).filter(
+                JobRun.started_at < datetime.utcnow() - timedelta(days=retention_days)
+            ).delete()
+            db.commit()
+            db.close()
+            return deleted_count
+
+        except Exception as e:
+            logger.error(f"Error purging job run history: {str(e)}")
+            return 0
+
+
 # ============================================================================
 # Test Script
 # ============================================================================
@@ -0,0 +1,179 @@
+# DimeDrop Email Templates
+# Notification email templates, compiled once by a shared Jinja environment
+
+from typing import Any
+from jinja2 import DictLoader, Environment, Template, select_autoescape
+
+BASE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{% block title %}DimeDrop{% endblock %}</title>
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: #1a365d; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }
+        .content { background: #f8f9fa; padding: 20px; border-radius: 0 0 8px 8px; }
+        .alert-details { background: white; padding: 15px; border-radius: 5px; margin: 15px 0; border-left: 4px solid #e53e3e; }
+        .price-info { display: flex; justify-content: space-between; margin: 10px 0; }
+        .cta-button { display: inline-block; background: #3182ce; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; margin: 20px 0; }
+        .footer { text-align: center; color: #666; font-size: 12px; margin-top: 20px; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        {% block body %}{% endblock %}
+    </div>
+</body>
+</html>
+"""
+
+ALERT_MACROS = """{% macro alert_details(alert) %}
+<div class="alert-details">
+    <h3>{{ alert.card_name }}</h3>
+    <div class="price-info">
+        <span><strong>Target Price:</strong> ${{ "%.2f"|format(alert.target_price) }}</span>
+        <span><strong>Condition:</strong> {{ alert.condition.title() }}</span>
+    </div>
+    <div class="price-info">
+        <span><strong>Current Price:</strong> ${{ "%.2f"|format(alert.current_price) }}</span>
+        <span><strong>Triggered:</strong> {{ alert.triggered_at.strftime('%Y-%m-%d %H:%M') }}</span>
+    </div>
+</div>
+{% endmacro %}
+
+{% macro footer(app_url) %}
+<div style="text-align: center;">
+    <a href="{{ app_url }}/alerts" class="cta-button">View All Alerts</a>
+</div>
+
+<p>You can manage your alerts and portfolio at <a href="{{ app_url }}">{{ app_url }}</a></p>
+
+<div class="footer">
+    <p>This alert was triggered by DimeDrop's price monitoring system.</p>
+    <p>To unsubscribe from alerts, visit your <a href="{{ app_url }}/settings">account settings</a>.</p>
+</div>
+{% endmacro %}
+"""
+
+PRICE_ALERT_TEMPLATE = """{% extends "base.html" %}
+{% from "alert_macros.html" import alert_details, footer %}
+{% block title %}Price Alert Triggered{% endblock %}
+{% block body %}
+<div class="header">
+    <h1>🎯 Price Alert Triggered!</h1>
+    <p>Your DimeDrop alert has been activated</p>
+</div>
+<div class="content">
+    <h2>{{ alert.card_name }}</h2>
+
+    {{ alert_details(alert) }}
+
+    <p>Great news! The price of <strong>{{ alert.card_name }}</strong> has {{ "risen above" if alert.condition == "above" else "fallen below" }} your target price of ${{ "%.2f"|format(alert.target_price) }}.</p>
+
+    <p>Current market price: <strong>${{ "%.2f"|format(alert.current_price) }}</strong></p>
+
+    {{ footer(app_url) }}
+</div>
+{% endblock %}
+"""
+
+ALERT_DIGEST_TEMPLATE = """{% extends "base.html" %}
+{% from "alert_macros.html" import alert_details, footer %}
+{% block title %}{{ alerts|length }} Price Alerts Triggered{% endblock %}
+{% block body %}
+<div class="header">
+    <h1>🎯 {{ alerts|length }} Price Alerts Triggered!</h1>
+    <p>Several of your DimeDrop alerts were activated</p>
+</div>
+<div class="content">
+    {% for alert in alerts %}
+    {{ alert_details(alert) }}
+    {% endfor %}
+
+    {{ footer(app_url) }}
+</div>
+{% endblock %}
+"""
+
+WEEKLY_SUMMARY_TEMPLATE = """{% extends "base.html" %}
+{% block title %}Your Weekly Portfolio Summary{% endblock %}
+{% block body %}
+<div class="header">
+    <h1>📊 Your Week on DimeDrop</h1>
+    <p>Portfolio summary for the week ending {{ summary.week_ending }}</p>
+</div>
+<div class="content">
+    <div class="alert-details" style="border-left-color: #3182ce;">
+        <div class="price-info">
+            <span><strong>Portfolio Value:</strong> ${{ "%.2f"|format(summary.total_value) }}</span>
+            <span><strong>Invested:</strong> ${{ "%.2f"|format(summary.total_investment) }}</span>
+        </div>
+        <div class="price-info">
+            <span><strong>ROI:</strong> {{ "%+.2f"|format(summary.total_roi_percentage) }}%</span>
+            <span><strong>Cards:</strong> {{ summary.card_count }}</span>
+        </div>
+        {% if summary.week_change is not none %}
+        <div class="price-info">
+            <span><strong>This Week:</strong> {{ "+" if summary.week_change >= 0 else "-" }}${{ "%.2f"|format(summary.week_change|abs) }}{% if summary.week_change_percentage is not none %} ({{ "%+.2f"|format(summary.week_change_percentage) }}%){% endif %}</span>
+        </div>
+        {% endif %}
+    </div>
+
+    {% if summary.top_holdings %}
+    <h3>Top Holdings</h3>
+    <ul>
+        {% for holding in summary.top_holdings %}
+        <li>{{ holding.card_name }} &times; {{ holding.quantity }}: ${{ "%.2f"|format(holding.value) }}</li>
+        {% endfor %}
+    </ul>
+    {% endif %}
+
+    <div style="text-align: center;">
+        <a href="{{ app_url }}/portfolio" class="cta-button">View Portfolio</a>
+    </div>
+
+    <div class="footer">
+        <p>You're receiving this because weekly summaries are on for your DimeDrop account.</p>
+        <p>To unsubscribe, visit your <a href="{{ app_url }}/settings">account settings</a>.</p>
+    </div>
+</div>
+{% endblock %}
+"""
+
+TEST_TEMPLATE = """{% extends "base.html" %}
+{% block title %}Test Notification{% endblock %}
+{% block body %}
+<h1 style="color: #1a365d;">🧪 Test Notification</h1>
+<p>This is a test notification from DimeDrop to verify your email settings are working correctly.</p>
+<p>If you received this email, your notification system is properly configured!</p>
+<p><a href="{{ app_url }}" style="color: #3182ce;">Visit DimeDrop</a></p>
+<hr>
+<p style="font-size: 12px; color: #666;">Sent at {{ sent_at.strftime('%Y-%m-%d %H:%M:%S') }}</p>
+{% endblock %}
+"""
+
+# Templates are parsed and compiled on first get_template() and cached by the
+# environment after that; auto_reload is off since the sources never change
+email_environment = Environment(
+    loader=DictLoader({
+        'base.html': BASE_TEMPLATE,
+        'alert_macros.html': ALERT_MACROS,
+        'price_alert.html': PRICE_ALERT_TEMPLATE,
+        'alert_digest.html': ALERT_DIGEST_TEMPLATE,
+        'weekly_summary.html': WEEKLY_SUMMARY_TEMPLATE,
+        'test.html': TEST_TEMPLATE,
+    }),
+    autoescape=select_autoescape(['html']),
+    auto_reload=False,
+)
+
+
+def get_template(name: str) -> Template:
+    """Compiled template from the shared environment"""
+    return email_environment.get_template(name)
+
+
+def render(name: str, **context: Any) -> str:
+    """Render a cached template"""
+    return get_template(name).render(**context)
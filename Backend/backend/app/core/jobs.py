@@ -0,0 +1,114 @@
+# DimeDrop Background Jobs
+# Periodic alert checks, cache compaction, cache warming and summary checks, run by the scheduler
+
+import asyncio
+import os
+import logging
+
+from .database import (
+    CacheOperations, PriceHistoryOperations, PortfolioOperations, PortfolioSummaryOperations, JobOperations,
+    OutboxOperations, AuthorKarmaOperations, PolarityOperations
+)
+from .alerts_tracker import AlertsTracker, alert_index
+from .polarity_cache import polarity_cache
+from .price_tracker import price_resolver
+from .scheduler import Scheduler, ScheduledJob
+from .snapshot_job import run_snapshot_job, snapshot_job_enabled, snapshot_hour_utc
+from .weekly_summary_job import run_weekly_summary_job, weekly_summary_job_enabled, weekly_summary_hour_utc
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def check_alerts_job() -> None:
+    """Re-check every card with active alerts (backstop for the price event path)"""
+    await asyncio.to_thread(alert_index.ensure_current, 0)
+    triggered = await AlertsTracker().check_alerts()
+    logger.info(f"Scheduled alert check triggered {len(triggered)} alerts")
+
+
+async def compact_caches_job() -> None:
+    """Drop expired price partitions and karma, old polarity scores, tombstones and job history, and sent outbox rows"""
+    await asyncio.to_thread(CacheOperations.cleanup_expired)
+    await asyncio.to_thread(PriceHistoryOperations.cleanup_expired)
+    await asyncio.to_thread(PortfolioOperations.cleanup_tombstones)
+    await asyncio.to_thread(JobOperations.cleanup_runs)
+    await asyncio.to_thread(OutboxOperations.cleanup)
+    await asyncio.to_thread(AuthorKarmaOperations.cleanup_expired)
+    await asyncio.to_thread(PolarityOperations.cleanup_expired, polarity_cache.retention_days)
+
+
+async def warm_price_cache_job() -> None:
+    """
+    Refresh prices for cards people hold or watch, so reads hit the cache
+
+    Uncached cards come first, then cached prices older than
+    CACHE_WARM_MAX_AGE_SECONDS, oldest first; both draw on the resolver's
+    shared refresh budget, so each run refreshes what the budget allows and
+    the next run picks up where it stopped.
+    """
+    await asyncio.to_thread(alert_index.ensure_current)
+    cards = set(await asyncio.to_thread(PortfolioSummaryOperations.get_held_card_names))
+    cards.update(alert_index.cards())
+    prices = await price_resolver.resolve(sorted(cards), max_age=_env_seconds('CACHE_WARM_MAX_AGE_SECONDS', 86400))
+    logger.info(f"Cache warming priced {sum(p is not None for p in prices.values())}/{len(cards)} cards")
+
+
+async def check_summaries_job() -> None:
+    """Reprice every portfolio summary from the price cache and repair any drift"""
+    repaired = 0
+    for user_id in await asyncio.to_thread(PortfolioSummaryOperations.get_user_ids):
+        try:
+            report = await asyncio.to_thread(PortfolioSummaryOperations.check_summary, user_id)
+            repaired += report['repaired']
+        except Exception as e:
+            logger.error(f"Error checking portfolio summary for {user_id}: {str(e)}")
+    logger.info(f"Summary check repaired {repaired} portfolio summaries")
+
+
+def _env_seconds(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def scheduler_enabled() -> bool:
+    """Whether this process runs the scheduler (safe in every worker; leases pick one)"""
+    return os.getenv('SCHEDULER_ENABLED', 'true').lower() in ('1', 'true', 'yes', 'on')
+
+
+def build_scheduler() -> Scheduler:
+    """Scheduler with DimeDrop's jobs, intervals from the environment"""
+    scheduler = Scheduler()
+    jitter = _env_seconds('SCHEDULER_JITTER_SECONDS', 30)
+
+    scheduler.add_job(ScheduledJob(
+        'check_alerts', check_alerts_job,
+        interval_seconds=_env_seconds('ALERT_CHECK_INTERVAL_SECONDS', 300), jitter_seconds=jitter
+    ))
+    scheduler.add_job(ScheduledJob(
+        'compact_caches', compact_caches_job,
+        interval_seconds=_env_seconds('CACHE_COMPACTION_INTERVAL_SECONDS', 6 * 3600), jitter_seconds=jitter
+    ))
+    scheduler.add_job(ScheduledJob(
+        'warm_price_cache', warm_price_cache_job,
+        interval_seconds=_env_seconds('CACHE_WARM_INTERVAL_SECONDS', 1800), jitter_seconds=jitter
+    ))
+    scheduler.add_job(ScheduledJob(
+        'check_summaries', check_summaries_job,
+        interval_seconds=_env_seconds('SUMMARY_CHECK_INTERVAL_SECONDS', 24 * 3600), jitter_seconds=jitter
+    ))
+    if snapshot_job_enabled():
+        scheduler.add_job(ScheduledJob(
+            'portfolio_snapshots', run_snapshot_job,
+            daily_at_hour_utc=snapshot_hour_utc(), jitter_seconds=jitter
+        ))
+    if weekly_summary_job_enabled():
+        scheduler.add_job(ScheduledJob(
+            'weekly_summaries', run_weekly_summary_job,
+            daily_at_hour_utc=weekly_summary_hour_utc(), jitter_seconds=jitter
+        ))
+    return scheduler
+
+
+# Global scheduler - started in main.py when SCHEDULER_ENABLED (default on)
+scheduler = build_scheduler()
@@ -0,0 +1,171 @@
+# DimeDrop Lexicon Scorer
+# Card-market sentiment lexicon scored over whole batches with NumPy
+
+import re
+from typing import Dict, List, Tuple
+import numpy as np
+from textblob.en import sentiment as textblob_lexicon
+
+# Card-market terms TextBlob doesn't know (or scores as plain English).
+# Two-word entries are matched as phrases and take precedence over their words.
+CARD_MARKET_LEXICON: Dict[str, float] = {
+    # Grading and condition
+    'gem mint': 0.8, 'psa 10': 0.6, 'bgs 10': 0.6, 'black label': 0.7, 'well centered': 0.5,
+    'off center': -0.5, 'off centered': -0.5, 'trimmed': -0.6, 'altered': -0.6, 'creased': -0.5,
+    'soft corners': -0.4, 'surface scratches': -0.4,
+    # Price action
+    'overpriced': -0.6, 'overvalued': -0.6, 'underpriced': 0.5, 'undervalued': 0.6, 'steal': 0.6,
+    'bargain': 0.5, 'dump': -0.6, 'dumping': -0.6, 'dumped': -0.5, 'crash': -0.7, 'crashing': -0.7,
+    'crashed': -0.7, 'tank': -0.6, 'tanking': -0.7, 'tanked': -0.7, 'plummeting': -0.7, 'bubble': -0.4,
+    'bagholder': -0.6, 'bagholding': -0.6, 'moon': 0.6, 'mooning': 0.6, 'skyrocketing': 0.7,
+    'surging': 0.6, 'climbing': 0.4, 'price drop': -0.5, 'prices dropping': -0.5, 'sell off': -0.5,
+    'buy low': 0.4, 'all time': 0.0, 'record sale': 0.6, 'new high': 0.6, 'new low': -0.6,
+    # Hobby slang
+    'grail': 0.7, 'heater': 0.6, 'goat': 0.6, 'fire': 0.5, 'slept on': 0.5, 'sleeper': 0.4,
+    'must have': 0.6, 'bust': -0.6, 'flop': -0.6, 'scam': -0.8, 'scammer': -0.8, 'junk wax': -0.5,
+    'reprint': -0.3, 'shill': -0.5, 'shilling': -0.5, 'hype': 0.2, 'overhyped': -0.6,
+    # Hobby words TextBlob reads as plain English ("base card", "raw copy", "sick pull")
+    'base': 0.0, 'raw': 0.0, 'black': 0.0, 'green': 0.0, 'pink': 0.0, 'single': 0.0, 'sick': 0.5, 'insane': 0.5,
+    # Emoji
+    '🔥': 0.6, '🚀': 0.6, '💎': 0.4, '📈': 0.5, '📉': -0.5, '💰': 0.4, '🐐': 0.6, '😍': 0.7, '🤑': 0.5,
+    '👍': 0.5, '❤': 0.6, '♥': 0.6, '💩': -0.7, '🤡': -0.5, '👎': -0.5, '😭': -0.4, '🗑': -0.6, '🧢': -0.4,
+}
+
+# "not good" scores as slightly bad, like TextBlob
+NEGATIONS = frozenset(('no', 'not', 'never', "n't"))
+NEGATION_FACTOR = -0.5
+EXCLAMATION_BOOST = 1.25
+
+# Lowercase words (with contractions), or any other single non-space character
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)*|[^\sa-z0-9]")
+_VARIATION_SELECTOR = '\ufe0f'  # emoji presentation suffix, e.g. on ❤️
+
+
+def _before(values: np.ndarray, steps: int = 1) -> np.ndarray:
+    """values[i - steps] at each position i (False/0 where that runs off the start)"""
+    shifted = np.zeros_like(values)
+    if steps < len(values):
+        shifted[steps:] = values[:len(values) - steps]
+    return shifted
+
+
+def _after(values: np.ndarray) -> np.ndarray:
+    """values[i + 1] at each position i (False/0 at the end)"""
+    shifted = np.zeros_like(values)
+    shifted[:-1] = values[1:]
+    return shifted
+
+
+class LexiconScorer:
+    """
+    Lexicon polarity for batches of documents, vectorized over the batch
+
+    The lexicon is TextBlob's English word list (so plain-English scores
+    track TextBlob's) overlaid with CARD_MARKET_LEXICON, compiled once
+    into term ids and weight arrays. A batch is tokenized once into one
+    flat token array; phrase matches, modifiers ("very good"), negation
+    ("not good") and "!" are then resolved with array ops, and the
+    sparse document x term hits are reduced against the weight vector
+    with np.bincount. A document's polarity is the mean of its hits, as
+    in TextBlob.
+    """
+
+    # Cached scores are keyed by this name: bump it when the lexicon changes
+    name = 'lexicon-v1'
+
+    def __init__(self, lexicon: Dict[str, float] = None):
+        """
+        Args:
+            lexicon: Terms (words, two-word phrases, emoji) -> polarity in [-1, 1];
+                defaults to CARD_MARKET_LEXICON on top of TextBlob's lexicon
+        """
+        terms: Dict[str, Tuple[float, float]] = {}  # term -> (polarity, modifier intensity or 0)
+        if lexicon is None:
+            textblob_lexicon.load()
+            for word, senses in textblob_lexicon.items():
+                if ' ' not in word and "'" not in word:
+                    polarity, _, intensity = senses[None]
+                    terms[word] = (polarity, intensity if 'RB' in senses else 0.0)
+            lexicon = CARD_MARKET_LEXICON
+        for term, polarity in lexicon.items():
+            terms[term] = (polarity, terms.get(term, (0.0, 0.0))[1])
+
+        words = [term for term in terms if ' ' not in term]
+        phrases = [term for term in terms if ' ' in term]
+        self._word_ids = {word: i for i, word in enumerate(words)}
+        self._phrase_ids = {tuple(phrase.split(' ', 1)): len(words) + i for i, phrase in enumerate(phrases)}
+        self._polarity = np.array([terms[term][0] for term in words + phrases], dtype=np.float64)
+        self._intensity = np.array([terms[term][1] for term in words + phrases], dtype=np.float64)
+
+    def tokenize(self, text: str) -> List[str]:
+        """Lowercase tokens: words, contractions and single symbols or emoji"""
+        return _TOKEN.findall(text.lower().replace(_VARIATION_SELECTOR, ''))
+
+    def score_batch(self, texts: List[str]) -> List[float]:
+        """
+        Polarity per text, in order
+
+        Args:
+            texts: Cleaned texts
+
+        Returns:
+            Polarity in [-1, 1] per text (0.0 for texts with no lexicon terms)
+        """
+        if not texts:
+            return []
+        tokenized = [self.tokenize(text) for text in texts]
+        lengths = np.fromiter((len(tokens) for tokens in tokenized), dtype=np.int64, count=len(texts))
+        if not lengths.sum():
+            return [0.0] * len(texts)
+
+        # Flat token stream for the whole batch; each distinct token is looked up once
+        vocabulary, token_index = np.unique(
+            np.array([token for tokens in tokenized for token in tokens]), return_inverse=True
+        )
+        doc = np.repeat(np.arange(len(texts)), lengths)
+        term = np.array([self._word_ids.get(token, -1) for token in vocabulary], dtype=np.int64)[token_index]
+        negation = np.array([token in NEGATIONS or token.endswith("n't") for token in vocabulary])[token_index]
+        exclamation = vocabulary[token_index] == '!'
+        continues_doc = _before(doc) == doc  # token i and i - 1 are in the same document
+        continues_doc[0] = False
+
+        # Phrases: a pair of adjacent tokens replaces its first word's hit and drops the second's
+        if self._phrase_ids:
+            position = {token: i for i, token in enumerate(vocabulary)}
+            codes, phrase_terms = [], []
+            for (first, second), phrase_term in self._phrase_ids.items():
+                if first in position and second in position:
+                    codes.append(position[first] * len(vocabulary) + position[second])
+                    phrase_terms.append(phrase_term)
+            if codes:
+                order = np.argsort(codes)
+                codes, phrase_terms = np.asarray(codes)[order], np.asarray(phrase_terms)[order]
+                pair_codes = token_index[:-1].astype(np.int64) * len(vocabulary) + token_index[1:]
+                slot = np.minimum(np.searchsorted(codes, pair_codes), len(codes) - 1)
+                starts = np.flatnonzero((codes[slot] == pair_codes) & continues_doc[1:])
+                term[starts] = phrase_terms[slot[starts]]
+                term[starts + 1] = -1
+
+        hit = term >= 0
+        weight = np.where(hit, self._polarity[np.maximum(term, 0)], 0.0)
+
+        # A known modifier right before a known word scales it and isn't scored itself;
+        # a negated modifier softens instead ("not very good" is mildly bad)
+        modifier = hit & (self._intensity[np.maximum(term, 0)] > 0)
+        modified = _before(modifier) & hit & continues_doc
+        modifier_negated = _before(negation, 2) & modified & _before(continues_doc)
+        intensity = self._intensity[_before(term)[modified]]
+        weight[modified] *= np.where(modifier_negated[modified], 1.0 / intensity, intensity)
+        hit[np.flatnonzero(modified) - 1] = False
+
+        # "!" right after a word strengthens it
+        weight[_after(exclamation & continues_doc)] *= EXCLAMATION_BOOST
+        np.clip(weight, -1.0, 1.0, out=weight)
+
+        # Negation directly before the word, or before its modifier
+        weight[(_before(negation) & continues_doc) | modifier_negated] *= NEGATION_FACTOR
+
+        # Sparse documents x terms product with the weight vector: sum and count of hits per document
+        totals = np.bincount(doc[hit], weights=weight[hit], minlength=len(texts))
+        counts = np.bincount(doc[hit], minlength=len(texts))
+        return (totals / np.maximum(counts, 1)).tolist()
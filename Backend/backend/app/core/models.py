@@ -3,7 +3,7 @@
 SQLAlchemy models for DimeDrop local SQLite database
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Date, DateTime, Text, DECIMAL, JSON, Index
+from sqlalchemy import create_engine, Column, Integer, String, Date, DateTime, Text, DECIMAL, Float, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -22,8 +22,9 @@ class PriceCache(Base):
     expires_at = Column(DateTime, nullable=False)
 
     # Indexes
+    # get_cached_price filters on (card_query, expires_at); cleanup_expired on expires_at
     __table_args__ = (
-        Index('idx_price_cache_card_query', 'card_query'),
+        Index('idx_price_cache_query_expires', 'card_query', 'expires_at'),
         Index('idx_price_cache_expires_at', 'expires_at'),
     )
 
@@ -36,8 +37,9 @@ class ApiRateLimits(Base):
     date = Column(Date, nullable=False)
     call_count = Column(Integer, default=0)
 
-    # Unique constraint
+    # Unique constraint - one counter row per API per day
     __table_args__ = (
+        Index('uq_api_rate_limits_api_name_date', 'api_name', 'date', unique=True),
         {'sqlite_autoincrement': True},
     )
 
@@ -58,11 +60,64 @@ class Portfolio(Base):
 
     # Indexes
     __table_args__ = (
-        Index('idx_portfolio_user_id', 'user_id'),
+        Index('idx_portfolio_user_created', 'user_id', 'created_at'),
+        Index('idx_portfolio_user_updated', 'user_id', 'updated_at'),
         Index('idx_portfolio_card_name', 'card_name'),
         Index('idx_portfolio_created_at', 'created_at'),
+        {'sqlite_autoincrement': True},  # deleted ids are never reused (delta sync relies on it)
     )
 
+class PortfolioTombstone(Base):
+    """Deleted portfolio rows, kept for a while so delta sync clients can drop them"""
+    __tablename__ = 'portfolio_tombstones'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    portfolio_id = Column(Integer, nullable=False)
+    user_id = Column(String(255), nullable=False)  # Auth0 user ID
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Indexes
+    __table_args__ = (
+        Index('idx_portfolio_tombstones_user_deleted', 'user_id', 'deleted_at'),
+        Index('idx_portfolio_tombstones_deleted_at', 'deleted_at'),
+    )
+
+class PortfolioSummary(Base):
+    """Per-user portfolio totals, maintained incrementally by PortfolioOperations"""
+    __tablename__ = 'portfolio_summaries'
+
+    user_id = Column(String(255), primary_key=True)  # Auth0 user ID
+    total_investment = Column(Float, default=0, nullable=False)
+    total_value = Column(Float, default=0, nullable=False)
+    row_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class PortfolioHolding(Base):
+    """Per-user, per-card aggregate behind PortfolioSummary (lets price changes apply as deltas)"""
+    __tablename__ = 'portfolio_holdings'
+
+    user_id = Column(String(255), primary_key=True)  # Auth0 user ID
+    card_name = Column(String(255), primary_key=True)
+    quantity = Column(Integer, default=0, nullable=False)
+    investment = Column(Float, default=0, nullable=False)
+    row_count = Column(Integer, default=0, nullable=False)
+    price = Column(Float, default=0, nullable=False)  # Price used for this holding's share of total_value
+
+    # Indexes
+    __table_args__ = (
+        Index('idx_portfolio_holdings_card_name', 'card_name'),
+    )
+
+class PortfolioSnapshot(Base):
+    """Daily per-user portfolio value, written by the nightly snapshot job"""
+    __tablename__ = 'portfolio_snapshots'
+
+    user_id = Column(String(255), primary_key=True)  # Auth0 user ID
+    snapshot_date = Column(Date, primary_key=True)
+    total_investment = Column(Float, nullable=False)
+    total_value = Column(Float, nullable=False)
+    card_count = Column(Integer, nullable=False)
+
 class Alert(Base):
     """Alerts table for price notification system"""
     __tablename__ = 'alerts'
@@ -76,6 +131,10 @@ class Alert(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     last_triggered = Column(DateTime)
     notes = Column(Text)
+    auto_rearm = Column(Integer, nullable=False, default=0)  # Stay active after firing, re-arm past the hysteresis band
+    armed = Column(Integer, nullable=False, default=1)  # 0 after firing until re-armed
+    cooldown_seconds = Column(Integer)  # Min seconds between triggers (NULL = ALERT_COOLDOWN_SECONDS)
+    hysteresis_pct = Column(Float)  # Re-arm band as % of target (NULL = ALERT_HYSTERESIS_PERCENT)
 
     # Indexes
     __table_args__ = (
@@ -91,6 +150,7 @@ class NotificationPreferences(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     email = Column(String(255), nullable=False)
+    user_id = Column(String(255))  # Auth0 user ID, set when saved while signed in
     email_notifications_enabled = Column(Integer, default=1)  # Enable/disable email notifications
     push_notifications_enabled = Column(Integer, default=0)  # For future push notifications
     alert_trigger_notifications = Column(Integer, default=1)  # Price alert triggers
@@ -101,6 +161,7 @@ class NotificationPreferences(Base):
     # Indexes
     __table_args__ = (
         Index('idx_notification_preferences_email', 'email'),
+        Index('idx_notification_preferences_weekly_user', 'weekly_summary_enabled', 'user_id'),
     )
 
 class TrackedListing(Base):
@@ -124,13 +185,127 @@ class TrackedListing(Base):
         Index('idx_tracked_listings_end_time', 'end_time'),
     )
 
+class JobLease(Base):
+    """Scheduler lease: the worker process allowed to run a job until expires_at"""
+    __tablename__ = 'job_leases'
+
+    job_name = Column(String(100), primary_key=True)
+    owner = Column(String(255), nullable=False)  # host:pid:uuid of the leader
+    expires_at = Column(DateTime, nullable=False)
+
+class JobRun(Base):
+    """One scheduled job execution (duration and outcome)"""
+    __tablename__ = 'job_runs'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_name = Column(String(100), nullable=False)
+    owner = Column(String(255), nullable=False)
+    started_at = Column(DateTime, nullable=False)
+    duration_ms = Column(Float, nullable=False)
+    status = Column(String(20), nullable=False)  # 'success' or 'failed'
+    error = Column(Text)
+
+    # Indexes
+    __table_args__ = (
+        Index('idx_job_runs_job_started', 'job_name', 'started_at'),
+        Index('idx_job_runs_started_at', 'started_at'),
+    )
+
+class NotificationOutbox(Base):
+    """
+    Notification waiting to be sent, written in the same transaction as the
+    state change that caused it (e.g. an alert firing)
+
+    status: 'pending' until claimed, 'sending' while a drainer holds it (until
+    available_at, after which another drainer may reclaim it), then 'sent',
+    'skipped' (recipient opted out) or 'failed' (retries exhausted).
+    """
+    __tablename__ = 'notification_outbox'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String(50), nullable=False)  # e.g. 'price_alert'
+    recipient = Column(String(255), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    status = Column(String(20), nullable=False, default='pending')
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False)  # next attempt, or claim expiry while sending
+    claimed_by = Column(String(255))
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime)
+    last_error = Column(Text)
+
+    # Indexes
+    __table_args__ = (
+        Index('idx_notification_outbox_status_available', 'status', 'available_at'),
+    )
+
+class RedditAuthorKarma(Base):
+    """Cached Reddit author karma used to weight posts in sentiment analysis"""
+    __tablename__ = 'reddit_author_karma'
+
+    username = Column(String(255), primary_key=True)
+    karma = Column(Integer)  # comment + link karma; NULL if the account is gone or suspended
+    fetched_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    # Indexes
+    __table_args__ = (
+        Index('idx_reddit_author_karma_expires_at', 'expires_at'),
+    )
+
+class TextPolarity(Base):
+    """Sentiment polarity of a cleaned post or article, keyed by a hash of its text"""
+    __tablename__ = 'text_polarity'
+
+    content_hash = Column(String(64), primary_key=True)  # hash of scorer name + cleaned text
+    polarity = Column(Float, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+    # Indexes
+    __table_args__ = (
+        Index('idx_text_polarity_created_at', 'created_at'),
+    )
+
+class ChangeCounter(Base):
+    """Version number bumped by every write to a table that workers mirror in memory"""
+    __tablename__ = 'change_counters'
+
+    name = Column(String(100), primary_key=True)  # e.g. 'alerts'
+    version = Column(Integer, nullable=False, default=0)
+
+class PushEventLog(Base):
+    """
+    Live-client event (price tick, alert trigger) shared by every worker
+
+    Each worker's push relay appends the events it produces and polls for
+    rows past the last id it saw, so clients connected to any worker get
+    them. Rows are only needed for a few seconds and are pruned by age.
+    """
+    __tablename__ = 'push_events'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    topic = Column(String(300), nullable=False)  # e.g. 'price:<card>' or 'alerts:<user_id>'
+    event_type = Column(String(50), nullable=False)  # 'price' or 'alert_triggered'
+    data = Column(Text, nullable=False)  # JSON
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # Indexes
+    __table_args__ = (
+        Index('idx_push_events_created_at', 'created_at'),
+    )
+
 # Database setup
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///./dimedrop.db')
 engine = create_engine(DATABASE_URL, connect_args={'check_same_thread': False} if 'sqlite' in DATABASE_URL else {})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def create_tables():
-    """Create all tables in the database"""
+    """
+    Create all tables in the database
+
+    Only meant for throwaway databases (tests, scripts). Real databases are
+    built and upgraded by the Alembic migrations in backend/migrations.
+    """
     Base.metadata.create_all(bind=engine)
 
 def get_db():
@@ -0,0 +1,249 @@
+# DimeDrop Notification Outbox
+# Drains the notification_outbox table: claim a batch, send, mark done or retry
+
+import asyncio
+import os
+import random
+import socket
+import uuid
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from .database import NotificationOperations, OutboxOperations
+from .notification_queue import EmailMessage, TransportError
+from .notification_service import NotificationService, notification_service
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class OutboxDrainer:
+    """
+    Sends what producers wrote to the outbox, at least once
+
+    Every worker may run a drainer: claims are atomic, so they split the
+    backlog between them. A row is only marked sent after the transport
+    accepts it; if the process dies first the claim expires and the row is
+    sent again. While a batch is being sent its claims are extended every
+    lease_seconds / 3, so a slow batch isn't reclaimed (and sent twice) by
+    another drainer. Failed sends are retried with exponential backoff
+    (persisted in available_at) until max_attempts, then marked failed; so
+    are rows whose claims keep expiring.
+    """
+
+    # Preference a recipient must have on for each kind of row
+    PREFERENCE_FOR_KIND = {
+        'price_alert': 'alert_trigger_notifications',
+        'weekly_summary': 'weekly_summary_enabled',
+    }
+
+    def __init__(self, service: Optional[NotificationService] = None, owner: Optional[str] = None,
+                 batch_size: int = 100, concurrency: int = 8, poll_interval: float = 5.0,
+                 lease_seconds: float = 60, max_attempts: int = 5,
+                 backoff_base: float = 30, backoff_max: float = 3600):
+        """
+        Args:
+            service: Renders and transports emails (default: the global service)
+            owner: Claim owner id for this process (default host:pid:random)
+            batch_size: Rows claimed per round trip
+            concurrency: Emails in flight at once
+            poll_interval: Seconds between polls when nothing wakes the drainer
+            lease_seconds: How long a claim lasts before another drainer may retry it
+            max_attempts: Sends per row before it is marked failed
+            backoff_base: First retry delay in seconds (doubles per attempt)
+            backoff_max: Retry delay cap in seconds
+        """
+        self.service = service or notification_service
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        # Counters for monitoring (the backlog itself comes from OutboxOperations.get_backlog)
+        self.stats = {'claimed': 0, 'sent': 0, 'skipped': 0, 'retried': 0, 'failed': 0}
+
+    @property
+    def running(self) -> bool:
+        """True while the drain loop is running"""
+        return self._task is not None and not self._task.done()
+
+    def notify(self) -> None:
+        """Wake the drainer now (a producer just committed outbox rows)"""
+        self._wake.set()
+
+    async def start(self) -> None:
+        """Start the drain loop on the running event loop"""
+        if self.running:
+            return
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Outbox drainer {self.owner} started")
+
+    async def stop(self) -> None:
+        """Stop the drain loop once the batch in hand is sent (the rest waits for the next drainer)"""
+        if not self.running:
+            return
+        self._stopping = True
+        self._wake.set()
+        await self._task
+        self._task = None
+        logger.info(f"Outbox drainer {self.owner} stopped: {self.stats}")
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                claimed = await self.drain_once()
+            except Exception as e:
+                logger.error(f"Outbox drain failed: {str(e)}")
+                claimed = 0
+            if claimed >= self.batch_size or self._stopping:
+                continue  # more is probably waiting (or we're done)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            # In digest mode, give a burst of alerts time to land so they share emails
+            if self.service.digest_window > 0 and not self._stopping:
+                await asyncio.sleep(self.service.digest_window)
+
+    async def drain_once(self) -> int:
+        """
+        Claim one batch and send it
+
+        Returns:
+            Number of rows claimed
+        """
+        rows = await asyncio.to_thread(OutboxOperations.claim_batch, self.owner, self.batch_size,
+                                       self.lease_seconds, self.max_attempts)
+        if not rows:
+            return 0
+        self.stats['claimed'] += len(rows)
+
+        renewal = asyncio.create_task(self._extend_claims([row['id'] for row in rows]))
+        try:
+            await self._send_batch(rows)
+        finally:
+            renewal.cancel()
+        return len(rows)
+
+    async def _extend_claims(self, outbox_ids: List[int]) -> None:
+        """Keep extending a batch's claims while it is being sent"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            await asyncio.to_thread(OutboxOperations.extend_claims, outbox_ids, self.owner, self.lease_seconds)
+
+    async def _send_batch(self, rows: List[Dict]) -> None:
+
+        # Opted-out recipients are skipped (one cached bulk lookup per batch)
+        preferences = await asyncio.to_thread(
+            NotificationOperations.get_notification_preferences_bulk, list({row['recipient'] for row in rows})
+        )
+        wanted, skipped = [], []
+        for row in rows:
+            prefs = preferences.get(row['recipient'])
+            opt_in = self.PREFERENCE_FOR_KIND.get(row['kind'], 'alert_trigger_notifications')
+            if prefs and prefs.get('email_notifications_enabled', True) and prefs.get(opt_in, True):
+                wanted.append(row)
+            else:
+                skipped.append(row['id'])
+        if skipped:
+            await asyncio.to_thread(OutboxOperations.complete, skipped, self.owner, 'skipped')
+            self.stats['skipped'] += len(skipped)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send(message: EmailMessage, group: List[Dict]) -> Tuple[List[Dict], Optional[TransportError]]:
+            async with semaphore:
+                try:
+                    await self.service.transport.send(message)
+                    return group, None
+                except TransportError as e:
+                    return group, e
+                except Exception as e:
+                    return group, TransportError(str(e))
+
+        if self.service.transport is None:
+            results = [(group, TransportError("No email transport configured", retryable=False))
+                       for _, group in self._messages(wanted)]
+        else:
+            results = await asyncio.gather(*(send(message, group) for message, group in self._messages(wanted)))
+
+        sent = [row['id'] for group, error in results if error is None for row in group]
+        await asyncio.to_thread(OutboxOperations.complete, sent, self.owner)
+        self.stats['sent'] += len(sent)
+
+        for group, error in results:
+            if error is not None:
+                await self._record_failure(group, error)
+
+    def _messages(self, rows: List[Dict]) -> List[Tuple[EmailMessage, List[Dict]]]:
+        """
+        Render rows into emails: a weekly summary per row, and an alert per
+        row or, in digest mode, one alert email per recipient
+        """
+        messages = [(self.service.render_weekly_summary(row['recipient'], row['payload']), [row])
+                    for row in rows if row['kind'] == 'weekly_summary']
+        return messages + self._alert_messages([row for row in rows if row['kind'] != 'weekly_summary'])
+
+    def _alert_messages(self, rows: List[Dict]) -> List[Tuple[EmailMessage, List[Dict]]]:
+        alerts = []
+        for row in rows:
+            alert = dict(row['payload'])
+            alert['triggered_at'] = datetime.fromisoformat(alert['triggered_at'])
+            alerts.append((row, alert))
+
+        if self.service.digest_window <= 0:
+            return [(self.service.render_price_alert(row['recipient'], alert), [row]) for row, alert in alerts]
+
+        by_recipient: Dict[str, List[Tuple[Dict, Dict]]] = {}
+        for row, alert in alerts:
+            by_recipient.setdefault(row['recipient'], []).append((row, alert))
+        return [(self.service.render_digest(recipient, [alert for _, alert in group]), [row for row, _ in group])
+                for recipient, group in by_recipient.items()]
+
+    async def _record_failure(self, group: List[Dict], error: TransportError) -> None:
+        retry, give_up = [], []
+        for row in group:
+            (retry if error.retryable and row['attempts'] < self.max_attempts else give_up).append(row)
+
+        for row in retry:
+            delay = self.backoff(row['attempts'])
+            await asyncio.to_thread(OutboxOperations.fail, [row['id']], self.owner, str(error),
+                                    datetime.utcnow() + timedelta(seconds=delay))
+        if give_up:
+            await asyncio.to_thread(OutboxOperations.fail, [row['id'] for row in give_up], self.owner, str(error))
+            logger.error(f"Giving up on {len(give_up)} outbox notifications: {str(error)}")
+        self.stats['retried'] += len(retry)
+        self.stats['failed'] += len(give_up)
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retrying after attempt number `attempt`: exponential with jitter"""
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+
+def outbox_enabled() -> bool:
+    """Whether this process drains the outbox (safe in every worker; claims are atomic)"""
+    return os.getenv('NOTIFICATION_OUTBOX_ENABLED', 'true').lower() in ('1', 'true', 'yes', 'on')
+
+
+# Global outbox drainer - started in main.py; alerts_tracker wakes it after triggering
+outbox_drainer = OutboxDrainer(
+    batch_size=int(os.getenv('NOTIFICATION_OUTBOX_BATCH_SIZE', '100')),
+    concurrency=int(os.getenv('NOTIFICATION_WORKERS', '4')),
+    poll_interval=float(os.getenv('NOTIFICATION_OUTBOX_POLL_SECONDS', '5')),
+    max_attempts=int(os.getenv('NOTIFICATION_OUTBOX_MAX_ATTEMPTS', '5')),
+    backoff_base=float(os.getenv('NOTIFICATION_OUTBOX_BACKOFF_SECONDS', '30'))
+)
@@ -0,0 +1,141 @@
+# DimeDrop Notification Transports
+# Email messages and the pluggable transports that deliver them (SendGrid, SMTP, local)
+
+import asyncio
+import os
+import smtplib
+import logging
+from dataclasses import dataclass, field
+from email.mime.text import MIMEText
+from typing import List, Optional, Protocol
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EmailMessage:
+    """A rendered email ready for a transport"""
+    to: str
+    subject: str
+    html: str
+    attempts: int = field(default=0, compare=False)
+
+
+class TransportError(Exception):
+    """Delivery failed; `retryable` says whether trying again may help"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class Transport(Protocol):
+    """Sends one message or raises TransportError"""
+
+    async def send(self, message: EmailMessage) -> None:
+        ...
+
+
+class SendGridTransport:
+    """Delivers through the SendGrid API (the blocking client runs in a thread)"""
+
+    def __init__(self, api_key: str, from_email: str):
+        from sendgrid import SendGridAPIClient
+        self.client = SendGridAPIClient(api_key)
+        self.from_email = from_email
+
+    def _send(self, message: EmailMessage):
+        from sendgrid.helpers.mail import Mail, Email, To, Content
+        mail = Mail(Email(self.from_email), To(message.to), message.subject, Content("text/html", message.html))
+        return self.client.send(mail)
+
+    async def send(self, message: EmailMessage) -> None:
+        try:
+            response = await asyncio.to_thread(self._send, message)
+        except Exception as e:
+            # HTTP errors from the client carry a status code; network errors don't
+            status = getattr(e, 'status_code', None)
+            raise TransportError(f"SendGrid error: {str(e)}", retryable=status is None or status == 429 or status >= 500)
+        if response.status_code != 202:
+            raise TransportError(f"SendGrid returned {response.status_code}",
+                                 retryable=response.status_code == 429 or response.status_code >= 500)
+
+
+class SMTPTransport:
+    """Delivers through an SMTP relay (smtplib runs in a thread)"""
+
+    def __init__(self, host: str, port: int = 587, username: Optional[str] = None,
+                 password: Optional[str] = None, from_email: str = '', use_tls: bool = True):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.from_email = from_email
+        self.use_tls = use_tls
+
+    def _send(self, message: EmailMessage) -> None:
+        mime = MIMEText(message.html, 'html', 'utf-8')
+        mime['Subject'] = message.subject
+        mime['From'] = self.from_email
+        mime['To'] = message.to
+        with smtplib.SMTP(self.host, self.port, timeout=30) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or '')
+            smtp.send_message(mime)
+
+    async def send(self, message: EmailMessage) -> None:
+        try:
+            await asyncio.to_thread(self._send, message)
+        except smtplib.SMTPRecipientsRefused as e:
+            raise TransportError(f"SMTP recipient refused: {str(e)}", retryable=False)
+        except (smtplib.SMTPException, OSError) as e:
+            raise TransportError(f"SMTP error: {str(e)}")
+
+
+class LocalTransport:
+    """
+    In-process stand-in that keeps messages instead of sending them
+
+    For tests, local development and benchmarks: `latency` simulates a
+    provider round trip and `failures` makes the next N sends fail.
+    """
+
+    def __init__(self, latency: float = 0.0, failures: int = 0, retryable: bool = True):
+        self.latency = latency
+        self.failures = failures
+        self.retryable = retryable
+        self.sent: List[EmailMessage] = []
+
+    async def send(self, message: EmailMessage) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failures > 0:
+            self.failures -= 1
+            raise TransportError("Simulated delivery failure", retryable=self.retryable)
+        self.sent.append(message)
+
+
+def build_transport(from_email: str) -> Optional[Transport]:
+    """
+    Transport selected by NOTIFICATION_TRANSPORT (sendgrid, smtp or local)
+
+    Defaults to SendGrid when SENDGRID_API_KEY is set; None means email is disabled.
+    """
+    kind = os.getenv('NOTIFICATION_TRANSPORT', 'sendgrid').lower()
+    if kind == 'local':
+        return LocalTransport()
+    if kind == 'smtp':
+        return SMTPTransport(
+            host=os.getenv('SMTP_HOST', 'localhost'),
+            port=int(os.getenv('SMTP_PORT', '587')),
+            username=os.getenv('SMTP_USERNAME'),
+            password=os.getenv('SMTP_PASSWORD'),
+            from_email=from_email,
+            use_tls=os.getenv('SMTP_USE_TLS', 'true').lower() in ('1', 'true', 'yes', 'on')
+        )
+    api_key = os.getenv('SENDGRID_API_KEY')
+    return SendGridTransport(api_key, from_email) if api_key else None
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Monthly table partitioning for DimeDrop price data
+Routes rows of a logical table to one physical SQLite table per month
+(e.g. price_cache_202510) so retention is a DROP TABLE instead of a DELETE
+"""
+
+import re
+import logging
+from datetime import date, datetime
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, JSON, Index, MetaData, Table, inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+logger = logging.getLogger(__name__)
+
+# Partition tables are created at runtime, not by Alembic
+partition_metadata = MetaData()
+
+
+def month_start(when) -> date:
+    """First day of the month containing `when`"""
+    return date(when.year, when.month, 1)
+
+
+def next_month(month: date) -> date:
+    """First day of the following month"""
+    return date(month.year + (month.month == 12), month.month % 12 + 1, 1)
+
+
+class MonthlyPartitions:
+    """
+    Routes a logical table to per-month physical tables named <prefix>_YYYYMM
+
+    The partition list is read from the schema on every call (other workers
+    may have created or dropped months); ensure() pre-creates upcoming months
+    so the write path doesn't have to issue DDL in the common case.
+    """
+
+    def __init__(self, prefix: str, build_columns: Callable[[], List[Column]],
+                 indexes: List[Tuple[str, List[str]]]):
+        """
+        Args:
+            prefix: Logical table name; partitions are <prefix>_YYYYMM
+            build_columns: Returns fresh Column objects for a new partition
+            indexes: (suffix, columns) pairs; index names are idx_<partition>_<suffix>
+        """
+        self.prefix = prefix
+        self.build_columns = build_columns
+        self.indexes = indexes
+        self.name_pattern = re.compile(rf'^{re.escape(prefix)}_(\d{{4}})(\d{{2}})$')
+
+    def name_for(self, when) -> str:
+        """Partition table name for the month containing `when`"""
+        return f"{self.prefix}_{when.year:04d}{when.month:02d}"
+
+    def month_of(self, name: str) -> Optional[date]:
+        """Month a partition covers, or None if `name` isn't one of ours"""
+        match = self.name_pattern.match(name)
+        return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+    def table(self, name: str) -> Table:
+        """Table object for a partition (shared per process)"""
+        if name in partition_metadata.tables:
+            return partition_metadata.tables[name]
+        table = Table(name, partition_metadata, *self.build_columns())
+        for suffix, columns in self.indexes:
+            Index(f"idx_{name}_{suffix}", *[table.c[c] for c in columns])
+        return table
+
+    def existing(self, conn: Connection) -> List[str]:
+        """Names of partitions present in the database, oldest first"""
+        return sorted(name for name in inspect(conn).get_table_names() if self.month_of(name))
+
+    def _create(self, conn: Connection, name: str) -> Table:
+        table = self.table(name)
+        conn.execute(CreateTable(table, if_not_exists=True))
+        for index in table.indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+        return table
+
+    def table_for_write(self, conn: Connection, when) -> Table:
+        """
+        Partition that rows stamped `when` belong in
+
+        A missing partition is created on the caller's connection, so it rolls
+        back with the caller's transaction.
+        """
+        name = self.name_for(when)
+        if name not in self.existing(conn):
+            logger.info(f"Creating partition {name} on write path")
+            return self._create(conn, name)
+        return self.table(name)
+
+    def tables_between(self, conn: Connection, start=None, end=None) -> List[Table]:
+        """Existing partitions overlapping [start, end], newest first"""
+        first = month_start(start) if start else None
+        last = month_start(end) if end else None
+        tables = []
+        for name in reversed(self.existing(conn)):
+            month = self.month_of(name)
+            if (first is None or month >= first) and (last is None or month <= last):
+                tables.append(self.table(name))
+        return tables
+
+    def ensure(self, conn: Connection, start, end) -> List[str]:
+        """Create any missing partitions for the months from start to end"""
+        existing = set(self.existing(conn))
+        created = []
+        month = month_start(start)
+        while month <= month_start(end):
+            name = self.name_for(month)
+            if name not in existing:
+                self._create(conn, name)
+                created.append(name)
+            month = next_month(month)
+        return created
+
+    def drop_before(self, conn: Connection, cutoff: datetime) -> List[str]:
+        """Drop every partition whose whole month ends on or before `cutoff`"""
+        dropped = []
+        for name in self.existing(conn):
+            if datetime.combine(next_month(self.month_of(name)), datetime.min.time()) <= cutoff:
+                self.table(name).drop(conn)
+                dropped.append(name)
+        return dropped
+
+
+# ============================================================================
+# Partitioned price tables
+# ============================================================================
+
+def _price_cache_columns() -> List[Column]:
+    return [
+        Column('id', Integer, primary_key=True, autoincrement=True),
+        Column('card_query', String(255), nullable=False),
+        Column('price_data', JSON, nullable=False),
+        Column('cached_at', DateTime, nullable=False),
+        Column('expires_at', DateTime, nullable=False),
+    ]
+
+
+def _price_history_columns() -> List[Column]:
+    return [
+        Column('id', Integer, primary_key=True, autoincrement=True),
+        Column('card_query', String(255), nullable=False),
+        Column('avg_price', DECIMAL(10, 2)),
+        Column('high', DECIMAL(10, 2)),
+        Column('low', DECIMAL(10, 2)),
+        Column('count', Integer),
+        Column('recorded_at', DateTime, nullable=False),
+    ]
+
+
+# Price cache rows are partitioned by expires_at month: once that month is
+# over, every row in the partition has expired and the table can be dropped.
+price_cache_partitions = MonthlyPartitions(
+    'price_cache', _price_cache_columns,
+    indexes=[('query_expires', ['card_query', 'expires_at'])]
+)
+
+# Price history is partitioned by recorded_at month and kept for a fixed window
+price_history_partitions = MonthlyPartitions(
+    'price_history', _price_history_columns,
+    indexes=[('query_recorded', ['card_query', 'recorded_at'])]
+)
+
+ALL_PARTITIONS = (price_cache_partitions, price_history_partitions)
+
+
+def is_partition_table(name: str) -> bool:
+    """True for runtime-managed partition tables (ignored by Alembic autogenerate)"""
+    return any(p.month_of(name) for p in ALL_PARTITIONS)
@@ -0,0 +1,105 @@
+# DimeDrop Polarity Cache
+# Sentiment scores memoized by content hash, in-process and in SQLite
+
+import hashlib
+import os
+import logging
+import re
+from typing import Callable, Dict, List, Optional
+
+from .database import PolarityOperations
+from .ttl_cache import TTLCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_URL = re.compile(r'http\S+')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def clean_text(text: str) -> str:
+    """Strip URLs and normalize whitespace (what the scorers see)"""
+    return _WHITESPACE.sub(' ', _URL.sub('', text)).strip()
+
+
+def content_hash(scorer_name: str, cleaned_text: str) -> str:
+    """Hash identifying a scorer's result for a cleaned document"""
+    return hashlib.blake2b(f"{scorer_name}\0{cleaned_text}".encode('utf-8'), digest_size=16).hexdigest()
+
+
+class PolarityCache:
+    """
+    Polarity by content hash: memory, then SQLite, then the scorer
+
+    Overlapping card queries ("wembanyama", "wembanyama prizm", "wemby
+    rookie") return many of the same posts and articles, so each distinct
+    document is scored once. Documents that differ only in URLs or
+    whitespace clean to the same text and share a score.
+    """
+
+    def __init__(self, max_entries: int = 100000, retention_days: int = 30):
+        """
+        Args:
+            max_entries: Documents kept in memory
+            retention_days: How long scores stay cached (memory and SQLite)
+        """
+        self.retention_days = retention_days
+        self._memory = TTLCache(ttl_seconds=retention_days * 86400, max_entries=max_entries)
+
+        # Counters for monitoring
+        self.stats = {'memory_hits': 0, 'db_hits': 0, 'scored': 0, 'failed': 0}
+
+    def score_many(self, texts: List[str], scorer_name: str,
+                   scorer: Callable[[List[str]], List[Optional[float]]]) -> List[float]:
+        """
+        Polarity for many documents, scoring only the ones not seen before
+
+        Blocking (SQLite and the scorer); call it off the event loop.
+
+        Args:
+            texts: Raw post or article texts
+            scorer_name: Identifies the scorer, so backends don't share scores
+            scorer: Scores a batch of cleaned, non-empty texts (only the unseen ones);
+                None for a text it failed on, which isn't cached so it is scored again next time
+
+        Returns:
+            Polarity per text, in order (0.0 for empty or unscorable texts)
+        """
+        cleaned = [clean_text(text) if text else '' for text in texts]
+        keys = {text: content_hash(scorer_name, text) for text in cleaned if text}
+
+        polarity = self._memory.get_many(keys.values())
+        self.stats['memory_hits'] += len(polarity)
+
+        missing = [key for key in dict.fromkeys(keys.values()) if key not in polarity]
+        if missing:
+            stored = PolarityOperations.get_polarity(missing)
+            for key, value in stored.items():
+                self._memory.set(key, value)
+            polarity.update(stored)
+            self.stats['db_hits'] += len(stored)
+
+        unseen = [text for text, key in keys.items() if key not in polarity]
+        if unseen:
+            results = dict(zip((keys[text] for text in unseen), scorer(unseen)))
+            scored = {key: value for key, value in results.items() if value is not None}
+            polarity.update(results)
+            self.stats['scored'] += len(scored)
+            self.stats['failed'] += len(results) - len(scored)
+            for key, value in scored.items():
+                self._memory.set(key, value)
+            PolarityOperations.store_polarity(scored)
+
+        return [polarity[keys[text]] if text and polarity[keys[text]] is not None else 0.0 for text in cleaned]
+
+    def clear(self) -> None:
+        """Drop the in-process cache (SQLite entries stay until cleaned up)"""
+        self._memory.clear()
+
+
+# Global polarity cache - shared by every SentimentAnalyzer in the process
+polarity_cache = PolarityCache(
+    max_entries=int(os.getenv('POLARITY_CACHE_SIZE', '100000')),
+    retention_days=int(os.getenv('POLARITY_CACHE_RETENTION_DAYS', '30'))
+)
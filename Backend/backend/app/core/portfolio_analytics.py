@@ -0,0 +1,117 @@
+# DimeDrop Portfolio Analytics
+# Columnar, NumPy-vectorized ROI / totals / weights / group breakdowns
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+
+@dataclass
+class PortfolioColumns:
+    """Portfolio rows held as parallel arrays (one element per portfolio row)"""
+    buy_price: np.ndarray
+    quantity: np.ndarray
+    current_price: np.ndarray
+
+    @classmethod
+    def from_rows(cls, entries: Sequence[Dict], prices: Sequence[float]) -> 'PortfolioColumns':
+        """
+        Build columns from PortfolioOperations rows and their resolved prices
+
+        Args:
+            entries: Portfolio row dicts (buy_price may be None)
+            prices: Current price per row, aligned with entries
+        """
+        return cls(
+            buy_price=np.fromiter((e['buy_price'] or 0 for e in entries), dtype=np.float64, count=len(entries)),
+            quantity=np.fromiter((e['quantity'] for e in entries), dtype=np.float64, count=len(entries)),
+            current_price=np.asarray(prices, dtype=np.float64)
+        )
+
+    def __len__(self) -> int:
+        return len(self.buy_price)
+
+
+@dataclass
+class PortfolioAnalytics:
+    """Per-row and portfolio-wide results of analyze()"""
+    total_investment: np.ndarray
+    current_value: np.ndarray
+    roi_percentage: np.ndarray
+    weight: np.ndarray
+    summary: Dict
+
+
+def _roi(investment, value):
+    """(value - investment) / investment * 100, 0 where nothing was invested"""
+    investment = np.asarray(investment, dtype=np.float64)
+    value = np.asarray(value, dtype=np.float64)
+    roi = np.zeros_like(investment)
+    np.divide((value - investment) * 100, investment, out=roi, where=investment > 0)
+    return roi
+
+
+def analyze(columns: PortfolioColumns) -> PortfolioAnalytics:
+    """
+    Compute per-row investment, value, ROI and weight plus portfolio totals in one pass
+
+    Returns:
+        PortfolioAnalytics; summary matches the /portfolio "summary" payload
+    """
+    total_investment = columns.buy_price * columns.quantity
+    current_value = columns.current_price * columns.quantity
+
+    invested = float(total_investment.sum())
+    value = float(current_value.sum())
+
+    weight = current_value / value if value > 0 else np.zeros_like(current_value)
+
+    return PortfolioAnalytics(
+        total_investment=total_investment,
+        current_value=current_value,
+        roi_percentage=_roi(total_investment, current_value),
+        weight=weight,
+        summary={
+            'total_investment': round(invested, 2),
+            'total_value': round(value, 2),
+            'total_roi_percentage': round(float(_roi(invested, value)), 2),
+            'card_count': len(columns)
+        }
+    )
+
+
+def group_breakdown(analytics: PortfolioAnalytics, keys: Sequence, quantity: Optional[np.ndarray] = None) -> List[Dict]:
+    """
+    Aggregate analyze() results per group key (card name, condition, month, ...)
+
+    Args:
+        analytics: Result of analyze()
+        keys: Group key per row, aligned with the analyzed columns
+        quantity: Optional quantity column to report card counts per group
+
+    Returns:
+        One dict per group, largest current value first
+    """
+    if len(keys) == 0:
+        return []
+
+    labels, inverse = np.unique(np.asarray(keys, dtype=object).astype(str), return_inverse=True)
+    investment = np.bincount(inverse, weights=analytics.total_investment, minlength=len(labels))
+    value = np.bincount(inverse, weights=analytics.current_value, minlength=len(labels))
+    rows = np.bincount(inverse, minlength=len(labels))
+    cards = np.bincount(inverse, weights=quantity, minlength=len(labels)) if quantity is not None else rows
+
+    total_value = value.sum()
+    weight = value / total_value if total_value > 0 else np.zeros_like(value)
+    roi = _roi(investment, value)
+
+    order = np.argsort(-value, kind='stable')
+    return [{
+        'group': labels[i],
+        'row_count': int(rows[i]),
+        'card_count': int(cards[i]),
+        'total_investment': round(float(investment[i]), 2),
+        'total_value': round(float(value[i]), 2),
+        'roi_percentage': round(float(roi[i]), 2),
+        'weight_percentage': round(float(weight[i]) * 100, 2)
+    } for i in order]
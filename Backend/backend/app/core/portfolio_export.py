@@ -0,0 +1,132 @@
+# DimeDrop Portfolio Export
+# Streams priced portfolio rows as CSV, NDJSON or Parquet without building the whole file in memory
+
+import io
+import csv
+import json
+import logging
+from typing import AsyncIterator, Dict, List
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+# (CSV header, row key) in export column order
+EXPORT_FIELDS = [
+    ('Card Name', 'card_name'),
+    ('Buy Price', 'buy_price'),
+    ('Current Price', 'current_price'),
+    ('Quantity', 'quantity'),
+    ('Condition', 'condition'),
+    ('Total Investment', 'total_investment'),
+    ('Current Value', 'current_value'),
+    ('ROI %', 'roi_percentage'),
+    ('Purchase Date', 'purchase_date'),
+]
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+
+def parquet_available() -> bool:
+    """True if pyarrow is installed"""
+    return pa is not None
+
+
+async def stream_csv(batches: AsyncIterator[List[Dict]]) -> AsyncIterator[bytes]:
+    """Encode row batches as CSV (csv module quoting), one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for header, _ in EXPORT_FIELDS])
+    yield buffer.getvalue().encode('utf-8')
+
+    async for rows in batches:
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerows([[row[key] if row[key] is not None else '' for _, key in EXPORT_FIELDS]
+                          for row in rows])
+        yield buffer.getvalue().encode('utf-8')
+
+
+async def stream_ndjson(batches: AsyncIterator[List[Dict]]) -> AsyncIterator[bytes]:
+    """Encode row batches as newline-delimited JSON objects"""
+    async for rows in batches:
+        yield ''.join(json.dumps({key: row[key] for _, key in EXPORT_FIELDS}) + '\n'
+                      for row in rows).encode('utf-8')
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back in chunks instead of keeping them"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _parquet_schema():
+    return pa.schema([
+        ('card_name', pa.string()),
+        ('buy_price', pa.float64()),
+        ('current_price', pa.float64()),
+        ('quantity', pa.int64()),
+        ('condition', pa.string()),
+        ('total_investment', pa.float64()),
+        ('current_value', pa.float64()),
+        ('roi_percentage', pa.float64()),
+        ('purchase_date', pa.string()),
+    ])
+
+
+async def stream_parquet(batches: AsyncIterator[List[Dict]]) -> AsyncIterator[bytes]:
+    """
+    Encode row batches as a Parquet file, one row group per batch
+
+    Each row group is sent as soon as it is written; the footer follows the last one.
+    """
+    if pa is None:
+        raise RuntimeError("Parquet export requires pyarrow")
+
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        async for rows in batches:
+            columns = {name: [row[name] for row in rows] for name in schema.names}
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+STREAMERS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+    'parquet': stream_parquet,
+}
@@ -1,14 +1,19 @@
 # DimeDrop Portfolio Tracker
 # Manages user's basketball card collection and ROI calculations
 
+import asyncio
 import os
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional
 from fastapi import HTTPException
 import logging
 
 # Import our database module
-from .database import PortfolioOperations
+from .database import PortfolioOperations, PortfolioSummaryOperations
+from .write_queue import run_write
+from .price_tracker import RefreshBudget, price_resolver
+from .portfolio_analytics import PortfolioColumns, analyze
+from .portfolio_export import STREAMERS, parquet_available
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -49,29 +54,36 @@ class PortfolioTracker:
             if buy_price <= 0 or quantity <= 0:
                 raise HTTPException(status_code=400, detail="Buy price and quantity must be positive")
 
-            # Get current price from price tracker (mock for now)
-            # In production, this would call the price tracker
-            current_price = self._get_current_price(card_name)
-
-            # Calculate ROI
-            total_investment = buy_price * quantity
-            current_value = current_price * quantity
-            roi_percentage = ((current_value - total_investment) / total_investment) * 100
+            # Confirmed market price from the price cache / tracker, if there is one
+            prices = await price_resolver.resolve([card_name])
+            market_price = prices.get(card_name)
 
             # Save to database
-            portfolio_entry = PortfolioOperations.add_card(
+            portfolio_entry = await run_write(lambda db: PortfolioOperations.add_card(
                 card_name=card_name,
                 purchase_price=buy_price,
                 quantity=quantity,
                 condition=condition,
                 purchase_date=purchase_date,
                 notes=notes,
-                user_id=user_id
-            )
+                user_id=user_id,
+                db=db,
+                current_price=market_price
+            ))
 
             if not portfolio_entry:
                 raise HTTPException(status_code=500, detail="Failed to save card to portfolio")
 
+            # Value it as the summary does (see PortfolioSummaryOperations)
+            current_price = portfolio_entry.get('current_price')
+            if current_price is None:
+                current_price = float(market_price) if market_price is not None else buy_price
+
+            # Calculate ROI
+            total_investment = buy_price * quantity
+            current_value = current_price * quantity
+            roi_percentage = ((current_value - total_investment) / total_investment) * 100
+
             logger.info(f"Added {card_name} to portfolio: {quantity} cards at ${buy_price} each")
 
             return {
@@ -101,95 +113,172 @@ class PortfolioTracker:
         Returns:
             List of portfolio entries with current prices and ROI
         """
+        return (await self.get_portfolio_analytics(user_id))['portfolio']
+
+    async def get_portfolio_analytics(self, user_id: Optional[str] = None) -> Dict:
+        """
+        Get user's portfolio entries together with portfolio-wide totals
+
+        Rows are loaded into columnar arrays and ROI, totals and weights are
+        computed vectorized in one pass (see portfolio_analytics).
+
+        Args:
+            user_id: Optional user ID filter (for future multi-user support)
+
+        Returns:
+            Dict with 'portfolio' (entries with current prices, ROI and weight)
+            and 'summary' (total_investment, total_value, total_roi_percentage, card_count)
+        """
         try:
             entries = PortfolioOperations.get_all_cards(user_id=user_id)
 
-            portfolio = []
-            for entry in entries:
-                # Get current price (mock for now)
-                current_price = self._get_current_price(entry['card_name'])
-
-                # Recalculate ROI with current price
-                total_investment = (entry['buy_price'] or 0) * entry['quantity']
-                current_value = current_price * entry['quantity']
-                roi_percentage = ((current_value - total_investment) / total_investment) * 100 if total_investment > 0 else 0
-
-                portfolio.append({
-                    'id': entry['id'],
-                    'card_name': entry['card_name'],
-                    'buy_price': entry['buy_price'] or 0,
-                    'current_price': current_price,
-                    'quantity': entry['quantity'],
-                    'condition': entry['condition'] or 'Raw',
-                    'total_investment': total_investment,
-                    'current_value': current_value,
-                    'roi_percentage': round(roi_percentage, 2),
-                    'purchase_date': entry['purchase_date'],
-                    'created_at': entry['created_at']
-                })
-
-            return portfolio
+            # One batched lookup for the distinct cards, then price every row from the map
+            prices = await price_resolver.resolve([entry['card_name'] for entry in entries])
+            current_prices = self._current_prices(entries, prices, user_id)
+
+            columns = PortfolioColumns.from_rows(entries, current_prices)
+            analytics = analyze(columns)
+
+            # Convert once to Python floats rather than per element
+            total_investment = analytics.total_investment.tolist()
+            current_value = analytics.current_value.tolist()
+            roi_percentage = analytics.roi_percentage.round(2).tolist()
+            weight_percentage = (analytics.weight * 100).round(2).tolist()
+
+            portfolio = [{
+                'id': entry['id'],
+                'card_name': entry['card_name'],
+                'buy_price': entry['buy_price'] or 0,
+                'current_price': current_prices[i],
+                'quantity': entry['quantity'],
+                'condition': entry['condition'] or 'Raw',
+                'total_investment': total_investment[i],
+                'current_value': current_value[i],
+                'roi_percentage': roi_percentage[i],
+                'weight_percentage': weight_percentage[i],
+                'purchase_date': entry['purchase_date'],
+                'created_at': entry['created_at']
+            } for i, entry in enumerate(entries)]
+
+            return {'portfolio': portfolio, 'summary': analytics.summary}
 
         except Exception as e:
             logger.error(f"Error retrieving portfolio: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Error retrieving portfolio: {str(e)}")
 
+    async def iter_priced_batches(self, user_id: Optional[str] = None,
+                                  batch_size: int = 1000) -> AsyncIterator[List[Dict]]:
+        """
+        Stream the user's portfolio as priced row batches
+
+        Rows are read a keyset page at a time, each page in its own short read
+        off the event loop, then priced from cached prices only (no eBay
+        refreshes, so an export doesn't spend the refresh budget) and
+        analyzed on its own; memory stays bounded by batch_size regardless
+        of portfolio size.
+
+        Args:
+            user_id: Optional user ID filter
+            batch_size: Rows per batch
+
+        Yields:
+            Lists of entries with current price, totals and ROI
+        """
+        held = await asyncio.to_thread(PortfolioSummaryOperations.get_holding_prices, user_id) if user_id else {}
+        cache_only = RefreshBudget(0)
+        after = None
+        while True:
+            entries = await asyncio.to_thread(PortfolioOperations.get_cards_page, user_id, after, batch_size)
+            if not entries:
+                break
+            after = (entries[-1]['created_at'], entries[-1]['id'])
+
+            prices = await price_resolver.resolve([entry['card_name'] for entry in entries], budget=cache_only)
+            current_prices = self._current_prices(entries, prices, user_id, held)
+            analytics = analyze(PortfolioColumns.from_rows(entries, current_prices))
+
+            total_investment = analytics.total_investment.tolist()
+            current_value = analytics.current_value.tolist()
+            roi_percentage = analytics.roi_percentage.round(2).tolist()
+
+            yield [{
+                'card_name': entry['card_name'],
+                'buy_price': entry['buy_price'] or 0,
+                'current_price': current_prices[i],
+                'quantity': entry['quantity'],
+                'condition': entry['condition'] or 'Raw',
+                'total_investment': total_investment[i],
+                'current_value': current_value[i],
+                'roi_percentage': roi_percentage[i],
+                'purchase_date': entry['purchase_date']
+            } for i, entry in enumerate(entries)]
+
+    def export_portfolio(self, user_id: Optional[str] = None, export_format: str = 'csv',
+                         batch_size: int = 1000) -> AsyncIterator[bytes]:
+        """
+        Export portfolio as a stream of encoded chunks
+
+        Args:
+            user_id: Optional user ID filter
+            export_format: 'csv', 'ndjson' or 'parquet'
+            batch_size: Rows encoded per chunk
+
+        Returns:
+            Async iterator of bytes suitable for a StreamingResponse
+        """
+        if export_format not in STREAMERS:
+            raise HTTPException(status_code=400, detail=f"Unsupported export format: {export_format}")
+        if export_format == 'parquet' and not parquet_available():
+            raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+
+        return self._logged_stream(
+            STREAMERS[export_format](self.iter_priced_batches(user_id, batch_size=batch_size)),
+            export_format
+        )
+
+    async def _logged_stream(self, chunks: AsyncIterator[bytes], export_format: str) -> AsyncIterator[bytes]:
+        # Headers are already sent once streaming starts, so failures can only be logged
+        try:
+            async for chunk in chunks:
+                yield chunk
+        except Exception as e:
+            logger.error(f"Error exporting portfolio {export_format}: {str(e)}")
+            raise
+
     async def export_portfolio_csv(self, user_id: Optional[str] = None) -> str:
         """
         Export portfolio as CSV string
 
+        Prefer export_portfolio() for large portfolios; this collects the whole stream.
+
         Returns:
             CSV formatted string of portfolio data
         """
         try:
-            portfolio = await self.get_portfolio(user_id)
-
-            if not portfolio:
-                return "No portfolio data available"
-
-            # CSV header
-            csv_lines = [
-                "Card Name,Buy Price,Current Price,Quantity,Condition,Total Investment,Current Value,ROI %,Purchase Date"
-            ]
-
-            # CSV data rows
-            for entry in portfolio:
-                line = ",".join([
-                    entry['card_name'],
-                    str(entry['buy_price']),
-                    str(entry['current_price']),
-                    str(entry['quantity']),
-                    entry['condition'],
-                    str(entry['total_investment']),
-                    str(entry['current_value']),
-                    str(entry['roi_percentage']),
-                    entry['purchase_date'] or ''
-                ])
-                csv_lines.append(line)
-
-            return "\n".join(csv_lines)
+            return b''.join([chunk async for chunk in self.export_portfolio(user_id, 'csv')]).decode('utf-8')
 
         except Exception as e:
             logger.error(f"Error exporting portfolio CSV: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Error exporting portfolio: {str(e)}")
 
-    def _get_current_price(self, card_name: str) -> float:
+    def _current_prices(self, entries: List[Dict], prices: Dict[str, Optional[float]],
+                        user_id: Optional[str], held: Optional[Dict[str, float]] = None) -> List[float]:
         """
-        Get current market price for a card
-        In production, this would call the price tracker API
-        For now, returns mock prices based on card name
+        Price per row, by the same rule as the portfolio summary: the resolved
+        market price, else the price the user's holding is valued at (last
+        confirmed price, or its starting buy price), else the row's buy price
         """
-        # Mock price logic - in production, call price tracker
-        card_lower = card_name.lower()
-
-        if 'wembanyama' in card_lower:
-            return 152.50
-        elif 'lebron' in card_lower:
-            return 48.90
-        elif 'jordan' in card_lower:
-            return 125.00
-        else:
-            return 35.00  # Default price for unknown cards
+        if held is None:
+            held = PortfolioSummaryOperations.get_holding_prices(user_id) if user_id else {}
+        current_prices = []
+        for entry in entries:
+            price = prices.get(entry['card_name'])
+            if price is None:
+                price = held.get(entry['card_name'].strip())
+            if price is None:
+                price = entry['buy_price'] or 0.0
+            current_prices.append(float(price))
+        return current_prices
 
 
 # Global instance for use in FastAPI
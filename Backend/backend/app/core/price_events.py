@@ -0,0 +1,127 @@
+# DimeDrop Price Events
+# In-process event bus published whenever fresh price data is written
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PriceUpdate:
+    """Fresh price data for one card, published after it is committed"""
+    card_query: str
+    price_data: Dict
+    recorded_at: datetime = field(default_factory=datetime.utcnow)
+
+    @property
+    def avg_price(self) -> Optional[float]:
+        price = self.price_data.get('avg_price')
+        return float(price) if price is not None else None
+
+
+PriceHandler = Callable[[PriceUpdate], Awaitable[None]]
+
+
+class PriceEventBus:
+    """
+    Fans price updates out to subscribers (alert evaluation, push, ...)
+
+    When started, publish() only enqueues and a dispatcher task delivers
+    events, so the request that fetched the price isn't held up by
+    subscribers. Updates for the same card that queue up before dispatch are
+    coalesced to the newest. When not started, events are delivered inline.
+    A failing subscriber is logged and doesn't affect the others.
+    """
+
+    def __init__(self, max_pending: int = 10000):
+        self.max_pending = max_pending
+        self._handlers: List[PriceHandler] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters for monitoring
+        self.stats = {'published': 0, 'delivered': 0, 'coalesced': 0, 'dropped': 0, 'handler_errors': 0}
+
+    @property
+    def running(self) -> bool:
+        """True while the dispatcher task is delivering events"""
+        return self._task is not None and not self._task.done()
+
+    def subscribe(self, handler: PriceHandler) -> None:
+        """Register an async handler called with every PriceUpdate"""
+        if handler not in self._handlers:
+            self._handlers.append(handler)
+
+    def unsubscribe(self, handler: PriceHandler) -> None:
+        """Remove a handler registered with subscribe()"""
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    async def start(self) -> None:
+        """Start the dispatcher task on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Price event bus started with {len(self._handlers)} subscribers")
+
+    async def stop(self) -> None:
+        """Deliver queued events and stop the dispatcher task"""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        logger.info(f"Price event bus stopped: {self.stats}")
+
+    async def publish(self, event: PriceUpdate) -> None:
+        """Publish a price update to every subscriber"""
+        self.stats['published'] += 1
+        if not self.running:
+            await self._deliver(event)
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.stats['dropped'] += 1
+            logger.warning(f"Price event queue full, dropped update for '{event.card_query}'")
+
+    async def _run(self) -> None:
+        """Dispatcher loop: drain what's queued, keep the newest update per card, deliver"""
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            latest = {first.card_query: first}
+            while not self._queue.empty():
+                event = self._queue.get_nowait()
+                if event is None:
+                    stopping = True
+                    break
+                if event.card_query in latest:
+                    self.stats['coalesced'] += 1
+                latest[event.card_query] = event
+
+            for event in latest.values():
+                await self._deliver(event)
+
+    async def _deliver(self, event: PriceUpdate) -> None:
+        for handler in list(self._handlers):
+            try:
+                await handler(event)
+                self.stats['delivered'] += 1
+            except Exception as e:
+                self.stats['handler_errors'] += 1
+                logger.error(f"Price event handler {getattr(handler, '__qualname__', handler)} failed "
+                             f"for '{event.card_query}': {str(e)}")
+
+
+# Global price event bus - started in main.py; PriceTracker publishes, alerts subscribe
+price_events = PriceEventBus()
@@ -3,15 +3,19 @@
 
 import asyncio
 import os
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from fastapi import HTTPException
 import httpx
 import logging
 from dotenv import load_dotenv
 
 # Import our database module
-from .database import CacheOperations, RateLimitOperations
+from .database import CacheOperations, RateLimitOperations, PriceHistoryOperations, PortfolioSummaryOperations
+from .write_queue import run_write
+from .price_events import PriceUpdate, price_events
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -48,12 +52,27 @@ class LocalCache:
             return None
 
     async def set_cached_prices(self, card_query: str, price_data: Dict) -> bool:
-        """Store price data in Supabase cache"""
+        """
+        Store price data in the cache, append it to price history and revalue portfolio summaries,
+        then publish a PriceUpdate once the write has committed
+        """
         try:
             if not price_data:
                 return False  # Simulate failure for empty data
-            cache_entry = CacheOperations.set_cached_price(card_query, price_data, self.cache_max_days)
-            return cache_entry is not None
+
+            def write(db):
+                cache_entry = CacheOperations.set_cached_price(card_query, price_data, self.cache_max_days, db=db)
+                PriceHistoryOperations.record_price(card_query, price_data, db=db)
+                if price_data.get('avg_price') is not None:
+                    PortfolioSummaryOperations.apply_price_change(card_query, price_data['avg_price'], db=db)
+                return cache_entry
+
+            cache_entry = await run_write(write)
+            if cache_entry is None:
+                return False
+
+            await price_events.publish(PriceUpdate(card_query=card_query, price_data=price_data))
+            return True
 
         except Exception as e:
             logger.error(f"Error writing to cache: {str(e)}")
@@ -120,6 +139,14 @@ class PriceTracker:
         except Exception as e:
             logger.error(f"Cache lookup failed, continuing without cache: {str(e)}")
 
+        return await self.refresh_prices(card_query)
+
+    async def refresh_prices(self, card_query: str) -> Dict:
+        """
+        Fetch fresh prices for a card (skipping the cache read) and cache them
+
+        Raises HTTPException(429) when the daily eBay budget is spent.
+        """
         # Check rate limit before calling eBay API
         if not await self.rate_limiter.check_and_increment():
             raise HTTPException(
@@ -295,8 +322,121 @@ class PriceTracker:
         return mock_listings[:limit]
 
 
-# Global instance for FastAPI endpoint
+class RefreshBudget:
+    """
+    Token bucket for eBay price refreshes
+
+    Holds up to capacity refreshes and regains capacity every window_seconds
+    (continuously); with window_seconds=None it never refills, which makes a
+    one-off budget a caller can spread over several resolve() calls.
+    Complements RateLimiter's daily cap: this one paces cache misses so a
+    loop of resolves can't spend the whole day's quota at once.
+    """
+
+    def __init__(self, capacity: int, window_seconds: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.window_seconds = window_seconds
+        self.clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def take(self, wanted: int) -> int:
+        """Take up to wanted refreshes; returns how many were granted"""
+        with self._lock:
+            now = self.clock()
+            if self.window_seconds:
+                refill = max(0.0, now - self._updated) * self.capacity / self.window_seconds
+                self._tokens = min(float(self.capacity), self._tokens + refill)
+            self._updated = now
+            granted = max(0, min(wanted, int(self._tokens)))
+            self._tokens -= granted
+            return granted
+
+
+class BatchPriceResolver:
+    """
+    Resolves current prices for many cards with one batched cache lookup
+
+    Cache misses are refreshed concurrently, but at most max_concurrency at a
+    time and only as far as the refresh budget allows. The resolver's own
+    budget is a rate (refresh_budget per refresh_window_seconds) shared by
+    every caller, so looping callers can't burn through the daily eBay
+    limit; a caller may pass its own RefreshBudget to spend across several
+    calls instead. Cards left unresolved map to None.
+    """
+
+    def __init__(self, tracker: PriceTracker, max_concurrency: int = 8, refresh_budget: int = 50,
+                 refresh_window_seconds: Optional[float] = 1800):
+        self.tracker = tracker
+        self.max_concurrency = max_concurrency
+        self.budget = RefreshBudget(refresh_budget, refresh_window_seconds)
+
+    async def resolve(self, card_names: List[str], budget: Optional[RefreshBudget] = None,
+                      max_age: Optional[float] = None) -> Dict[str, Optional[float]]:
+        """
+        Map each distinct card name to its current average price
+
+        Args:
+            card_names: Card names (duplicates are resolved once)
+            budget: Refresh budget to draw cache misses from (default: the
+                    resolver's shared rate); RefreshBudget(0) means cache only
+            max_age: Also refresh cached prices older than this many seconds,
+                     oldest first and after the misses (they keep their cached
+                     price if the budget runs out or the refresh fails)
+
+        Returns:
+            Dict of card_name -> avg price, or None if it couldn't be resolved
+        """
+        distinct = list(dict.fromkeys(card_names))
+        prices: Dict[str, Optional[float]] = dict.fromkeys(distinct)
+
+        cached = CacheOperations.get_cached_prices([name.strip() for name in distinct])
+        misses, stale = [], []
+        stale_before = (datetime.utcnow() - timedelta(seconds=max_age)).isoformat() if max_age is not None else None
+        for name in distinct:
+            entry = cached.get(name.strip())
+            if entry:
+                prices[name] = entry['price_data'].get('avg_price')
+                if stale_before is not None and entry['cached_at'] < stale_before:
+                    stale.append((entry['cached_at'], name))
+            else:
+                misses.append(name)
+        candidates = misses + [name for _, name in sorted(stale)]
+
+        budget = budget if budget is not None else self.budget
+        to_refresh = candidates[:budget.take(len(candidates))]
+        if len(misses) > len(to_refresh):
+            logger.warning(f"Price refresh budget exhausted: {len(misses) - len(to_refresh)} cards left unpriced")
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def refresh(name: str) -> Optional[float]:
+            async with semaphore:
+                try:
+                    price_data = await self.tracker.refresh_prices(name.strip())
+                    return price_data.get('avg_price')
+                except Exception as e:
+                    logger.warning(f"Price refresh failed for '{name}': {str(e)}")
+                    return None
+
+        refreshed = await asyncio.gather(*[refresh(name) for name in to_refresh])
+        prices.update((name, price) for name, price in zip(to_refresh, refreshed) if price is not None)
+
+        logger.info(f"Resolved prices for {len(distinct)} cards: {len(distinct) - len(misses)} cached "
+                    f"({len(stale)} stale), {sum(p is not None for p in refreshed)} refreshed")
+        return prices
+
+
+# Global instances for FastAPI endpoint
 price_tracker = PriceTracker()
+price_resolver = BatchPriceResolver(
+    price_tracker,
+    max_concurrency=int(os.getenv('PRICE_REFRESH_CONCURRENCY', '8')),
+    refresh_budget=int(os.getenv('PRICE_REFRESH_BUDGET', '50')),
+    refresh_window_seconds=float(os.getenv('PRICE_REFRESH_WINDOW_SECONDS', '1800'))
+)
 
 
 # Example async endpoint function for FastAPI integration
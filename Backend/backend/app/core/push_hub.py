@@ -0,0 +1,351 @@
+# DimeDrop Push Hub
+# Pub/sub that fans price ticks and alert triggers out to SSE/WebSocket clients on every worker
+
+import asyncio
+import itertools
+import json
+import os
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .alert_index import card_key
+from .database import PushEventOperations
+from .price_events import PriceUpdate
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_event_ids = itertools.count(1)
+
+
+def price_topic(card_name: str) -> str:
+    """Topic carrying price ticks for one card"""
+    return f"price:{card_key(card_name)}"
+
+
+def alert_topic(user_id: str) -> str:
+    """Topic carrying one user's alert triggers"""
+    return f"alerts:{user_id}"
+
+
+@dataclass
+class PushEvent:
+    """
+    One event for clients, encoded once per publish
+
+    The SSE frame and the WebSocket message are built on first use and then
+    shared by every subscriber, so fan-out doesn't re-serialize per connection.
+    """
+    type: str
+    data: Dict
+    id: int = field(default_factory=lambda: next(_event_ids))
+    _sse: Optional[str] = field(default=None, repr=False, compare=False)
+    _message: Optional[str] = field(default=None, repr=False, compare=False)
+
+    @property
+    def sse(self) -> str:
+        """Server-sent events frame"""
+        if self._sse is None:
+            self._sse = f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data, default=str)}\n\n"
+        return self._sse
+
+    @property
+    def message(self) -> str:
+        """WebSocket text message"""
+        if self._message is None:
+            self._message = json.dumps({'id': self.id, 'type': self.type, 'data': self.data}, default=str)
+        return self._message
+
+
+class Subscription:
+    """
+    One client connection's topics and pending events
+
+    The queue is bounded: a client that can't keep up loses its oldest
+    events (counted in `dropped`) rather than holding up publishers.
+    """
+
+    def __init__(self, hub: 'PushHub', max_pending: int):
+        self.hub = hub
+        self.topics: Set[str] = set()
+        self.dropped = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+
+    def deliver(self, event: PushEvent) -> None:
+        """Queue an event without blocking (drops the oldest when full)"""
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self._queue.get_nowait()
+            self._queue.put_nowait(event)
+            self.dropped += 1
+            self.hub.stats['dropped'] += 1
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[PushEvent]:
+        """Next event, or None if nothing arrives within timeout"""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+
+class PushHub:
+    """
+    Topic -> subscriptions index
+
+    publish() touches only the subscriptions of that topic and never awaits,
+    so a tick for one card costs O(its watchers) regardless of how many
+    clients are connected. While a PushRelay is running, price ticks and
+    alert triggers go through the shared event log instead, so clients on
+    every worker get them.
+    """
+
+    def __init__(self, max_connections: int = 10000, max_pending: int = 100, max_topics: int = 200):
+        """
+        Args:
+            max_connections: Subscriptions allowed at once in this worker
+            max_pending: Events buffered per subscription before the oldest is dropped
+            max_topics: Topics one subscription may follow
+        """
+        self.max_connections = max_connections
+        self.max_pending = max_pending
+        self.max_topics = max_topics
+        self._topics: Dict[str, Set[Subscription]] = {}
+        self._subscriptions: Set[Subscription] = set()
+        self.relay: Optional['PushRelay'] = None  # set while a relay is running
+
+        # Counters for monitoring
+        self.stats = {'published': 0, 'delivered': 0, 'dropped': 0}
+
+    @property
+    def connections(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self, topics: Iterable[str] = ()) -> Optional[Subscription]:
+        """
+        Open a subscription
+
+        Returns:
+            The subscription, or None if the worker is at max_connections
+        """
+        if len(self._subscriptions) >= self.max_connections:
+            return None
+        subscription = Subscription(self, self.max_pending)
+        self._subscriptions.add(subscription)
+        self.add_topics(subscription, topics)
+        return subscription
+
+    def add_topics(self, subscription: Subscription, topics: Iterable[str]) -> Set[str]:
+        """Follow more topics (up to max_topics); returns the ones added"""
+        added = set()
+        for topic in topics:
+            if topic in subscription.topics:
+                continue
+            if len(subscription.topics) >= self.max_topics:
+                break
+            subscription.topics.add(topic)
+            self._topics.setdefault(topic, set()).add(subscription)
+            added.add(topic)
+        return added
+
+    def remove_topics(self, subscription: Subscription, topics: Iterable[str]) -> None:
+        """Stop following topics"""
+        for topic in topics:
+            if topic not in subscription.topics:
+                continue
+            subscription.topics.discard(topic)
+            watchers = self._topics.get(topic)
+            if watchers is not None:
+                watchers.discard(subscription)
+                if not watchers:
+                    del self._topics[topic]
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Close a subscription (call when the client disconnects)"""
+        self.remove_topics(subscription, list(subscription.topics))
+        self._subscriptions.discard(subscription)
+
+    def publish(self, topic: str, event: PushEvent) -> int:
+        """
+        Fan an event out to a topic's subscribers
+
+        Returns:
+            Number of subscriptions it was queued for
+        """
+        self.stats['published'] += 1
+        watchers = self._topics.get(topic)
+        if not watchers:
+            return 0
+        for subscription in watchers:
+            subscription.deliver(event)
+        self.stats['delivered'] += len(watchers)
+        return len(watchers)
+
+    def emit(self, topic: str, event: PushEvent) -> int:
+        """
+        Publish to every worker's clients (through the relay) or, without a
+        running relay, to this worker's
+
+        Returns:
+            Subscriptions it was queued for in this worker (0 when relayed)
+        """
+        if self.relay is not None and self.relay.running:
+            self.relay.send(topic, event)
+            return 0
+        return self.publish(topic, event)
+
+    async def on_price_update(self, event: PriceUpdate) -> None:
+        """Price event subscriber: push the tick to clients watching that card"""
+        if event.avg_price is None:
+            return
+        self.emit(price_topic(event.card_query), PushEvent('price', {
+            'card_name': event.card_query,
+            'avg_price': event.avg_price,
+            'high': event.price_data.get('high'),
+            'low': event.price_data.get('low'),
+            'recorded_at': event.recorded_at.isoformat(),
+        }))
+
+    def publish_alert(self, user_id: Optional[str], alert: Dict) -> int:
+        """Push a triggered alert to its owner's connections"""
+        if not user_id:
+            return 0
+        return self.emit(alert_topic(user_id), PushEvent('alert_triggered', alert))
+
+
+class PushRelay:
+    """
+    Carries live events between workers through the shared push_events log
+
+    Events a worker emits are buffered and appended in one write per round;
+    every round then reads the rows past the last id this worker saw
+    (including its own) and publishes them to its hub. Each event reaches
+    every worker within poll_interval, and its id is the row id, so SSE ids
+    agree across workers. Rows older than retention_seconds are pruned.
+    """
+
+    def __init__(self, hub: PushHub, poll_interval: float = 1.0, batch_size: int = 500,
+                 retention_seconds: float = 300):
+        """
+        Args:
+            hub: This worker's hub
+            poll_interval: Seconds between polls when this worker emits nothing
+            batch_size: Rows read per query
+            retention_seconds: Age after which rows are pruned
+        """
+        self.hub = hub
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.retention_seconds = retention_seconds
+
+        self._outgoing: List[Tuple[str, str, Dict]] = []
+        self._last_id = 0
+        self._pruned_at = 0.0
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        # Counters for monitoring
+        self.stats = {'relayed': 0, 'received': 0, 'write_errors': 0}
+
+    @property
+    def running(self) -> bool:
+        """True while the relay loop is running"""
+        return self._task is not None and not self._task.done()
+
+    def send(self, topic: str, event: PushEvent) -> None:
+        """Queue an event for the shared log (written on the next round, which starts now)"""
+        self._outgoing.append((topic, event.type, event.data))
+        self._wake.set()
+
+    async def start(self) -> None:
+        """Start relaying from the newest event in the log"""
+        if self.running:
+            return
+        self._last_id = await asyncio.to_thread(PushEventOperations.get_last_id) or 0
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+        self.hub.relay = self
+        logger.info(f"Push relay started at event {self._last_id}")
+
+    async def stop(self) -> None:
+        """Write what is still buffered and stop"""
+        if not self.running:
+            return
+        self._stopping = True
+        self._wake.set()
+        await self._task
+        self._task = None
+        self.hub.relay = None
+        await self.flush()
+        logger.info(f"Push relay stopped: {self.stats}")
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await self.relay_once()
+            except Exception as e:
+                logger.error(f"Push relay round failed: {str(e)}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def flush(self) -> None:
+        """Append buffered events to the log; if that fails, publish them here only"""
+        if not self._outgoing:
+            return
+        events, self._outgoing = self._outgoing, []
+        if await asyncio.to_thread(PushEventOperations.append, events):
+            self.stats['relayed'] += len(events)
+            return
+        self.stats['write_errors'] += 1
+        for topic, event_type, data in events:
+            self.hub.publish(topic, PushEvent(event_type, data))
+
+    async def relay_once(self) -> int:
+        """
+        One round: write buffered events, publish new log rows, prune old ones
+
+        Returns:
+            Number of rows published to this worker's hub
+        """
+        await self.flush()
+        received = 0
+        while True:
+            rows = await asyncio.to_thread(PushEventOperations.get_since, self._last_id, self.batch_size)
+            for row in rows:
+                self.hub.publish(row['topic'], PushEvent(row['event_type'], row['data'], id=row['id']))
+                self._last_id = row['id']
+            received += len(rows)
+            if len(rows) < self.batch_size:
+                break
+        self.stats['received'] += received
+
+        if time.monotonic() - self._pruned_at >= self.retention_seconds:
+            self._pruned_at = time.monotonic()
+            await asyncio.to_thread(PushEventOperations.cleanup, self.retention_seconds)
+        return received
+
+
+# Global push hub - fed by price_events (main.py) and alerts_tracker, read by app/api/stream.py
+push_hub = PushHub(
+    max_connections=int(os.getenv('PUSH_MAX_CONNECTIONS', '10000')),
+    max_pending=int(os.getenv('PUSH_MAX_PENDING_EVENTS', '100')),
+    max_topics=int(os.getenv('PUSH_MAX_CARDS_PER_CLIENT', '200'))
+)
+
+# Global push relay - started in every worker by main.py, so events reach clients on all of them
+push_relay = PushRelay(
+    push_hub,
+    poll_interval=float(os.getenv('PUSH_POLL_INTERVAL_SECONDS', '1')),
+    retention_seconds=float(os.getenv('PUSH_EVENT_RETENTION_SECONDS', '300'))
+)
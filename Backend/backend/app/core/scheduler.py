@@ -0,0 +1,157 @@
+# DimeDrop Scheduler
+# Periodic background jobs with jitter and a DB-backed lease per job, so with
+# several uvicorn workers each job runs in exactly one of them
+
+import asyncio
+import os
+import random
+import socket
+import time
+import uuid
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .database import JobOperations
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def seconds_until(hour_utc: int, now: Optional[datetime] = None) -> float:
+    """Seconds from now until the next hour_utc:00 UTC"""
+    now = now or datetime.utcnow()
+    run_at = now.replace(hour=hour_utc, minute=0, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return (run_at - now).total_seconds()
+
+
+@dataclass
+class ScheduledJob:
+    """
+    A periodic job: every interval_seconds, or daily at daily_at_hour_utc
+
+    Each run waits an extra random 0..jitter_seconds so workers don't all
+    hit the lease table at once. The lease is held for lease_seconds
+    (default 1.5 intervals plus jitter, or an hour for daily jobs); the
+    leader renews it on every run, and every lease_seconds / 3 while a run
+    is in progress, so it keeps the job until it dies and a long run can't
+    outlive its lease.
+    """
+    name: str
+    func: Callable[[], Awaitable[Any]]
+    interval_seconds: float = 0
+    daily_at_hour_utc: Optional[int] = None
+    jitter_seconds: float = 0
+    lease_seconds: Optional[float] = None
+    run_on_start: bool = False
+
+    def __post_init__(self):
+        if self.lease_seconds is None:
+            self.lease_seconds = (3600 if self.daily_at_hour_utc is not None
+                                  else self.interval_seconds * 1.5 + self.jitter_seconds)
+
+    def next_delay(self, rng: random.Random) -> float:
+        """Seconds to wait before the next run"""
+        base = seconds_until(self.daily_at_hour_utc) if self.daily_at_hour_utc is not None else self.interval_seconds
+        return base + rng.uniform(0, self.jitter_seconds)
+
+
+class Scheduler:
+    """Runs ScheduledJobs on the event loop, one task per job"""
+
+    def __init__(self, owner: Optional[str] = None, rng: Optional[random.Random] = None):
+        """
+        Args:
+            owner: Lease owner id for this process (default host:pid:random)
+            rng: Random source for jitter (injectable for tests)
+        """
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.rng = rng or random.Random()
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+        # Per-job counters for monitoring (history is also stored in job_runs)
+        self.stats: Dict[str, Dict] = {}
+
+    @property
+    def running(self) -> bool:
+        """True while job tasks are scheduled"""
+        return any(not task.done() for task in self._tasks.values())
+
+    def add_job(self, job: ScheduledJob) -> None:
+        """Register a job (call before start())"""
+        self.jobs[job.name] = job
+        self.stats[job.name] = {'runs': 0, 'failures': 0, 'skipped': 0,
+                                'last_status': None, 'last_duration_ms': None, 'last_started_at': None}
+
+    async def start(self) -> None:
+        """Start one task per registered job"""
+        if self.running:
+            return
+        for job in self.jobs.values():
+            self._tasks[job.name] = asyncio.create_task(self._loop(job))
+        logger.info(f"Scheduler {self.owner} started jobs: {', '.join(self.jobs) or 'none'}")
+
+    async def stop(self) -> None:
+        """Cancel job tasks and release held leases so another worker can take over"""
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks = {}
+        for name in self.jobs:
+            await asyncio.to_thread(JobOperations.release_lease, name, self.owner)
+        logger.info(f"Scheduler {self.owner} stopped")
+
+    async def _loop(self, job: ScheduledJob) -> None:
+        if not job.run_on_start:
+            await asyncio.sleep(job.next_delay(self.rng))
+        while True:
+            await self.run_job(job)
+            await asyncio.sleep(job.next_delay(self.rng))
+
+    async def run_job(self, job: ScheduledJob) -> Optional[str]:
+        """
+        Run a job once if this worker holds (or can take) its lease
+
+        Returns:
+            'success' or 'failed', or None if another worker holds the lease
+        """
+        stats = self.stats.setdefault(job.name, {'runs': 0, 'failures': 0, 'skipped': 0})
+        if not await asyncio.to_thread(JobOperations.acquire_lease, job.name, self.owner, job.lease_seconds):
+            stats['skipped'] += 1
+            return None
+
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+        error = None
+        renewal = asyncio.create_task(self._renew_lease(job))
+        try:
+            await job.func()
+            status = 'success'
+        except Exception as e:
+            status = 'failed'
+            error = str(e)
+            logger.error(f"Scheduled job {job.name} failed: {error}")
+        finally:
+            renewal.cancel()
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        stats['runs'] += 1
+        stats['failures'] += status == 'failed'
+        stats.update(last_status=status, last_duration_ms=round(duration_ms, 1),
+                     last_started_at=started_at.isoformat())
+        await asyncio.to_thread(JobOperations.record_run, job.name, self.owner, started_at,
+                                duration_ms, status, error)
+        logger.info(f"Scheduled job {job.name} {status} in {duration_ms:.0f}ms")
+        return status
+
+    async def _renew_lease(self, job: ScheduledJob) -> None:
+        """Keep renewing a job's lease while a run is in progress"""
+        while True:
+            await asyncio.sleep(job.lease_seconds / 3)
+            if not await asyncio.to_thread(JobOperations.acquire_lease, job.name, self.owner, job.lease_seconds):
+                logger.warning(f"Scheduler {self.owner} lost the lease on {job.name} during a run")
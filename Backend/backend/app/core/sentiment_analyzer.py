@@ -2,23 +2,91 @@
 # Analyzes market sentiment from Reddit and News sources to generate Flip Score
 
 import asyncio
+import math
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Protocol, Tuple
 from fastapi import HTTPException
 import httpx
 import praw
 import logging
 from textblob import TextBlob
-import re
+
+from .author_karma import author_karma_cache
+from .lexicon_scorer import LexiconScorer
+from .polarity_cache import polarity_cache
+from .ttl_cache import TTLCache, MISSING
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# PRAW is blocking, so subreddit searches run on a shared, bounded pool
+# instead of the event loop; a search that times out keeps its thread until
+# PRAW's own request timeout, so the pool size caps how many can pile up
+_reddit_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('REDDIT_FETCH_WORKERS', '5')), thread_name_prefix='reddit'
+)
+
+# PRAW instances aren't thread-safe: each pool thread gets its own
+_reddit_clients = threading.local()
+
+
+class PolarityScorer(Protocol):
+    """
+    Sentiment backend: polarity in [-1, 1] for a batch of cleaned, non-empty texts
+
+    Scores are cached under the scorer's name, so it must change whenever
+    the scores would. A text the backend fails on scores None, which is
+    counted as neutral but never cached.
+    """
+
+    name: str
+
+    def score_batch(self, texts: List[str]) -> List[Optional[float]]:
+        ...
+
+
+class TextBlobScorer:
+    """TextBlob's pattern analyzer, one document at a time"""
+
+    name = 'textblob'
+
+    def score_batch(self, texts: List[str]) -> List[Optional[float]]:
+        return [self.score(text) for text in texts]
+
+    def score(self, text: str) -> Optional[float]:
+        """
+        TextBlob polarity of already-cleaned text, clamped to [-1, 1]
+        (None if TextBlob fails on it)
+        """
+        try:
+            # Analyze sentiment
+            blob = TextBlob(text)
+            polarity = blob.sentiment.polarity
+            
+            # Ensure the result is within [-1, 1]
+            return max(min(polarity, 1.0), -1.0)
+        except Exception as e:
+            logger.error(f"Error analyzing text sentiment: {str(e)}, text: {text[:100]}...")
+            return None
+
+
+# Scorer backends selectable with SENTIMENT_SCORER
+SCORERS = {'textblob': TextBlobScorer, 'lexicon': LexiconScorer}
+
+
+def get_scorer(name: str) -> PolarityScorer:
+    """Scorer backend by name ('textblob' or 'lexicon')"""
+    if name not in SCORERS:
+        raise ValueError(f"Sentiment scorer must be one of {tuple(SCORERS)}")
+    return SCORERS[name]()
+
 
 class SentimentAnalyzer:
-    def __init__(self):
+    def __init__(self, scorer: Optional[PolarityScorer] = None):
         # Check if APIs are configured with real credentials (not placeholders)
         reddit_id = os.getenv('REDDIT_CLIENT_ID')
         reddit_secret = os.getenv('REDDIT_CLIENT_SECRET')
@@ -38,13 +106,20 @@ class SentimentAnalyzer:
             len(news_key) > 10
         )
         
+        # Subreddits searched concurrently; each search gets its own timeout,
+        # so a sentiment request waits for the slowest one, not the sum
+        self.target_subreddits = ['sports', 'basketballcards', 'tradingcards', 'sportscollectors', 'nba']
+        self.reddit_source_timeout = float(os.getenv('REDDIT_SOURCE_TIMEOUT_SECONDS', '8'))
+
         if self.reddit_available:
             # Initialize PRAW for Reddit API
-            self.reddit = praw.Reddit(
-                client_id=reddit_id,
-                client_secret=reddit_secret,
-                user_agent='DimeDrop/1.0 by DimeDropBot'
-            )
+            self._reddit_config = {
+                'client_id': reddit_id,
+                'client_secret': reddit_secret,
+                'user_agent': 'DimeDrop/1.0 by DimeDropBot',
+                'timeout': max(1, math.ceil(self.reddit_source_timeout))
+            }
+            self.reddit = praw.Reddit(**self._reddit_config)
         else:
             self.reddit = None
             logger.warning("Reddit API not configured with real credentials - using mock data")
@@ -53,23 +128,115 @@ class SentimentAnalyzer:
         self.news_api_key = news_key
         self.news_base_url = 'https://newsapi.org/v2/'
         
+        # Text polarity backend (TextBlob unless SENTIMENT_SCORER says otherwise)
+        self.scorer = scorer or get_scorer(os.getenv('SENTIMENT_SCORER', 'textblob'))
+
         # Weighting factors for sentiment calculation
         self.redditor_weight = 0.3  # Higher karma = more weight
         self.post_age_weight = 0.2  # Newer posts = more weight
         self.sentiment_confidence = 0.5  # Base confidence multiplier
         
-        # Cache settings
-        self.cache_duration = timedelta(hours=6)  # 6-hour cache for sentiment
+        # Cache settings: results are fresh for cache_duration, then served
+        # stale for up to stale_duration while one refresh runs in the background
+        self.cache_duration = timedelta(seconds=float(os.getenv('SENTIMENT_CACHE_TTL_SECONDS', str(6 * 3600))))
+        self.stale_duration = timedelta(seconds=float(os.getenv('SENTIMENT_STALE_SECONDS', str(24 * 3600))))
+        # Degraded results (a source failed or nothing was found) are kept only this long
+        self.degraded_duration = timedelta(seconds=float(os.getenv('SENTIMENT_DEGRADED_TTL_SECONDS', '300')))
+        self._results = TTLCache(
+            ttl_seconds=(self.cache_duration + self.stale_duration).total_seconds(),
+            max_entries=int(os.getenv('SENTIMENT_CACHE_SIZE', '5000'))
+        )
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+        # Counters for monitoring
+        self.cache_stats = {'hits': 0, 'stale': 0, 'misses': 0, 'coalesced': 0, 'errors': 0, 'degraded': 0}
 
     async def analyze_card_sentiment(self, card_name: str) -> Dict:
         """
         Analyzes sentiment for a basketball card from multiple sources
         Returns a comprehensive sentiment report with Flip Score
+
+        Results are cached per card: a fresh result is returned as is, a
+        stale one is returned while it is refreshed in the background, and
+        concurrent misses for the same card share a single analysis.
+        """
+        key = self._cache_key(card_name)
+        entry = self._results.get(key)
+        if entry is not MISSING:
+            fresh_until, result = entry
+            if self._results.clock() < fresh_until:
+                self.cache_stats['hits'] += 1
+            else:
+                self.cache_stats['stale'] += 1
+                if key not in self._in_flight:
+                    self._refresh(key, card_name)
+            return dict(result, card_name=card_name)
+
+        if key in self._in_flight:
+            self.cache_stats['coalesced'] += 1
+        else:
+            self.cache_stats['misses'] += 1
+            self._refresh(key, card_name)
+        # Shielded so one caller disconnecting doesn't cancel the others' analysis
+        result = await asyncio.shield(self._in_flight[key])
+        return dict(result, card_name=card_name)
+
+    def _cache_key(self, card_name: str) -> str:
+        """Cards differing only in case or spacing share a cache entry"""
+        return ' '.join(card_name.lower().split())
+
+    def _refresh(self, key: str, card_name: str) -> asyncio.Task:
+        """
+        Start the single in-flight analysis for a card; it caches its result
+
+        A degraded result never replaces a good cached one (which keeps being
+        served stale), and is otherwise cached for degraded_duration only.
+        """
+        async def run() -> Dict:
+            try:
+                result = await self._compute_sentiment(card_name)
+                if not result.get('degraded'):
+                    fresh_until = self._results.clock() + self.cache_duration.total_seconds()
+                    self._results.set(key, (fresh_until, result))
+                    return result
+
+                self.cache_stats['degraded'] += 1
+                cached = self._results.get(key)
+                if cached is not MISSING and not cached[1].get('degraded'):
+                    return cached[1]
+                ttl = self.degraded_duration.total_seconds()
+                self._results.set(key, (self._results.clock() + ttl, result), ttl_seconds=ttl)
+                return result
+            finally:
+                self._in_flight.pop(key, None)
+
+        task = asyncio.create_task(run())
+        task.add_done_callback(self._count_error)
+        self._in_flight[key] = task
+        return task
+
+    def _count_error(self, task: asyncio.Task) -> None:
+        """Failed analyses aren't cached, so a stale result keeps being served"""
+        if not task.cancelled() and task.exception() is not None:
+            self.cache_stats['errors'] += 1
+
+    def clear_cache(self) -> None:
+        """Drop cached results (in-flight analyses still finish)"""
+        self._results.clear()
+
+    async def _compute_sentiment(self, card_name: str) -> Dict:
+        """
+        Run the full analysis for a card, bypassing the result cache
+
+        The result is flagged 'degraded' when a source failed or no posts
+        or articles were found, so its neutral score isn't cached as fresh.
         """
         try:
-            # Fetch data from all sources
-            reddit_data = await self._fetch_reddit_sentiment(card_name)
-            news_data = await self._fetch_news_sentiment(card_name)
+            # Fetch data from all sources at once
+            reddit_data, news_data = await asyncio.gather(
+                self._fetch_reddit_sentiment(card_name),
+                self._fetch_news_sentiment(card_name)
+            )
             
             # Calculate composite sentiment
             composite_sentiment = self._calculate_composite_sentiment(
@@ -87,7 +254,9 @@ class SentimentAnalyzer:
                 'sentiment_breakdown': composite_sentiment,
                 'total_discussions': reddit_data['total_posts'] + news_data['total_articles'],
                 'last_updated': datetime.now(),
-                'confidence_level': 'high' if composite_sentiment['total_sources'] > 2 else 'medium'
+                'confidence_level': 'high' if composite_sentiment['total_sources'] > 2 else 'medium',
+                'degraded': bool(reddit_data.get('error') or news_data.get('error')
+                                 or reddit_data['total_posts'] + news_data['total_articles'] == 0)
             }
             
             logger.info(f"Sentiment analysis complete for '{card_name}', Flip Score: {flip_score}")
@@ -118,48 +287,39 @@ class SentimentAnalyzer:
         
         # Real Reddit API code
         try:
-            # Define target subreddits
-            target_subreddits = ['sports', 'basketballcards', 'tradingcards', 'sportscollectors', 'nba']
-            
-            all_posts = []
-            total_posts = 0
-            
-            # Search in each subreddit
-            for subreddit_name in target_subreddits:
-                try:
-                    subreddit = self.reddit.subreddit(subreddit_name)
-                    posts = subreddit.search(card_name, sort='new', limit=10)
-                    
-                    for post in posts:
-                        # Get post details
-                        post_age = datetime.now() - datetime.fromtimestamp(post.created_utc)
-                        post_data = {
-                            'title': post.title,
-                            'selftext': post.selftext,
-                            'score': post.score,
-                            'num_comments': post.num_comments,
-                            'created_utc': post.created_utc,
-                            'subreddit': post.subreddit.display_name,
-                            'author_karma': self._get_author_karma(post.author),
-                            'post_age_hours': post_age.total_seconds() / 3600
-                        }
-                        all_posts.append(post_data)
-                        total_posts += 1
-                except Exception as e:
-                    logger.warning(f"Error fetching posts from /r/{subreddit_name}: {str(e)}")
-                    continue
-            
-            # Analyze sentiment of each post
-            sentiment_scores = []
-            for post in all_posts:
-                text = f"{post['title']} {post['selftext']}"
-                if len(text.strip()) > 0:  # Only analyze non-empty posts
-                    sentiment_score = self._analyze_text_sentiment(text)
-                    sentiment_scores.append({
-                        'score': sentiment_score,
-                        'weight': self._calculate_post_weight(post),
-                        'post': post
-                    })
+            loop = asyncio.get_running_loop()
+            searches = [
+                asyncio.wait_for(
+                    loop.run_in_executor(_reddit_executor, self._search_subreddit, subreddit_name, card_name),
+                    timeout=self.reddit_source_timeout
+                )
+                for subreddit_name in self.target_subreddits
+            ]
+            results = await asyncio.gather(*searches, return_exceptions=True)
+
+            all_posts, failed = [], 0
+            for subreddit_name, result in zip(self.target_subreddits, results):
+                if isinstance(result, asyncio.TimeoutError):
+                    failed += 1
+                    logger.warning(f"Timed out fetching posts from /r/{subreddit_name} "
+                                   f"after {self.reddit_source_timeout}s")
+                elif isinstance(result, Exception):
+                    failed += 1
+                    logger.warning(f"Error fetching posts from /r/{subreddit_name}: {str(result)}")
+                else:
+                    all_posts.extend(result)
+            total_posts = len(all_posts)
+            await self._apply_author_karma(all_posts)
+
+            # Analyze sentiment of each post (only non-empty posts)
+            scored_posts = [post for post in all_posts if f"{post['title']} {post['selftext']}".strip()]
+            scores = await asyncio.to_thread(
+                self._analyze_texts, [f"{post['title']} {post['selftext']}" for post in scored_posts]
+            )
+            sentiment_scores = [
+                {'score': sentiment_score, 'weight': self._calculate_post_weight(post), 'post': post}
+                for post, sentiment_score in zip(scored_posts, scores)
+            ]
             
             # Calculate weighted average sentiment
             weighted_sentiment = 0
@@ -176,7 +336,8 @@ class SentimentAnalyzer:
                 'avg_sentiment': avg_sentiment,
                 'posts': all_posts,
                 'sentiment_scores': [s['score'] for s in sentiment_scores],
-                'source': 'reddit'
+                'source': 'reddit',
+                'error': failed == len(self.target_subreddits)
             }
             
         except Exception as e:
@@ -186,9 +347,78 @@ class SentimentAnalyzer:
                 'avg_sentiment': 0,
                 'posts': [],
                 'sentiment_scores': [],
-                'source': 'reddit'
+                'source': 'reddit',
+                'error': True
             }
 
+    def _reddit_client(self) -> praw.Reddit:
+        """This thread's PRAW instance"""
+        client = getattr(_reddit_clients, 'reddit', None)
+        if client is None:
+            client = _reddit_clients.reddit = praw.Reddit(**self._reddit_config)
+        return client
+
+    def _search_subreddit(self, subreddit_name: str, card_name: str) -> List[Dict]:
+        """
+        Search one subreddit (blocking; runs on the Reddit pool)
+
+        PRAW fetches lazily, so every attribute used later is read here,
+        off the event loop. Only fields that come with the search listing are
+        read: touching author karma would fetch each author's profile, so
+        karma is filled in afterwards from the author karma cache.
+        """
+        subreddit = self._reddit_client().subreddit(subreddit_name)
+        posts = []
+        for post in subreddit.search(card_name, sort='new', limit=10):
+            # Get post details
+            post_age = datetime.now() - datetime.fromtimestamp(post.created_utc)
+            listing = vars(post)  # plain dict lookups never trigger a fetch
+            posts.append({
+                'title': post.title,
+                'selftext': post.selftext,
+                'score': post.score,
+                'num_comments': post.num_comments,
+                'created_utc': post.created_utc,
+                'subreddit': post.subreddit.display_name,
+                'author': post.author.name if post.author else None,
+                'author_fullname': listing.get('author_fullname'),
+                'author_karma': None,
+                'post_age_hours': post_age.total_seconds() / 3600
+            })
+        return posts
+
+    async def _apply_author_karma(self, posts: List[Dict]) -> None:
+        """Fill in each post's author_karma from the shared author karma cache"""
+        authors = {post['author']: post.get('author_fullname') for post in posts if post.get('author')}
+        if not authors:
+            return
+        karma = await author_karma_cache.lookup(authors, self._fetch_author_karma)
+        for post in posts:
+            if post.get('author'):
+                post['author_karma'] = karma.get(post['author'])
+
+    async def _fetch_author_karma(self, authors: Dict[str, str]) -> Dict[str, Optional[int]]:
+        """Batch-fetch karma for authors (username -> fullname) on the Reddit pool"""
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(
+            loop.run_in_executor(_reddit_executor, self._partial_redditor_karma, authors),
+            timeout=self.reddit_source_timeout
+        )
+
+    def _partial_redditor_karma(self, authors: Dict[str, str]) -> Dict[str, Optional[int]]:
+        """
+        Karma for up to 100 authors per request via Reddit's user_data_by_account_ids
+
+        Authors Reddit doesn't return (deleted or suspended) map to None.
+        """
+        by_fullname = {fullname: username for username, fullname in authors.items()}
+        karma = {username: None for username in authors}
+        for redditor in self._reddit_client().redditors.partial_redditors(by_fullname):
+            username = by_fullname.get(redditor.fullname)
+            if username is not None:
+                karma[username] = getattr(redditor, 'comment_karma', 0) + getattr(redditor, 'link_karma', 0)
+        return karma
+
     async def _fetch_news_sentiment(self, card_name: str) -> Dict:
         """
         Fetch sentiment from news articles using NewsAPI
@@ -228,7 +458,7 @@ class SentimentAnalyzer:
                     articles = data.get('articles', [])
                     
                     # Analyze sentiment for each article
-                    sentiment_scores = []
+                    texts = []
                     processed_articles = []
                     
                     for article in articles:
@@ -239,8 +469,6 @@ class SentimentAnalyzer:
                         text = f"{title} {description} {content}"
                         
                         if text.strip():
-                            sentiment_score = self._analyze_text_sentiment(text)
-                            
                             article_data = {
                                 'title': title,
                                 'description': description,
@@ -249,9 +477,11 @@ class SentimentAnalyzer:
                                 'source': article.get('source', {}).get('name', 'Unknown')
                             }
                             
-                            sentiment_scores.append(sentiment_score)
+                            texts.append(text)
                             processed_articles.append(article_data)
                     
+                    sentiment_scores = await asyncio.to_thread(self._analyze_texts, texts)
+                    
                     # Calculate average sentiment
                     avg_sentiment = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
                     
@@ -269,7 +499,8 @@ class SentimentAnalyzer:
                         'avg_sentiment': 0,
                         'articles': [],
                         'sentiment_scores': [],
-                        'source': 'news'
+                        'source': 'news',
+                        'error': True
                     }
         
         except Exception as e:
@@ -279,7 +510,8 @@ class SentimentAnalyzer:
                 'avg_sentiment': 0,
                 'articles': [],
                 'sentiment_scores': [],
-                'source': 'news'
+                'source': 'news',
+                'error': True
             }
 
     def _calculate_post_weight(self, post: Dict) -> float:
@@ -304,39 +536,19 @@ class SentimentAnalyzer:
         
         return weight
 
-    def _get_author_karma(self, author) -> Optional[int]:
+    def _analyze_text_sentiment(self, text: str) -> float:
         """
-        Get author's post karma (with error handling)
+        Analyze sentiment of text using the configured scorer
+        Returns polarity score between -1 (negative) and 1 (positive)
         """
-        try:
-            if author:
-                return author.comment_karma + author.link_karma
-            return None
-        except:
-            return None  # Return None if we can't get karma
+        return self._analyze_texts([text])[0]
 
-    def _analyze_text_sentiment(self, text: str) -> float:
+    def _analyze_texts(self, texts: List[str]) -> List[float]:
         """
-        Analyze sentiment of text using TextBlob
-        Returns polarity score between -1 (negative) and 1 (positive)
+        Polarity for many texts, memoized by content hash so each distinct
+        post or article is scored once across all queries (blocking)
         """
-        if not text or not text.strip():
-            return 0.0
-        
-        try:
-            # Clean text
-            cleaned_text = re.sub(r'http\S+', '', text)  # Remove URLs
-            cleaned_text = re.sub(r'\s+', ' ', cleaned_text)  # Normalize whitespace
-            
-            # Analyze sentiment
-            blob = TextBlob(cleaned_text)
-            polarity = blob.sentiment.polarity
-            
-            # Ensure the result is within [-1, 1]
-            return max(min(polarity, 1.0), -1.0)
-        except Exception as e:
-            logger.error(f"Error analyzing text sentiment: {str(e)}, text: {text[:100]}...")
-            return 0.0
+        return polarity_cache.score_many(texts, self.scorer.name, self.scorer.score_batch)
 
     def _calculate_composite_sentiment(self, reddit_data: Dict, news_data: Dict, card_name: str) -> Dict:
         """
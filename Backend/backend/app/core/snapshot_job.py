@@ -0,0 +1,35 @@
+# DimeDrop Snapshot Job
+# Nightly batch job that records every user's portfolio value for /portfolio/history
+
+import asyncio
+import os
+import logging
+
+from .database import PortfolioSnapshotOperations
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def run_snapshot_job() -> int:
+    """Take today's snapshots off the event loop; returns users snapshotted"""
+    written = await asyncio.to_thread(PortfolioSnapshotOperations.take_snapshots)
+    if written < 0:
+        raise RuntimeError("Portfolio snapshot job failed")
+    return written
+
+
+def snapshot_job_enabled() -> bool:
+    """Whether the scheduler should run the nightly snapshot job"""
+    return os.getenv('PORTFOLIO_SNAPSHOT_ENABLED', '').lower() in ('1', 'true', 'yes', 'on')
+
+
+def snapshot_hour_utc() -> int:
+    """UTC hour the nightly job runs at"""
+    return int(os.getenv('PORTFOLIO_SNAPSHOT_HOUR_UTC', '0'))
+
+
+# Run once from cron instead of in-process: python -m app.core.snapshot_job
+if __name__ == "__main__":
+    print(f"Snapshotted {asyncio.run(run_snapshot_job())} portfolios")
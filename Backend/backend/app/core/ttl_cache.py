@@ -0,0 +1,75 @@
+# DimeDrop TTL Cache
+# Small thread-safe in-process cache with per-entry expiry
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+# Returned by get() on a miss, so that None can be cached as a value
+MISSING = object()
+
+
+class TTLCache:
+    """
+    Key -> value cache whose entries expire ttl_seconds after being set
+
+    Bounded to max_entries; the least recently used entry is evicted first.
+    Safe to share between the event loop and worker threads.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 10000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters for monitoring
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, key: Hashable) -> Any:
+        """Cached value, or MISSING if absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.stats['misses'] += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[1]
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Cached values for the keys that are present (misses are left out)"""
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not MISSING:
+                found[key] = value
+        return found
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Cache a value (None included)"""
+        expires_at = self.clock() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop one entry"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,54 @@
+# DimeDrop Weekly Summary Job
+# Weekly batch job that enqueues portfolio summary emails for opted-in users
+
+import asyncio
+import os
+import logging
+from datetime import datetime
+
+from .database import WeeklySummaryOperations
+from .notification_outbox import outbox_drainer
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def enqueue_weekly_summaries() -> int:
+    """Enqueue this week's summaries off the event loop and wake the outbox; returns summaries enqueued"""
+    enqueued = await asyncio.to_thread(
+        WeeklySummaryOperations.enqueue_summaries,
+        batch_size=int(os.getenv('WEEKLY_SUMMARY_BATCH_SIZE', '1000'))
+    )
+    if enqueued < 0:
+        raise RuntimeError("Weekly summary job failed")
+    outbox_drainer.notify()
+    return enqueued
+
+
+async def run_weekly_summary_job() -> int:
+    """Scheduled daily; only enqueues on the configured weekday"""
+    if datetime.utcnow().weekday() != weekly_summary_weekday():
+        return 0
+    return await enqueue_weekly_summaries()
+
+
+def weekly_summary_job_enabled() -> bool:
+    """Whether the scheduler should run the weekly summary job"""
+    return os.getenv('WEEKLY_SUMMARY_ENABLED', '').lower() in ('1', 'true', 'yes', 'on')
+
+
+def weekly_summary_weekday() -> int:
+    """UTC weekday the summaries go out on (0 = Monday)"""
+    return int(os.getenv('WEEKLY_SUMMARY_WEEKDAY', '0'))
+
+
+def weekly_summary_hour_utc() -> int:
+    """UTC hour the job runs at"""
+    return int(os.getenv('WEEKLY_SUMMARY_HOUR_UTC', '14'))
+
+
+# Run once from cron instead of in-process: python -m app.core.weekly_summary_job
+# (the outbox drainers in the running app pick the rows up)
+if __name__ == "__main__":
+    print(f"Enqueued {asyncio.run(enqueue_weekly_summaries())} weekly summaries")
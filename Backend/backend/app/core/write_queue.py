@@ -0,0 +1,214 @@
+# DimeDrop Write Queue
+# Optional single-writer task that group-commits SQLite writes from all handlers
+
+import asyncio
+import os
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .models import SessionLocal
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingWrite:
+    """A queued write operation and the future its caller is awaiting"""
+    operation: Callable[[Session], Any]
+    future: asyncio.Future
+
+
+class WriteQueue:
+    """
+    Funnels write operations through one writer task
+
+    SQLite allows a single writer at a time, so concurrent handlers that each
+    commit on their own end up serialized behind "database is locked" retries.
+    Here every handler submits an operation (a callable taking a Session);
+    the writer collects whatever arrives within max_delay_ms, runs the batch
+    in one transaction with a SAVEPOINT per operation, commits once, and
+    resolves each caller's future with its own result or exception.
+    """
+
+    def __init__(self, max_delay_ms: float = 5.0, max_batch_size: int = 200,
+                 max_pending: int = 10000, session_factory: Callable[[], Session] = SessionLocal):
+        self.max_delay = max_delay_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.max_pending = max_pending
+        self.session_factory = session_factory
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        # Counters for monitoring / benchmarks
+        self.stats = {'batches': 0, 'writes': 0, 'failed_writes': 0, 'failed_batches': 0}
+
+    @property
+    def running(self) -> bool:
+        """True while the writer task is accepting operations"""
+        return self._task is not None and not self._task.done() and not self._stopping
+
+    async def start(self) -> None:
+        """Start the writer task on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Write queue started (max delay {self.max_delay * 1000:.1f}ms, batch {self.max_batch_size})")
+
+    async def stop(self) -> None:
+        """Flush queued operations and stop the writer task"""
+        if not self.running:
+            return
+        self._stopping = True  # submit() rejects new operations from here on
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+        # Operations queued behind the stop marker never reach the writer
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None and not item.future.done():
+                item.future.set_exception(RuntimeError("Write queue stopped"))
+        logger.info(f"Write queue stopped: {self.stats}")
+
+    async def submit(self, operation: Callable[[Session], Any]) -> Any:
+        """
+        Queue a write and wait for its transaction to commit
+
+        Args:
+            operation: Callable that performs the write on the given session
+                       (it must not commit) and returns the caller's result
+
+        Returns:
+            Whatever the operation returned, once the batch has committed
+        """
+        if not self.running:
+            raise RuntimeError("Write queue is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_PendingWrite(operation, future))
+        if self._task is None or self._task.done():
+            # The put waited on a full queue while stop() finished draining it
+            if not future.done():
+                future.set_exception(RuntimeError("Write queue stopped"))
+        return await future
+
+    async def _run(self) -> None:
+        """Writer loop: gather a batch, commit it off the event loop, resolve futures"""
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+
+            # Give concurrent writers a few ms to join this transaction
+            if self._queue.qsize() < self.max_batch_size - 1:
+                await asyncio.sleep(self.max_delay)
+
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                results = await asyncio.to_thread(self._commit_batch, batch)
+            except Exception as e:
+                logger.error(f"Write batch of {len(batch)} failed: {str(e)}")
+                results = [(False, e)] * len(batch)
+
+            for pending, (ok, value) in zip(batch, results):
+                if pending.future.done():
+                    continue  # Caller was cancelled
+                if ok:
+                    pending.future.set_result(value)
+                else:
+                    pending.future.set_exception(value)
+
+    def _commit_batch(self, batch: List[_PendingWrite]) -> List[Tuple[bool, Any]]:
+        """Run a batch in a single transaction; one failing operation doesn't sink the rest"""
+        db = None
+        results: List[Tuple[bool, Any]] = []
+        try:
+            db = self.session_factory()
+            if db.get_bind().dialect.name == 'sqlite':
+                # Take the write lock up front; pysqlite also needs an explicit
+                # BEGIN for SAVEPOINTs to nest inside the transaction
+                db.connection().exec_driver_sql('BEGIN IMMEDIATE')
+
+            for pending in batch:
+                try:
+                    with db.begin_nested():
+                        results.append((True, pending.operation(db)))
+                except Exception as e:
+                    results.append((False, e))
+
+            db.commit()
+
+        except Exception as e:
+            logger.error(f"Write batch of {len(batch)} failed to commit: {str(e)}")
+            if db is not None:
+                db.rollback()
+            self.stats['failed_batches'] += 1
+            results = [(False, e)] * len(batch)
+
+        finally:
+            if db is not None:
+                db.close()
+
+        self.stats['batches'] += 1
+        self.stats['writes'] += len(batch)
+        self.stats['failed_writes'] += sum(1 for ok, _ in results if not ok)
+        return results
+
+
+def _env_flag(name: str, default: str = 'false') -> bool:
+    return os.getenv(name, default).lower() in ('1', 'true', 'yes', 'on')
+
+
+# Global write queue instance - started in main.py when DB_WRITE_QUEUE_ENABLED is set
+write_queue = WriteQueue(
+    max_delay_ms=float(os.getenv('DB_WRITE_QUEUE_MAX_DELAY_MS', '5')),
+    max_batch_size=int(os.getenv('DB_WRITE_QUEUE_MAX_BATCH', '200'))
+)
+
+
+def write_queue_enabled() -> bool:
+    """Whether the app should route writes through the global write queue"""
+    return _env_flag('DB_WRITE_QUEUE_ENABLED')
+
+
+async def run_write(operation: Callable[[Session], Any]) -> Any:
+    """
+    Run a write operation through the write queue if it is running,
+    otherwise in its own session and transaction (the original behaviour)
+
+    Args:
+        operation: Callable taking a Session; it must not commit
+
+    Returns:
+        The operation's result
+    """
+    if write_queue.running:
+        return await write_queue.submit(operation)
+
+    db = SessionLocal()
+    try:
+        result = operation(db)
+        db.commit()
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -17,8 +17,11 @@ class User(BaseModel):
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
     """Validate Auth0 JWT token and extract user information"""
+    return user_from_token(credentials.credentials)
+
+def user_from_token(token: str) -> User:
+    """Validate a raw JWT (e.g. from a query parameter, where headers aren't available)"""
     try:
-        token = credentials.credentials
         # Get Auth0 configuration from environment
         auth0_domain = os.getenv("AUTH0_DOMAIN", "")
         auth0_client_id = os.getenv("AUTH0_CLIENT_ID", "")
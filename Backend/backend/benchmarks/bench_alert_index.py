@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Alert matching benchmark: scan every active alert vs per-card binary search
+
+Run from Backend/backend:
+    python benchmarks/bench_alert_index.py --alerts 1000000 --cards 10000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add backend root to path for `app.*` imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.alert_index import AlertIndex
+
+
+def make_alerts(count: int, cards: int):
+    rng = random.Random(42)
+    return [{
+        'id': i,
+        'card_name': f"Card {rng.randrange(cards)}",
+        'target_price': round(rng.uniform(5, 500), 2),
+        'alert_type': rng.choice(['above', 'below']),
+    } for i in range(count)]
+
+
+def make_updates(count: int, cards: int):
+    rng = random.Random(7)
+    return [(f"Card {rng.randrange(cards)}", round(rng.uniform(5, 500), 2)) for _ in range(count)]
+
+
+def scan_match(alerts, card_name, price):
+    """The original check_alerts comparison: every active alert, every time"""
+    matched = []
+    for alert in alerts:
+        if alert['card_name'] != card_name:
+            continue
+        if alert['alert_type'] == 'above' and price >= alert['target_price']:
+            matched.append(alert['id'])
+        elif alert['alert_type'] == 'below' and price <= alert['target_price']:
+            matched.append(alert['id'])
+    return matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--alerts', type=int, default=1_000_000, help='Active alerts')
+    parser.add_argument('--cards', type=int, default=10_000, help='Distinct cards')
+    parser.add_argument('--updates', type=int, default=10_000, help='Price updates to match')
+    parser.add_argument('--scan-updates', type=int, default=20, help='Price updates for the (slow) scan')
+    args = parser.parse_args()
+
+    alerts = make_alerts(args.alerts, args.cards)
+    updates = make_updates(args.updates, args.cards)
+
+    start = time.perf_counter()
+    index = AlertIndex(loader=lambda: alerts)
+    index.reload()
+    build = time.perf_counter() - start
+
+    for card_name, price in updates[:args.scan_updates]:
+        assert sorted(index.match(card_name, price)) == sorted(scan_match(alerts, card_name, price))
+
+    start = time.perf_counter()
+    for card_name, price in updates[:args.scan_updates]:
+        scan_match(alerts, card_name, price)
+    scan = (time.perf_counter() - start) / args.scan_updates
+
+    start = time.perf_counter()
+    matched = sum(len(index.match(card_name, price)) for card_name, price in updates)
+    indexed = (time.perf_counter() - start) / len(updates)
+
+    print(f"{args.alerts} alerts across {args.cards} cards, {matched / len(updates):.1f} matches per update")
+    print(f"  index build : {build * 1000:10.1f} ms")
+    print(f"  scan        : {scan * 1e6:10.1f} us per price update")
+    print(f"  index       : {indexed * 1e6:10.1f} us per price update")
+    print(f"  speedup     : {scan / indexed:10.0f}x")
+
+
+if __name__ == '__main__':
+    main()
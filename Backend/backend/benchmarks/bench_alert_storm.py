@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Alert trigger storms: triggers with and without cooldown / hysteresis
+
+Replays a price that random-walks around many auto re-arm alerts'
+targets through the alert index (re-arm, match, cooldown, record), on a
+simulated clock. Every trigger would cost a DB write and an email; the
+table shows how many each rule set lets through and how many it holds back.
+
+Run from Backend/backend:
+    python benchmarks/bench_alert_storm.py --alerts 1000 --ticks 10000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add backend root to path for `app.*` imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.alert_index import AlertIndex
+
+CARD = 'Wembanyama Prizm'
+
+
+def replay(alerts, prices, tick_seconds: float, cooldown: float, hysteresis: float):
+    index = AlertIndex(loader=lambda: alerts, cooldown_seconds=cooldown, hysteresis_pct=hysteresis)
+    index.reload()
+    now = datetime(2024, 1, 1)
+    start = time.perf_counter()
+    for price in prices:
+        index.rearm(CARD, price)
+        due, _ = index.split_cooldown(index.match(CARD, price), now)
+        if due:
+            index.record_trigger(due, now)
+        now += timedelta(seconds=tick_seconds)
+    return index.stats, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--alerts', type=int, default=1000, help='Auto re-arm alerts on the card')
+    parser.add_argument('--ticks', type=int, default=10_000, help='Price updates')
+    parser.add_argument('--tick-seconds', type=float, default=60, help='Simulated time between updates')
+    parser.add_argument('--volatility', type=float, default=0.01, help='Per-tick price change (fraction)')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    alerts = [{'id': i, 'card_name': CARD, 'target_price': rng.uniform(90, 110),
+               'alert_type': rng.choice(['above', 'below']), 'auto_rearm': True} for i in range(args.alerts)]
+    price, prices = 100.0, []
+    for _ in range(args.ticks):
+        price = min(120.0, max(80.0, price * (1 + rng.gauss(0, args.volatility))))
+        prices.append(price)
+
+    print(f"{args.alerts} alerts, {args.ticks} ticks every {args.tick_seconds:.0f}s, "
+          f"{args.volatility:.1%} volatility")
+    print(f"  {'cooldown':>9} {'band':>6} {'triggers':>10} {'suppressed':>11} {'rearmed':>9} {'us/tick':>9}")
+    for cooldown, hysteresis in ((0, 0), (0, 2), (3600, 0), (3600, 2), (3600, 5)):
+        stats, elapsed = replay(alerts, prices, args.tick_seconds, cooldown, hysteresis)
+        print(f"  {cooldown:8.0f}s {hysteresis:5.1f}% {stats['triggered']:10d} {stats['suppressed']:11d} "
+              f"{stats['rearmed']:9d} {elapsed / args.ticks * 1e6:9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Outbox drain throughput for different claim batch sizes
+
+Sends go to LocalTransport with a simulated provider latency, so this
+measures claim/complete round trips plus send concurrency.
+
+Run from Backend/backend:
+    python benchmarks/bench_notification_outbox.py --rows 10000 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Add backend root to path for `app.*` imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ['NOTIFICATION_TRANSPORT'] = 'local'
+
+from sqlalchemy import create_engine
+from app.core.models import SessionLocal, NotificationOutbox
+from app.core.database import run_migrations, NotificationOperations, OutboxOperations
+from app.core.notification_outbox import OutboxDrainer
+from app.core.notification_queue import LocalTransport
+from app.core.notification_service import NotificationService
+
+RECIPIENT = "bench@example.com"
+
+
+def seed(engine, rows: int):
+    now = datetime.utcnow()
+    payload = json.dumps({'alert_id': 1, 'card_name': 'Wembanyama Prizm', 'target_price': 150.0,
+                          'condition': 'above', 'current_price': 160.0, 'triggered_at': now.isoformat()})
+    with engine.begin() as conn:
+        conn.execute(NotificationOutbox.__table__.delete())
+        conn.execute(NotificationOutbox.__table__.insert(), [{
+            'kind': 'price_alert', 'recipient': RECIPIENT, 'payload': payload, 'status': 'pending',
+            'attempts': 0, 'available_at': now, 'created_at': now,
+        } for _ in range(rows)])
+
+
+async def drain(rows: int, batch_size: int, concurrency: int, latency: float) -> float:
+    service = NotificationService()
+    service.transport = LocalTransport(latency=latency)
+    drainer = OutboxDrainer(service=service, owner='bench', batch_size=batch_size, concurrency=concurrency)
+    start = time.perf_counter()
+    while await drainer.drain_once():
+        pass
+    elapsed = time.perf_counter() - start
+    assert len(service.transport.sent) == rows
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10_000, help='Outbox rows to drain')
+    parser.add_argument('--latency-ms', type=float, default=20, help='Simulated provider latency per send')
+    parser.add_argument('--concurrency', type=int, default=32, help='Sends in flight per drainer')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10, 100, 500], help='Claim batch sizes')
+    parser.add_argument('--single-row-sample', type=int, default=500, help='Rows drained for batch size 1')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        run_migrations(url)
+        engine = create_engine(url)
+        SessionLocal.configure(bind=engine)
+        NotificationOperations.create_or_update_notification_preferences(RECIPIENT)
+
+        print(f"{args.rows} outbox rows, {args.latency_ms:.0f} ms send latency, {args.concurrency} sends in flight")
+        print(f"  {'batch':>6} {'rows':>8} {'elapsed':>10} {'rows/s':>10}")
+        for batch_size in args.batch_sizes:
+            # Batch size 1 can't overlap sends and is slow, so drain a sample
+            rows = min(args.rows, args.single_row_sample) if batch_size == 1 else args.rows
+            seed(engine, rows)
+            elapsed = asyncio.run(drain(rows, batch_size, args.concurrency, args.latency_ms / 1000))
+            print(f"  {batch_size:6d} {rows:8d} {elapsed:9.2f}s {rows / elapsed:10.0f}")
+
+        backlog = OutboxOperations.get_backlog()
+        assert backlog['pending'] == 0 and backlog['sending'] == 0
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Alert email rendering: per-send Template() vs cached environment, and digests
+
+Run from Backend/backend:
+    python benchmarks/bench_notification_render.py --alerts 5000 --users 200
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+# Add backend root to path for `app.*` imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jinja2 import Environment, DictLoader
+
+from app.core import email_templates
+from app.core.email_templates import render
+from app.core.notification_service import NotificationService
+
+
+def make_alerts(count: int, users: int):
+    rng = random.Random(42)
+    return [(f"user{rng.randrange(users)}@example.com", {
+        'card_name': f"Card {i}",
+        'target_price': round(rng.uniform(5, 500), 2),
+        'condition': rng.choice(['above', 'below']),
+        'current_price': round(rng.uniform(5, 500), 2),
+        'triggered_at': datetime.now(),
+    }) for i in range(count)]
+
+
+def render_uncached(alert, app_url):
+    """The original path: parse and compile the template source on every send"""
+    env = Environment(loader=DictLoader(email_templates.email_environment.loader.mapping),
+                      autoescape=True, cache_size=0)
+    return env.get_template('price_alert.html').render(alert=alert, app_url=app_url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--alerts', type=int, default=5000, help='Triggered alerts')
+    parser.add_argument('--users', type=int, default=200, help='Distinct users they belong to')
+    parser.add_argument('--uncached-sample', type=int, default=200, help='Alerts rendered for the (slow) baseline')
+    args = parser.parse_args()
+
+    alerts = make_alerts(args.alerts, args.users)
+    service = NotificationService()
+
+    sample = alerts[:args.uncached_sample]
+    start = time.perf_counter()
+    for _, alert in sample:
+        render_uncached(alert, service.app_url)
+    uncached = (time.perf_counter() - start) / len(sample)
+
+    render('price_alert.html', alert=alerts[0][1], app_url=service.app_url)  # compile once
+    start = time.perf_counter()
+    for user_email, alert in alerts:
+        service.render_price_alert(user_email, alert)
+    cached = (time.perf_counter() - start) / len(alerts)
+
+    by_user = {}
+    for user_email, alert in alerts:
+        by_user.setdefault(user_email, []).append(alert)
+    start = time.perf_counter()
+    digests = [service.render_digest(user_email, user_alerts) for user_email, user_alerts in by_user.items()]
+    digest_total = time.perf_counter() - start
+
+    print(f"{args.alerts} triggered alerts across {len(by_user)} users")
+    print(f"  {'mode':<22} {'emails':>8} {'per email':>12} {'total':>10}")
+    print(f"  {'Template per send':<22} {args.alerts:8d} {uncached * 1e6:10.0f}us {uncached * args.alerts:9.2f}s")
+    print(f"  {'cached environment':<22} {args.alerts:8d} {cached * 1e6:10.0f}us {cached * args.alerts:9.2f}s")
+    print(f"  {'digest per user':<22} {len(digests):8d} {digest_total / len(digests) * 1e6:10.0f}us "
+          f"{digest_total:9.2f}s")
+
+
+if __name__ == '__main__':
+    main()
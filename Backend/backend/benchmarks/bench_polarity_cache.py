@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Polarity scoring: memoized by content hash vs TextBlob on every document
+
+Simulates overlapping card queries: each query returns posts drawn from
+a shared pool of documents (same threads showing up for "wembanyama",
+"wembanyama prizm", "wemby rookie", ...), and scores them either with
+TextBlob every time or through the polarity cache on a scratch database.
+
+Run from Backend/backend:
+    python benchmarks/bench_polarity_cache.py --documents 2000 --queries 300 --posts 50
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add backend root to path for `app.*` imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from app.core.models import SessionLocal
+from app.core.database import run_migrations
+from app.core.polarity_cache import PolarityCache, clean_text
+from app.core.sentiment_analyzer import TextBlobScorer
+
+WORDS = ("wemby rookie prizm silver psa 10 gem mint great buy overpriced dump hold sell fire "
+         "bad centering love this card price dropping amazing pull terrible investment").split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--documents', type=int, default=2000, help='Distinct posts and articles')
+    parser.add_argument('--queries', type=int, default=300, help='Card queries')
+    parser.add_argument('--posts', type=int, default=50, help='Documents returned per query')
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    pool = [f"{' '.join(rng.choices(WORDS, k=rng.randint(8, 60)))} https://redd.it/{i}" for i in range(args.documents)]
+    queries = [rng.sample(pool, args.posts) for _ in range(args.queries)]
+    scorer = TextBlobScorer()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        run_migrations(url)
+        engine = create_engine(url)
+        SessionLocal.configure(bind=engine)
+
+        start = time.perf_counter()
+        for texts in queries:
+            scorer.score_batch([clean_text(text) for text in texts])
+        uncached = time.perf_counter() - start
+
+        cache = PolarityCache()
+        start = time.perf_counter()
+        for texts in queries:
+            cache.score_many(texts, scorer.name, scorer.score_batch)
+        cached = time.perf_counter() - start
+        scored = cache.stats['scored']
+
+        # A restarted worker: empty memory, scores still in SQLite
+        restarted = PolarityCache()
+        start = time.perf_counter()
+        for texts in queries:
+            restarted.score_many(texts, scorer.name, scorer.score_batch)
+        restart = time.perf_counter() - start
+        engine.dispose()
+
+    total = args.queries * args.posts
+    print(f"{args.queries} queries x {args.posts} posts from {args.documents} distinct documents")
+    print(f"  {'mode':<22} {'elapsed':>10} {'scored':>8} {'us/doc':>9}")
+    for label, elapsed, count in (('textblob every time', uncached, total), ('polarity cache', cached, scored),
+                                  ('after restart', restart, restarted.stats['scored'])):
+        print(f"  {label:<22} {elapsed:9.2f}s {count:8d} {elapsed / total * 1e6:9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Portfolio analytics benchmark: per-row Python loop vs columnar NumPy engine
+
+Run from Backend/backend:
+    python benchmarks/bench_portfolio_analytics.py --rows 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add backend root to path for `app.*` imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.portfolio_analytics import PortfolioColumns, analyze, group_breakdown
+
+
+def make_rows(count: int, distinct_cards: int = 3000):
+    rng = random.Random(42)
+    entries = [{
+        'card_name': f"Card {rng.randrange(distinct_cards)}",
+        'buy_price': round(rng.uniform(5, 500), 2),
+        'quantity': rng.randint(1, 5),
+        'condition': rng.choice(['Raw', 'PSA 9', 'PSA 10', 'BGS 9.5']),
+    } for _ in range(count)]
+    prices = [round(rng.uniform(5, 600), 2) for _ in range(count)]
+    return entries, prices
+
+
+def loop_analytics(entries, prices):
+    """The original per-row loop from PortfolioTracker.get_portfolio plus main.py's re-summing"""
+    portfolio = []
+    for entry, current_price in zip(entries, prices):
+        total_investment = (entry['buy_price'] or 0) * entry['quantity']
+        current_value = current_price * entry['quantity']
+        roi_percentage = ((current_value - total_investment) / total_investment) * 100 if total_investment > 0 else 0
+        portfolio.append({
+            'total_investment': total_investment,
+            'current_value': current_value,
+            'roi_percentage': round(roi_percentage, 2),
+        })
+
+    total_investment = sum(card['total_investment'] for card in portfolio)
+    total_value = sum(card['current_value'] for card in portfolio)
+    total_roi = ((total_value - total_investment) / total_investment) * 100 if total_investment > 0 else 0
+
+    by_condition = {}
+    for entry, card in zip(entries, portfolio):
+        group = by_condition.setdefault(entry['condition'], [0.0, 0.0])
+        group[0] += card['total_investment']
+        group[1] += card['current_value']
+    return round(total_roi, 2), by_condition
+
+
+def vectorized_analytics(entries, prices):
+    columns = PortfolioColumns.from_rows(entries, prices)
+    analytics = analyze(columns)
+    analytics.roi_percentage.round(2)
+    groups = group_breakdown(analytics, [e['condition'] for e in entries], quantity=columns.quantity)
+    return analytics.summary['total_roi_percentage'], groups
+
+
+def best_of(fn, repeat, *args):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100_000, help='Portfolio rows')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per engine (best is reported)')
+    args = parser.parse_args()
+
+    entries, prices = make_rows(args.rows)
+
+    loop_time, (loop_roi, _) = best_of(loop_analytics, args.repeat, entries, prices)
+    vec_time, (vec_roi, _) = best_of(vectorized_analytics, args.repeat, entries, prices)
+    assert loop_roi == vec_roi, (loop_roi, vec_roi)
+
+    print(f"{args.rows} rows (ROI, totals, per-condition breakdown)")
+    print(f"  python loop : {loop_time * 1000:8.1f} ms")
+    print(f"  numpy       : {vec_time * 1000:8.1f} ms")
+    print(f"  speedup     : {loop_time / vec_time:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
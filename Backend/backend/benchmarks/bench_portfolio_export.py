@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Portfolio export benchmark: build-then-join CSV vs streamed export
+
+Run from Backend/backend:
+    python benchmarks/bench_portfolio_export.py --rows 500000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+# Add backend root to path for `app.*` imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from app.core.models import SessionLocal, Portfolio
+from app.core.database import run_migrations, PortfolioOperations
+from app.core import portfolio_tracker as tracker_module
+from app.core.portfolio_tracker import PortfolioTracker
+
+
+class FixedPriceResolver:
+    """Prices every card from a dict so the benchmark measures export only"""
+
+    async def resolve(self, card_names, budget=None):
+        return {name: 42.0 for name in card_names}
+
+
+def seed(engine, rows: int, user_id: str):
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        for start in range(0, rows, 10_000):
+            conn.execute(Portfolio.__table__.insert(), [{
+                'user_id': user_id,
+                'card_name': f"Prizm, Silver #{rng.randrange(3000)}",
+                'buy_price': round(rng.uniform(5, 500), 2),
+                'quantity': rng.randint(1, 5),
+                'condition': 'Raw',
+                'created_at': now,
+                'updated_at': now,
+            } for _ in range(start, min(start + 10_000, rows))])
+
+
+def join_export(user_id: str) -> int:
+    """The original approach: load every row, then join one string"""
+    entries = PortfolioOperations.get_all_cards(user_id=user_id)
+    lines = ["Card Name,Buy Price,Current Price,Quantity,Condition,Total Investment,Current Value,ROI %,Purchase Date"]
+    for entry in entries:
+        total_investment = entry['buy_price'] * entry['quantity']
+        current_value = 42.0 * entry['quantity']
+        lines.append(",".join([
+            entry['card_name'], str(entry['buy_price']), '42.0', str(entry['quantity']), entry['condition'],
+            str(total_investment), str(current_value),
+            str(round((current_value - total_investment) / total_investment * 100, 2)),
+            entry['purchase_date'] or ''
+        ]))
+    return len("\n".join(lines))
+
+
+async def stream_export(user_id: str, export_format: str):
+    """Drain the streamed export; returns (bytes, seconds to first chunk)"""
+    start = time.perf_counter()
+    first_byte = None
+    size = 0
+    async for chunk in PortfolioTracker().export_portfolio(user_id, export_format):
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        size += len(chunk)
+    return size, first_byte
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=500_000, help='Portfolio rows')
+    parser.add_argument('--formats', default='csv,ndjson,parquet', help='Streamed formats to run')
+    args = parser.parse_args()
+
+    user_id = "auth0|bench"
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        run_migrations(url)
+        engine = create_engine(url)
+        SessionLocal.configure(bind=engine)
+        seed(engine, args.rows, user_id)
+        tracker_module.price_resolver = FixedPriceResolver()
+
+        print(f"{args.rows} rows")
+        elapsed, peak, size = measure(lambda: join_export(user_id))
+        print(f"  join csv     : {elapsed:7.2f} s total, {elapsed:7.2f} s to first byte, "
+              f"peak {peak / 2**20:7.1f} MiB, {size / 2**20:6.1f} MiB out")
+
+        for export_format in args.formats.split(','):
+            elapsed, peak, (size, first_byte) = measure(lambda: asyncio.run(stream_export(user_id, export_format)))
+            print(f"  stream {export_format:<7}: {elapsed:7.2f} s total, {first_byte:7.3f} s to first byte, "
+                  f"peak {peak / 2**20:7.1f} MiB, {size / 2**20:6.1f} MiB out")
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
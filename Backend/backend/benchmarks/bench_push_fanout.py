@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Push fan-out load test: connections per worker and publish-to-client latency
+
+In-process mode drives the PushHub with one consumer task per simulated
+connection. --http serves the real /stream/events endpoint with uvicorn
+and opens that many SSE sockets against it from the same process (one
+worker), so latency includes encoding, the socket and the client parse.
+
+Run from Backend/backend:
+    python benchmarks/bench_push_fanout.py --connections 10000 --cards 500
+    python benchmarks/bench_push_fanout.py --http --connections 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+# Add backend root to path for `app.*` imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.push_hub import PushEvent, PushHub, price_topic
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else float('nan')
+
+
+def watch_lists(connections: int, cards: int, per_connection: int):
+    rng = random.Random(42)
+    return [[f"Card {rng.randrange(cards)}" for _ in range(per_connection)] for _ in range(connections)]
+
+
+async def publish_ticks(hub: PushHub, cards: int, ticks: int, rate: float) -> float:
+    """Publish price ticks at `rate` per second; returns mean publish() cost in seconds"""
+    rng = random.Random(7)
+    cost = 0.0
+    for i in range(ticks):
+        card = f"Card {rng.randrange(cards)}"
+        start = time.perf_counter()
+        hub.publish(price_topic(card), PushEvent('price', {'card_name': card, 'avg_price': 100.0 + i,
+                                                          'sent_at': time.perf_counter()}))
+        cost += time.perf_counter() - start
+        await asyncio.sleep(1 / rate)
+    return cost / ticks
+
+
+async def run_in_process(args) -> None:
+    hub = PushHub(max_connections=args.connections, max_pending=1000)
+    latencies = []
+
+    async def consume(subscription):
+        while True:
+            event = await subscription.get()
+            latencies.append(time.perf_counter() - event.data['sent_at'])
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    subscriptions = [hub.subscribe(price_topic(card) for card in cards)
+                     for cards in watch_lists(args.connections, args.cards, args.cards_per_connection)]
+    consumers = [asyncio.create_task(consume(subscription)) for subscription in subscriptions]
+    await asyncio.sleep(0)
+    per_connection = (tracemalloc.get_traced_memory()[0] - baseline) / args.connections
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    publish_cost = await publish_ticks(hub, args.cards, args.ticks, args.rate)
+    await asyncio.sleep(0.5)
+    elapsed = time.perf_counter() - start
+    for consumer in consumers:
+        consumer.cancel()
+
+    report(args, 'in-process', hub, latencies, elapsed, publish_cost, per_connection)
+
+
+async def run_http(args) -> None:
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("--http needs uvicorn (pip install 'uvicorn[standard]')")
+    from fastapi import FastAPI
+    from app.api.stream import router
+    from app.core.push_hub import push_hub
+
+    push_hub.max_connections = args.connections
+    app = FastAPI()
+    app.include_router(router)
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=args.port, log_level='warning',
+                                           backlog=args.connections))
+    serve = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    latencies = []
+    connected = 0
+
+    async def client(cards):
+        nonlocal connected
+        reader, writer = await asyncio.open_connection('127.0.0.1', args.port)
+        query = ','.join(cards).replace(' ', '%20')
+        writer.write(f"GET /stream/events?cards={query} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+        await writer.drain()
+        connected += 1
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            if line.startswith(b'data: {"card_name"'):
+                latencies.append(time.perf_counter() - json.loads(line[6:])['sent_at'])
+
+    start_connect = time.perf_counter()
+    clients = [asyncio.create_task(client(cards))
+               for cards in watch_lists(args.connections, args.cards, args.cards_per_connection)]
+    while push_hub.connections < args.connections and time.perf_counter() - start_connect < 60:
+        await asyncio.sleep(0.1)
+    connect_time = time.perf_counter() - start_connect
+    print(f"  {push_hub.connections} SSE connections open after {connect_time:.1f}s")
+
+    start = time.perf_counter()
+    publish_cost = await publish_ticks(push_hub, args.cards, args.ticks, args.rate)
+    await asyncio.sleep(1.0)
+    elapsed = time.perf_counter() - start
+
+    for task in clients:
+        task.cancel()
+    server.should_exit = True
+    await serve
+
+    report(args, 'http (SSE)', push_hub, latencies, elapsed, publish_cost, None)
+
+
+def report(args, mode, hub, latencies, elapsed, publish_cost, per_connection) -> None:
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode}: {args.connections} connections, {args.cards} cards, "
+          f"{args.cards_per_connection} cards each, {args.ticks} ticks at {args.rate:.0f}/s")
+    if per_connection is not None:
+        print(f"  memory per connection : {per_connection / 1024:10.1f} KiB")
+    print(f"  peak RSS              : {rss_mb:10.0f} MiB")
+    print(f"  publish() per tick    : {publish_cost * 1e6:10.1f} us")
+    print(f"  events delivered      : {len(latencies):10d} ({len(latencies) / elapsed:.0f}/s), "
+          f"{hub.stats['dropped']} dropped")
+    if latencies:
+        print(f"  fan-out latency p50   : {statistics.median(latencies) * 1000:10.2f} ms")
+        print(f"  fan-out latency p99   : {percentile(latencies, 99) * 1000:10.2f} ms")
+        print(f"  fan-out latency max   : {max(latencies) * 1000:10.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--connections', type=int, default=10_000, help='Client connections')
+    parser.add_argument('--cards', type=int, default=500, help='Distinct cards')
+    parser.add_argument('--cards-per-connection', type=int, default=10, help='Cards each client watches')
+    parser.add_argument('--ticks', type=int, default=500, help='Price ticks to publish')
+    parser.add_argument('--rate', type=float, default=200, help='Ticks per second')
+    parser.add_argument('--http', action='store_true', help='Serve /stream/events and connect real SSE sockets')
+    parser.add_argument('--port', type=int, default=8765, help='Port for --http')
+    args = parser.parse_args()
+
+    if args.http:
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, args.connections * 2 + 100)), hard))
+    asyncio.run(run_http(args) if args.http else run_in_process(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Reddit fetch latency: concurrent subreddit searches vs one after another
+
+Subreddit searches are simulated with a blocking sleep per call (what
+PRAW does on the wire), so this measures the fan-out itself: request
+latency, and how long the event loop is blocked while requests run.
+
+Run from Backend/backend:
+    python benchmarks/bench_reddit_fetch.py --requests 20 --latency-ms 300 800
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+# Add backend root to path for `app.*` imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('REDDIT_CLIENT_ID', 'bench-reddit-client-id')
+os.environ.setdefault('REDDIT_CLIENT_SECRET', 'bench-reddit-client-secret')
+
+from app.core.sentiment_analyzer import SentimentAnalyzer
+
+
+def make_search(low: float, high: float, seed: int):
+    rng = random.Random(seed)
+
+    def search(subreddit_name, card_name):
+        time.sleep(rng.uniform(low, high))
+        return [{'title': f"{card_name} on {subreddit_name}", 'selftext': '', 'score': 10, 'num_comments': 1,
+                 'created_utc': time.time(), 'subreddit': subreddit_name, 'author_karma': 100,
+                 'post_age_hours': 1.0}]
+    return search
+
+
+async def loop_lag(stop: asyncio.Event, lags: list) -> None:
+    """Record how late a 10 ms ticker wakes up (time the loop was blocked)"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - start - 0.01)
+
+
+async def run(args, concurrent: bool):
+    analyzer = SentimentAnalyzer()
+    search = make_search(args.latency_ms[0] / 1000, args.latency_ms[1] / 1000, seed=1)
+    analyzer._search_subreddit = search
+
+    async def serial(card_name):
+        # The old shape: each blocking search in turn, on the event loop
+        return [post for name in analyzer.target_subreddits for post in search(name, card_name)]
+
+    stop, lags, latencies = asyncio.Event(), [], []
+    ticker = asyncio.create_task(loop_lag(stop, lags))
+    for i in range(args.requests):
+        await asyncio.sleep(0.02)  # let the ticker see each request separately
+        start = time.perf_counter()
+        if concurrent:
+            await analyzer._fetch_reddit_sentiment(f"Card {i}")
+        else:
+            await serial(f"Card {i}")
+        latencies.append(time.perf_counter() - start)
+    stop.set()
+    await ticker
+    return latencies, lags
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=20, help='Sentiment requests')
+    parser.add_argument('--latency-ms', type=float, nargs=2, default=[300, 800], metavar=('MIN', 'MAX'),
+                        help='Simulated per-subreddit search latency range')
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests, 5 subreddits, {args.latency_ms[0]:.0f}-{args.latency_ms[1]:.0f} ms per search")
+    print(f"  {'mode':<12} {'p50':>9} {'max':>9} {'max loop block':>16}")
+    for label, concurrent in (('serial', False), ('concurrent', True)):
+        latencies, lags = asyncio.run(run(args, concurrent))
+        print(f"  {label:<12} {statistics.median(latencies) * 1000:7.0f}ms {max(latencies) * 1000:7.0f}ms "
+              f"{max(lags, default=0) * 1000:14.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
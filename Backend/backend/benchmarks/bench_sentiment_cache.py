@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Flip Score latency: cached sentiment results vs analyzing every request
+
+Replays bursts of concurrent requests over a set of cards through
+SentimentAnalyzer.analyze_card_sentiment, with the analysis itself
+replaced by a fixed-latency fake (what the Reddit and news fetches
+cost). Without the cache every request pays that latency; with it each
+card is analyzed once and concurrent misses share that analysis.
+
+Run from Backend/backend:
+    python benchmarks/bench_sentiment_cache.py --cards 50 --requests 2000 --latency-ms 1500
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+# Add backend root to path for `app.*` imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.sentiment_analyzer import SentimentAnalyzer
+
+
+async def run(args, cached: bool):
+    analyzer = SentimentAnalyzer()
+    analyses = 0
+
+    async def compute(card_name):
+        nonlocal analyses
+        analyses += 1
+        await asyncio.sleep(args.latency_ms / 1000)
+        return {'card_name': card_name, 'flip_score': 50}
+
+    analyzer._compute_sentiment = compute
+    analyze = analyzer.analyze_card_sentiment if cached else compute
+
+    async def request(card_name):
+        start = time.perf_counter()
+        await analyze(card_name)
+        return time.perf_counter() - start
+
+    rng = random.Random(7)
+    cards = [f"Card {i}" for i in range(args.cards)]
+    latencies = []
+    for start in range(0, args.requests, args.concurrency):
+        burst = [rng.choice(cards) for _ in range(min(args.concurrency, args.requests - start))]
+        latencies.extend(await asyncio.gather(*[request(card) for card in burst]))
+    return sorted(latencies), analyses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--cards', type=int, default=50, help='Distinct cards requested')
+    parser.add_argument('--requests', type=int, default=2000, help='Flip Score requests')
+    parser.add_argument('--concurrency', type=int, default=20, help='Requests in flight at once')
+    parser.add_argument('--latency-ms', type=float, default=1500, help='Simulated analysis latency')
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests over {args.cards} cards, {args.concurrency} at a time, "
+          f"{args.latency_ms:.0f} ms per analysis")
+    print(f"  {'mode':<10} {'p50':>10} {'p99':>10} {'analyses':>10}")
+    for label, cached in (('uncached', False), ('cached', True)):
+        latencies, analyses = asyncio.run(run(args, cached))
+        p50, p99 = statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+        print(f"  {label:<10} {p50 * 1000:8.2f}ms {p99 * 1000:8.2f}ms {analyses:10d}")
+
+
+if __name__ == '__main__':
+    main()
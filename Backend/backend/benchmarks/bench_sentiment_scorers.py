@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Sentiment scorers: lexicon backend vs TextBlob, accuracy and throughput
+
+Accuracy is measured on a fixed, hand-labeled corpus of card-market posts
+(positive / negative / neutral, scores within +-0.05 count as neutral), and
+as agreement with TextBlob (same sign, mean absolute difference,
+correlation) over a larger fixed corpus assembled from it. Throughput is
+documents per second for one request's worth of posts and for a large
+batch.
+
+Run from Backend/backend:
+    python benchmarks/bench_sentiment_scorers.py --documents 20000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add backend root to path for `app.*` imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.core.lexicon_scorer import LexiconScorer
+from app.core.polarity_cache import clean_text
+from app.core.sentiment_analyzer import TextBlobScorer
+
+# (text, label) with label +1 positive, -1 negative, 0 neutral
+LABELED = [
+    ("Pulled a Wemby PSA 10 gem mint, absolute grail 🔥", 1),
+    ("This rookie is a steal at this price, buying more", 1),
+    ("Prices are skyrocketing after the 40 point game 🚀🚀", 1),
+    ("Beautiful card, perfectly centered, love it", 1),
+    ("Undervalued right now, slept on for sure", 1),
+    ("Great pickup, best card in my PC", 1),
+    ("Black label BGS 10, what a heater", 1),
+    ("This set is amazing, every box has a great hit", 1),
+    ("Got it for a bargain at the card show, very happy", 1),
+    ("Sick pull! 💎", 1),
+    ("Record sale today, this card is the goat 🐐", 1),
+    ("Really nice parallel, colors look awesome", 1),
+    ("Strong buy, market is climbing 📈", 1),
+    ("Gorgeous refractor, well centered with sharp corners", 1),
+    ("New high for the silver prizm, congrats to the seller", 1),
+    ("Happy with this trade, fair deal for both of us", 1),
+    ("Overpriced junk, dump it while you can", -1),
+    ("Market is crashing, everyone is dumping their rookies 📉", -1),
+    ("Card came back trimmed, total scam", -1),
+    ("Terrible centering and soft corners, returned it", -1),
+    ("This guy is a bust, prices tanking all week", -1),
+    ("Overhyped rookie, sell off incoming", -1),
+    ("Worst break ever, nothing but base", -1),
+    ("Seller sent a fake, avoid this shop 👎", -1),
+    ("Not a good investment, way overvalued", -1),
+    ("Off center and creased, disappointing", -1),
+    ("Bubble is popping, new low every day", -1),
+    ("Bagholding 20 of these, horrible decision", -1),
+    ("Surface scratches everywhere, awful quality control", -1),
+    ("Price drop after the injury, ugly", -1),
+    ("This card is not worth it at all", -1),
+    ("Shilling this set won't save it, flop 💩", -1),
+    ("Wemby Prizm base card, raw", 0),
+    ("Listing my silver prizm tonight, PSA submission next week", 0),
+    ("What are these selling for?", 0),
+    ("Box break tonight at 8pm", 0),
+    ("Anyone have the checklist for this set", 0),
+    ("Mail day: blaster, hanger and a mega box", 0),
+    ("Graded by PSA, slab arrived today", 0),
+    ("Looking to trade for Wemby rookies", 0),
+    ("Which grading company do you use for modern cards", 0),
+    ("Shipping with a top loader and team bag", 0),
+]
+
+FILLER = ("card rookie prizm wemby psa bgs listing trade box break pull set auction ebay comps sold for "
+          "grade slab sleeve mail day checklist parallel numbered season game points").split()
+
+
+def label(polarity: float) -> int:
+    return 0 if abs(polarity) <= 0.05 else (1 if polarity > 0 else -1)
+
+
+def corpus(documents: int) -> list:
+    """Fixed larger corpus: labeled sentences padded with neutral hobby filler"""
+    rng = random.Random(5)
+    docs = []
+    for _ in range(documents):
+        text = ' '.join(text for text, _ in rng.sample(LABELED, rng.randint(1, 3)))
+        docs.append(clean_text(f"{text} {' '.join(rng.choices(FILLER, k=rng.randint(0, 30)))}"))
+    return docs
+
+
+def throughput(scorer, docs: list, batch: int) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(docs), batch):
+        scorer.score_batch(docs[i:i + batch])
+    return len(docs) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--documents', type=int, default=20000, help='Documents in the agreement/throughput corpus')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    textblob, lexicon = TextBlobScorer(), LexiconScorer()
+    print(f"Lexicon compiled in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    texts, labels = [text for text, _ in LABELED], [expected for _, expected in LABELED]
+    print(f"\nAccuracy on {len(LABELED)} labeled posts (positive / negative / neutral)")
+    print(f"  {'scorer':<10} {'accuracy':>9} {'positive':>9} {'negative':>9} {'neutral':>9}")
+    for name, scorer in (('textblob', textblob), ('lexicon', lexicon)):
+        predicted = [label(polarity) for polarity in scorer.score_batch(texts)]
+        correct = [p == e for p, e in zip(predicted, labels)]
+        per_class = [np.mean([c for c, e in zip(correct, labels) if e == cls]) for cls in (1, -1, 0)]
+        print(f"  {name:<10} {np.mean(correct):9.1%} {per_class[0]:9.1%} {per_class[1]:9.1%} {per_class[2]:9.1%}")
+
+    docs = corpus(args.documents)
+    reference = np.array(textblob.score_batch(docs))
+    scores = np.array(lexicon.score_batch(docs))
+    same_label = np.mean([label(a) == label(b) for a, b in zip(reference, scores)])
+    print(f"\nAgreement with TextBlob on {len(docs)} documents")
+    print(f"  same label {same_label:.1%}, mean abs difference {np.mean(np.abs(reference - scores)):.3f}, "
+          f"correlation {np.corrcoef(reference, scores)[0, 1]:.3f}")
+
+    print(f"\nThroughput (documents/s)")
+    print(f"  {'scorer':<10} {'batch 50':>12} {'batch 5000':>12}")
+    for name, scorer in (('textblob', textblob), ('lexicon', lexicon)):
+        sample = docs if name == 'lexicon' else docs[:5000]
+        print(f"  {name:<10} {throughput(scorer, sample, 50):12.0f} {throughput(scorer, sample, 5000):12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Weekly summary generation: batch job vs per-user queries
+
+Seeds opted-in users with holdings, cached prices and last week's
+snapshots, then times WeeklySummaryOperations.enqueue_summaries against a
+per-user loop (preferences, holdings, snapshot and one price lookup per
+card for each user) run on a sample and extrapolated. Rendering is timed
+separately on the compiled template.
+
+Run from Backend/backend:
+    python benchmarks/bench_weekly_summary.py --users 100000 --cards 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+# Add backend root to path for `app.*` imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ['NOTIFICATION_TRANSPORT'] = 'local'
+
+from sqlalchemy import create_engine, event
+from app.core.models import (
+    SessionLocal, NotificationOutbox, NotificationPreferences, PortfolioHolding, PortfolioSnapshot, PriceCache
+)
+from app.core.database import run_migrations, CacheOperations, WeeklySummaryOperations
+from app.core.notification_service import NotificationService
+
+WEEK_ENDING = date(2024, 1, 8)
+
+
+def seed(engine, users: int, cards: int, holdings_per_user: int) -> None:
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(PriceCache.__table__.insert(), [{
+            'card_query': f"Card {i}", 'price_data': {'avg_price': rng.uniform(5, 500)},
+            'cached_at': now, 'expires_at': now + timedelta(days=90)
+        } for i in range(cards)])
+        for start in range(0, users, 10_000):
+            ids = range(start, min(users, start + 10_000))
+            conn.execute(NotificationPreferences.__table__.insert(), [{
+                'email': f"user{i}@example.com", 'user_id': f"auth0|{i:07d}", 'email_notifications_enabled': 1,
+                'push_notifications_enabled': 0, 'alert_trigger_notifications': 1, 'weekly_summary_enabled': 1,
+                'created_at': now, 'updated_at': now
+            } for i in ids])
+            conn.execute(PortfolioHolding.__table__.insert(), [{
+                'user_id': f"auth0|{i:07d}", 'card_name': f"Card {card}", 'quantity': 1,
+                'investment': 100.0, 'row_count': 1, 'price': 100.0
+            } for i in ids for card in rng.sample(range(cards), holdings_per_user)])
+            conn.execute(PortfolioSnapshot.__table__.insert(), [{
+                'user_id': f"auth0|{i:07d}", 'snapshot_date': WEEK_ENDING - timedelta(days=7),
+                'total_investment': 100.0 * holdings_per_user, 'total_value': 90.0 * holdings_per_user,
+                'card_count': holdings_per_user
+            } for i in ids])
+
+
+def per_user(sample: int) -> float:
+    """The naive shape: a handful of queries per user plus one price lookup per card"""
+    start = time.perf_counter()
+    db = SessionLocal()
+    users = db.query(NotificationPreferences).filter(NotificationPreferences.weekly_summary_enabled == 1).limit(sample)
+    for prefs in users.all():
+        holdings = db.query(PortfolioHolding).filter(PortfolioHolding.user_id == prefs.user_id).all()
+        db.query(PortfolioSnapshot).filter(PortfolioSnapshot.user_id == prefs.user_id,
+                                           PortfolioSnapshot.snapshot_date == WEEK_ENDING - timedelta(days=7)).first()
+        for holding in holdings:
+            CacheOperations.get_cached_price(holding.card_name)
+    db.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=100_000, help='Opted-in users')
+    parser.add_argument('--cards', type=int, default=2000, help='Distinct cards')
+    parser.add_argument('--holdings', type=int, default=10, help='Holdings per user')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Users per page')
+    parser.add_argument('--per-user-sample', type=int, default=1000, help='Users timed on the per-user path')
+    parser.add_argument('--render-sample', type=int, default=5000, help='Summaries rendered for the render timing')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        run_migrations(url)
+        engine = create_engine(url)
+        SessionLocal.configure(bind=engine)
+
+        start = time.perf_counter()
+        seed(engine, args.users, args.cards, args.holdings)
+        print(f"Seeded {args.users} users x {args.holdings} holdings in {time.perf_counter() - start:.1f}s")
+
+        queries = 0
+
+        def count(*_):
+            nonlocal queries
+            queries += 1
+
+        event.listen(engine, 'before_cursor_execute', count)
+        start = time.perf_counter()
+        enqueued = WeeklySummaryOperations.enqueue_summaries(WEEK_ENDING, batch_size=args.batch_size)
+        batch_elapsed = time.perf_counter() - start
+        batch_queries = queries
+        assert enqueued == args.users
+
+        queries = 0
+        sample = min(args.per_user_sample, args.users)
+        sample_elapsed = per_user(sample)
+        per_user_elapsed = sample_elapsed / sample * args.users
+        per_user_queries = queries / sample * args.users
+        event.remove(engine, 'before_cursor_execute', count)
+
+        db = SessionLocal()
+        rows = db.query(NotificationOutbox.recipient, NotificationOutbox.payload).limit(args.render_sample).all()
+        db.close()
+        service = NotificationService()
+        start = time.perf_counter()
+        for recipient, payload in rows:
+            service.render_weekly_summary(recipient, json.loads(payload))
+        render_elapsed = (time.perf_counter() - start) / len(rows) * args.users
+
+        print(f"  {'path':<28} {'elapsed':>10} {'queries':>10} {'users/s':>10}")
+        print(f"  {'batch (enqueue)':<28} {batch_elapsed:9.2f}s {batch_queries:10d} {args.users / batch_elapsed:10.0f}")
+        print(f"  {'per-user (extrapolated)':<28} {per_user_elapsed:9.2f}s {per_user_queries:10.0f} "
+              f"{args.users / per_user_elapsed:10.0f}")
+        print(f"  {'render (extrapolated)':<28} {render_elapsed:9.2f}s {'-':>10} {args.users / render_elapsed:10.0f}")
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Write throughput benchmark: per-request commits vs the group-commit write queue
+
+Run from Backend/backend:
+    python benchmarks/bench_write_queue.py --writers 64 --writes 25
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# Add backend root to path for `app.*` imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from app.core.models import SessionLocal
+from app.core.database import run_migrations, PortfolioOperations
+from app.core.write_queue import WriteQueue
+
+
+def bind_scratch_database(path: str):
+    """Migrate a fresh SQLite file and point SessionLocal at it"""
+    db_url = f"sqlite:///{path}"
+    run_migrations(db_url)
+    engine = create_engine(db_url, connect_args={'check_same_thread': False, 'timeout': 30})
+    SessionLocal.configure(bind=engine)
+    return engine
+
+
+async def direct_writer(writer_id: int, writes: int) -> None:
+    """Baseline: every write opens a session and commits on its own (in a worker thread)"""
+    for i in range(writes):
+        await asyncio.to_thread(
+            PortfolioOperations.add_card, f"Card {writer_id}-{i}",
+            purchase_price=25.0, user_id=f"auth0|bench{writer_id}"
+        )
+
+
+async def queued_writer(queue: WriteQueue, writer_id: int, writes: int) -> None:
+    """Every write goes through the shared writer task"""
+    for i in range(writes):
+        await queue.submit(lambda db, i=i: PortfolioOperations.add_card(
+            f"Card {writer_id}-{i}", purchase_price=25.0, user_id=f"auth0|bench{writer_id}", db=db
+        ))
+
+
+async def run_direct(writers: int, writes: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*[direct_writer(w, writes) for w in range(writers)])
+    return time.perf_counter() - start
+
+
+async def run_queued(writers: int, writes: int, max_delay_ms: float) -> tuple:
+    queue = WriteQueue(max_delay_ms=max_delay_ms)
+    await queue.start()
+    start = time.perf_counter()
+    await asyncio.gather(*[queued_writer(queue, w, writes) for w in range(writers)])
+    elapsed = time.perf_counter() - start
+    await queue.stop()
+    return elapsed, queue.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--writers', type=int, default=64, help='Concurrent writers')
+    parser.add_argument('--writes', type=int, default=25, help='Writes per writer')
+    parser.add_argument('--max-delay-ms', type=float, default=5.0, help='Write queue batching window')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    total = args.writers * args.writes
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = bind_scratch_database(os.path.join(tmp, 'direct.db'))
+        direct = asyncio.run(run_direct(args.writers, args.writes))
+        engine.dispose()
+
+        engine = bind_scratch_database(os.path.join(tmp, 'queued.db'))
+        queued, stats = asyncio.run(run_queued(args.writers, args.writes, args.max_delay_ms))
+        engine.dispose()
+
+    print(f"{args.writers} concurrent writers x {args.writes} writes = {total} rows")
+    print(f"  per-request commit : {direct:7.2f}s  {total / direct:9.0f} writes/s")
+    print(f"  group-commit queue : {queued:7.2f}s  {total / queued:9.0f} writes/s "
+          f"({stats['batches']} transactions, {total / stats['batches']:.1f} writes/txn)")
+    print(f"  speedup            : {direct / queued:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,12 @@
 # DimeDrop FastAPI Application
 # Main entry point for the API server
 
-from fastapi import FastAPI, HTTPException, Query, Response, File, UploadFile, Depends
+from fastapi import FastAPI, HTTPException, Query, Response, File, UploadFile, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 import logging
 import os
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import sys
 
 # Add parent directory to path for imports
@@ -21,20 +22,29 @@ load_environment()
 # Import our modules
 from backend.app.core.price_tracker import get_card_prices_endpoint
 # from backend.app.core.sentiment_analyzer import SentimentAnalyzer
-from backend.app.core.sentiment_analyzer import SentimentAnalyzer
+from backend.app.core.sentiment_analyzer import sentiment_analyzer
 # from backend.app.core.forecast_model import ForecastModel
 from backend.app.core.portfolio_tracker import PortfolioTracker
-from backend.app.core.alerts_tracker import AlertsTracker
+from backend.app.core.portfolio_export import EXPORT_FORMATS
+from backend.app.core.alerts_tracker import AlertsTracker, alert_index
 from backend.app.core.vision_processor import VisionProcessor
-from backend.app.core.database import NotificationOperations
+from backend.app.core.database import (
+    NotificationOperations, OutboxOperations, PortfolioOperations, PortfolioSummaryOperations, PortfolioSnapshotOperations,
+    init_database
+)
 from backend.app.core.notification_service import notification_service
-from backend.app.services.auth import get_current_user, get_optional_user
+from backend.app.core.notification_outbox import outbox_drainer, outbox_enabled
+from backend.app.core.write_queue import write_queue, write_queue_enabled, run_write
+from backend.app.core.price_events import price_events
+from backend.app.core.jobs import scheduler, scheduler_enabled
+from backend.app.services.auth import User, get_current_user, get_optional_user, user_from_token
 from backend.app.api.upload_card import router as upload_card_router
 from backend.app.api.ebay import router as ebay_router
+from backend.app.api.stream import router as stream_router
+from backend.app.core.push_hub import push_hub, push_relay
 
 # Initialize components
 # forecast_model = ForecastModel()
-sentiment_analyzer = SentimentAnalyzer()
 portfolio_tracker = PortfolioTracker()
 alerts_tracker = AlertsTracker()
 vision_processor = VisionProcessor()
@@ -69,6 +79,7 @@ app.add_middleware(
 # Include API routers
 app.include_router(upload_card_router, prefix="/api", tags=["upload"])
 app.include_router(ebay_router, prefix="/api", tags=["ebay"])
+app.include_router(stream_router, tags=["stream"])
 
 @app.on_event("startup")
 async def startup_event():
@@ -76,6 +87,33 @@ async def startup_event():
     if not os.getenv("EBAY_APP_ID"):
         logger.error("EBAY_APP_ID not set")
         raise ValueError("EBAY_APP_ID environment variable required")
+    # Apply any pending schema migrations before serving requests
+    init_database()
+    if write_queue_enabled():
+        await write_queue.start()
+    # Sends triggered-alert emails from the outbox (safe in every worker; claims are atomic)
+    if outbox_enabled():
+        await outbox_drainer.start()
+    # Evaluate a card's alerts whenever a fresh price for it is written
+    price_events.subscribe(alerts_tracker.on_price_update)
+    # ...and push the tick to SSE/WebSocket clients watching the card, on every worker
+    price_events.subscribe(push_hub.on_price_update)
+    await push_relay.start()
+    await price_events.start()
+    # Periodic jobs; every worker runs the scheduler, DB leases pick one per job
+    if scheduler_enabled():
+        await scheduler.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    logger.info("FastAPI server shutting down")
+    await scheduler.stop()
+    await price_events.stop()
+    await push_relay.stop()
+    await outbox_drainer.stop()
+    # Flush writes still waiting in the group-commit queue
+    await write_queue.stop()
 
 
 @app.get("/")
@@ -182,14 +220,11 @@ async def get_prices_by_path(card_name: str):
 @app.get("/sentiment/{card_name}")
 async def get_sentiment(card_name: str):
     """
-    Get sentiment analysis and Flip Score for a basketball card
+    Get sentiment analysis and Flip Score for a basketball card (cached per card)
     """
     try:
-        # Initialize sentiment analyzer
-        analyzer = SentimentAnalyzer()
-        
-        # Get sentiment analysis
-        result = await analyzer.analyze_card_sentiment(card_name)
+        # Shared analyzer: one Reddit client and one result cache per process
+        result = await sentiment_analyzer.analyze_card_sentiment(card_name)
         
         return result
     except Exception as e:
@@ -243,7 +278,7 @@ async def get_sentiment(card_name: str):
 
 
 @app.get("/portfolio")
-async def get_portfolio(current_user: dict = Depends(get_current_user)):
+async def get_portfolio(current_user: User = Depends(get_current_user)):
     """
     Get user's basketball card portfolio with current prices and ROI calculations
 
@@ -255,28 +290,112 @@ async def get_portfolio(current_user: dict = Depends(get_current_user)):
     """
     try:
         tracker = PortfolioTracker()
-        user_id = current_user.get('sub') if current_user else None
-        portfolio = await tracker.get_portfolio(user_id=user_id)
-        
-        # Calculate totals
-        total_investment = sum(card['total_investment'] for card in portfolio)
-        total_value = sum(card['current_value'] for card in portfolio)
-        total_roi = ((total_value - total_investment) / total_investment) * 100 if total_investment > 0 else 0
-        
+        user_id = current_user.user_id
+
+        # Totals come from the same vectorized pass that prices the rows
+        analytics = await tracker.get_portfolio_analytics(user_id=user_id)
+
         return {
-            "portfolio": portfolio,
-            "summary": {
-                "total_investment": round(total_investment, 2),
-                "total_value": round(total_value, 2),
-                "total_roi_percentage": round(total_roi, 2),
-                "card_count": len(portfolio)
-            }
+            "portfolio": analytics['portfolio'],
+            "summary": analytics['summary']
         }
     except Exception as e:
         # logger.error(f"Error in /portfolio endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail="Error retrieving portfolio")
 
 
+@app.get("/portfolio/summary")
+async def get_portfolio_summary(current_user: User = Depends(get_current_user)):
+    """
+    Get the user's portfolio totals without loading or pricing any rows
+
+    Reads the incrementally maintained summary (kept current by portfolio
+    changes and price updates).
+
+    Returns:
+    - total_investment, total_value, total_roi_percentage, card_count, updated_at
+    """
+    try:
+        user_id = current_user.user_id
+        return PortfolioSummaryOperations.get_summary(user_id)
+    except Exception as e:
+        # logger.error(f"Error in /portfolio/summary endpoint: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error retrieving portfolio summary")
+
+
+@app.get("/portfolio/changes")
+async def get_portfolio_changes(
+    since: str = Query(None, description="next_token from the previous sync; omit for a full sync"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Delta sync for clients that keep a local copy of the portfolio
+
+    Returns:
+    - changes: Cards added or updated since the token (upsert by id)
+    - deleted: Portfolio ids removed since the token (apply before changes)
+    - prices: Current value per held card (same pricing as /portfolio/summary)
+    - full_resync: True if the client should replace its copy with `changes`
+    - next_token: Pass as `since` on the next call
+    """
+    try:
+        since_time = PortfolioOperations.parse_sync_token(since) if since else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+    user_id = current_user.user_id
+    changes = PortfolioOperations.get_changes(user_id, since=since_time)
+    if changes is None:
+        raise HTTPException(status_code=500, detail="Error retrieving portfolio changes")
+    return changes
+
+
+@app.get("/portfolio/breakdown")
+async def get_portfolio_breakdown(
+    by: str = Query("condition", pattern="^(condition|card_name|purchase_month)$",
+                    description="Group by condition, card_name or purchase_month"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the user's portfolio exposure per group, aggregated in the database
+
+    Returns:
+    - groups: List of {group, row_count, card_count, total_investment, total_value,
+      roi_percentage, weight_percentage}, largest value first
+    """
+    try:
+        user_id = current_user.user_id
+        return {"by": by, "groups": PortfolioOperations.get_breakdown(user_id, by=by)}
+    except Exception as e:
+        # logger.error(f"Error in /portfolio/breakdown endpoint: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error retrieving portfolio breakdown")
+
+
+@app.get("/portfolio/history")
+async def get_portfolio_history(
+    interval: str = Query("daily", pattern="^(daily|weekly|monthly)$", description="daily, weekly or monthly"),
+    start: date = Query(None, description="First day (YYYY-MM-DD)"),
+    end: date = Query(None, description="Last day (YYYY-MM-DD)"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the user's portfolio value over time from the nightly snapshots
+
+    Weekly and monthly intervals are downsampled in the database (one point
+    per week or month, its closing value), so multi-year ranges stay small.
+
+    Returns:
+    - history: List of {date, total_investment, total_value, total_roi_percentage, card_count}
+    """
+    try:
+        user_id = current_user.user_id
+        history = PortfolioSnapshotOperations.get_history(user_id, start=start, end=end, interval=interval)
+        return {"interval": interval, "history": history}
+    except Exception as e:
+        # logger.error(f"Error in /portfolio/history endpoint: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error retrieving portfolio history")
+
+
 @app.post("/portfolio")
 async def add_to_portfolio(
     card_name: str = Query(..., description="Name of the basketball card"),
@@ -285,7 +404,7 @@ async def add_to_portfolio(
     condition: str = Query(None, description="Card condition (e.g., 'PSA 10', 'Raw')"),
     purchase_date: str = Query(None, description="Purchase date (YYYY-MM-DD)"),
     notes: str = Query(None, description="Optional notes about the purchase"),
-    current_user: dict = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Add a card to the user's portfolio
@@ -321,7 +440,7 @@ async def add_to_portfolio(
         }
         
         tracker = PortfolioTracker()
-        user_id = current_user.get('sub') if current_user else None
+        user_id = current_user.user_id
         result = await tracker.add_card_to_portfolio(card_data, user_id=user_id)
         
         return result
@@ -333,22 +452,32 @@ async def add_to_portfolio(
 
 
 @app.get("/portfolio/export")
-async def export_portfolio_csv():
+async def export_portfolio(
+    format: str = Query("csv", description="Export format: csv, ndjson or parquet"),
+    current_user: User = Depends(get_current_user)
+):
     """
-    Export user's portfolio as CSV for tax purposes
+    Export user's portfolio for tax purposes
+
+    Rows are streamed from the database and encoded batch by batch, so the
+    first bytes go out immediately and memory stays flat for any portfolio size.
 
     Returns:
-        CSV formatted string of portfolio data
+        Streaming CSV (default), NDJSON or Parquet file
     """
     try:
         tracker = PortfolioTracker()
-        csv_data = await tracker.export_portfolio_csv()
-
-        return Response(
-            content=csv_data,
-            media_type="text/csv",
-            headers={"Content-Disposition": "attachment; filename=portfolio.csv"}
+        user_id = current_user.user_id
+        chunks = tracker.export_portfolio(user_id=user_id, export_format=format)
+        media_type, extension = EXPORT_FORMATS[format]
+
+        return StreamingResponse(
+            chunks,
+            media_type=media_type,
+            headers={"Content-Disposition": f"attachment; filename=portfolio.{extension}"}
         )
+    except HTTPException:
+        raise
     except Exception as e:
         # logger.error(f"Error in /portfolio/export endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail="Error exporting portfolio")
@@ -357,7 +486,7 @@ async def export_portfolio_csv():
 @app.get("/alerts")
 async def get_alerts(
     active_only: bool = Query(True, description="Return only active alerts"),
-    current_user: dict = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Get all price alerts
@@ -368,7 +497,7 @@ async def get_alerts(
         List of alerts with current prices
     """
     try:
-        user_id = current_user.get('sub') if current_user else None
+        user_id = current_user.user_id
         alerts = await alerts_tracker.get_alerts(active_only=active_only, user_id=user_id)
         return {"alerts": alerts}
     except Exception as e:
@@ -382,7 +511,10 @@ async def create_alert(
     target_price: float = Query(..., gt=0, description="Target price for the alert"),
     alert_type: str = Query(..., description="Alert type: 'above' or 'below'"),
     notes: str = Query(None, description="Optional notes for the alert"),
-    current_user: dict = Depends(get_current_user)
+    auto_rearm: bool = Query(False, description="Re-arm after firing once the price leaves the hysteresis band"),
+    cooldown_seconds: int = Query(None, ge=0, description="Minimum seconds between triggers"),
+    hysteresis_pct: float = Query(None, ge=0, lt=100, description="Re-arm band as a percentage of the target"),
+    current_user: User = Depends(get_current_user)
 ):
     """
     Create a new price alert
@@ -391,6 +523,11 @@ async def create_alert(
     - **target_price**: Price threshold for the alert
     - **alert_type**: 'above' (notify when price goes above target) or 'below' (notify when price goes below target)
     - **notes**: Optional notes
+    - **auto_rearm**: Keep the alert after it fires; it fires again once the price has moved
+      back past the hysteresis band and crossed the target again (default: fire once)
+    - **cooldown_seconds**: Minimum time between triggers (default ALERT_COOLDOWN_SECONDS)
+    - **hysteresis_pct**: How far past the target, in percent, the price must retreat to re-arm
+      (default ALERT_HYSTERESIS_PERCENT)
 
     Returns the created alert details
     """
@@ -399,10 +536,13 @@ async def create_alert(
             'card_name': card_name,
             'target_price': target_price,
             'alert_type': alert_type,
-            'notes': notes
+            'notes': notes,
+            'auto_rearm': auto_rearm,
+            'cooldown_seconds': cooldown_seconds,
+            'hysteresis_pct': hysteresis_pct
         }
 
-        user_id = current_user.get('sub') if current_user else None
+        user_id = current_user.user_id
         result = await alerts_tracker.create_alert(alert_data, user_id=user_id)
         return result
     except HTTPException:
@@ -419,7 +559,10 @@ async def update_alert(
     target_price: float = Query(None, gt=0, description="Updated target price"),
     alert_type: str = Query(None, description="Updated alert type"),
     is_active: bool = Query(None, description="Whether alert is active"),
-    notes: str = Query(None, description="Updated notes")
+    notes: str = Query(None, description="Updated notes"),
+    auto_rearm: bool = Query(None, description="Re-arm after firing"),
+    cooldown_seconds: int = Query(None, ge=0, description="Minimum seconds between triggers"),
+    hysteresis_pct: float = Query(None, ge=0, lt=100, description="Re-arm band as a percentage of the target")
 ):
     """
     Update an existing alert
@@ -430,6 +573,7 @@ async def update_alert(
     - **alert_type**: Updated alert type (optional)
     - **is_active**: Whether alert is active (optional)
     - **notes**: Updated notes (optional)
+    - **auto_rearm**, **cooldown_seconds**, **hysteresis_pct**: Trigger rules (optional)
 
     Returns the updated alert details
     """
@@ -445,6 +589,12 @@ async def update_alert(
             update_data['is_active'] = is_active
         if notes is not None:
             update_data['notes'] = notes
+        if auto_rearm is not None:
+            update_data['auto_rearm'] = auto_rearm
+        if cooldown_seconds is not None:
+            update_data['cooldown_seconds'] = cooldown_seconds
+        if hysteresis_pct is not None:
+            update_data['hysteresis_pct'] = hysteresis_pct
 
         result = await alerts_tracker.update_alert(alert_id, update_data)
         if not result:
@@ -485,6 +635,9 @@ async def check_alerts():
     """
     Manually check all active alerts against current prices
 
+    Alerts are also evaluated automatically whenever a card's price is
+    refreshed; this re-checks every card with active alerts.
+
     Returns list of triggered alerts
     """
     try:
@@ -495,6 +648,12 @@ async def check_alerts():
         raise HTTPException(status_code=500, detail="Error checking alerts")
 
 
+@app.get("/alerts/stats")
+async def alert_engine_stats():
+    """Alerts indexed in this worker, and trigger / cooldown-suppressed / re-arm counts"""
+    return {"indexed": len(alert_index), **alert_index.stats}
+
+
 # ============================================================================
 # Notification Endpoints
 # ============================================================================
@@ -512,10 +671,13 @@ async def get_notification_preferences(email: str = Query(..., description="User
 
 
 @app.post("/notifications/preferences")
-async def update_notification_preferences(preferences: dict):
+async def update_notification_preferences(preferences: dict, authorization: str = Header(None)):
     """
     Create or update notification preferences for a user
 
+    When called with a Bearer token the preferences are linked to that user,
+    which weekly summaries need to find the user's portfolio.
+
     Expected JSON:
     {
         "email": "user@example.com",
@@ -536,14 +698,19 @@ async def update_notification_preferences(preferences: dict):
         push_enabled = preferences.get('push_notifications_enabled', False)
         alert_notifications = preferences.get('alert_trigger_notifications', True)
         weekly_summary = preferences.get('weekly_summary_enabled', False)
+        user_id = None
+        if authorization and authorization.lower().startswith('bearer '):
+            user_id = user_from_token(authorization[7:]).user_id
 
-        result = NotificationOperations.create_or_update_notification_preferences(
+        result = await run_write(lambda db: NotificationOperations.create_or_update_notification_preferences(
             email=email,
             email_notifications_enabled=email_enabled,
             push_notifications_enabled=push_enabled,
             alert_trigger_notifications=alert_notifications,
-            weekly_summary_enabled=weekly_summary
-        )
+            weekly_summary_enabled=weekly_summary,
+            user_id=user_id,
+            db=db
+        ))
 
         if not result:
             raise HTTPException(status_code=500, detail="Failed to update notification preferences")
@@ -571,6 +738,18 @@ async def send_test_notification(email: str):
         raise HTTPException(status_code=500, detail=f"Error sending test notification: {str(e)}")
 
 
+@app.get("/notifications/outbox")
+async def get_outbox_status():
+    """
+    Notification outbox backlog (pending / sending / failed rows, oldest
+    pending age) and this worker's drainer counters
+    """
+    backlog = OutboxOperations.get_backlog()
+    if not backlog:
+        raise HTTPException(status_code=500, detail="Error getting outbox backlog")
+    return {"backlog": backlog, "drainer": {"running": outbox_drainer.running, **outbox_drainer.stats}}
+
+
 @app.delete("/notifications/preferences")
 async def delete_notification_preferences(email: str = Query(..., description="User email address")):
     """Delete notification preferences for a user"""
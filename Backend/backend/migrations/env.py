@@ -0,0 +1,75 @@
+# DimeDrop Alembic environment
+# Runs schema migrations against DATABASE_URL (falls back to alembic.ini)
+
+import os
+import sys
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+# Make `app.core.models` importable when alembic is run from the CLI
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.models import Base
+from app.core.partitions import is_partition_table
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get('configure_logger', True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+# An explicit URL set by run_migrations() wins over the environment
+if not config.attributes.get('url_override') and os.getenv('DATABASE_URL'):
+    config.set_main_option('sqlalchemy.url', os.getenv('DATABASE_URL'))
+
+target_metadata = Base.metadata
+
+
+def include_name(name, type_, parent_names) -> bool:
+    """Keep autogenerate away from the runtime-managed monthly partitions"""
+    if type_ == 'table':
+        return not is_partition_table(name)
+    return True
+
+
+def run_migrations_offline() -> None:
+    """Emit migration SQL to stdout without a database connection"""
+    context.configure(
+        url=config.get_main_option('sqlalchemy.url'),
+        target_metadata=target_metadata,
+        include_name=include_name,
+        literal_binds=True,
+        render_as_batch=True,
+        dialect_opts={'paramstyle': 'named'},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run migrations against a live database connection"""
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix='sqlalchemy.',
+        poolclass=pool.NullPool,
+    )
+
+    with connectable.connect() as connection:
+        # SQLite can't ALTER most constraints in place, so use batch mode
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
+            render_as_batch=True,
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,108 @@
+"""Baseline schema (tables as created by Base.metadata.create_all)
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-10-15
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'price_cache',
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('card_query', sa.String(255), nullable=False),
+        sa.Column('price_data', sa.JSON, nullable=False),
+        sa.Column('cached_at', sa.DateTime),
+        sa.Column('expires_at', sa.DateTime, nullable=False),
+    )
+    op.create_index('idx_price_cache_card_query', 'price_cache', ['card_query'])
+    op.create_index('idx_price_cache_expires_at', 'price_cache', ['expires_at'])
+
+    op.create_table(
+        'api_rate_limits',
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('api_name', sa.String(50), nullable=False),
+        sa.Column('date', sa.Date, nullable=False),
+        sa.Column('call_count', sa.Integer),
+        sqlite_autoincrement=True,
+    )
+
+    op.create_table(
+        'portfolio',
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('user_id', sa.String(255), nullable=False),
+        sa.Column('card_name', sa.String(255), nullable=False),
+        sa.Column('buy_price', sa.DECIMAL(10, 2), nullable=False),
+        sa.Column('quantity', sa.Integer, nullable=False),
+        sa.Column('condition', sa.String(50)),
+        sa.Column('purchase_date', sa.Date),
+        sa.Column('notes', sa.Text),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('updated_at', sa.DateTime),
+    )
+    op.create_index('idx_portfolio_user_id', 'portfolio', ['user_id'])
+    op.create_index('idx_portfolio_card_name', 'portfolio', ['card_name'])
+    op.create_index('idx_portfolio_created_at', 'portfolio', ['created_at'])
+
+    op.create_table(
+        'alerts',
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('user_id', sa.String(255), nullable=False),
+        sa.Column('card_name', sa.String(255), nullable=False),
+        sa.Column('target_price', sa.DECIMAL(10, 2), nullable=False),
+        sa.Column('alert_type', sa.String(20), nullable=False),
+        sa.Column('is_active', sa.Integer),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('last_triggered', sa.DateTime),
+        sa.Column('notes', sa.Text),
+    )
+    op.create_index('idx_alerts_user_id', 'alerts', ['user_id'])
+    op.create_index('idx_alerts_card_name', 'alerts', ['card_name'])
+    op.create_index('idx_alerts_is_active', 'alerts', ['is_active'])
+    op.create_index('idx_alerts_target_price', 'alerts', ['target_price'])
+
+    op.create_table(
+        'notification_preferences',
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('email', sa.String(255), nullable=False),
+        sa.Column('email_notifications_enabled', sa.Integer),
+        sa.Column('push_notifications_enabled', sa.Integer),
+        sa.Column('alert_trigger_notifications', sa.Integer),
+        sa.Column('weekly_summary_enabled', sa.Integer),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('updated_at', sa.DateTime),
+    )
+    op.create_index('idx_notification_preferences_email', 'notification_preferences', ['email'])
+
+    op.create_table(
+        'tracked_listings',
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('user_id', sa.String(255), nullable=False),
+        sa.Column('item_id', sa.String(50), nullable=False),
+        sa.Column('card_name', sa.String(255), nullable=False),
+        sa.Column('watch_count', sa.Integer),
+        sa.Column('current_price', sa.DECIMAL(10, 2), nullable=False),
+        sa.Column('end_time', sa.DateTime, nullable=False),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('updated_at', sa.DateTime),
+    )
+    op.create_index('idx_tracked_listings_user_id', 'tracked_listings', ['user_id'])
+    op.create_index('idx_tracked_listings_item_id', 'tracked_listings', ['item_id'])
+    op.create_index('idx_tracked_listings_end_time', 'tracked_listings', ['end_time'])
+
+
+def downgrade() -> None:
+    op.drop_table('tracked_listings')
+    op.drop_table('notification_preferences')
+    op.drop_table('alerts')
+    op.drop_table('portfolio')
+    op.drop_table('api_rate_limits')
+    op.drop_table('price_cache')
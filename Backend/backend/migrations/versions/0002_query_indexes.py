@@ -0,0 +1,55 @@
+"""Composite and unique indexes matching the hot queries in database.py
+
+- price_cache: (card_query, expires_at) replaces the card_query-only index
+- api_rate_limits: unique (api_name, date), after merging duplicate counters
+- portfolio: (user_id, created_at) replaces the user_id-only index
+
+Index operations are idempotent so databases built by create_tables() with
+the current models can be stamped at the baseline and still upgrade.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_price_cache_query_expires', 'price_cache', ['card_query', 'expires_at'], if_not_exists=True)
+    op.drop_index('idx_price_cache_card_query', table_name='price_cache', if_exists=True)
+
+    # Without a unique key, concurrent increments could insert several rows for
+    # the same day. Fold them into the lowest id before adding the constraint.
+    op.execute(sa.text("""
+        UPDATE api_rate_limits
+        SET call_count = (
+            SELECT SUM(COALESCE(dup.call_count, 0)) FROM api_rate_limits AS dup
+            WHERE dup.api_name = api_rate_limits.api_name AND dup.date = api_rate_limits.date
+        )
+        WHERE id IN (SELECT MIN(id) FROM api_rate_limits GROUP BY api_name, date)
+    """))
+    op.execute(sa.text("""
+        DELETE FROM api_rate_limits
+        WHERE id NOT IN (SELECT MIN(id) FROM api_rate_limits GROUP BY api_name, date)
+    """))
+    op.create_index('uq_api_rate_limits_api_name_date', 'api_rate_limits', ['api_name', 'date'], unique=True, if_not_exists=True)
+
+    op.create_index('idx_portfolio_user_created', 'portfolio', ['user_id', 'created_at'], if_not_exists=True)
+    op.drop_index('idx_portfolio_user_id', table_name='portfolio', if_exists=True)
+
+
+def downgrade() -> None:
+    op.create_index('idx_portfolio_user_id', 'portfolio', ['user_id'], if_not_exists=True)
+    op.drop_index('idx_portfolio_user_created', table_name='portfolio', if_exists=True)
+
+    op.drop_index('uq_api_rate_limits_api_name_date', table_name='api_rate_limits', if_exists=True)
+
+    op.create_index('idx_price_cache_card_query', 'price_cache', ['card_query'], if_not_exists=True)
+    op.drop_index('idx_price_cache_query_expires', table_name='price_cache', if_exists=True)
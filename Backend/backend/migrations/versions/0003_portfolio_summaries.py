@@ -0,0 +1,59 @@
+"""Incrementally maintained per-user portfolio summaries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'portfolio_summaries',
+        sa.Column('user_id', sa.String(255), primary_key=True),
+        sa.Column('total_investment', sa.Float, nullable=False),
+        sa.Column('total_value', sa.Float, nullable=False),
+        sa.Column('row_count', sa.Integer, nullable=False),
+        sa.Column('updated_at', sa.DateTime),
+    )
+
+    op.create_table(
+        'portfolio_holdings',
+        sa.Column('user_id', sa.String(255), primary_key=True),
+        sa.Column('card_name', sa.String(255), primary_key=True),
+        sa.Column('quantity', sa.Integer, nullable=False),
+        sa.Column('investment', sa.Float, nullable=False),
+        sa.Column('row_count', sa.Integer, nullable=False),
+        sa.Column('price', sa.Float, nullable=False),
+    )
+    op.create_index('idx_portfolio_holdings_card_name', 'portfolio_holdings', ['card_name'])
+
+    # Backfill from existing rows. Prices aren't known here, so holdings start
+    # at their average buy price; the next price update for a card, or the
+    # scheduled summary check (PortfolioSummaryOperations.check_summary, which
+    # reprices from the price cache), brings values current.
+    op.execute(sa.text("""
+        INSERT INTO portfolio_holdings (user_id, card_name, quantity, investment, row_count, price)
+        SELECT user_id, TRIM(card_name), SUM(quantity), SUM(COALESCE(buy_price, 0) * quantity), COUNT(*),
+               CASE WHEN SUM(quantity) > 0 THEN SUM(COALESCE(buy_price, 0) * quantity) / SUM(quantity) ELSE 0 END
+        FROM portfolio
+        GROUP BY user_id, TRIM(card_name)
+    """))
+    op.execute(sa.text("""
+        INSERT INTO portfolio_summaries (user_id, total_investment, total_value, row_count, updated_at)
+        SELECT user_id, SUM(investment), SUM(quantity * price), SUM(row_count), CURRENT_TIMESTAMP
+        FROM portfolio_holdings
+        GROUP BY user_id
+    """))
+
+
+def downgrade() -> None:
+    op.drop_table('portfolio_holdings')
+    op.drop_table('portfolio_summaries')
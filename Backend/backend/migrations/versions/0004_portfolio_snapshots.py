@@ -0,0 +1,30 @@
+"""Daily per-user portfolio value snapshots
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # (user_id, snapshot_date) primary key serves the per-user date range reads
+    op.create_table(
+        'portfolio_snapshots',
+        sa.Column('user_id', sa.String(255), primary_key=True),
+        sa.Column('snapshot_date', sa.Date, primary_key=True),
+        sa.Column('total_investment', sa.Float, nullable=False),
+        sa.Column('total_value', sa.Float, nullable=False),
+        sa.Column('card_count', sa.Integer, nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('portfolio_snapshots')
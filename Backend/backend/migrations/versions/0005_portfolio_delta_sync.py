@@ -0,0 +1,34 @@
+"""Portfolio delta sync: updated_at index and delete tombstones
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # /portfolio/changes reads WHERE user_id = ? AND updated_at >= ?
+    op.create_index('idx_portfolio_user_updated', 'portfolio', ['user_id', 'updated_at'], if_not_exists=True)
+
+    op.create_table(
+        'portfolio_tombstones',
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('portfolio_id', sa.Integer, nullable=False),
+        sa.Column('user_id', sa.String(255), nullable=False),
+        sa.Column('deleted_at', sa.DateTime, nullable=False),
+    )
+    op.create_index('idx_portfolio_tombstones_user_deleted', 'portfolio_tombstones', ['user_id', 'deleted_at'])
+    op.create_index('idx_portfolio_tombstones_deleted_at', 'portfolio_tombstones', ['deleted_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('portfolio_tombstones')
+    op.drop_index('idx_portfolio_user_updated', table_name='portfolio', if_exists=True)
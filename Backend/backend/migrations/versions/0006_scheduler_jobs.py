@@ -0,0 +1,41 @@
+"""Scheduler job leases and run history
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'job_leases',
+        sa.Column('job_name', sa.String(100), primary_key=True),
+        sa.Column('owner', sa.String(255), nullable=False),
+        sa.Column('expires_at', sa.DateTime, nullable=False),
+    )
+
+    op.create_table(
+        'job_runs',
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('job_name', sa.String(100), nullable=False),
+        sa.Column('owner', sa.String(255), nullable=False),
+        sa.Column('started_at', sa.DateTime, nullable=False),
+        sa.Column('duration_ms', sa.Float, nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('error', sa.Text),
+    )
+    op.create_index('idx_job_runs_job_started', 'job_runs', ['job_name', 'started_at'])
+    op.create_index('idx_job_runs_started_at', 'job_runs', ['started_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('job_runs')
+    op.drop_table('job_leases')
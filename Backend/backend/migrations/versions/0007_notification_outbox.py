@@ -0,0 +1,36 @@
+"""Transactional notification outbox
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'notification_outbox',
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('kind', sa.String(50), nullable=False),
+        sa.Column('recipient', sa.String(255), nullable=False),
+        sa.Column('payload', sa.Text, nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('available_at', sa.DateTime, nullable=False),
+        sa.Column('claimed_by', sa.String(255)),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+        sa.Column('sent_at', sa.DateTime),
+        sa.Column('last_error', sa.Text),
+    )
+    op.create_index('idx_notification_outbox_status_available', 'notification_outbox', ['status', 'available_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('notification_outbox')
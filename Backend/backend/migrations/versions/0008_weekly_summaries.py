@@ -0,0 +1,30 @@
+"""Weekly summaries: link notification preferences to Auth0 users
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Portfolios are keyed by Auth0 user ID and preferences by email; the
+    # weekly summary job joins them on this column
+    with op.batch_alter_table('notification_preferences') as batch:
+        batch.add_column(sa.Column('user_id', sa.String(255)))
+    # The job reads WHERE weekly_summary_enabled = 1 ORDER BY user_id
+    op.create_index('idx_notification_preferences_weekly_user', 'notification_preferences',
+                    ['weekly_summary_enabled', 'user_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_notification_preferences_weekly_user', table_name='notification_preferences')
+    with op.batch_alter_table('notification_preferences') as batch:
+        batch.drop_column('user_id')
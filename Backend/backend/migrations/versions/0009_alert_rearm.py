@@ -0,0 +1,30 @@
+"""Alert cooldowns, hysteresis and automatic re-arming
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2025-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('alerts') as batch:
+        batch.add_column(sa.Column('auto_rearm', sa.Integer, nullable=False, server_default='0'))
+        batch.add_column(sa.Column('armed', sa.Integer, nullable=False, server_default='1'))
+        batch.add_column(sa.Column('cooldown_seconds', sa.Integer))
+        batch.add_column(sa.Column('hysteresis_pct', sa.Float))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('alerts') as batch:
+        batch.drop_column('hysteresis_pct')
+        batch.drop_column('cooldown_seconds')
+        batch.drop_column('armed')
+        batch.drop_column('auto_rearm')
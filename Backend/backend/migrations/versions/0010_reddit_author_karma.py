@@ -0,0 +1,29 @@
+"""Reddit author karma cache
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2025-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'reddit_author_karma',
+        sa.Column('username', sa.String(255), primary_key=True),
+        sa.Column('karma', sa.Integer),
+        sa.Column('fetched_at', sa.DateTime, nullable=False),
+        sa.Column('expires_at', sa.DateTime, nullable=False),
+    )
+    op.create_index('idx_reddit_author_karma_expires_at', 'reddit_author_karma', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('reddit_author_karma')
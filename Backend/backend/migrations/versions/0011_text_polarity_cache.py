@@ -0,0 +1,28 @@
+"""Text polarity cache
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2025-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'text_polarity',
+        sa.Column('content_hash', sa.String(64), primary_key=True),
+        sa.Column('polarity', sa.Float, nullable=False),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+    )
+    op.create_index('idx_text_polarity_created_at', 'text_polarity', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('text_polarity')
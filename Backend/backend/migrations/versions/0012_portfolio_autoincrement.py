@@ -0,0 +1,40 @@
+"""Portfolio ids are never reused (AUTOINCREMENT)
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2025-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Without AUTOINCREMENT SQLite hands a deleted max rowid to the next insert,
+    # so a delta sync could list one id as both changed and deleted. Adding it
+    # means rebuilding the table.
+    with op.batch_alter_table('portfolio', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}):
+        pass
+
+    # Ids already handed out and deleted (still tombstoned) must not come back either
+    op.execute(sa.text("""
+        UPDATE sqlite_sequence
+        SET seq = MAX(seq, COALESCE((SELECT MAX(portfolio_id) FROM portfolio_tombstones), 0))
+        WHERE name = 'portfolio'
+    """))
+    op.execute(sa.text("""
+        INSERT INTO sqlite_sequence (name, seq)
+        SELECT 'portfolio', COALESCE((SELECT MAX(portfolio_id) FROM portfolio_tombstones), 0)
+        WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'portfolio')
+    """))
+
+
+def downgrade() -> None:
+    # Nothing to undo: earlier revisions work unchanged on the AUTOINCREMENT table
+    pass
@@ -0,0 +1,27 @@
+"""Change counters for in-memory mirrors (alert index)
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2025-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'change_counters',
+        sa.Column('name', sa.String(100), primary_key=True),
+        sa.Column('version', sa.Integer, nullable=False),
+    )
+    op.execute(sa.text("INSERT INTO change_counters (name, version) VALUES ('alerts', 0)"))
+
+
+def downgrade() -> None:
+    op.drop_table('change_counters')
@@ -0,0 +1,31 @@
+"""Shared push event log so every worker can fan out live events
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2025-10-20
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0014'
+down_revision = '0013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'push_events',
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('topic', sa.String(300), nullable=False),
+        sa.Column('event_type', sa.String(50), nullable=False),
+        sa.Column('data', sa.Text, nullable=False),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+    )
+    op.create_index('idx_push_events_created_at', 'push_events', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_push_events_created_at', table_name='push_events')
+    op.drop_table('push_events')
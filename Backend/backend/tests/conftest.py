@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Shared fixtures for DimeDrop backend tests
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from app.core.models import SessionLocal
+from app.core.database import NotificationOperations, run_migrations
+from app.core.author_karma import author_karma_cache
+from app.core.polarity_cache import polarity_cache
+
+
+@pytest.fixture
+def migrated_engine(tmp_path):
+    """Scratch SQLite database migrated to head, bound to the shared SessionLocal"""
+    db_url = f"sqlite:///{tmp_path / 'dimedrop_test.db'}"
+    run_migrations(db_url)
+
+    engine = create_engine(db_url, connect_args={'check_same_thread': False})
+    original_bind = SessionLocal.kw.get('bind')
+    SessionLocal.configure(bind=engine)
+    # Process-wide caches would otherwise leak rows between scratch databases
+    NotificationOperations._preferences_cache.clear()
+    NotificationOperations._preferences_version = None
+    NotificationOperations._version_checked_at = float("-inf")
+    author_karma_cache.clear()
+    polarity_cache.clear()
+    yield engine
+    SessionLocal.configure(bind=original_bind)
+    engine.dispose()
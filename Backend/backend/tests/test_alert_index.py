@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Tests for the price-indexed alert matching engine
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from app.core.alert_index import AlertIndex
+from app.core.alerts_tracker import AlertsTracker, alert_index
+from app.core.database import AlertOperations, CacheOperations
+
+
+def make_index(alerts):
+    index = AlertIndex(loader=lambda: alerts)
+    index.reload()
+    return index
+
+
+@pytest.fixture
+def tracker(migrated_engine):
+    alert_index.reload()
+    yield AlertsTracker()
+    alert_index.loaded = False
+
+
+class TestAlertIndex:
+    """Test cases for AlertIndex matching and maintenance"""
+
+    def test_match_returns_exactly_crossed_alerts(self):
+        index = make_index([
+            {'id': 1, 'card_name': 'Wembanyama Prizm', 'target_price': 100.0, 'alert_type': 'above'},
+            {'id': 2, 'card_name': 'Wembanyama Prizm', 'target_price': 150.0, 'alert_type': 'above'},
+            {'id': 3, 'card_name': 'Wembanyama Prizm', 'target_price': 200.0, 'alert_type': 'above'},
+            {'id': 4, 'card_name': 'Wembanyama Prizm', 'target_price': 150.0, 'alert_type': 'below'},
+            {'id': 5, 'card_name': 'Wembanyama Prizm', 'target_price': 120.0, 'alert_type': 'below'},
+            {'id': 6, 'card_name': 'Luka Doncic Auto', 'target_price': 10.0, 'alert_type': 'above'},
+        ])
+
+        assert sorted(index.match('Wembanyama Prizm', 150.0)) == [1, 2, 4]
+        assert sorted(index.match('Wembanyama Prizm ', 110.0)) == [1, 4, 5]
+        assert index.match('Wembanyama Prizm', 250.0) == [1, 2, 3]
+        assert index.match('LeBron James', 150.0) == []
+
+    def test_add_discard_and_sync(self):
+        index = make_index([])
+        index.add(1, 'LeBron James', 50.0, 'above')
+        index.add(2, 'LeBron James', 60.0, 'above')
+        assert index.match('LeBron James', 55.0) == [1]
+
+        index.add(1, 'LeBron James', 70.0, 'above')  # re-index at a new target
+        assert index.match('LeBron James', 65.0) == [2]
+
+        index.sync({'id': 2, 'card_name': 'LeBron James', 'target_price': 60.0,
+                    'alert_type': 'above', 'is_active': False})
+        assert index.match('LeBron James', 100.0) == [1]
+        assert index.discard(1)
+        assert not index.discard(1)
+        assert len(index) == 0 and index.cards() == []
+
+    def test_rebuilds_when_version_moves(self):
+        alerts, version, now = [], [0], [100.0]
+        index = AlertIndex(loader=lambda: list(alerts), version_loader=lambda: version[0], refresh_seconds=10)
+        index.clock = lambda: now[0]
+        index.ensure_current()
+
+        # Another worker adds an alert: unseen until the next version check is due
+        alerts.append({'id': 1, 'card_name': 'LeBron James', 'target_price': 50.0, 'alert_type': 'above'})
+        version[0] += 1
+        index.ensure_current()
+        assert index.match('LeBron James', 60.0) == []
+
+        now[0] += 10
+        index.ensure_current()
+        assert index.match('LeBron James', 60.0) == [1]
+
+        alerts.clear()
+        index.ensure_current(max_age=0)  # same version: nothing reloaded
+        assert index.match('LeBron James', 60.0) == [1]
+
+
+class TestAlertsTrackerIndex:
+    """Test cases for AlertsTracker evaluating alerts through the index"""
+
+    @pytest.mark.asyncio
+    async def test_evaluate_price_triggers_once(self, tracker):
+        above = await tracker.create_alert({'card_name': 'LeBron James', 'target_price': 80.0, 'alert_type': 'above'},
+                                           user_id="auth0|user1")
+        await tracker.create_alert({'card_name': 'LeBron James', 'target_price': 95.0, 'alert_type': 'above'},
+                                   user_id="auth0|user1")
+
+        triggered = await tracker.evaluate_price('LeBron James', 90.0)
+        assert [alert['id'] for alert in triggered] == [above['id']]
+        assert await tracker.evaluate_price('LeBron James', 90.0) == []
+
+        stored = AlertOperations.get_alerts_by_ids([above['id']])[0]
+        assert not stored['is_active']
+        assert stored['last_triggered']
+
+    @pytest.mark.asyncio
+    async def test_check_alerts_uses_index_and_updates(self, tracker):
+        alert = await tracker.create_alert({'card_name': 'Stephen Curry', 'target_price': 150.0, 'alert_type': 'above'},
+                                           user_id="auth0|user1")
+        CacheOperations.set_cached_price('Stephen Curry', {'avg_price': 120.0})
+        assert await tracker.check_alerts() == []
+
+        # Lowering the target re-indexes the alert; the cached price is 120
+        await tracker.update_alert(alert['id'], {'target_price': 110.0})
+        triggered = await tracker.check_alerts()
+        assert [a['id'] for a in triggered] == [alert['id']]
+        assert len(alert_index) == 0
+
+    @pytest.mark.asyncio
+    async def test_check_alerts_skips_cards_without_a_cached_price(self, tracker):
+        await tracker.create_alert({'card_name': 'Unknown Rookie', 'target_price': 1.0, 'alert_type': 'above'},
+                                   user_id="auth0|user1")
+        await tracker.create_alert({'card_name': 'Unknown Rookie', 'target_price': 500.0, 'alert_type': 'below'},
+                                   user_id="auth0|user1")
+
+        assert await tracker.check_alerts() == []
+        assert len(alert_index) == 2
+
+    @pytest.mark.asyncio
+    async def test_sees_alerts_written_by_other_workers(self, tracker, monkeypatch):
+        monkeypatch.setattr(alert_index, 'refresh_seconds', 0)
+        assert await tracker.evaluate_price('LeBron James', 90.0) == []
+
+        # Written straight to the table, as another worker process would
+        created = AlertOperations.create_alert('LeBron James', 80.0, 'above', user_id="auth0|user2")
+        doomed = AlertOperations.create_alert('LeBron James', 85.0, 'above', user_id="auth0|user2")
+        AlertOperations.delete_alert(doomed['id'])
+
+        triggered = await tracker.evaluate_price('LeBron James', 90.0)
+        assert [alert['id'] for alert in triggered] == [created['id']]
+
+    @pytest.mark.asyncio
+    async def test_index_loads_existing_alerts(self, tracker):
+        created = AlertOperations.create_alert('Stephen Curry', 100.0, 'above', user_id="auth0|user1")
+        CacheOperations.set_cached_price('Stephen Curry', {'avg_price': 120.0})
+        alert_index.loaded = False
+
+        triggered = await tracker.check_alerts()
+        assert [a['id'] for a in triggered] == [created['id']]
+
+
+class TestAlertRearm:
+    """Test cases for cooldowns, hysteresis and automatic re-arming"""
+
+    def test_rearm_needs_price_to_leave_the_band(self):
+        index = make_index([
+            {'id': 1, 'card_name': 'LeBron James', 'target_price': 100.0, 'alert_type': 'above',
+             'auto_rearm': True, 'hysteresis_pct': 5},
+            {'id': 2, 'card_name': 'LeBron James', 'target_price': 100.0, 'alert_type': 'below',
+             'auto_rearm': True, 'hysteresis_pct': 5},
+        ])
+        index.record_trigger([1, 2], datetime(2024, 1, 1))
+        assert index.match('LeBron James', 100.0) == []
+
+        assert index.rearm('LeBron James', 99.0) == []  # inside the band
+        assert index.rearm('LeBron James', 95.0) == [1]
+        assert index.rearm('LeBron James', 105.0) == [2]
+        assert sorted(index.match('LeBron James', 100.0)) == [1, 2]
+        assert index.stats['rearmed'] == 2
+
+    def test_one_shot_alerts_leave_the_index(self):
+        index = make_index([{'id': 1, 'card_name': 'LeBron James', 'target_price': 100.0, 'alert_type': 'above'}])
+        index.record_trigger([1], datetime(2024, 1, 1))
+
+        assert len(index) == 0
+        assert index.rearm('LeBron James', 50.0) == []
+
+    def test_cooldown_holds_back_recent_triggers(self):
+        last = datetime(2024, 1, 1, 12, 0)
+        index = AlertIndex(cooldown_seconds=600)
+        index.add(1, 'LeBron James', 100.0, 'above', last_triggered=last)
+        index.add(2, 'LeBron James', 100.0, 'above', last_triggered=last, cooldown_seconds=0)
+        index.add(3, 'LeBron James', 100.0, 'above')
+
+        assert index.split_cooldown([1, 2, 3], last + timedelta(minutes=5)) == ([2, 3], [1])
+        assert index.split_cooldown([1], last + timedelta(minutes=10)) == ([1], [])
+        assert index.stats['suppressed'] == 1
+
+    def test_reload_restores_disarmed_alerts(self):
+        index = make_index([{'id': 1, 'card_name': 'LeBron James', 'target_price': 100.0, 'alert_type': 'above',
+                             'auto_rearm': True, 'armed': False, 'hysteresis_pct': 10}])
+
+        assert index.match('LeBron James', 120.0) == []
+        assert index.rearm('LeBron James', 90.0) == [1]
+        assert index.cards() == ['LeBron James']
+
+
+class TestAlertsTrackerRearm:
+    """Test cases for the tracker applying trigger rules"""
+
+    @pytest.mark.asyncio
+    async def test_oscillating_price_fires_once_per_cycle(self, tracker):
+        alert = await tracker.create_alert({'card_name': 'LeBron James', 'target_price': 100.0, 'alert_type': 'above',
+                                            'auto_rearm': True, 'hysteresis_pct': 5, 'cooldown_seconds': 0},
+                                           user_id="auth0|user1")
+
+        fired = [len(await tracker.evaluate_price('LeBron James', price))
+                 for price in (101.0, 99.0, 101.0, 99.0, 94.0, 101.0)]
+
+        assert fired == [1, 0, 0, 0, 0, 1]
+        stored = AlertOperations.get_alerts_by_ids([alert['id']])[0]
+        assert stored['is_active'] and not stored['armed']
+
+    @pytest.mark.asyncio
+    async def test_cooldown_suppresses_and_counts(self, tracker):
+        await tracker.create_alert({'card_name': 'LeBron James', 'target_price': 100.0, 'alert_type': 'above',
+                                    'auto_rearm': True, 'hysteresis_pct': 5, 'cooldown_seconds': 3600},
+                                   user_id="auth0|user1")
+        suppressed = alert_index.stats['suppressed']
+
+        assert len(await tracker.evaluate_price('LeBron James', 101.0)) == 1
+        assert await tracker.evaluate_price('LeBron James', 90.0) == []  # re-arms
+        assert await tracker.evaluate_price('LeBron James', 101.0) == []
+
+        assert alert_index.stats['suppressed'] == suppressed + 1
+
+    @pytest.mark.asyncio
+    async def test_reactivating_a_one_shot_alert_arms_it(self, tracker):
+        alert = await tracker.create_alert({'card_name': 'LeBron James', 'target_price': 100.0, 'alert_type': 'above',
+                                            'cooldown_seconds': 0}, user_id="auth0|user1")
+        assert len(await tracker.evaluate_price('LeBron James', 101.0)) == 1
+        assert not AlertOperations.get_alerts_by_ids([alert['id']])[0]['is_active']
+
+        await tracker.update_alert(alert['id'], {'is_active': True})
+
+        assert len(await tracker.evaluate_price('LeBron James', 101.0)) == 1
+
+    @pytest.mark.asyncio
+    async def test_index_reload_keeps_rearm_state(self, tracker):
+        await tracker.create_alert({'card_name': 'LeBron James', 'target_price': 100.0, 'alert_type': 'above',
+                                    'auto_rearm': True, 'hysteresis_pct': 5, 'cooldown_seconds': 0},
+                                   user_id="auth0|user1")
+        await tracker.evaluate_price('LeBron James', 101.0)
+        alert_index.reload()
+
+        assert await tracker.evaluate_price('LeBron James', 101.0) == []
+        await tracker.evaluate_price('LeBron James', 94.0)
+        alert_index.reload()
+        assert len(await tracker.evaluate_price('LeBron James', 101.0)) == 1
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for the Reddit author karma cache
+"""
+
+import asyncio
+import time
+import pytest
+from app.core import author_karma
+from app.core.author_karma import AuthorKarmaCache
+from app.core.database import AuthorKarmaOperations
+from app.core.sentiment_analyzer import SentimentAnalyzer
+
+AUTHORS = {'wemby_fan': 't2_wemby', 'card_flipper': 't2_flip', 'deleted_user': 't2_gone'}
+KARMA = {'wemby_fan': 500, 'card_flipper': 12000}
+
+
+class FakeFetcher:
+    """Batch karma fetch that records every call"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, authors):
+        self.calls.append(dict(authors))
+        return {username: KARMA.get(username) for username in authors}
+
+
+class TestAuthorKarmaCache:
+    """Test cases for AuthorKarmaCache lookups"""
+
+    @pytest.mark.asyncio
+    async def test_inline_fetch_then_memory(self, migrated_engine):
+        cache, fetcher = AuthorKarmaCache(fetch_mode='inline'), FakeFetcher()
+
+        assert await cache.lookup(AUTHORS, fetcher) == {'wemby_fan': 500, 'card_flipper': 12000,
+                                                        'deleted_user': None}
+        assert await cache.lookup(AUTHORS, fetcher) == {'wemby_fan': 500, 'card_flipper': 12000,
+                                                        'deleted_user': None}
+
+        assert fetcher.calls == [AUTHORS]
+        assert cache.stats['memory_hits'] == 3
+
+    @pytest.mark.asyncio
+    async def test_karma_is_shared_through_sqlite(self, migrated_engine):
+        await AuthorKarmaCache(fetch_mode='inline').lookup(AUTHORS, FakeFetcher())
+
+        # A fresh process (or another worker) starts with an empty memory cache
+        cache, fetcher = AuthorKarmaCache(fetch_mode='inline'), FakeFetcher()
+        karma = await cache.lookup(AUTHORS, fetcher)
+
+        assert karma['card_flipper'] == 12000
+        assert fetcher.calls == []
+        assert cache.stats['db_hits'] == 3
+
+    @pytest.mark.asyncio
+    async def test_background_fetch_fills_later_requests(self, migrated_engine):
+        cache, fetcher, released = AuthorKarmaCache(fetch_mode='background'), FakeFetcher(), asyncio.Event()
+
+        async def slow_fetch(authors):
+            await released.wait()
+            return await fetcher(authors)
+
+        first, second = await cache.lookup(AUTHORS, slow_fetch), await cache.lookup(AUTHORS, slow_fetch)
+        released.set()
+        await cache.wait()
+
+        assert first == second == {username: None for username in AUTHORS}
+        assert fetcher.calls == [AUTHORS]  # in-flight authors aren't fetched twice
+        assert (await cache.lookup(AUTHORS, fetcher))['wemby_fan'] == 500
+
+    @pytest.mark.asyncio
+    async def test_off_never_fetches(self, migrated_engine):
+        cache, fetcher = AuthorKarmaCache(fetch_mode='off'), FakeFetcher()
+
+        assert await cache.lookup(AUTHORS, fetcher) == {username: None for username in AUTHORS}
+        assert fetcher.calls == []
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_is_retried_later(self, migrated_engine):
+        cache = AuthorKarmaCache(fetch_mode='inline')
+
+        async def failing(authors):
+            raise TimeoutError()
+
+        assert await cache.lookup(AUTHORS, failing) == {username: None for username in AUTHORS}
+        fetcher = FakeFetcher()
+        assert (await cache.lookup(AUTHORS, fetcher))['wemby_fan'] == 500
+        assert fetcher.calls == [AUTHORS]
+
+    def test_expired_entries_are_ignored_and_cleaned_up(self, migrated_engine):
+        AuthorKarmaOperations.store_karma({'wemby_fan': 500}, ttl_seconds=-1)
+        AuthorKarmaOperations.store_karma({'card_flipper': 12000}, ttl_seconds=3600)
+
+        assert set(AuthorKarmaOperations.get_karma(list(AUTHORS))) == {'card_flipper'}
+        assert AuthorKarmaOperations.cleanup_expired() == 1
+
+
+class TestSentimentAuthorKarma:
+    """Test cases for author karma in SentimentAnalyzer's Reddit fetch"""
+
+    @pytest.mark.asyncio
+    async def test_repeat_requests_only_search(self, migrated_engine, monkeypatch):
+        monkeypatch.setenv('REDDIT_CLIENT_ID', 'test-reddit-client-id')
+        monkeypatch.setenv('REDDIT_CLIENT_SECRET', 'test-reddit-client-secret')
+        monkeypatch.setattr(author_karma.author_karma_cache, 'fetch_mode', 'inline')
+        analyzer, fetcher, searches = SentimentAnalyzer(), FakeFetcher(), []
+
+        def search(subreddit_name, card_name):
+            searches.append(subreddit_name)
+            return [{'title': "great pickup", 'selftext': '', 'score': 10, 'num_comments': 1,
+                     'created_utc': time.time(), 'subreddit': subreddit_name, 'author': username,
+                     'author_fullname': fullname, 'author_karma': None, 'post_age_hours': 1.0}
+                    for username, fullname in AUTHORS.items()]
+
+        monkeypatch.setattr(analyzer, '_search_subreddit', search)
+        monkeypatch.setattr(analyzer, '_fetch_author_karma', fetcher)
+
+        first = await analyzer._fetch_reddit_sentiment("Wembanyama Prizm")
+        second = await analyzer._fetch_reddit_sentiment("Wembanyama Prizm")
+
+        # One batched karma call for the first request, none for the second
+        assert fetcher.calls == [AUTHORS]
+        assert len(searches) == 2 * len(analyzer.target_subreddits)
+        assert {post['author']: post['author_karma'] for post in second['posts']} == {
+            'wemby_fan': 500, 'card_flipper': 12000, 'deleted_user': None
+        }
+        assert first['avg_sentiment'] == second['avg_sentiment']
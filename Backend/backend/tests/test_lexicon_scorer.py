@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the vectorized lexicon sentiment scorer
+"""
+
+import pytest
+from app.core.lexicon_scorer import LexiconScorer
+from app.core.sentiment_analyzer import SentimentAnalyzer, TextBlobScorer, get_scorer
+
+
+@pytest.fixture(scope='module')
+def scorer():
+    return LexiconScorer()
+
+
+class TestLexiconScorer:
+    """Test cases for LexiconScorer.score_batch"""
+
+    def test_tracks_textblob_on_plain_english(self, scorer):
+        texts = ["This is a great card", "not good at all", "very good!", "Terrible centering, really bad",
+                 "the price is not very good", "I love this set", "an awful, ugly pull"]
+
+        for text, lexicon, textblob in zip(texts, scorer.score_batch(texts), TextBlobScorer().score_batch(texts)):
+            assert lexicon == pytest.approx(textblob, abs=0.05), text
+
+    def test_card_market_terms(self, scorer):
+        gem, overpriced, fire, neutral = scorer.score_batch([
+            "Wemby PSA 10 gem mint", "overpriced, dump it", "this pull 🔥🔥", "Wemby Prizm base card, raw"
+        ])
+
+        assert gem > 0.5
+        assert overpriced < -0.5
+        assert fire > 0.5
+        assert neutral == 0.0
+
+    def test_phrases_and_modifiers_stay_within_a_document(self, scorer):
+        split_phrase, split_modifier = scorer.score_batch(["looks gem", "mint condition"]), \
+            scorer.score_batch(["very", "good"])
+
+        assert split_phrase == scorer.score_batch(["looks gem"]) + scorer.score_batch(["mint condition"])
+        assert split_modifier == [scorer.score_batch(["very"])[0], 0.7]
+
+    def test_negation_and_exclamation(self, scorer):
+        good, not_good, good_exclaimed = scorer.score_batch(["good", "not good", "good!"])
+
+        assert not_good == pytest.approx(-0.5 * good)
+        assert good_exclaimed == pytest.approx(min(good * 1.25, 1.0))
+
+    def test_batch_results_match_one_at_a_time(self, scorer):
+        texts = ["great card", "", "!!!", "overpriced", "not a bargain", "🚀🚀🚀 to the moon"]
+
+        assert scorer.score_batch(texts) == [scorer.score_batch([text])[0] for text in texts]
+        assert scorer.score_batch([]) == []
+
+    def test_custom_lexicon(self):
+        scorer = LexiconScorer({'heater': 0.9, 'brick wall': -0.4})
+
+        assert scorer.score_batch(["heater", "brick wall", "great"]) == [0.9, -0.4, 0.0]
+
+
+class TestScorerSelection:
+    """Test cases for choosing the sentiment scorer backend"""
+
+    def test_scorer_from_environment(self, monkeypatch):
+        monkeypatch.setenv('SENTIMENT_SCORER', 'lexicon')
+
+        assert isinstance(SentimentAnalyzer().scorer, LexiconScorer)
+
+    def test_textblob_failures_score_none(self, monkeypatch):
+        def fail(text):
+            raise ValueError("bad input")
+
+        monkeypatch.setattr('app.core.sentiment_analyzer.TextBlob', fail)
+
+        assert TextBlobScorer().score_batch(["great card"]) == [None]
+
+    def test_unknown_scorer(self):
+        with pytest.raises(ValueError):
+            get_scorer('vader')
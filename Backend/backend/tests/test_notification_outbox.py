@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Tests for the transactional notification outbox and its drainer
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from app.core import alerts_tracker as alerts_module
+from app.core.alerts_tracker import AlertsTracker, alert_index
+from app.core.database import AlertOperations, NotificationOperations, OutboxOperations
+from app.core.models import NotificationOutbox, SessionLocal
+from app.core.notification_outbox import OutboxDrainer
+from app.core.notification_queue import LocalTransport
+from app.core.notification_service import NotificationService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """NotificationService with an in-process transport"""
+    monkeypatch.setenv('NOTIFICATION_TRANSPORT', 'local')
+    return NotificationService()
+
+
+def add_rows(count, recipient="a@example.com"):
+    db = SessionLocal()
+    for i in range(count):
+        OutboxOperations.enqueue(db, 'price_alert', recipient, {
+            'alert_id': i, 'card_name': f"Card {i}", 'target_price': 10.0, 'condition': 'above',
+            'current_price': 12.0, 'triggered_at': datetime(2024, 1, 1).isoformat(),
+        })
+    db.commit()
+    db.close()
+
+
+def rows_by_status():
+    db = SessionLocal()
+    statuses = {}
+    for row in db.query(NotificationOutbox).all():
+        statuses.setdefault(row.status, []).append(row)
+    db.close()
+    return statuses
+
+
+class TestTriggerAlerts:
+    """Test cases for writing alert state and outbox rows together"""
+
+    def test_fired_alerts_get_outbox_rows(self, migrated_engine):
+        alert = AlertOperations.create_alert('LeBron James', 100.0, 'above', user_id="auth0|user1")
+
+        fired = AlertOperations.trigger_alerts([alert['id']], datetime(2024, 1, 1), 120.0,
+                                               recipient_for=lambda alert: "a@example.com")
+        again = AlertOperations.trigger_alerts([alert['id']], datetime(2024, 1, 1), 120.0,
+                                               recipient_for=lambda alert: "a@example.com")
+
+        assert [a['id'] for a in fired] == [alert['id']]
+        assert again == []
+        [row] = rows_by_status()['pending']
+        assert row.recipient == "a@example.com"
+        assert '"current_price": 120.0' in row.payload
+
+    def test_outbox_failure_rolls_back_the_alert(self, migrated_engine, monkeypatch):
+        alert = AlertOperations.create_alert('LeBron James', 100.0, 'above', user_id="auth0|user1")
+
+        def broken(*args, **kwargs):
+            raise RuntimeError("disk full")
+
+        monkeypatch.setattr(OutboxOperations, 'enqueue', broken)
+        assert AlertOperations.trigger_alerts([alert['id']], datetime(2024, 1, 1), 120.0,
+                                              recipient_for=lambda alert: "a@example.com") == []
+
+        assert AlertOperations.get_alerts_by_ids([alert['id']])[0]['is_active']
+
+    @pytest.mark.asyncio
+    async def test_evaluate_price_writes_outbox(self, migrated_engine, service, monkeypatch):
+        monkeypatch.setattr(alerts_module, 'notification_service', service)
+        alert_index.reload()
+        try:
+            tracker = AlertsTracker()
+            await tracker.create_alert({'card_name': 'Wembanyama Prizm', 'target_price': 150.0,
+                                        'alert_type': 'above'}, user_id="auth0|user1")
+            triggered = await tracker.evaluate_price('Wembanyama Prizm', 160.0)
+        finally:
+            alert_index.loaded = False
+
+        assert len(triggered) == 1
+        assert len(rows_by_status()['pending']) == 1
+
+
+class TestOutboxClaims:
+    """Test cases for batch claiming"""
+
+    def test_claims_are_disjoint(self, migrated_engine):
+        add_rows(10)
+
+        first = OutboxOperations.claim_batch('worker-a', limit=6)
+        second = OutboxOperations.claim_batch('worker-b', limit=6)
+
+        assert len(first) == 6 and len(second) == 4
+        assert not {row['id'] for row in first} & {row['id'] for row in second}
+        assert OutboxOperations.claim_batch('worker-c') == []
+
+    def test_expired_claims_are_reclaimed(self, migrated_engine):
+        add_rows(1)
+        [row] = OutboxOperations.claim_batch('worker-a', lease_seconds=-1)
+
+        [reclaimed] = OutboxOperations.claim_batch('worker-b')
+
+        assert reclaimed['id'] == row['id']
+        assert reclaimed['attempts'] == 2
+        # The original claimant can no longer complete it
+        assert OutboxOperations.complete([row['id']], 'worker-a') == 0
+        assert OutboxOperations.complete([row['id']], 'worker-b') == 1
+
+    def test_rows_whose_claims_keep_expiring_are_failed(self, migrated_engine):
+        add_rows(2)
+        OutboxOperations.claim_batch('worker-a', limit=1, lease_seconds=-1)
+        OutboxOperations.claim_batch('worker-b', limit=1, lease_seconds=-1, max_attempts=2)
+
+        claimed = OutboxOperations.claim_batch('worker-c', max_attempts=2)
+
+        assert [row['attempts'] for row in claimed] == [1]
+        [failed] = rows_by_status()['failed']
+        assert failed.attempts == 2 and 'claim expired' in failed.last_error
+
+    def test_backlog(self, migrated_engine):
+        add_rows(3)
+        OutboxOperations.claim_batch('worker-a', limit=1)
+
+        backlog = OutboxOperations.get_backlog()
+
+        assert backlog['pending'] == 2
+        assert backlog['sending'] == 1
+        assert backlog['failed'] == 0
+        assert backlog['oldest_pending_seconds'] >= 0
+
+    def test_cleanup_keeps_failed_rows(self, migrated_engine):
+        add_rows(2)
+        sent, failed = OutboxOperations.claim_batch('worker-a')
+        OutboxOperations.complete([sent['id']], 'worker-a')
+        OutboxOperations.fail([failed['id']], 'worker-a', "bounced")
+
+        assert OutboxOperations.cleanup(retention_days=-1) == 1
+        assert [row.id for row in rows_by_status()['failed']] == [failed['id']]
+
+
+class TestOutboxDrainer:
+    """Test cases for OutboxDrainer delivery"""
+
+    @pytest.mark.asyncio
+    async def test_drains_and_marks_sent(self, migrated_engine, service):
+        NotificationOperations.create_or_update_notification_preferences("a@example.com")
+        add_rows(5)
+        drainer = OutboxDrainer(service=service, owner='worker-a', batch_size=3)
+
+        assert await drainer.drain_once() == 3
+        assert await drainer.drain_once() == 2
+        assert await drainer.drain_once() == 0
+
+        assert len(service.transport.sent) == 5
+        assert len(rows_by_status()['sent']) == 5
+
+    @pytest.mark.asyncio
+    async def test_opted_out_recipients_are_skipped(self, migrated_engine, service):
+        NotificationOperations.create_or_update_notification_preferences("a@example.com", alert_trigger_notifications=False)
+        add_rows(2, recipient="a@example.com")
+        add_rows(1, recipient="no-prefs@example.com")
+
+        await OutboxDrainer(service=service, owner='worker-a').drain_once()
+
+        assert service.transport.sent == []
+        assert len(rows_by_status()['skipped']) == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_sends_are_retried_later(self, migrated_engine, service):
+        NotificationOperations.create_or_update_notification_preferences("a@example.com")
+        service.transport = LocalTransport(failures=1)
+        add_rows(1)
+        drainer = OutboxDrainer(service=service, owner='worker-a', backoff_base=60)
+
+        await drainer.drain_once()
+        [row] = rows_by_status()['pending']
+        assert row.attempts == 1 and row.last_error
+        assert row.available_at > datetime.utcnow() + timedelta(seconds=20)
+        # Not due yet
+        assert await drainer.drain_once() == 0
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self, migrated_engine, service):
+        NotificationOperations.create_or_update_notification_preferences("a@example.com")
+        service.transport = LocalTransport(failures=10)
+        add_rows(1)
+        drainer = OutboxDrainer(service=service, owner='worker-a', max_attempts=2, backoff_base=0)
+
+        await drainer.drain_once()
+        await drainer.drain_once()
+
+        assert len(rows_by_status()['failed']) == 1
+        assert drainer.stats['retried'] == 1
+        assert drainer.stats['failed'] == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_batch_keeps_its_claims(self, migrated_engine, service):
+        NotificationOperations.create_or_update_notification_preferences("a@example.com")
+        service.transport = LocalTransport(latency=0.25)
+        add_rows(4)
+        # 4 sends one at a time take ~1s against a 0.3s lease
+        drainer = OutboxDrainer(service=service, owner='worker-a', concurrency=1, lease_seconds=0.3)
+
+        drain = asyncio.create_task(drainer.drain_once())
+        await asyncio.sleep(0.6)
+        assert await asyncio.to_thread(OutboxOperations.claim_batch, 'worker-b') == []
+        await drain
+
+        assert len(service.transport.sent) == 4
+        assert len(rows_by_status()['sent']) == 4
+
+    @pytest.mark.asyncio
+    async def test_digest_mode_groups_by_recipient(self, migrated_engine, service):
+        NotificationOperations.create_or_update_notification_preferences("a@example.com")
+        NotificationOperations.create_or_update_notification_preferences("b@example.com")
+        service.digest_window = 1
+        add_rows(3, recipient="a@example.com")
+        add_rows(1, recipient="b@example.com")
+
+        await OutboxDrainer(service=service, owner='worker-a').drain_once()
+
+        subjects = sorted(message.subject for message in service.transport.sent)
+        assert subjects == ['🎯 3 Price Alerts Triggered', '🎯 Price Alert Triggered: Card 0']
+        assert len(rows_by_status()['sent']) == 4
+
+    @pytest.mark.asyncio
+    async def test_start_and_stop(self, migrated_engine, service):
+        NotificationOperations.create_or_update_notification_preferences("a@example.com")
+        drainer = OutboxDrainer(service=service, owner='worker-a', poll_interval=60)
+        await drainer.start()
+
+        add_rows(2)
+        drainer.notify()
+        for _ in range(100):
+            if len(service.transport.sent) == 2:
+                break
+            await asyncio.sleep(0.02)
+        await drainer.stop()
+
+        assert len(service.transport.sent) == 2
+        assert not drainer.running
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Tests for cached notification preference lookups
+"""
+
+import pytest
+from sqlalchemy import event
+from app.core.database import ChangeCounterOperations, NotificationOperations
+from app.core.models import NotificationPreferences, SessionLocal
+from app.core.ttl_cache import MISSING, TTLCache
+
+
+@pytest.fixture
+def select_count(migrated_engine):
+    """Number of SELECTs against notification_preferences issued during a test"""
+    counter = {'selects': 0}
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'notification_preferences' in statement:
+            counter['selects'] += 1
+
+    event.listen(migrated_engine, 'before_cursor_execute', count)
+    yield counter
+    event.remove(migrated_engine, 'before_cursor_execute', count)
+
+
+class TestPreferencesCache:
+    """Test cases for the read-through preferences cache"""
+
+    def test_repeat_lookups_hit_the_cache(self, select_count):
+        NotificationOperations.create_or_update_notification_preferences("a@example.com")
+        select_count['selects'] = 0
+
+        for _ in range(5):
+            prefs = NotificationOperations.get_notification_preferences("a@example.com")
+            assert prefs['email_notifications_enabled'] is True
+
+        assert select_count['selects'] == 1
+
+    def test_missing_users_are_cached(self, select_count):
+        assert NotificationOperations.get_notification_preferences("nobody@example.com") is None
+        assert NotificationOperations.get_notification_preferences("nobody@example.com") is None
+        assert select_count['selects'] == 1
+
+    def test_update_invalidates(self, migrated_engine):
+        NotificationOperations.create_or_update_notification_preferences("a@example.com")
+        assert NotificationOperations.get_notification_preferences("a@example.com")['weekly_summary_enabled'] is False
+
+        NotificationOperations.create_or_update_notification_preferences("a@example.com", weekly_summary_enabled=True)
+
+        assert NotificationOperations.get_notification_preferences("a@example.com")['weekly_summary_enabled'] is True
+
+    def test_delete_invalidates(self, migrated_engine):
+        NotificationOperations.create_or_update_notification_preferences("a@example.com")
+        assert NotificationOperations.get_notification_preferences("a@example.com") is not None
+
+        NotificationOperations.delete_notification_preferences("a@example.com")
+
+        assert NotificationOperations.get_notification_preferences("a@example.com") is None
+
+    def test_caller_session_update_invalidates_on_commit(self, migrated_engine):
+        NotificationOperations.create_or_update_notification_preferences("a@example.com")
+        db = SessionLocal()
+        NotificationOperations.create_or_update_notification_preferences("a@example.com", push_notifications_enabled=True, db=db)
+
+        # Read before the caller commits re-caches the old row...
+        assert NotificationOperations.get_notification_preferences("a@example.com")['push_notifications_enabled'] is False
+        db.commit()
+        db.close()
+
+        # ...and the commit drops it again
+        assert NotificationOperations.get_notification_preferences("a@example.com")['push_notifications_enabled'] is True
+
+    def test_changes_by_other_workers_clear_the_cache(self, migrated_engine, monkeypatch):
+        NotificationOperations.create_or_update_notification_preferences("a@example.com")
+        assert NotificationOperations.get_notification_preferences("a@example.com")['email_notifications_enabled'] is True
+        assert NotificationOperations.get_notification_preferences_bulk(["a@example.com"])["a@example.com"] is not None
+
+        # Another worker unsubscribes: it commits and bumps the counter, but can't touch this cache
+        db = SessionLocal()
+        db.query(NotificationPreferences).filter(NotificationPreferences.email == "a@example.com").update(
+            {'email_notifications_enabled': 0}
+        )
+        ChangeCounterOperations.bump(db, 'notification_preferences')
+        db.commit()
+        db.close()
+
+        # The outbox's bulk lookup checks the counter on every call
+        bulk = NotificationOperations.get_notification_preferences_bulk(["a@example.com"])
+        assert bulk["a@example.com"]['email_notifications_enabled'] is False
+
+        # Single lookups check it once the interval has passed
+        db = SessionLocal()
+        db.query(NotificationPreferences).delete()
+        ChangeCounterOperations.bump(db, 'notification_preferences')
+        db.commit()
+        db.close()
+        assert NotificationOperations.get_notification_preferences("a@example.com") is not None
+        monkeypatch.setattr(NotificationOperations, 'PREFERENCES_VERSION_CHECK_SECONDS', 0)
+        assert NotificationOperations.get_notification_preferences("a@example.com") is None
+
+    def test_writes_bump_the_change_counter(self, migrated_engine):
+        NotificationOperations.create_or_update_notification_preferences("a@example.com")
+        NotificationOperations.create_or_update_notification_preferences("a@example.com", db=None)
+        NotificationOperations.delete_notification_preferences("a@example.com")
+        NotificationOperations.delete_notification_preferences("a@example.com")  # nothing to delete
+
+        assert ChangeCounterOperations.get_version('notification_preferences') == 3
+
+    def test_returned_dicts_are_copies(self, migrated_engine):
+        NotificationOperations.create_or_update_notification_preferences("a@example.com")
+        NotificationOperations.get_notification_preferences("a@example.com")['email_notifications_enabled'] = False
+
+        assert NotificationOperations.get_notification_preferences("a@example.com")['email_notifications_enabled'] is True
+
+
+class TestBulkPreferences:
+    """Test cases for get_notification_preferences_bulk"""
+
+    def test_one_query_for_all_misses(self, select_count):
+        emails = [f"user{i}@example.com" for i in range(20)]
+        for email in emails[:10]:
+            NotificationOperations.create_or_update_notification_preferences(email)
+        NotificationOperations.get_notification_preferences(emails[0])
+        select_count['selects'] = 0
+
+        prefs = NotificationOperations.get_notification_preferences_bulk(emails)
+
+        assert select_count['selects'] == 1
+        assert set(prefs) == set(emails)
+        assert all(prefs[email]['email'] == email for email in emails[:10])
+        assert all(prefs[email] is None for email in emails[10:])
+
+        # Everything is cached now, users without preferences included
+        NotificationOperations.get_notification_preferences_bulk(emails)
+        assert select_count['selects'] == 1
+
+    def test_large_batches_are_chunked(self, migrated_engine, monkeypatch):
+        monkeypatch.setattr(NotificationOperations, 'BULK_FETCH_CHUNK', 3)
+        emails = [f"user{i}@example.com" for i in range(10)]
+        for email in emails:
+            NotificationOperations.create_or_update_notification_preferences(email)
+
+        prefs = NotificationOperations.get_notification_preferences_bulk(emails)
+
+        assert all(prefs[email]['email'] == email for email in emails)
+
+
+class TestTTLCache:
+    """Test cases for TTLCache expiry and eviction"""
+
+    def test_entries_expire(self):
+        now = [0.0]
+        cache = TTLCache(ttl_seconds=10, clock=lambda: now[0])
+        cache.set('a', None)
+
+        assert cache.get('a') is None
+        now[0] = 10.0
+        assert cache.get('a') is MISSING
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TTLCache(ttl_seconds=60, max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert cache.get('b') is MISSING
+        assert cache.get('a') == 1
+        assert cache.stats['evictions'] == 1
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for notification transports and email rendering
+"""
+
+from datetime import datetime
+import pytest
+from app.core.email_templates import get_template
+from app.core.notification_queue import EmailMessage, LocalTransport, TransportError
+from app.core.notification_service import NotificationService
+
+
+class TestNotificationService:
+    """Test cases for the notification service's transport"""
+
+    @pytest.mark.asyncio
+    async def test_no_transport_skips_email(self, monkeypatch):
+        monkeypatch.setenv('NOTIFICATION_TRANSPORT', 'sendgrid')
+        monkeypatch.delenv('SENDGRID_API_KEY', raising=False)
+        service = NotificationService()
+
+        assert service.transport is None
+        assert await service.send_test_notification('collector@example.com') is False
+
+    @pytest.mark.asyncio
+    async def test_local_transport_records_sends_and_failures(self):
+        transport = LocalTransport(failures=1, retryable=False)
+        message = EmailMessage(to="collector@example.com", subject="Alert", html="<p>hi</p>")
+
+        with pytest.raises(TransportError) as error:
+            await transport.send(message)
+        await transport.send(message)
+
+        assert error.value.retryable is False
+        assert transport.sent == [message]
+
+
+class TestNotificationTemplates:
+    """Test cases for the cached template environment"""
+
+    def test_templates_are_compiled_once(self):
+        assert get_template('price_alert.html') is get_template('price_alert.html')
+
+    def test_card_names_are_escaped(self):
+        service = NotificationService()
+        alert = {'card_name': '<b>Rookie</b> & Co', 'target_price': 10.0, 'condition': 'above',
+                 'current_price': 12.5, 'triggered_at': datetime(2024, 1, 1, 12, 0)}
+
+        html = service.render_price_alert('collector@example.com', alert).html
+
+        assert '&lt;b&gt;Rookie&lt;/b&gt; &amp; Co' in html
+        assert '$12.50' in html
+        assert '2024-01-01 12:00' in html
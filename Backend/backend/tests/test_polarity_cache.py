@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for memoized text polarity scores
+"""
+
+import time
+import pytest
+from app.core.polarity_cache import PolarityCache, clean_text, content_hash
+from app.core.sentiment_analyzer import SentimentAnalyzer
+
+
+class CountingScorer:
+    """Batch scorer that records every text it scores"""
+
+    def __init__(self):
+        self.texts = []
+
+    def __call__(self, texts):
+        self.texts.extend(texts)
+        return [0.5 if 'great' in text else -0.5 for text in texts]
+
+
+class TestPolarityCache:
+    """Test cases for PolarityCache.score_many"""
+
+    def test_each_distinct_document_is_scored_once(self, migrated_engine):
+        cache, scorer = PolarityCache(), CountingScorer()
+
+        first = cache.score_many(["great pickup", "overpriced junk", "great pickup"], 'test', scorer)
+        second = cache.score_many(["overpriced junk", "great pickup"], 'test', scorer)
+
+        assert first == [0.5, -0.5, 0.5]
+        assert second == [-0.5, 0.5]
+        assert scorer.texts == ["great pickup", "overpriced junk"]
+        assert cache.stats['memory_hits'] == 2
+
+    def test_scores_are_shared_through_sqlite(self, migrated_engine):
+        PolarityCache().score_many(["great pickup"], 'test', CountingScorer())
+
+        cache, scorer = PolarityCache(), CountingScorer()
+        assert cache.score_many(["great pickup"], 'test', scorer) == [0.5]
+        assert scorer.texts == []
+        assert cache.stats['db_hits'] == 1
+
+    def test_urls_and_whitespace_do_not_change_the_key(self, migrated_engine):
+        cache, scorer = PolarityCache(), CountingScorer()
+
+        cache.score_many(["great  pickup https://redd.it/abc"], 'test', scorer)
+        cache.score_many(["great pickup\nhttps://redd.it/xyz"], 'test', scorer)
+
+        assert scorer.texts == ["great pickup"]
+        assert clean_text(" great\tpickup http://x.co ") == "great pickup"
+
+    def test_scorers_do_not_share_scores(self, migrated_engine):
+        cache = PolarityCache()
+        cache.score_many(["great pickup"], 'textblob', CountingScorer())
+
+        other = CountingScorer()
+        cache.score_many(["great pickup"], 'lexicon', other)
+
+        assert other.texts == ["great pickup"]
+        assert content_hash('textblob', "great pickup") != content_hash('lexicon', "great pickup")
+
+    def test_failed_scores_are_not_cached(self, migrated_engine):
+        cache, texts = PolarityCache(), []
+
+        def flaky(batch):
+            texts.extend(batch)
+            return [None if len(texts) == 1 else 0.5 for _ in batch]
+
+        assert cache.score_many(["great pickup"], 'test', flaky) == [0.0]
+        assert cache.stats['failed'] == 1
+        assert cache.score_many(["great pickup"], 'test', flaky) == [0.5]
+        assert texts == ["great pickup", "great pickup"]
+        assert PolarityCache().score_many(["great pickup"], 'test', CountingScorer()) == [0.5]
+
+    def test_empty_texts_score_zero(self, migrated_engine):
+        cache, scorer = PolarityCache(), CountingScorer()
+
+        assert cache.score_many(["", "   ", "https://redd.it/abc"], 'test', scorer) == [0.0, 0.0, 0.0]
+        assert scorer.texts == []
+
+
+class TestSentimentPolarityCache:
+    """Test cases for polarity memoization across sentiment queries"""
+
+    @pytest.mark.asyncio
+    async def test_overlapping_queries_score_posts_once(self, migrated_engine, monkeypatch):
+        monkeypatch.setenv('REDDIT_CLIENT_ID', 'test-reddit-client-id')
+        monkeypatch.setenv('REDDIT_CLIENT_SECRET', 'test-reddit-client-secret')
+        analyzer, scored = SentimentAnalyzer(), []
+        score_batch = analyzer.scorer.score_batch
+
+        def score(texts):
+            scored.extend(texts)
+            return score_batch(texts)
+
+        def search(subreddit_name, card_name):
+            # Every query finds the same thread, plus one post of its own
+            return [{'title': "Wemby rookie is a great buy", 'selftext': 'https://i.redd.it/1.jpg', 'score': 10,
+                     'num_comments': 1, 'created_utc': time.time(), 'subreddit': subreddit_name,
+                     'author_karma': None, 'post_age_hours': 1.0},
+                    {'title': f"{card_name} prices", 'selftext': '', 'score': 1, 'num_comments': 0,
+                     'created_utc': time.time(), 'subreddit': subreddit_name, 'author_karma': None,
+                     'post_age_hours': 1.0}]
+
+        monkeypatch.setattr(analyzer.scorer, 'score_batch', score)
+        monkeypatch.setattr(analyzer, '_search_subreddit', search)
+
+        results = [await analyzer._fetch_reddit_sentiment(query)
+                   for query in ("wembanyama", "wembanyama prizm", "wemby rookie")]
+
+        assert sorted(scored) == sorted(["Wemby rookie is a great buy", "wembanyama prices",
+                                         "wembanyama prizm prices", "wemby rookie prices"])
+        assert all(result['avg_sentiment'] > 0 for result in results)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for vectorized portfolio analytics
+"""
+
+import pytest
+from app.core.portfolio_analytics import PortfolioColumns, analyze, group_breakdown
+
+
+@pytest.fixture
+def entries():
+    return [
+        {'card_name': 'Wembanyama Prizm', 'buy_price': 120.0, 'quantity': 2, 'condition': 'PSA 10'},
+        {'card_name': 'LeBron James', 'buy_price': 60.0, 'quantity': 1, 'condition': 'Raw'},
+        {'card_name': 'Wembanyama Prizm', 'buy_price': 140.0, 'quantity': 1, 'condition': 'Raw'},
+        {'card_name': 'Free Pack Pull', 'buy_price': None, 'quantity': 3, 'condition': 'Raw'},
+    ]
+
+
+class TestPortfolioAnalytics:
+    """Test cases for the columnar analytics engine"""
+
+    def test_matches_per_row_calculation(self, entries):
+        prices = [152.5, 48.9, 152.5, 35.0]
+        analytics = analyze(PortfolioColumns.from_rows(entries, prices))
+
+        for i, (entry, price) in enumerate(zip(entries, prices)):
+            investment = (entry['buy_price'] or 0) * entry['quantity']
+            value = price * entry['quantity']
+            roi = ((value - investment) / investment) * 100 if investment > 0 else 0
+            assert analytics.total_investment[i] == pytest.approx(investment)
+            assert analytics.current_value[i] == pytest.approx(value)
+            assert analytics.roi_percentage[i] == pytest.approx(roi)
+
+        assert analytics.summary == {
+            'total_investment': 440.0,
+            'total_value': 611.4,
+            'total_roi_percentage': 38.95,
+            'card_count': 4
+        }
+        assert analytics.weight.sum() == pytest.approx(1.0)
+
+    def test_empty_portfolio(self):
+        analytics = analyze(PortfolioColumns.from_rows([], []))
+        assert analytics.summary == {
+            'total_investment': 0.0, 'total_value': 0.0, 'total_roi_percentage': 0.0, 'card_count': 0
+        }
+        assert group_breakdown(analytics, []) == []
+
+    def test_group_breakdown(self, entries):
+        columns = PortfolioColumns.from_rows(entries, [152.5, 48.9, 152.5, 35.0])
+        analytics = analyze(columns)
+
+        groups = group_breakdown(analytics, [e['card_name'] for e in entries], quantity=columns.quantity)
+
+        assert [g['group'] for g in groups] == ['Wembanyama Prizm', 'Free Pack Pull', 'LeBron James']
+        wemby = groups[0]
+        assert wemby['row_count'] == 2
+        assert wemby['card_count'] == 3
+        assert wemby['total_investment'] == 380.0
+        assert wemby['total_value'] == 457.5
+        assert sum(g['weight_percentage'] for g in groups) == pytest.approx(100.0, abs=0.02)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for SQL-side portfolio breakdowns
+"""
+
+from app.core.database import PortfolioOperations, PortfolioSummaryOperations
+
+
+class TestPortfolioBreakdown:
+    """Test cases for PortfolioOperations.get_breakdown"""
+
+    def seed(self):
+        PortfolioOperations.add_card("LeBron James", purchase_price=40.0, quantity=2, condition="PSA 10",
+                                     purchase_date="2025-01-15", user_id="auth0|user1")
+        PortfolioOperations.add_card("LeBron James ", purchase_price=60.0, condition="Raw",
+                                     purchase_date="2025-02-01", user_id="auth0|user1")
+        PortfolioOperations.add_card("Luka Doncic", purchase_price=30.0, condition="PSA 10",
+                                     purchase_date="2025-01-20", user_id="auth0|user1")
+        PortfolioOperations.add_card("Luka Doncic", purchase_price=999.0, user_id="auth0|user2")
+        PortfolioSummaryOperations.apply_price_change("LeBron James", 100.0)
+
+    def test_by_condition_uses_holding_prices(self, migrated_engine):
+        self.seed()
+        groups = {g['group']: g for g in PortfolioOperations.get_breakdown("auth0|user1", by='condition')}
+
+        assert groups['PSA 10'] == {
+            'group': 'PSA 10', 'row_count': 2, 'card_count': 3,
+            'total_investment': 110.0, 'total_value': 230.0,
+            'roi_percentage': 109.09, 'weight_percentage': 69.7
+        }
+        assert groups['Raw']['total_value'] == 100.0
+
+    def test_by_card_name_groups_trimmed_names(self, migrated_engine):
+        self.seed()
+        groups = PortfolioOperations.get_breakdown("auth0|user1", by='card_name')
+
+        assert [g['group'] for g in groups] == ["LeBron James", "Luka Doncic"]
+        assert groups[0]['row_count'] == 2
+        assert groups[0]['total_value'] == 300.0
+
+    def test_by_purchase_month(self, migrated_engine):
+        self.seed()
+        groups = {g['group']: g for g in PortfolioOperations.get_breakdown("auth0|user1", by='purchase_month')}
+
+        assert set(groups) == {'2025-01', '2025-02'}
+        assert groups['2025-01']['card_count'] == 3
+
+    def test_empty_portfolio(self, migrated_engine):
+        assert PortfolioOperations.get_breakdown("auth0|nobody") == []
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for portfolio delta sync (updated_at + tombstones)
+"""
+
+from datetime import datetime, timedelta
+from app.core.database import PortfolioOperations
+from app.core.models import SessionLocal, Portfolio, PortfolioTombstone
+
+
+class TestPortfolioChanges:
+    """Test cases for PortfolioOperations.get_changes"""
+
+    def test_first_sync_is_full(self, migrated_engine):
+        PortfolioOperations.add_card("LeBron James", purchase_price=40.0, user_id="auth0|user1")
+        PortfolioOperations.add_card("Luka Doncic", purchase_price=30.0, user_id="auth0|user2")
+
+        result = PortfolioOperations.get_changes("auth0|user1")
+
+        assert result['full_resync']
+        assert [card['card_name'] for card in result['changes']] == ["LeBron James"]
+        assert result['deleted'] == []
+        assert PortfolioOperations.parse_sync_token(result['next_token'])
+
+    def test_delta_returns_only_changed_and_deleted(self, migrated_engine):
+        keep = PortfolioOperations.add_card("LeBron James", purchase_price=40.0, user_id="auth0|user1")
+        edit = PortfolioOperations.add_card("Luka Doncic", purchase_price=30.0, user_id="auth0|user1")
+        gone = PortfolioOperations.add_card("Jordan Fleer", purchase_price=500.0, user_id="auth0|user1")
+
+        # Pretend the initial sync happened well before these edits (beyond the overlap window)
+        since = datetime.utcnow() + timedelta(minutes=1)
+        PortfolioOperations.update_card(edit['id'], quantity=3)
+        PortfolioOperations.delete_card(gone['id'])
+        db = SessionLocal()
+        db.query(PortfolioTombstone).update({'deleted_at': since + timedelta(seconds=1)})
+        db.query(Portfolio).filter(Portfolio.id == edit['id']).update({'updated_at': since + timedelta(seconds=1)})
+        db.commit()
+        db.close()
+
+        result = PortfolioOperations.get_changes("auth0|user1", since=since)
+
+        assert not result['full_resync']
+        assert [card['id'] for card in result['changes']] == [edit['id']]
+        assert result['changes'][0]['quantity'] == 3
+        assert result['deleted'] == [gone['id']]
+        assert keep['id'] not in [card['id'] for card in result['changes']]
+
+    def test_stale_token_forces_full_resync(self, migrated_engine):
+        PortfolioOperations.add_card("LeBron James", purchase_price=40.0, user_id="auth0|user1")
+        stale = datetime.utcnow() - timedelta(days=PortfolioOperations.TOMBSTONE_RETENTION_DAYS + 1)
+
+        result = PortfolioOperations.get_changes("auth0|user1", since=stale)
+
+        assert result['full_resync']
+        assert len(result['changes']) == 1
+
+    def test_cleanup_purges_old_tombstones(self, migrated_engine):
+        card = PortfolioOperations.add_card("LeBron James", purchase_price=40.0, user_id="auth0|user1")
+        PortfolioOperations.delete_card(card['id'])
+
+        assert PortfolioOperations.cleanup_tombstones() == 0
+        assert PortfolioOperations.cleanup_tombstones(retention_days=-1) == 1
+
+    def test_deleted_ids_are_not_reused(self, migrated_engine):
+        first = PortfolioOperations.add_card("LeBron James", purchase_price=40.0, user_id="auth0|user1")
+        last = PortfolioOperations.add_card("Luka Doncic", purchase_price=30.0, user_id="auth0|user1")
+        PortfolioOperations.delete_card(last['id'])
+
+        added = PortfolioOperations.add_card("Jordan Fleer", purchase_price=500.0, user_id="auth0|user1")
+
+        assert added['id'] > last['id'] > first['id']
+
+    def test_row_present_wins_over_its_tombstone(self, migrated_engine):
+        since = datetime.utcnow() - timedelta(minutes=5)
+        card = PortfolioOperations.add_card("LeBron James", purchase_price=40.0, user_id="auth0|user1",
+                                            current_price=55.0)
+        db = SessionLocal()
+        db.add(PortfolioTombstone(portfolio_id=card['id'], user_id="auth0|user1", deleted_at=datetime.utcnow()))
+        db.commit()
+        db.close()
+
+        result = PortfolioOperations.get_changes("auth0|user1", since=since)
+
+        assert [change['id'] for change in result['changes']] == [card['id']]
+        assert result['deleted'] == []
+        assert result['prices'] == {"LeBron James": 55.0}
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for the authenticated portfolio endpoints in main.py
+"""
+
+import os
+import sys
+import pytest
+from jose import jwt
+
+# main.py imports the vision stack at module level
+pytest.importorskip('cv2')
+pytest.importorskip('ultralytics')
+pytest.importorskip('transformers')
+
+from fastapi.testclient import TestClient
+from app.core.database import PortfolioOperations
+
+# main.py imports the app as `backend.app.*`, so Backend/ must be importable too
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import backend.main as main
+from backend.app.core.models import SessionLocal as MainSessionLocal
+
+
+@pytest.fixture
+def client(migrated_engine):
+    """main.app bound to the scratch database (its modules are loaded as backend.app.*)"""
+    original_bind = MainSessionLocal.kw.get('bind')
+    MainSessionLocal.configure(bind=migrated_engine)
+    yield TestClient(main.app)
+    MainSessionLocal.configure(bind=original_bind)
+
+
+def auth(user_id):
+    return {'Authorization': f"Bearer {jwt.encode({'sub': user_id}, 'test-secret', algorithm='HS256')}"}
+
+
+class TestPortfolioEndpoints:
+    """Test cases for portfolio endpoints called with a bearer token"""
+
+    def test_changes_are_scoped_to_the_token_user(self, client):
+        PortfolioOperations.add_card("LeBron James", purchase_price=40.0, user_id="auth0|user1")
+        PortfolioOperations.add_card("Luka Doncic", purchase_price=30.0, user_id="auth0|user2")
+
+        response = client.get("/portfolio/changes", headers=auth("auth0|user1"))
+
+        assert response.status_code == 200
+        assert [card['card_name'] for card in response.json()['changes']] == ["LeBron James"]
+
+    def test_summary_and_breakdown_accept_a_token(self, client):
+        PortfolioOperations.add_card("LeBron James", purchase_price=40.0, user_id="auth0|user1")
+
+        assert client.get("/portfolio/summary", headers=auth("auth0|user1")).status_code == 200
+        assert client.get("/portfolio/breakdown", headers=auth("auth0|user1")).status_code == 200
+
+    def test_requests_without_a_token_are_rejected(self, client):
+        assert client.get("/portfolio/changes").status_code in (401, 403)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming DimeDrop portfolio export
+"""
+
+import io
+import csv
+import json
+import pytest
+from unittest.mock import patch
+from datetime import datetime
+from app.core.database import PortfolioOperations
+from app.core.models import SessionLocal, Portfolio
+from app.core.portfolio_tracker import PortfolioTracker
+from app.core.price_tracker import BatchPriceResolver, PriceTracker
+
+
+class FixedPriceResolver:
+    """Resolver stand-in that prices every card at 20.0 without touching the cache"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def resolve(self, card_names, budget=None):
+        self.calls.append(len(card_names))
+        return {name: 20.0 for name in card_names}
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+@pytest.fixture
+def portfolio(migrated_engine):
+    for i in range(25):
+        PortfolioOperations.add_card(f"Prizm, Silver #{i}", purchase_price=10.0, quantity=2, user_id="auth0|user1")
+    PortfolioOperations.add_card("Other User Card", purchase_price=10.0, user_id="auth0|user2")
+    resolver = FixedPriceResolver()
+    with patch('app.core.portfolio_tracker.price_resolver', resolver):
+        yield resolver
+
+
+class TestPortfolioExport:
+    """Test cases for CSV / NDJSON / Parquet portfolio export"""
+
+    @pytest.mark.asyncio
+    async def test_csv_quotes_commas_and_streams_per_batch(self, portfolio):
+        chunks = await collect(PortfolioTracker().export_portfolio("auth0|user1", 'csv', batch_size=10))
+
+        # Header chunk, then one chunk per batch of 10
+        assert len(chunks) == 4
+        assert portfolio.calls == [10, 10, 5]
+
+        rows = list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+        assert rows[0][0] == 'Card Name'
+        assert len(rows) == 26
+        assert {row[0] for row in rows[1:]} == {f"Prizm, Silver #{i}" for i in range(25)}
+        assert rows[1][6] == '40.0'
+
+    @pytest.mark.asyncio
+    async def test_ndjson_one_object_per_row(self, portfolio):
+        chunks = await collect(PortfolioTracker().export_portfolio("auth0|user1", 'ndjson', batch_size=10))
+        records = [json.loads(line) for line in b''.join(chunks).decode('utf-8').splitlines()]
+
+        assert len(records) == 25
+        assert records[0]['roi_percentage'] == 100.0
+
+    @pytest.mark.asyncio
+    async def test_parquet_round_trip(self, portfolio):
+        pq = pytest.importorskip('pyarrow.parquet')
+        chunks = await collect(PortfolioTracker().export_portfolio("auth0|user1", 'parquet', batch_size=10))
+
+        table = pq.read_table(io.BytesIO(b''.join(chunks)))
+        assert table.num_rows == 25
+        assert pq.ParquetFile(io.BytesIO(b''.join(chunks))).num_row_groups == 3
+        assert table.column('current_value').to_pylist() == [40.0] * 25
+
+    @pytest.mark.asyncio
+    async def test_empty_portfolio_exports_header_only(self, portfolio):
+        csv_data = await PortfolioTracker().export_portfolio_csv("auth0|nobody")
+        assert csv_data.splitlines() == [
+            "Card Name,Buy Price,Current Price,Quantity,Condition,Total Investment,Current Value,ROI %,Purchase Date"
+        ]
+
+    def test_unknown_format_rejected(self, migrated_engine):
+        from fastapi import HTTPException
+        with pytest.raises(HTTPException) as exc:
+            PortfolioTracker().export_portfolio("auth0|user1", 'xlsx')
+        assert exc.value.status_code == 400
+
+    def test_pages_break_created_at_ties_by_id(self, migrated_engine):
+        for i in range(7):
+            PortfolioOperations.add_card(f"Card {i}", purchase_price=10.0, user_id="auth0|user1")
+        db = SessionLocal()
+        db.query(Portfolio).update({Portfolio.created_at: datetime(2024, 1, 1)})
+        db.commit()
+        db.close()
+
+        ids, after = [], None
+        while page := PortfolioOperations.get_cards_page("auth0|user1", after, limit=3):
+            ids.extend(entry['id'] for entry in page)
+            after = (page[-1]['created_at'], page[-1]['id'])
+
+        assert ids == sorted(ids, reverse=True)
+        assert len(ids) == 7
+
+    @pytest.mark.asyncio
+    async def test_export_prices_from_cache_without_refreshing(self, migrated_engine):
+        PortfolioOperations.add_card("Uncached Card", purchase_price=10.0, user_id="auth0|user1", current_price=12.0)
+
+        class FailingTracker(PriceTracker):
+            async def refresh_prices(self, card_query):
+                raise AssertionError("export must not refresh prices")
+
+        with patch('app.core.portfolio_tracker.price_resolver', BatchPriceResolver(FailingTracker())):
+            csv_data = await PortfolioTracker().export_portfolio_csv("auth0|user1")
+
+        assert csv_data.splitlines()[1].split(',')[2] == '12.0'
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for daily portfolio snapshots and the downsampled history series
+"""
+
+from datetime import date, datetime, timedelta
+from app.core.database import CacheOperations, PortfolioOperations, PortfolioSnapshotOperations
+from app.core.scheduler import seconds_until
+
+
+class TestPortfolioSnapshots:
+    """Test cases for the nightly snapshot job and get_history"""
+
+    def test_snapshot_values_every_user_from_cache(self, migrated_engine):
+        PortfolioOperations.add_card("LeBron James", purchase_price=40.0, quantity=2, user_id="auth0|user1")
+        PortfolioOperations.add_card("Luka Doncic", purchase_price=30.0, user_id="auth0|user1")
+        PortfolioOperations.add_card("LeBron James", purchase_price=50.0, user_id="auth0|user2")
+        CacheOperations.set_cached_price("LeBron James", {'avg_price': 60.0})
+
+        assert PortfolioSnapshotOperations.take_snapshots(date(2025, 1, 1)) == 2
+
+        user1 = PortfolioSnapshotOperations.get_history("auth0|user1")
+        assert user1 == [{
+            'date': '2025-01-01',
+            'total_investment': 110.0,
+            'total_value': 150.0,  # LeBron from cache, Luka at its buy price
+            'total_roi_percentage': 36.36,
+            'card_count': 2
+        }]
+        assert PortfolioSnapshotOperations.get_history("auth0|user2")[0]['total_value'] == 60.0
+
+    def test_rerun_overwrites_same_day(self, migrated_engine):
+        PortfolioOperations.add_card("LeBron James", purchase_price=40.0, user_id="auth0|user1")
+        PortfolioSnapshotOperations.take_snapshots(date(2025, 1, 1))
+        PortfolioOperations.add_card("Luka Doncic", purchase_price=30.0, user_id="auth0|user1")
+        PortfolioSnapshotOperations.take_snapshots(date(2025, 1, 1))
+
+        history = PortfolioSnapshotOperations.get_history("auth0|user1")
+        assert len(history) == 1
+        assert history[0]['card_count'] == 2
+
+    def test_downsampling_keeps_period_close(self, migrated_engine):
+        PortfolioOperations.add_card("LeBron James", purchase_price=40.0, user_id="auth0|user1")
+        first = date(2023, 1, 1)
+        for day in range(730):
+            PortfolioSnapshotOperations.take_snapshots(first + timedelta(days=day))
+
+        daily = PortfolioSnapshotOperations.get_history("auth0|user1")
+        weekly = PortfolioSnapshotOperations.get_history("auth0|user1", interval='weekly')
+        monthly = PortfolioSnapshotOperations.get_history("auth0|user1", interval='monthly')
+
+        assert len(daily) == 730
+        assert 104 <= len(weekly) <= 106
+        assert len(monthly) == 24
+        assert monthly[0]['date'] == '2023-01-31'
+        assert monthly[-1]['date'] == '2024-12-30'
+
+        ranged = PortfolioSnapshotOperations.get_history(
+            "auth0|user1", start=date(2024, 3, 1), end=date(2024, 5, 31), interval='monthly'
+        )
+        assert [point['date'] for point in ranged] == ['2024-03-31', '2024-04-30', '2024-05-31']
+
+    def test_seconds_until_next_run(self):
+        assert seconds_until(2, now=datetime(2025, 1, 1, 1, 30)) == 1800
+        assert seconds_until(2, now=datetime(2025, 1, 1, 2, 0)) == 86400
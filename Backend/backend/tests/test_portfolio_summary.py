@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for incrementally maintained DimeDrop portfolio summaries
+"""
+
+import pytest
+from unittest.mock import patch
+from app.core.database import CacheOperations, PortfolioOperations, PortfolioSummaryOperations
+from app.core.models import SessionLocal, PortfolioSummary
+from app.core.portfolio_tracker import PortfolioTracker
+from app.core.price_tracker import BatchPriceResolver, PriceTracker
+
+
+def unpriced_resolver():
+    """Resolver with no refresh budget: only cached prices resolve"""
+    return BatchPriceResolver(PriceTracker(), refresh_budget=0, refresh_window_seconds=None)
+
+
+class TestPortfolioSummary:
+    """Test cases for keeping portfolio_summaries in step with portfolio rows"""
+
+    def test_add_update_delete_keep_totals(self, migrated_engine):
+        a = PortfolioOperations.add_card("LeBron James", purchase_price=100.0, quantity=2,
+                                         user_id="auth0|user1", current_price=150.0)
+        PortfolioOperations.add_card("Luka Doncic", purchase_price=50.0, user_id="auth0|user1")
+
+        summary = PortfolioSummaryOperations.get_summary("auth0|user1")
+        assert summary['total_investment'] == 250.0
+        assert summary['total_value'] == 350.0
+        assert summary['card_count'] == 2
+
+        PortfolioOperations.update_card(a['id'], quantity=3)
+        assert PortfolioSummaryOperations.get_summary("auth0|user1")['total_value'] == 500.0
+
+        PortfolioOperations.delete_card(a['id'])
+        summary = PortfolioSummaryOperations.get_summary("auth0|user1")
+        assert summary['total_investment'] == 50.0
+        assert summary['total_value'] == 50.0
+        assert summary['card_count'] == 1
+
+        assert PortfolioSummaryOperations.check_summary("auth0|user1")['consistent']
+
+    def test_price_change_revalues_only_holders(self, migrated_engine):
+        PortfolioOperations.add_card("Wembanyama Prizm", purchase_price=100.0, quantity=2, user_id="auth0|user1")
+        PortfolioOperations.add_card("Wembanyama Prizm", purchase_price=120.0, user_id="auth0|user2")
+        PortfolioOperations.add_card("Jordan Fleer", purchase_price=500.0, user_id="auth0|user2")
+
+        assert PortfolioSummaryOperations.apply_price_change("Wembanyama Prizm", 200.0)
+
+        assert PortfolioSummaryOperations.get_summary("auth0|user1")['total_value'] == 400.0
+        assert PortfolioSummaryOperations.get_summary("auth0|user2")['total_value'] == 700.0
+
+    def test_unknown_user_reads_zeros(self, migrated_engine):
+        summary = PortfolioSummaryOperations.get_summary("auth0|nobody")
+        assert summary['total_value'] == 0.0
+        assert summary['card_count'] == 0
+
+    def test_check_summary_repairs_drift(self, migrated_engine):
+        PortfolioOperations.add_card("LeBron James", purchase_price=100.0, user_id="auth0|user1")
+
+        db = SessionLocal()
+        db.get(PortfolioSummary, "auth0|user1").total_investment = 999.0
+        db.commit()
+        db.close()
+
+        report = PortfolioSummaryOperations.check_summary("auth0|user1")
+        assert not report['consistent']
+        assert report['repaired']
+        assert PortfolioSummaryOperations.get_summary("auth0|user1")['total_investment'] == 100.0
+        assert PortfolioSummaryOperations.check_summary("auth0|user1")['consistent']
+
+    def test_check_summary_reprices_from_cache(self, migrated_engine):
+        PortfolioOperations.add_card("LeBron James", purchase_price=100.0, quantity=2, user_id="auth0|user1")
+        CacheOperations.set_cached_price("LeBron James", {'avg_price': 130.0})
+
+        report = PortfolioSummaryOperations.check_summary("auth0|user1")
+
+        assert report['repaired']
+        assert PortfolioSummaryOperations.get_summary("auth0|user1")['total_value'] == 260.0
+        assert PortfolioSummaryOperations.get_user_ids() == ["auth0|user1"]
+
+
+class TestPortfolioPricingRule:
+    """Test cases for /portfolio and the summary valuing cards the same way"""
+
+    @pytest.mark.asyncio
+    async def test_unpriced_add_does_not_revalue_holding(self, migrated_engine):
+        PortfolioOperations.add_card("LeBron James", purchase_price=100.0, user_id="auth0|user1", current_price=150.0)
+
+        with patch('app.core.portfolio_tracker.price_resolver', unpriced_resolver()):
+            added = await PortfolioTracker().add_card_to_portfolio(
+                {'card_name': "LeBron James", 'buy_price': 90.0, 'quantity': 1}, user_id="auth0|user1"
+            )
+
+        assert added['current_price'] == 150.0
+        assert PortfolioSummaryOperations.get_summary("auth0|user1")['total_value'] == 300.0
+
+    @pytest.mark.asyncio
+    async def test_portfolio_totals_match_summary(self, migrated_engine):
+        PortfolioOperations.add_card("LeBron James", purchase_price=100.0, quantity=2,
+                                     user_id="auth0|user1", current_price=150.0)
+        PortfolioOperations.add_card("Unknown Rookie", purchase_price=20.0, quantity=3, user_id="auth0|user1")
+        CacheOperations.set_cached_price("Luka Doncic", {'avg_price': 80.0})
+        PortfolioOperations.add_card("Luka Doncic", purchase_price=50.0, user_id="auth0|user1", current_price=80.0)
+
+        with patch('app.core.portfolio_tracker.price_resolver', unpriced_resolver()):
+            analytics = await PortfolioTracker().get_portfolio_analytics(user_id="auth0|user1")
+
+        summary = PortfolioSummaryOperations.get_summary("auth0|user1")
+        assert analytics['summary']['total_value'] == summary['total_value'] == 440.0
+        breakdown = PortfolioOperations.get_breakdown("auth0|user1", by='card_name')
+        assert sum(group['total_value'] for group in breakdown) == 440.0
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the price-update event bus and event-driven alert evaluation
+"""
+
+import asyncio
+import pytest
+from app.core.alerts_tracker import AlertsTracker, alert_index
+from app.core.database import AlertOperations
+from app.core.price_events import PriceEventBus, PriceUpdate, price_events
+from app.core.price_tracker import PriceTracker
+
+
+class FixedPriceTracker(PriceTracker):
+    """PriceTracker whose eBay fetch returns a fixed price"""
+
+    def __init__(self, price):
+        super().__init__()
+        self.price = price
+
+    async def _fetch_ebay_prices(self, card_query):
+        return {'items': [], 'avg_price': self.price, 'high': 0, 'low': 0, 'count': 0}
+
+
+class TestPriceEventBus:
+    """Test cases for PriceEventBus delivery"""
+
+    @pytest.mark.asyncio
+    async def test_inline_delivery_isolates_failing_handlers(self):
+        bus = PriceEventBus()
+        received = []
+
+        async def broken(event):
+            raise ValueError("boom")
+
+        async def record(event):
+            received.append(event.card_query)
+
+        bus.subscribe(broken)
+        bus.subscribe(record)
+        await bus.publish(PriceUpdate("LeBron James", {'avg_price': 50.0}))
+
+        assert received == ["LeBron James"]
+        assert bus.stats['handler_errors'] == 1
+
+    @pytest.mark.asyncio
+    async def test_dispatcher_coalesces_per_card(self):
+        bus = PriceEventBus()
+        received = []
+
+        async def record(event):
+            received.append((event.card_query, event.avg_price))
+
+        bus.subscribe(record)
+        await bus.start()
+        for price in (10.0, 11.0, 12.0):
+            await bus.publish(PriceUpdate("LeBron James", {'avg_price': price}))
+        await bus.publish(PriceUpdate("Luka Doncic", {'avg_price': 30.0}))
+        await bus.stop()
+
+        assert received == [("LeBron James", 12.0), ("Luka Doncic", 30.0)]
+        assert bus.stats['coalesced'] == 2
+
+
+class TestEventDrivenAlerts:
+    """Test cases for alerts firing from price writes"""
+
+    @pytest.mark.asyncio
+    async def test_fresh_price_triggers_alerts_for_that_card(self, migrated_engine):
+        alert_index.reload()
+        alerts = AlertsTracker()
+        crossed = await alerts.create_alert({'card_name': 'Wembanyama Prizm', 'target_price': 150.0,
+                                             'alert_type': 'above'}, user_id="auth0|user1")
+        await alerts.create_alert({'card_name': 'Luka Doncic Auto', 'target_price': 1.0,
+                                   'alert_type': 'above'}, user_id="auth0|user1")
+
+        price_events.subscribe(alerts.on_price_update)
+        try:
+            await price_events.start()
+            await FixedPriceTracker(160.0).get_prices('Wembanyama Prizm')
+            await asyncio.wait_for(price_events.stop(), timeout=5)
+        finally:
+            price_events.unsubscribe(alerts.on_price_update)
+            alert_index.loaded = False
+
+        # Only the card whose price moved was evaluated; the Luka alert stays armed
+        active = AlertOperations.get_alerts(active_only=True)
+        assert [alert['card_name'] for alert in active] == ['Luka Doncic Auto']
+        assert not AlertOperations.get_alerts_by_ids([crossed['id']])[0]['is_active']
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for monthly partitioning of DimeDrop price cache and price history
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import inspect
+from app.core.database import CacheOperations, PriceHistoryOperations
+from app.core.models import SessionLocal, PriceCache
+from app.core.partitions import price_cache_partitions, price_history_partitions
+
+
+def partition_names(engine, partitions):
+    return sorted(name for name in inspect(engine).get_table_names() if partitions.month_of(name))
+
+
+class TestPricePartitions:
+    """Test cases for partition routing and whole-partition retention"""
+
+    def test_cache_round_trip_routes_by_expiry_month(self, migrated_engine):
+        entry = CacheOperations.set_cached_price("Wembanyama Prizm", {'avg_price': 152.5})
+        expires_at = datetime.fromisoformat(entry['expires_at'])
+
+        assert partition_names(migrated_engine, price_cache_partitions) == [price_cache_partitions.name_for(expires_at)]
+
+        cached = CacheOperations.get_cached_price("Wembanyama Prizm")
+        assert cached['price_data'] == {'avg_price': 152.5}
+        assert CacheOperations.get_cached_price("Luka Doncic Auto") is None
+
+    def test_newest_entry_wins_across_partitions_and_legacy_table(self, migrated_engine):
+        db = SessionLocal()
+        db.add(PriceCache(
+            card_query="LeBron James", price_data={'avg_price': 40.0},
+            cached_at=datetime.utcnow() - timedelta(days=1),
+            expires_at=datetime.utcnow() + timedelta(days=89)
+        ))
+        db.commit()
+        db.close()
+
+        assert CacheOperations.get_cached_price("LeBron James")['price_data'] == {'avg_price': 40.0}
+
+        CacheOperations.set_cached_price("LeBron James", {'avg_price': 48.9}, cache_days=200)
+        assert CacheOperations.get_cached_price("LeBron James")['price_data'] == {'avg_price': 48.9}
+
+    def test_cleanup_drops_expired_partitions_whole(self, migrated_engine):
+        CacheOperations.set_cached_price("Old Card", {'avg_price': 10.0}, cache_days=-70)
+        CacheOperations.set_cached_price("Live Card", {'avg_price': 20.0})
+
+        dropped = CacheOperations.cleanup_expired()
+
+        assert dropped == 1
+        assert CacheOperations.get_cached_price("Live Card") is not None
+        remaining = partition_names(migrated_engine, price_cache_partitions)
+        assert all(price_cache_partitions.month_of(name) >= datetime.utcnow().date().replace(day=1)
+                   for name in remaining)
+
+    def test_history_spans_partitions(self, migrated_engine):
+        now = datetime.utcnow()
+        for days_ago in (65, 35, 5):
+            PriceHistoryOperations.record_price(
+                "Jordan Fleer", {'avg_price': 100.0 + days_ago, 'count': 5},
+                recorded_at=now - timedelta(days=days_ago)
+            )
+
+        history = PriceHistoryOperations.get_price_history("Jordan Fleer")
+        assert [h['avg_price'] for h in history] == [165.0, 135.0, 105.0]
+        assert len(partition_names(migrated_engine, price_history_partitions)) >= 3
+
+        recent = PriceHistoryOperations.get_price_history("Jordan Fleer", since=now - timedelta(days=40))
+        assert [h['avg_price'] for h in recent] == [135.0, 105.0]
+
+        PriceHistoryOperations.cleanup_expired(retention_days=20)
+        assert [h['avg_price'] for h in PriceHistoryOperations.get_price_history("Jordan Fleer")][-1] == 105.0
+        assert len(PriceHistoryOperations.get_price_history("Jordan Fleer")) < 3
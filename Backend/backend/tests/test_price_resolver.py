@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for batched price resolution used by portfolio valuation
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from app.core.database import CacheOperations, PortfolioOperations
+from app.core.partitions import price_cache_partitions
+from app.core.price_tracker import PriceTracker, BatchPriceResolver, RefreshBudget
+from app.core.portfolio_tracker import PortfolioTracker
+
+
+class CountingTracker(PriceTracker):
+    """PriceTracker whose eBay fetch is counted instead of hitting the network"""
+
+    def __init__(self):
+        super().__init__()
+        self.fetches = []
+
+    async def _fetch_ebay_prices(self, card_query):
+        self.fetches.append(card_query)
+        return {'items': [], 'avg_price': 10.0 + len(card_query), 'high': 0, 'low': 0, 'count': 0}
+
+
+class TestBatchPriceResolver:
+    """Test cases for BatchPriceResolver"""
+
+    @pytest.mark.asyncio
+    async def test_distinct_cards_fetched_once_then_served_from_cache(self, migrated_engine):
+        tracker = CountingTracker()
+        resolver = BatchPriceResolver(tracker, max_concurrency=8, refresh_budget=500)
+        names = [f"Card {i % 300}" for i in range(2000)]
+
+        prices = await resolver.resolve(names)
+
+        assert len(tracker.fetches) == 300
+        assert prices["Card 7"] == 10.0 + len("Card 7")
+
+        await resolver.resolve(names)
+        assert len(tracker.fetches) == 300
+
+    @pytest.mark.asyncio
+    async def test_refresh_budget_limits_fetches(self, migrated_engine):
+        tracker = CountingTracker()
+        resolver = BatchPriceResolver(tracker, refresh_budget=10)
+
+        prices = await resolver.resolve([f"Card {i}" for i in range(40)])
+
+        assert len(tracker.fetches) == 10
+        assert sum(price is not None for price in prices.values()) == 10
+
+    @pytest.mark.asyncio
+    async def test_refresh_budget_is_shared_across_calls(self, migrated_engine):
+        now = [0.0]
+        tracker = CountingTracker()
+        resolver = BatchPriceResolver(tracker, refresh_budget=10, refresh_window_seconds=100)
+        resolver.budget.clock = lambda: now[0]
+
+        for start in range(0, 40, 5):
+            await resolver.resolve([f"Card {i}" for i in range(start, start + 5)])
+        assert len(tracker.fetches) == 10
+
+        now[0] = 50.0  # half a window refills half the budget
+        await resolver.resolve([f"Card {i}" for i in range(100, 140)])
+        assert len(tracker.fetches) == 15
+
+    @pytest.mark.asyncio
+    async def test_caller_budget_spans_calls(self, migrated_engine):
+        tracker = CountingTracker()
+        resolver = BatchPriceResolver(tracker, refresh_budget=500)
+        budget = RefreshBudget(7)
+
+        for start in range(0, 40, 5):
+            await resolver.resolve([f"Card {i}" for i in range(start, start + 5)], budget=budget)
+
+        assert len(tracker.fetches) == 7
+        assert await resolver.resolve(["Card 99"], budget=RefreshBudget(0)) == {"Card 99": None}
+
+    @pytest.mark.asyncio
+    async def test_max_age_refreshes_oldest_cached_prices_first(self, migrated_engine):
+        for name, age_days in (("Card A", 3), ("Card B", 10), ("Card C", 0)):
+            entry = CacheOperations.set_cached_price(name, {'avg_price': 1.0})
+            with migrated_engine.begin() as conn:
+                for table in price_cache_partitions.tables_between(conn, start=datetime.utcnow()):
+                    conn.execute(table.update().where(table.c.id == entry['id'])
+                                 .values(cached_at=datetime.utcnow() - timedelta(days=age_days)))
+        tracker = CountingTracker()
+        resolver = BatchPriceResolver(tracker, refresh_budget=2)
+
+        prices = await resolver.resolve(["Card A", "Card B", "Card C", "Card D"], max_age=86400)
+
+        assert tracker.fetches == ["Card D", "Card B"]
+        assert prices == {"Card A": 1.0, "Card B": 10.0 + len("Card B"), "Card C": 1.0,
+                          "Card D": 10.0 + len("Card D")}
+
+    @pytest.mark.asyncio
+    async def test_portfolio_prices_rows_from_one_resolution(self, migrated_engine):
+        for i in range(30):
+            PortfolioOperations.add_card(f"Card {i % 3}", purchase_price=5.0, user_id="auth0|user1")
+
+        tracker = CountingTracker()
+        resolver = BatchPriceResolver(tracker)
+        with patch('app.core.portfolio_tracker.price_resolver', resolver):
+            portfolio = await PortfolioTracker().get_portfolio(user_id="auth0|user1")
+
+        assert len(portfolio) == 30
+        assert sorted(tracker.fetches) == ["Card 0", "Card 1", "Card 2"]
+        assert all(row['current_price'] == 10.0 + len(row['card_name']) for row in portfolio)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Tests for the push hub and the SSE / WebSocket event endpoints
+"""
+
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.stream import event_stream, router
+from app.core.alerts_tracker import AlertsTracker, alert_index
+from app.core.price_events import PriceUpdate
+from app.core.push_hub import PushEvent, PushHub, PushRelay, alert_topic, price_topic, push_hub
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+class TestPushHub:
+    """Test cases for PushHub fan-out"""
+
+    @pytest.mark.asyncio
+    async def test_publish_reaches_only_topic_subscribers(self):
+        hub = PushHub()
+        lebron = hub.subscribe([price_topic("LeBron James")])
+        both = hub.subscribe([price_topic("LeBron James"), price_topic("Luka Doncic")])
+        luka = hub.subscribe([price_topic("Luka Doncic")])
+
+        delivered = hub.publish(price_topic("LeBron James"), PushEvent('price', {'avg_price': 50.0}))
+
+        assert delivered == 2
+        assert lebron.pending() == 1 and both.pending() == 1 and luka.pending() == 0
+
+    @pytest.mark.asyncio
+    async def test_events_are_encoded_once(self):
+        hub = PushHub()
+        subscriptions = [hub.subscribe(["t"]) for _ in range(3)]
+        hub.publish("t", PushEvent('price', {'avg_price': 50.0}))
+
+        events = [await subscription.get(timeout=1) for subscription in subscriptions]
+
+        assert events[0] is events[1] is events[2]
+        assert events[0].sse is events[1].sse
+        assert events[0].sse.endswith('data: {"avg_price": 50.0}\n\n')
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_drops_oldest(self):
+        hub = PushHub(max_pending=2)
+        subscription = hub.subscribe(["t"])
+        for price in (1.0, 2.0, 3.0):
+            hub.publish("t", PushEvent('price', {'avg_price': price}))
+
+        received = [(await subscription.get(timeout=1)).data['avg_price'] for _ in range(2)]
+
+        assert received == [2.0, 3.0]
+        assert subscription.dropped == 1 and hub.stats['dropped'] == 1
+
+    @pytest.mark.asyncio
+    async def test_connection_and_topic_limits(self):
+        hub = PushHub(max_connections=1, max_topics=2)
+        subscription = hub.subscribe(["a", "b", "c"])
+
+        assert subscription.topics == {"a", "b"}
+        assert hub.subscribe(["a"]) is None
+
+        hub.unsubscribe(subscription)
+        assert hub.connections == 0
+        assert hub.publish("a", PushEvent('price', {})) == 0
+        assert hub.subscribe(["a"]) is not None
+
+    @pytest.mark.asyncio
+    async def test_price_updates_are_pushed(self):
+        hub = PushHub()
+        subscription = hub.subscribe([price_topic("Wembanyama Prizm ")])
+
+        await hub.on_price_update(PriceUpdate("Wembanyama Prizm", {'avg_price': 152.5, 'high': 160, 'low': 140}))
+
+        event = await subscription.get(timeout=1)
+        assert event.type == 'price'
+        assert event.data['avg_price'] == 152.5
+
+    @pytest.mark.asyncio
+    async def test_triggered_alerts_are_pushed_to_their_owner(self, migrated_engine):
+        owner = push_hub.subscribe([alert_topic("auth0|user1")])
+        other = push_hub.subscribe([alert_topic("auth0|user2")])
+        alert_index.reload()
+        try:
+            tracker = AlertsTracker()
+            await tracker.create_alert({'card_name': 'Wembanyama Prizm', 'target_price': 150.0,
+                                        'alert_type': 'above'}, user_id="auth0|user1")
+            await tracker.evaluate_price('Wembanyama Prizm', 160.0)
+
+            event = await owner.get(timeout=1)
+            assert event.type == 'alert_triggered'
+            assert event.data['current_price'] == 160.0
+            assert other.pending() == 0
+        finally:
+            alert_index.loaded = False
+            push_hub.unsubscribe(owner)
+            push_hub.unsubscribe(other)
+
+
+class TestPushRelay:
+    """Test cases for fan-out across workers through the shared event log"""
+
+    @pytest.mark.asyncio
+    async def test_events_reach_clients_on_other_workers(self, migrated_engine):
+        # Two workers' hubs and relays over the same database
+        hubs = [PushHub(), PushHub()]
+        relays = [PushRelay(hub, poll_interval=0.05) for hub in hubs]
+        here, there = (hub.subscribe([alert_topic("auth0|user1")]) for hub in hubs)
+        for relay in relays:
+            await relay.start()
+        try:
+            assert hubs[0].publish_alert("auth0|user1", {'id': 1, 'current_price': 160.0}) == 0
+
+            received = [await here.get(timeout=1), await there.get(timeout=1)]
+
+            assert [event.data['current_price'] for event in received] == [160.0, 160.0]
+            assert received[0].id == received[1].id
+        finally:
+            for relay in relays:
+                await relay.stop()
+        assert hubs[0].relay is None
+
+    @pytest.mark.asyncio
+    async def test_new_relay_skips_old_events(self, migrated_engine):
+        first = PushRelay(PushHub(), poll_interval=0.05)
+        await first.start()
+        first.send(price_topic("LeBron James"), PushEvent('price', {'avg_price': 50.0}))
+        await first.stop()
+
+        hub = PushHub()
+        subscription = hub.subscribe([price_topic("LeBron James")])
+        relay = PushRelay(hub)
+        await relay.start()
+        try:
+            assert await relay.relay_once() == 0
+            assert subscription.pending() == 0
+        finally:
+            await relay.stop()
+
+
+class TestEventEndpoints:
+    """Test cases for /stream/events and /ws/events"""
+
+    @pytest.mark.asyncio
+    async def test_sse_stream_frames_and_cleanup(self):
+        subscription = push_hub.subscribe([price_topic("LeBron James")])
+        stream = event_stream(subscription, heartbeat=0.05)
+
+        assert 'event: subscribed' in await stream.__anext__()
+        assert await stream.__anext__() == ": ping\n\n"
+        push_hub.publish(price_topic("LeBron James"), PushEvent('price', {'avg_price': 50.0}))
+        assert 'event: price' in await stream.__anext__()
+
+        await stream.aclose()
+        assert subscription not in push_hub._subscriptions
+
+    def test_sse_rejects_when_full(self, client, monkeypatch):
+        monkeypatch.setattr(push_hub, 'max_connections', 0)
+        assert client.get("/stream/events", params={'cards': 'LeBron James'}).status_code == 503
+
+    def test_sse_rejects_bad_token(self, client):
+        assert client.get("/stream/events", params={'token': 'not-a-jwt'}).status_code == 401
+
+    def test_websocket_subscription_management(self, client):
+        before = push_hub.connections
+        with client.websocket_connect("/ws/events?cards=LeBron James") as websocket:
+            assert websocket.receive_json()['data']['topics'] == ["price:LeBron James"]
+            assert push_hub.connections == before + 1
+
+            websocket.send_json({'action': 'subscribe', 'cards': ['Luka Doncic']})
+            assert websocket.receive_json()['data']['topics'] == ["price:LeBron James", "price:Luka Doncic"]
+
+            websocket.send_json({'action': 'unsubscribe', 'cards': ['LeBron James']})
+            assert websocket.receive_json()['data']['topics'] == ["price:Luka Doncic"]
+
+            websocket.send_json({'action': 'bogus'})
+            assert websocket.receive_json()['type'] == 'error'
+
+
+        assert push_hub.connections == before
+
+    def test_websocket_rejects_malformed_messages_and_stays_open(self, client):
+        with client.websocket_connect("/ws/events?cards=LeBron James") as websocket:
+            websocket.receive_json()
+            for message in (["LeBron James"], "subscribe", {'action': 'subscribe', 'cards': "LeBron James"},
+                            {'action': 'subscribe', 'cards': [1]}, {'action': 'subscribe', 'cards': [None]}):
+                websocket.send_json(message)
+                assert websocket.receive_json()['type'] == 'error'
+
+            websocket.send_text("{not json")
+            assert websocket.receive_json()['data']['detail'] == "message must be JSON"
+
+            websocket.send_json({'action': 'subscribe', 'cards': ['Luka Doncic']})
+            assert websocket.receive_json()['data']['topics'] == ["price:LeBron James", "price:Luka Doncic"]
+
+    def test_stats(self, client):
+        stats = client.get("/stream/stats").json()
+        assert {'connections', 'published', 'delivered', 'dropped'} <= set(stats)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Query plan regression tests for DimeDrop
+Migrates a scratch SQLite database to head, runs every hot query in
+database.py against it and fails if EXPLAIN QUERY PLAN shows a full table scan
+"""
+
+import re
+import pytest
+from datetime import datetime
+from sqlalchemy import event, inspect
+from app.core.database import (
+    CacheOperations, PriceHistoryOperations, RateLimitOperations,
+    PortfolioOperations, NotificationOperations, OutboxOperations, PortfolioSummaryOperations,
+    PortfolioSnapshotOperations, AlertOperations, JobOperations, WeeklySummaryOperations,
+    AuthorKarmaOperations, PolarityOperations, ChangeCounterOperations, PushEventOperations
+)
+
+# "SCAN <table>" is a full scan; "SEARCH <table> USING ..." is an index lookup
+FULL_SCAN = re.compile(r'^SCAN (\w+)(?! USING (?:COVERING )?INDEX \w+ \()')
+
+
+@pytest.fixture
+def captured_queries(migrated_engine):
+    """Record every SELECT/UPDATE/DELETE issued through the engine"""
+    queries = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+            queries.append((statement, parameters))
+
+    event.listen(migrated_engine, 'before_cursor_execute', before_cursor_execute)
+    yield queries
+    event.remove(migrated_engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def full_scans(engine, queries):
+    """Return (statement, plan detail) for every query that scans a whole table"""
+    tables = set(inspect(engine).get_table_names())
+    scans = []
+    with engine.connect() as conn:
+        for statement, parameters in queries:
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            for row in plan:
+                match = FULL_SCAN.match(row[-1])
+                if match and match.group(1) in tables:
+                    scans.append((statement, row[-1]))
+    return scans
+
+
+class TestQueryPlans:
+    """Every hot query in database.py must be served by an index"""
+
+    def test_migrations_create_expected_indexes(self, migrated_engine):
+        """Head revision has the composite and unique indexes the queries rely on"""
+        inspector = inspect(migrated_engine)
+
+        price_cache = {i['name']: i for i in inspector.get_indexes('price_cache')}
+        assert price_cache['idx_price_cache_query_expires']['column_names'] == ['card_query', 'expires_at']
+
+        rate_limits = {i['name']: i for i in inspector.get_indexes('api_rate_limits')}
+        assert rate_limits['uq_api_rate_limits_api_name_date']['column_names'] == ['api_name', 'date']
+        assert rate_limits['uq_api_rate_limits_api_name_date']['unique']
+
+    def test_cache_queries_use_indexes(self, migrated_engine, captured_queries):
+        CacheOperations.set_cached_price("Wembanyama Prizm", {'avg_price': 152.5})
+        CacheOperations.get_cached_price("Wembanyama Prizm")
+        CacheOperations.get_cached_prices(["Wembanyama Prizm", "LeBron James"])
+        CacheOperations.cleanup_expired()
+
+        assert captured_queries
+        assert full_scans(migrated_engine, captured_queries) == []
+
+    def test_price_history_queries_use_indexes(self, migrated_engine, captured_queries):
+        PriceHistoryOperations.record_price("Wembanyama Prizm", {'avg_price': 152.5, 'count': 5})
+        PriceHistoryOperations.get_price_history("Wembanyama Prizm")
+
+        assert captured_queries
+        assert full_scans(migrated_engine, captured_queries) == []
+
+    def test_rate_limit_queries_use_indexes(self, migrated_engine, captured_queries):
+        RateLimitOperations.increment_call_count('ebay')
+        RateLimitOperations.increment_call_count('ebay')
+        RateLimitOperations.get_call_count('ebay')
+
+        assert captured_queries
+        assert full_scans(migrated_engine, captured_queries) == []
+
+    def test_portfolio_queries_use_indexes(self, migrated_engine, captured_queries):
+        card = PortfolioOperations.add_card("LeBron James Rookie", purchase_price=250.0, user_id="auth0|user1")
+        PortfolioOperations.get_all_cards(user_id="auth0|user1")
+        PortfolioOperations.get_cards_page("auth0|user1", after=(card['created_at'], card['id']))
+        PortfolioOperations.get_card_by_id(card['id'])
+        PortfolioOperations.update_card(card['id'], quantity=2)
+        PortfolioOperations.get_breakdown("auth0|user1", by='condition')
+        PortfolioOperations.get_breakdown("auth0|user1", by='purchase_month')
+        PortfolioOperations.get_changes("auth0|user1", since=datetime.utcnow())
+        PortfolioOperations.delete_card(card['id'])
+        PortfolioOperations.cleanup_tombstones()
+
+        assert captured_queries
+        assert full_scans(migrated_engine, captured_queries) == []
+
+    def test_portfolio_summary_queries_use_indexes(self, migrated_engine, captured_queries):
+        PortfolioOperations.add_card("LeBron James Rookie", purchase_price=250.0, user_id="auth0|user1")
+        PortfolioSummaryOperations.apply_price_change("LeBron James Rookie", 300.0)
+        PortfolioSummaryOperations.get_summary("auth0|user1")
+
+        assert captured_queries
+        assert full_scans(migrated_engine, captured_queries) == []
+
+    def test_portfolio_history_queries_use_indexes(self, migrated_engine, captured_queries):
+        PortfolioOperations.add_card("LeBron James Rookie", purchase_price=250.0, user_id="auth0|user1")
+        PortfolioSnapshotOperations.take_snapshots()
+        captured_queries.clear()  # the job reads every holding by design
+
+        PortfolioSnapshotOperations.get_history("auth0|user1")
+        PortfolioSnapshotOperations.get_history("auth0|user1", interval='weekly')
+        PortfolioSnapshotOperations.get_history("auth0|user1", interval='monthly')
+
+        assert captured_queries
+        assert full_scans(migrated_engine, captured_queries) == []
+
+    def test_alert_queries_use_indexes(self, migrated_engine, captured_queries):
+        alert = AlertOperations.create_alert("LeBron James", 50.0, 'above', user_id="auth0|user1")
+        AlertOperations.get_alerts(user_id="auth0|user1")
+        AlertOperations.get_active_alerts()
+        ChangeCounterOperations.get_version('alerts')
+        AlertOperations.update_alert(alert['id'], {'target_price': 60.0})
+        AlertOperations.trigger_alerts([alert['id']], datetime.utcnow(), 60.0)
+        AlertOperations.rearm_alerts([alert['id']])
+        AlertOperations.deactivate_alerts([alert['id']])
+        AlertOperations.get_alerts_by_ids([alert['id']])
+        AlertOperations.delete_alert(alert['id'])
+
+        assert captured_queries
+        assert full_scans(migrated_engine, captured_queries) == []
+
+    def test_scheduler_queries_use_indexes(self, migrated_engine, captured_queries):
+        JobOperations.acquire_lease('check_alerts', 'worker-a', 60)
+        JobOperations.record_run('check_alerts', 'worker-a', datetime.utcnow(), 12.5, 'success')
+        JobOperations.get_job_stats('check_alerts')
+        JobOperations.cleanup_runs()
+        JobOperations.release_lease('check_alerts', 'worker-a')
+
+        assert captured_queries
+        assert full_scans(migrated_engine, captured_queries) == []
+
+    def test_outbox_queries_use_indexes(self, migrated_engine, captured_queries):
+        alert = AlertOperations.create_alert("LeBron James", 100.0, "above", user_id="auth0|user1")
+        AlertOperations.trigger_alerts([alert['id']], datetime.utcnow(), 120.0,
+                                       recipient_for=lambda alert: "test@example.com")
+        [row] = OutboxOperations.claim_batch('worker-a')
+        OutboxOperations.fail([row['id']], 'worker-a', 'timeout', datetime.utcnow())
+        [row] = OutboxOperations.claim_batch('worker-a', max_attempts=5)
+        OutboxOperations.extend_claims([row['id']], 'worker-a', 60)
+        OutboxOperations.complete([row['id']], 'worker-a')
+        OutboxOperations.get_backlog()
+        OutboxOperations.cleanup()
+
+        assert captured_queries
+        assert full_scans(migrated_engine, captured_queries) == []
+
+    def test_push_event_queries_use_indexes(self, migrated_engine, captured_queries):
+        PushEventOperations.append([("price:lebron james", 'price', {'avg_price': 50.0})])
+        PushEventOperations.get_last_id()
+        PushEventOperations.get_since(0)
+        PushEventOperations.cleanup()
+
+        assert captured_queries
+        assert full_scans(migrated_engine, captured_queries) == []
+
+    def test_notification_queries_use_indexes(self, migrated_engine, captured_queries):
+        NotificationOperations.create_or_update_notification_preferences("test@example.com")
+        NotificationOperations.get_notification_preferences("test@example.com")
+        NotificationOperations.get_notification_preferences_bulk(["a@example.com", "b@example.com"])
+        NotificationOperations.delete_notification_preferences("test@example.com")
+
+        assert captured_queries
+        assert full_scans(migrated_engine, captured_queries) == []
+
+    def test_weekly_summary_queries_use_indexes(self, migrated_engine, captured_queries):
+        PortfolioOperations.add_card("LeBron James Rookie", purchase_price=250.0, user_id="auth0|user1")
+        NotificationOperations.create_or_update_notification_preferences(
+            "test@example.com", weekly_summary_enabled=True, user_id="auth0|user1"
+        )
+        captured_queries.clear()
+
+        assert WeeklySummaryOperations.enqueue_summaries() == 1
+
+        assert captured_queries
+        assert full_scans(migrated_engine, captured_queries) == []
+
+    def test_author_karma_queries_use_indexes(self, migrated_engine, captured_queries):
+        AuthorKarmaOperations.store_karma({"wemby_fan": 500, "deleted_user": None}, ttl_seconds=3600)
+        AuthorKarmaOperations.get_karma(["wemby_fan", "deleted_user", "unknown"])
+        AuthorKarmaOperations.cleanup_expired()
+
+        assert captured_queries
+        assert full_scans(migrated_engine, captured_queries) == []
+
+    def test_polarity_queries_use_indexes(self, migrated_engine, captured_queries):
+        PolarityOperations.store_polarity({"a" * 32: 0.5, "b" * 32: -0.25})
+        PolarityOperations.get_polarity(["a" * 32, "c" * 32])
+        PolarityOperations.cleanup_expired()
+
+        assert captured_queries
+        assert full_scans(migrated_engine, captured_queries) == []
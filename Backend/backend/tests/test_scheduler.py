@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the lease-based background job scheduler
+"""
+
+import asyncio
+import random
+import pytest
+from datetime import datetime, timedelta
+from app.core.database import JobOperations
+from app.core.models import SessionLocal, JobLease
+from app.core.scheduler import Scheduler, ScheduledJob
+
+
+class TestJobLeases:
+    """Test cases for JobOperations lease handling"""
+
+    def test_only_one_owner_holds_a_lease(self, migrated_engine):
+        assert JobOperations.acquire_lease('check_alerts', 'worker-a', 60)
+        assert not JobOperations.acquire_lease('check_alerts', 'worker-b', 60)
+        # The holder renews
+        assert JobOperations.acquire_lease('check_alerts', 'worker-a', 60)
+
+    def test_expired_or_released_lease_can_be_taken(self, migrated_engine):
+        JobOperations.acquire_lease('check_alerts', 'worker-a', 60)
+        db = SessionLocal()
+        db.get(JobLease, 'check_alerts').expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.commit()
+        db.close()
+        assert JobOperations.acquire_lease('check_alerts', 'worker-b', 60)
+
+        assert JobOperations.release_lease('check_alerts', 'worker-b')
+        assert JobOperations.acquire_lease('check_alerts', 'worker-a', 60)
+
+
+class TestScheduler:
+    """Test cases for Scheduler runs across several workers"""
+
+    @pytest.mark.asyncio
+    async def test_long_run_keeps_its_lease(self, migrated_engine):
+        taken_by_other = []
+
+        async def job_func():
+            await asyncio.sleep(0.5)  # outlives the 0.3s lease
+            taken_by_other.append(await asyncio.to_thread(JobOperations.acquire_lease, 'warm', 'worker-b', 0.3))
+
+        job = ScheduledJob('warm', job_func, interval_seconds=60, lease_seconds=0.3)
+        assert await Scheduler(owner='worker-a').run_job(job) == 'success'
+        assert taken_by_other == [False]
+
+    @pytest.mark.asyncio
+    async def test_job_runs_in_one_worker_and_records_metrics(self, migrated_engine):
+        calls = []
+
+        async def job_func():
+            calls.append(1)
+
+        job = ScheduledJob('compact_caches', job_func, interval_seconds=60)
+        workers = [Scheduler(owner=f"worker-{i}") for i in range(4)]
+        for worker in workers:
+            worker.add_job(job)
+
+        results = await asyncio.gather(*[worker.run_job(job) for worker in workers])
+
+        assert results.count('success') == 1 and results.count(None) == 3
+        assert len(calls) == 1
+        assert sum(worker.stats['compact_caches']['skipped'] for worker in workers) == 3
+
+        stats = JobOperations.get_job_stats('compact_caches')
+        assert stats['runs'] == 1 and stats['failures'] == 0
+        assert stats['last_run']['status'] == 'success'
+
+    @pytest.mark.asyncio
+    async def test_failures_are_recorded(self, migrated_engine):
+        async def broken():
+            raise RuntimeError("eBay down")
+
+        worker = Scheduler(owner="worker-a")
+        job = ScheduledJob('warm_price_cache', broken, interval_seconds=60)
+        worker.add_job(job)
+
+        assert await worker.run_job(job) == 'failed'
+        stats = JobOperations.get_job_stats('warm_price_cache')
+        assert stats['failures'] == 1
+        assert stats['last_run']['error'] == "eBay down"
+
+    @pytest.mark.asyncio
+    async def test_start_runs_periodically_and_stop_releases(self, migrated_engine):
+        calls = []
+
+        async def job_func():
+            calls.append(1)
+
+        worker = Scheduler(owner="worker-a")
+        worker.add_job(ScheduledJob('check_alerts', job_func, interval_seconds=0.01, run_on_start=True))
+        await worker.start()
+        await asyncio.sleep(0.3)
+        await worker.stop()
+
+        assert len(calls) >= 2
+        assert JobOperations.acquire_lease('check_alerts', 'worker-b', 60)
+
+    def test_jitter_and_daily_delays(self):
+        rng = random.Random(1)
+        job = ScheduledJob('check_alerts', None, interval_seconds=300, jitter_seconds=30)
+        assert all(300 <= job.next_delay(rng) <= 330 for _ in range(50))
+        assert job.lease_seconds == 480
+
+        daily = ScheduledJob('portfolio_snapshots', None, daily_at_hour_utc=0)
+        assert 0 < daily.next_delay(rng) <= 86400
+        assert daily.lease_seconds == 3600
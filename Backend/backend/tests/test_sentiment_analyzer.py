@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Tests for SentimentAnalyzer's Reddit fetching
+"""
+
+import asyncio
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+import pytest
+from app.core.sentiment_analyzer import SentimentAnalyzer
+
+
+@pytest.fixture
+def analyzer(migrated_engine, monkeypatch):
+    """Analyzer configured as if Reddit credentials were set (no requests are made)"""
+    monkeypatch.setenv('REDDIT_CLIENT_ID', 'test-reddit-client-id')
+    monkeypatch.setenv('REDDIT_CLIENT_SECRET', 'test-reddit-client-secret')
+    monkeypatch.setenv('REDDIT_SOURCE_TIMEOUT_SECONDS', '0.5')
+    return SentimentAnalyzer()
+
+
+def fake_post(subreddit_name, title):
+    return {'title': title, 'selftext': '', 'score': 10, 'num_comments': 1, 'created_utc': time.time(),
+            'subreddit': subreddit_name, 'author_karma': 100, 'post_age_hours': 1.0}
+
+
+class TestRedditFetch:
+    """Test cases for concurrent subreddit searches"""
+
+    @pytest.mark.asyncio
+    async def test_subreddits_are_searched_concurrently(self, analyzer, monkeypatch):
+        def search(subreddit_name, card_name):
+            time.sleep(0.2)  # blocking, like PRAW
+            return [fake_post(subreddit_name, f"{card_name} looks great")]
+
+        monkeypatch.setattr(analyzer, '_search_subreddit', search)
+        start = time.perf_counter()
+        data = await analyzer._fetch_reddit_sentiment("Wembanyama Prizm")
+        elapsed = time.perf_counter() - start
+
+        assert data['total_posts'] == len(analyzer.target_subreddits)
+        assert [post['subreddit'] for post in data['posts']] == analyzer.target_subreddits
+        assert elapsed < 0.2 * len(analyzer.target_subreddits) / 2
+
+    @pytest.mark.asyncio
+    async def test_slow_and_failing_sources_are_dropped(self, analyzer, monkeypatch):
+        def search(subreddit_name, card_name):
+            if subreddit_name == 'nba':
+                time.sleep(1.0)
+            if subreddit_name == 'sports':
+                raise RuntimeError("403 Forbidden")
+            return [fake_post(subreddit_name, "good deal")]
+
+        monkeypatch.setattr(analyzer, '_search_subreddit', search)
+        start = time.perf_counter()
+        data = await analyzer._fetch_reddit_sentiment("Wembanyama Prizm")
+
+        assert time.perf_counter() - start < 0.9
+        assert {post['subreddit'] for post in data['posts']} == {'basketballcards', 'tradingcards',
+                                                                  'sportscollectors'}
+        assert data['avg_sentiment'] > 0
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self, analyzer, monkeypatch):
+        monkeypatch.setattr(analyzer, '_search_subreddit', lambda name, card: time.sleep(0.3) or [])
+
+        fetch = asyncio.create_task(analyzer._fetch_reddit_sentiment("Wembanyama Prizm"))
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        assert time.perf_counter() - start < 0.1
+        await fetch
+
+    def test_search_reads_posts_off_the_loop(self, analyzer, monkeypatch):
+        class LazyAuthor:
+            name = 'wemby_fan'
+
+            @property
+            def comment_karma(self):
+                raise AssertionError("karma would fetch the author's profile")
+
+        post = SimpleNamespace(title="Wemby PSA 10", selftext="", score=42, num_comments=7,
+                               created_utc=time.time() - 3600, subreddit=SimpleNamespace(display_name='nba'),
+                               author=LazyAuthor(), author_fullname='t2_wemby')
+        reddit = SimpleNamespace(subreddit=lambda name: SimpleNamespace(search=lambda query, sort, limit: [post]))
+        monkeypatch.setattr(analyzer, '_reddit_client', lambda: reddit)
+
+        [result] = analyzer._search_subreddit('nba', "Wembanyama Prizm")
+
+        assert result['author'] == 'wemby_fan'
+        assert result['author_fullname'] == 't2_wemby'
+        assert result['author_karma'] is None
+        assert result['subreddit'] == 'nba'
+        assert 0.9 < result['post_age_hours'] < 1.1
+
+
+class TestSentimentCache:
+    """Test cases for the per-card result cache"""
+
+    @pytest.fixture
+    def computes(self, analyzer, monkeypatch):
+        """Replace the analysis with a slow fake that records each card it runs for"""
+        calls = []
+
+        async def compute(card_name):
+            calls.append(card_name)
+            await asyncio.sleep(0.05)
+            return {'card_name': card_name, 'flip_score': 60 + len(calls)}
+
+        monkeypatch.setattr(analyzer, '_compute_sentiment', compute)
+        return calls
+
+    @pytest.mark.asyncio
+    async def test_repeat_requests_hit_the_cache(self, analyzer, computes):
+        first = await analyzer.analyze_card_sentiment("Wembanyama Prizm")
+        start = time.perf_counter()
+        second = await analyzer.analyze_card_sentiment("  wembanyama   PRIZM ")
+
+        assert time.perf_counter() - start < 0.01
+        assert computes == ["Wembanyama Prizm"]
+        assert second['flip_score'] == first['flip_score']
+        assert second['card_name'] == "  wembanyama   PRIZM "
+        assert analyzer.cache_stats['hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_analysis(self, analyzer, computes):
+        results = await asyncio.gather(*[analyzer.analyze_card_sentiment("Wembanyama Prizm") for _ in range(10)])
+
+        assert computes == ["Wembanyama Prizm"]
+        assert {result['flip_score'] for result in results} == {61}
+        assert analyzer.cache_stats['coalesced'] == 9
+
+    @pytest.mark.asyncio
+    async def test_stale_results_are_served_while_refreshing(self, analyzer, computes):
+        analyzer.cache_duration = timedelta(0)
+        await analyzer.analyze_card_sentiment("Wembanyama Prizm")
+
+        start = time.perf_counter()
+        stale = await analyzer.analyze_card_sentiment("Wembanyama Prizm")
+        assert time.perf_counter() - start < 0.01
+        assert stale['flip_score'] == 61
+        await asyncio.sleep(0.1)
+
+        assert computes == ["Wembanyama Prizm"] * 2
+        assert (await analyzer.analyze_card_sentiment("Wembanyama Prizm"))['flip_score'] == 62
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self, analyzer, monkeypatch):
+        calls = []
+
+        async def compute(card_name):
+            calls.append(card_name)
+            if len(calls) == 1:
+                raise RuntimeError("Reddit is down")
+            return {'card_name': card_name, 'flip_score': 70}
+
+        monkeypatch.setattr(analyzer, '_compute_sentiment', compute)
+        with pytest.raises(RuntimeError):
+            await analyzer.analyze_card_sentiment("Wembanyama Prizm")
+
+        assert (await analyzer.analyze_card_sentiment("Wembanyama Prizm"))['flip_score'] == 70
+        assert analyzer.cache_stats['errors'] == 1
+
+    @pytest.mark.asyncio
+    async def test_degraded_results_never_replace_a_good_one(self, analyzer, monkeypatch):
+        results = [{'flip_score': 72}, {'flip_score': 50, 'degraded': True}]
+
+        async def compute(card_name):
+            return dict(results.pop(0), card_name=card_name)
+
+        monkeypatch.setattr(analyzer, '_compute_sentiment', compute)
+        analyzer.cache_duration = timedelta(0)
+        await analyzer.analyze_card_sentiment("Wembanyama Prizm")
+        await analyzer.analyze_card_sentiment("Wembanyama Prizm")  # stale: refreshes during the outage
+        await asyncio.sleep(0.01)
+
+        assert (await analyzer.analyze_card_sentiment("Wembanyama Prizm"))['flip_score'] == 72
+        assert analyzer.cache_stats['degraded'] == 1
+
+    @pytest.mark.asyncio
+    async def test_degraded_results_expire_quickly(self, analyzer, monkeypatch):
+        calls = []
+
+        async def compute(card_name):
+            calls.append(card_name)
+            return {'card_name': card_name, 'flip_score': 50, 'degraded': True}
+
+        monkeypatch.setattr(analyzer, '_compute_sentiment', compute)
+        now = [1000.0]
+        analyzer._results.clock = lambda: now[0]
+        await analyzer.analyze_card_sentiment("Wembanyama Prizm")
+        await analyzer.analyze_card_sentiment("Wembanyama Prizm")
+        now[0] += analyzer.degraded_duration.total_seconds() + 1
+        await analyzer.analyze_card_sentiment("Wembanyama Prizm")
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_source_outage_flags_the_result(self, analyzer, monkeypatch):
+        def search(subreddit_name, card_name):
+            raise RuntimeError("503 Service Unavailable")
+
+        monkeypatch.setattr(analyzer, '_search_subreddit', search)
+        result = await analyzer._compute_sentiment("Wembanyama Prizm")
+
+        assert result['degraded'] is True
+        assert result['total_discussions'] == 0
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for the weekly portfolio summary batch job
+"""
+
+import json
+from datetime import date, datetime, timedelta
+import pytest
+from app.core import weekly_summary_job
+from app.core.database import (
+    CacheOperations, NotificationOperations, OutboxOperations, PortfolioOperations, WeeklySummaryOperations
+)
+from app.core.models import NotificationOutbox, PortfolioSnapshot, SessionLocal
+from app.core.notification_outbox import OutboxDrainer
+from app.core.notification_service import NotificationService
+
+WEEK_ENDING = date(2024, 1, 8)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """NotificationService with an in-process transport"""
+    monkeypatch.setenv('NOTIFICATION_TRANSPORT', 'local')
+    return NotificationService()
+
+
+def opt_in(email, user_id, **preferences):
+    NotificationOperations.create_or_update_notification_preferences(
+        email, weekly_summary_enabled=preferences.pop('weekly_summary_enabled', True), user_id=user_id, **preferences
+    )
+
+
+def outbox_payloads():
+    db = SessionLocal()
+    rows = db.query(NotificationOutbox).filter(NotificationOutbox.kind == 'weekly_summary').all()
+    db.close()
+    return {row.recipient: json.loads(row.payload) for row in rows}
+
+
+class TestWeeklySummaryOperations:
+    """Test cases for WeeklySummaryOperations.enqueue_summaries"""
+
+    def test_only_opted_in_users_with_holdings_get_summaries(self, migrated_engine):
+        for user in ("auth0|a", "auth0|b", "auth0|c"):
+            PortfolioOperations.add_card("LeBron James", purchase_price=100.0, user_id=user, current_price=120.0)
+        opt_in("a@example.com", "auth0|a")
+        opt_in("b@example.com", "auth0|b", weekly_summary_enabled=False)
+        opt_in("c@example.com", "auth0|c", email_notifications_enabled=False)
+        opt_in("d@example.com", "auth0|d")  # no holdings
+        NotificationOperations.create_or_update_notification_preferences("e@example.com", weekly_summary_enabled=True)
+
+        assert WeeklySummaryOperations.enqueue_summaries(WEEK_ENDING) == 1
+        assert set(outbox_payloads()) == {"a@example.com"}
+
+    def test_values_with_cached_prices_and_last_week(self, migrated_engine):
+        PortfolioOperations.add_card("LeBron James", purchase_price=100.0, quantity=2, user_id="auth0|a",
+                                     current_price=120.0)
+        PortfolioOperations.add_card("Luka Doncic", purchase_price=50.0, user_id="auth0|a", current_price=40.0)
+        CacheOperations.set_cached_price("LeBron James", {'avg_price': 150.0})
+        db = SessionLocal()
+        db.add(PortfolioSnapshot(user_id="auth0|a", snapshot_date=WEEK_ENDING - timedelta(days=7),
+                                 total_investment=250.0, total_value=250.0, card_count=2))
+        db.commit()
+        db.close()
+        opt_in("a@example.com", "auth0|a")
+
+        WeeklySummaryOperations.enqueue_summaries(WEEK_ENDING)
+        summary = outbox_payloads()["a@example.com"]
+
+        # LeBron from the price cache, Luka at its last valued price
+        assert summary['total_value'] == 340.0
+        assert summary['total_investment'] == 250.0
+        assert summary['card_count'] == 2
+        assert summary['week_change'] == 90.0
+        assert summary['week_change_percentage'] == 36.0
+        assert [h['card_name'] for h in summary['top_holdings']] == ["LeBron James", "Luka Doncic"]
+        assert summary['week_ending'] == WEEK_ENDING.isoformat()
+
+    def test_pages_cover_every_recipient(self, migrated_engine):
+        for i in range(7):
+            PortfolioOperations.add_card("LeBron James", purchase_price=100.0, user_id=f"auth0|{i}")
+            opt_in(f"user{i}@example.com", f"auth0|{i}")
+        # A second address for the same user, which may straddle a page boundary
+        opt_in("user3-work@example.com", "auth0|3")
+
+        assert WeeklySummaryOperations.enqueue_summaries(WEEK_ENDING, batch_size=2, chunk_size=1) == 8
+        assert len(outbox_payloads()) == 8
+        assert outbox_payloads()["user3-work@example.com"]['week_change'] is None
+
+
+class TestWeeklySummaryDelivery:
+    """Test cases for sending weekly summaries through the outbox"""
+
+    @pytest.mark.asyncio
+    async def test_drainer_renders_summaries(self, migrated_engine, service):
+        PortfolioOperations.add_card("<b>LeBron</b>", purchase_price=100.0, user_id="auth0|a", current_price=120.0)
+        opt_in("a@example.com", "auth0|a", alert_trigger_notifications=False)
+        WeeklySummaryOperations.enqueue_summaries(WEEK_ENDING)
+
+        await OutboxDrainer(service=service, owner='worker-a').drain_once()
+
+        [message] = service.transport.sent
+        assert message.to == "a@example.com"
+        assert "$120.00" in message.subject
+        assert "&lt;b&gt;LeBron&lt;/b&gt;" in message.html
+        assert OutboxOperations.get_backlog()['pending'] == 0
+
+    @pytest.mark.asyncio
+    async def test_opting_out_after_enqueue_skips(self, migrated_engine, service):
+        PortfolioOperations.add_card("LeBron James", purchase_price=100.0, user_id="auth0|a")
+        opt_in("a@example.com", "auth0|a")
+        WeeklySummaryOperations.enqueue_summaries(WEEK_ENDING)
+        opt_in("a@example.com", "auth0|a", weekly_summary_enabled=False)
+
+        await OutboxDrainer(service=service, owner='worker-a').drain_once()
+
+        assert service.transport.sent == []
+
+    @pytest.mark.asyncio
+    async def test_job_runs_only_on_its_weekday(self, migrated_engine, monkeypatch):
+        PortfolioOperations.add_card("LeBron James", purchase_price=100.0, user_id="auth0|a")
+        opt_in("a@example.com", "auth0|a")
+        today = datetime.utcnow().weekday()
+
+        monkeypatch.setenv('WEEKLY_SUMMARY_WEEKDAY', str((today + 1) % 7))
+        assert await weekly_summary_job.run_weekly_summary_job() == 0
+
+        monkeypatch.setenv('WEEKLY_SUMMARY_WEEKDAY', str(today))
+        assert await weekly_summary_job.run_weekly_summary_job() == 1
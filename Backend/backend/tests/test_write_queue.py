@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the DimeDrop group-commit write queue
+"""
+
+import asyncio
+import pytest
+from app.core.database import PortfolioOperations, NotificationOperations
+from app.core.models import SessionLocal, Portfolio
+from app.core.write_queue import WriteQueue
+
+
+class TestWriteQueue:
+    """Test cases for batching writes through a single writer task"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_share_transactions(self, migrated_engine):
+        """Concurrent writers each get their own result from far fewer commits"""
+        queue = WriteQueue(max_delay_ms=20)
+        await queue.start()
+
+        results = await asyncio.gather(*[
+            queue.submit(lambda db, i=i: PortfolioOperations.add_card(
+                f"Card {i}", purchase_price=10.0 + i, user_id="auth0|user1", db=db
+            ))
+            for i in range(60)
+        ])
+        await queue.stop()
+
+        assert [r['card_name'] for r in results] == [f"Card {i}" for i in range(60)]
+        assert len({r['id'] for r in results}) == 60
+        assert queue.stats['writes'] == 60
+        assert queue.stats['batches'] < 60
+        assert len(PortfolioOperations.get_all_cards(user_id="auth0|user1")) == 60
+
+    @pytest.mark.asyncio
+    async def test_failed_operation_only_fails_its_caller(self, migrated_engine):
+        """A raising operation rolls back its savepoint; the rest of the batch commits"""
+        queue = WriteQueue(max_delay_ms=20)
+        await queue.start()
+
+        def broken(db):
+            db.add(Portfolio(user_id="auth0|user1", card_name="Broken", buy_price=1, quantity=1))
+            db.flush()
+            raise ValueError("boom")
+
+        good, bad, prefs = await asyncio.gather(
+            queue.submit(lambda db: PortfolioOperations.add_card("Good", purchase_price=5.0, user_id="auth0|user1", db=db)),
+            queue.submit(broken),
+            queue.submit(lambda db: NotificationOperations.create_or_update_notification_preferences("a@b.com", db=db)),
+            return_exceptions=True
+        )
+        await queue.stop()
+
+        assert good['card_name'] == "Good"
+        assert isinstance(bad, ValueError)
+        assert prefs['email'] == "a@b.com"
+
+        names = [c['card_name'] for c in PortfolioOperations.get_all_cards(user_id="auth0|user1")]
+        assert names == ["Good"]
+        assert queue.stats['failed_writes'] == 1
+
+    @pytest.mark.asyncio
+    async def test_submit_requires_running_queue(self, migrated_engine):
+        queue = WriteQueue()
+        with pytest.raises(RuntimeError):
+            await queue.submit(lambda db: None)
+
+    @pytest.mark.asyncio
+    async def test_session_failure_fails_the_batch(self, migrated_engine):
+        """A session that can't be created fails its callers instead of killing the writer"""
+        sessions = iter([RuntimeError("database unavailable")])
+
+        def session_factory():
+            error = next(sessions, None)
+            if error:
+                raise error
+            return SessionLocal()
+
+        queue = WriteQueue(max_delay_ms=1, session_factory=session_factory)
+        await queue.start()
+
+        with pytest.raises(RuntimeError, match="database unavailable"):
+            await asyncio.wait_for(queue.submit(lambda db: None), timeout=1)
+        assert await asyncio.wait_for(queue.submit(lambda db: "ok"), timeout=1) == "ok"
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_submits_racing_stop_fail(self, migrated_engine):
+        """Operations submitted once stop() has begun are rejected, never left hanging"""
+        queue = WriteQueue(max_delay_ms=20)
+        await queue.start()
+
+        first = asyncio.create_task(queue.submit(lambda db: "first"))
+        await asyncio.sleep(0)
+        stopping = asyncio.create_task(queue.stop())
+        await asyncio.sleep(0)
+        with pytest.raises(RuntimeError):
+            await queue.submit(lambda db: "late")
+
+        await asyncio.wait_for(stopping, timeout=1)
+        assert await first == "first"
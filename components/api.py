@@ -101,6 +101,18 @@ class APIManager:
         except requests.RequestException:
             return []
 
+    def get_portfolio_changes(self, token: str, since: Optional[str] = None) -> Optional[Dict]:
+        """Get portfolio rows changed since a sync token (None if the API is unavailable)."""
+        url = f"{self.base_url}/portfolio/changes"
+        headers = {"Authorization": f"Bearer {token}"}
+        params = {"since": since} if since else {}
+        try:
+            response = self.session.get(url, headers=headers, params=params, timeout=5)
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException:
+            return None
+
     def update_portfolio(self, action: str, card_data: Dict, token: str) -> Dict:
         """Update portfolio (add/update/delete)."""
         url = f"{self.base_url}/portfolio"
@@ -14,6 +14,9 @@ class PortfolioManagerComponent:
 
     def __init__(self, api_manager):
         self.api = api_manager
+        # Local copy of the portfolio keyed by card id, kept current via /portfolio/changes
+        self._replica = {}
+        self._sync_token = None
 
     def update_portfolio(self, action, card_name, quantity):
         """Update portfolio with add/update/delete."""
@@ -36,8 +39,31 @@ class PortfolioManagerComponent:
         return f"✅ {action}d {quantity} of '{card_name}' to portfolio."
 
     def get_portfolio(self):
-        """Get current user portfolio."""
-        return self.api.get_portfolio("mock_token")
+        """Get current user portfolio, fetching only rows changed since the last sync."""
+        delta = self.api.get_portfolio_changes("mock_token", self._sync_token)
+        if delta is None:
+            return self.api.get_portfolio("mock_token")
+
+        if delta.get("full_resync"):
+            self._replica = {}
+        for card_id in delta.get("deleted", []):
+            self._replica.pop(card_id, None)
+        for card in delta.get("changes", []):
+            self._replica[card["id"]] = card
+        self._sync_token = delta.get("next_token")
+
+        prices = delta.get("prices", {})
+        return [self._priced(card, prices) for card in self._replica.values()]
+
+    def _priced(self, card, prices):
+        """Replica row with the current price and ROI fields /portfolio returns."""
+        buy_price = card.get("buy_price") or 0
+        current_price = prices.get(card["card_name"].strip(), buy_price)
+        total_investment = buy_price * card["quantity"]
+        current_value = current_price * card["quantity"]
+        roi = (current_value - total_investment) / total_investment * 100 if total_investment else 0
+        return dict(card, current_price=current_price, total_investment=total_investment,
+                    current_value=current_value, roi_percentage=round(roi, 2))
 
     def export_portfolio(self, portfolio):
         """Export portfolio data."""